@@ -0,0 +1,62 @@
+"""jsonb_extra_data_and_gin_indexes
+
+Revision ID: b7c1d2e3f4a5
+Revises: e6509d63813f
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7c1d2e3f4a5'
+down_revision = 'e6509d63813f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Migrar columnas JSON -> JSONB (permite índices GIN y consultas con @>)
+    op.alter_column('products', 'extra_data',
+                    existing_type=sa.JSON(),
+                    type_=postgresql.JSONB(),
+                    postgresql_using='extra_data::jsonb')
+    op.alter_column('products', 'images',
+                    existing_type=sa.JSON(),
+                    type_=postgresql.JSONB(),
+                    postgresql_using='images::jsonb')
+    op.alter_column('import_jobs', 'result',
+                    existing_type=sa.JSON(),
+                    type_=postgresql.JSONB(),
+                    postgresql_using='result::jsonb')
+
+    # GIN con jsonb_path_ops: soporta @> (is_offer, characteristics, applications...)
+    op.create_index('ix_products_extra_data_gin', 'products', ['extra_data'],
+                    unique=False,
+                    postgresql_using='gin',
+                    postgresql_ops={'extra_data': 'jsonb_path_ops'})
+
+    # Índice parcial para el listado de ofertas por importador
+    op.create_index('ix_products_offers', 'products', ['importer_id'],
+                    unique=False,
+                    postgresql_where=sa.text('extra_data @> \'{"is_offer": true}\''))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_offers', table_name='products')
+    op.drop_index('ix_products_extra_data_gin', table_name='products')
+
+    op.alter_column('import_jobs', 'result',
+                    existing_type=postgresql.JSONB(),
+                    type_=sa.JSON(),
+                    postgresql_using='result::json')
+    op.alter_column('products', 'images',
+                    existing_type=postgresql.JSONB(),
+                    type_=sa.JSON(),
+                    postgresql_using='images::json')
+    op.alter_column('products', 'extra_data',
+                    existing_type=postgresql.JSONB(),
+                    type_=sa.JSON(),
+                    postgresql_using='extra_data::json')
@@ -0,0 +1,64 @@
+"""add_product_price_history
+
+Revision ID: c8d2e3f4a5b6
+Revises: b7c1d2e3f4a5
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8d2e3f4a5b6'
+down_revision = 'b7c1d2e3f4a5'
+branch_labels = None
+depends_on = None
+
+
+def _month_bounds(year: int, month: int):
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def upgrade() -> None:
+    # Tabla padre particionada por mes (las particiones se crean bajo demanda
+    # desde app.importers.persistence; aquí se crean el mes actual y el siguiente)
+    op.create_table('product_price_history',
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('importer_id', sa.Integer(), nullable=False),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('stock', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('product_id', 'recorded_at'),
+    postgresql_partition_by='RANGE (recorded_at)'
+    )
+    op.create_index('ix_product_price_history_importer_recorded', 'product_price_history',
+                    ['importer_id', 'recorded_at'], unique=False)
+
+    today = date.today()
+    months = [(today.year, today.month)]
+    months.append((today.year + 1, 1) if today.month == 12 else (today.year, today.month + 1))
+    for year, month in months:
+        start, end = _month_bounds(year, month)
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS product_price_history_{year}_{month:02d} "
+            f"PARTITION OF product_price_history "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    # Punto inicial del historial con el precio/stock actual de cada producto
+    op.execute(
+        "INSERT INTO product_price_history (product_id, recorded_at, importer_id, price, stock) "
+        "SELECT id, now(), importer_id, price, stock FROM products"
+    )
+
+
+def downgrade() -> None:
+    # Eliminar la tabla padre elimina también todas sus particiones
+    op.drop_index('ix_product_price_history_importer_recorded', table_name='product_price_history')
+    op.drop_table('product_price_history')
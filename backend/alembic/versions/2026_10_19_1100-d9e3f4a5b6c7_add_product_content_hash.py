@@ -0,0 +1,25 @@
+"""add_product_content_hash
+
+Revision ID: d9e3f4a5b6c7
+Revises: c8d2e3f4a5b6
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9e3f4a5b6c7'
+down_revision = 'c8d2e3f4a5b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Hash del payload normalizado; NULL hasta el próximo scraping de cada producto
+    op.add_column('products', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('products', 'content_hash')
@@ -0,0 +1,29 @@
+"""add_product_last_seen_at
+
+Revision ID: e0f4a5b6c7d8
+Revises: d9e3f4a5b6c7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e0f4a5b6c7d8'
+down_revision = 'd9e3f4a5b6c7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('products', sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=True))
+    # Los productos existentes se consideran vistos en su último scraping
+    op.execute("UPDATE products SET last_seen_at = COALESCE(last_scraped_at, updated_at)")
+    # El barrido de disponibilidad filtra por categoría
+    op.create_index(op.f('ix_products_category_id'), 'products', ['category_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_products_category_id'), table_name='products')
+    op.drop_column('products', 'last_seen_at')
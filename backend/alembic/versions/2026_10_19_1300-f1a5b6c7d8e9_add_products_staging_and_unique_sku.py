@@ -0,0 +1,56 @@
+"""add_products_staging_and_unique_sku
+
+Revision ID: f1a5b6c7d8e9
+Revises: e0f4a5b6c7d8
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a5b6c7d8e9'
+down_revision = 'e0f4a5b6c7d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Eliminar SKUs duplicados por importador (se conserva el más reciente)
+    op.execute(
+        "DELETE FROM products AS p USING products AS d "
+        "WHERE p.importer_id = d.importer_id AND p.sku = d.sku AND p.id < d.id"
+    )
+    # Destino del INSERT ... ON CONFLICT de la ingesta por staging
+    op.create_index('uq_products_importer_sku', 'products', ['importer_id', 'sku'], unique=True)
+
+    # Staging UNLOGGED para cargas COPY (sin WAL: solo datos en tránsito)
+    op.execute("""
+        CREATE UNLOGGED TABLE IF NOT EXISTS products_staging (
+            id BIGSERIAL PRIMARY KEY,
+            job_id VARCHAR(100) NOT NULL,
+            category_id INTEGER NOT NULL,
+            importer_id INTEGER NOT NULL,
+            sku VARCHAR(100) NOT NULL,
+            name VARCHAR(500),
+            description TEXT,
+            price DOUBLE PRECISION,
+            stock INTEGER,
+            brand VARCHAR(100),
+            url VARCHAR(500),
+            image_url VARCHAR(500),
+            images JSONB,
+            extra_data JSONB,
+            content_hash VARCHAR(64)
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_products_staging_job_category "
+        "ON products_staging (job_id, category_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS products_staging")
+    op.drop_index('uq_products_importer_sku', table_name='products')
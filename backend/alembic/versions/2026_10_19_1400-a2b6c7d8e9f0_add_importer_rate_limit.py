@@ -0,0 +1,27 @@
+"""add_importer_rate_limit
+
+Revision ID: a2b6c7d8e9f0
+Revises: f1a5b6c7d8e9
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a2b6c7d8e9f0'
+down_revision = 'f1a5b6c7d8e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rate limit compartido por proveedor (NULL = valor por defecto de settings)
+    op.add_column('importer_configs', sa.Column('rate_limit_per_second', sa.Float(), nullable=True))
+    op.add_column('importer_configs', sa.Column('rate_limit_burst', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('importer_configs', 'rate_limit_burst')
+    op.drop_column('importer_configs', 'rate_limit_per_second')
@@ -0,0 +1,61 @@
+"""add_failed_items
+
+Revision ID: b3c7d8e9f0a1
+Revises: a2b6c7d8e9f0
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3c7d8e9f0a1'
+down_revision = 'a2b6c7d8e9f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nuevo tipo de job: reprocesar solo los ítems fallidos
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE jobtype ADD VALUE IF NOT EXISTS 'RETRY_FAILED'")
+
+    # Dead-letter de SKUs que agotaron los reintentos dentro del job
+    op.create_table('failed_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('importer_id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('sku', sa.String(length=100), nullable=False),
+    sa.Column('url', sa.String(length=500), nullable=True),
+    sa.Column('stage', sa.String(length=20), nullable=False),
+    sa.Column('error_class', sa.String(length=100), nullable=False),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('failure_count', sa.Integer(), nullable=True),
+    sa.Column('job_id', sa.String(length=100), nullable=True),
+    sa.Column('first_failed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('last_failed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('resolved_job_id', sa.String(length=100), nullable=True),
+    sa.ForeignKeyConstraint(['importer_id'], ['importers.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_failed_items_id'), 'failed_items', ['id'], unique=False)
+    op.create_index('uq_failed_items_importer_sku', 'failed_items', ['importer_id', 'sku'], unique=True)
+    op.create_index(
+        'ix_failed_items_pending',
+        'failed_items',
+        ['importer_id', 'category_id'],
+        unique=False,
+        postgresql_where=sa.text('resolved_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_failed_items_pending', table_name='failed_items')
+    op.drop_index('uq_failed_items_importer_sku', table_name='failed_items')
+    op.drop_index(op.f('ix_failed_items_id'), table_name='failed_items')
+    op.drop_table('failed_items')
+    # Postgres no permite quitar valores de un enum: RETRY_FAILED queda en jobtype
@@ -0,0 +1,27 @@
+"""add_category_change_rate
+
+Revision ID: c4d8e9f0a1b2
+Revises: b3c7d8e9f0a1
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e9f0a1b2'
+down_revision = 'b3c7d8e9f0a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tasa de cambio aprendida y último refresh (scheduler de refresh)
+    op.add_column('categories', sa.Column('change_rate', sa.Float(), nullable=True))
+    op.add_column('categories', sa.Column('last_refreshed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('categories', 'last_refreshed_at')
+    op.drop_column('categories', 'change_rate')
@@ -0,0 +1,27 @@
+"""add_quick_refresh_job_type
+
+Revision ID: d5e9f0a1b2c3
+Revises: c4d8e9f0a1b2
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e9f0a1b2c3'
+down_revision = 'c4d8e9f0a1b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nuevo tipo de job: refresh de precio y stock solo desde los listados
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE jobtype ADD VALUE IF NOT EXISTS 'QUICK_REFRESH'")
+
+
+def downgrade() -> None:
+    # Postgres no permite quitar valores de un enum: QUICK_REFRESH queda en jobtype
+    pass
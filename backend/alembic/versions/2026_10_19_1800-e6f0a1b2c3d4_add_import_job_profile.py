@@ -0,0 +1,26 @@
+"""add_import_job_profile
+
+Revision ID: e6f0a1b2c3d4
+Revises: d5e9f0a1b2c3
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f0a1b2c3d4'
+down_revision = 'd5e9f0a1b2c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Perfil de tiempos por fase (auth, listing, navigation, save...) de cada job
+    op.add_column('import_jobs', sa.Column('profile', postgresql.JSONB(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('import_jobs', 'profile')
@@ -0,0 +1,29 @@
+"""add_import_job_heartbeat
+
+Revision ID: f7a1b2c3d4e5
+Revises: e6f0a1b2c3d4
+Create Date: 2026-10-19 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a1b2c3d4e5'
+down_revision = 'e6f0a1b2c3d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Último heartbeat del lease del job (lo usa claim_import_lease para
+    # distinguir un job activo de uno que quedó RUNNING sin worker)
+    op.add_column(
+        'import_jobs',
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('import_jobs', 'heartbeat_at')
@@ -1,23 +1,27 @@
 """
 Endpoints de desarrollo para scraping con navegador visible
 
-Estos endpoints ejecutan las importaciones de forma síncrona (bloqueante)
-con el navegador visible para facilitar el desarrollo y debugging.
+Las importaciones corren en el runner de desarrollo (cola imports.dev,
+worker local con pantalla: make dev-runner) con el navegador visible, para
+facilitar el desarrollo y debugging sin cargar el proceso de la API.
 
 ⚠️ NO USAR EN PRODUCCIÓN - Solo para desarrollo
 """
 
-import asyncio
 import uuid
 from typing import List
 
 from app.core.database import get_db
+from app.core.job_lock import JobLease, claim_import_lease
 from app.core.logger import logger
-from app.importers.emasa import EmasaAuthComponent, EmasaCategoriesComponent
-from app.importers.noriega import NoriegaAuthComponent, NoriegaCategoriesComponent
 from app.models import Importer, ImporterType, ImportJob, JobStatus, JobType
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from playwright.async_api import async_playwright
+from app.tasks.celery_app import celery_app
+from app.tasks.dev_tasks import (
+    DEV_COMPONENTS,
+    dev_import_categories_task,
+    dev_import_products_task,
+)
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -32,588 +36,123 @@ class ImportProductsRequest(BaseModel):
     selected_categories: List[str]
 
 
-@router.post("/{importer_name}/import-categories")
-async def dev_import_categories(importer_name: str, db: AsyncSession = Depends(get_db)):
+async def _claim_dev_job(
+    db: AsyncSession, importer_name: str, job_type: JobType, job_id: str
+):
     """
-    🔧 MODO DESARROLLO: Importa categorías con navegador visible
-
-    Este endpoint ejecuta el scraping de forma síncrona (bloqueante) con el
-    navegador visible para que puedas ver qué está haciendo en tiempo real.
+    Valida el importador, toma el lease y crea el job PENDING
 
-    ⚠️ Solo para desarrollo - El navegador se mantiene abierto 120 segundos
+    Returns:
+        (job_id, attached): attached=True si ya había un import en curso
     """
-    job_id = str(uuid.uuid4())
+    if importer_name.upper() not in DEV_COMPONENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Modo desarrollo no implementado para '{importer_name}' aún",
+        )
 
-    logger.info(
-        f"🔧 DEV MODE: Iniciando importación de categorías: {importer_name} | Job ID: {job_id}"
+    result = await db.execute(
+        select(Importer)
+        .options(joinedload(Importer.config))
+        .where(Importer.name == importer_name.upper())
     )
+    importer = result.unique().scalar_one_or_none()
 
-    try:
-        # Obtener importador y credenciales
-        result = await db.execute(
-            select(Importer)
-            .options(joinedload(Importer.config))
-            .where(Importer.name == importer_name.upper())
+    if not importer:
+        raise HTTPException(
+            status_code=404, detail=f"Importador '{importer_name}' no encontrado"
         )
-        importer = result.unique().scalar_one_or_none()
 
-        if not importer:
-            raise HTTPException(
-                status_code=404, detail=f"Importador '{importer_name}' no encontrado"
-            )
+    if not importer.config:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Configuración no encontrada para '{importer_name}'",
+        )
+
+    # Mismo lease que los imports de Celery: no duplicar un import en curso
+    lease, running_job_id = await claim_import_lease(
+        db, importer_name, job_type, job_id
+    )
+    if running_job_id:
+        return running_job_id, True
 
-        if not importer.config:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Configuración no encontrada para '{importer_name}'",
+    try:
+        db.add(
+            ImportJob(
+                job_id=job_id,
+                importer_id=importer.id,
+                job_type=job_type,
+                status=JobStatus.PENDING,
+                params={"source": "dev"},
             )
+        )
+        await db.commit()
+    except Exception:
+        await lease.release()
+        raise
 
-        credentials = importer.config.credentials or {}
+    return job_id, False
 
-        logger.info(f"📋 Credenciales cargadas desde BDD:")
-        logger.info(f"   - RUT: {credentials.get('rut', 'N/A')}")
-        logger.info(f"   - Usuario: {credentials.get('username', 'N/A')}")
-        logger.info(f"   - Password: {'*' * len(credentials.get('password', ''))}")
 
-        # Crear job en la base de datos
-        job = ImportJob(
-            job_id=job_id,
-            importer_id=importer.id,
-            job_type=JobType.CATEGORIES,
-            status=JobStatus.RUNNING,
-        )
-        db.add(job)
-        await db.commit()
+@router.post("/{importer_name}/import-categories")
+async def dev_import_categories(importer_name: str, db: AsyncSession = Depends(get_db)):
+    """
+    🔧 MODO DESARROLLO: Importa categorías con navegador visible
 
-        # Ejecutar scraping con navegador VISIBLE
-        async with async_playwright() as p:
-            logger.info("🌐 Lanzando Safari (WebKit) en modo visible...")
-            # 🍎 Usar WebKit (Safari) que funciona mejor en macOS
-            browser = await p.webkit.launch(
-                headless=False,  # ✅ Navegador visible
-                slow_mo=1000,  # Ralentizar 1 segundo entre acciones
-            )
+    El scraping corre en el runner de desarrollo (cola imports.dev, ver
+    app/tasks/dev_tasks.py), no en el proceso de la API. Igual que el de
+    productos, retorna el job_id inmediatamente para seguirlo con
+    /dev/status/{job_id}.
+    """
+    job_id = str(uuid.uuid4())
 
-            page = None
-            context = None
-
-            try:
-                if importer_name.upper() == "NORIEGA":
-                    logger.info("🔧 Ejecutando componente de Noriega")
-
-                    # Paso 1: Autenticación
-                    auth_component = NoriegaAuthComponent(
-                        importer_name=importer_name,
-                        job_id=job_id,
-                        db=db,
-                        browser=browser,
-                        credentials=credentials,
-                        headless=False,
-                    )
-                    auth_result = await auth_component.execute()
-
-                    page = auth_result.get("page")
-                    context = auth_result.get("context")
-
-                    if not auth_result["success"]:
-                        logger.error("❌ Autenticación fallida")
-                        job.status = JobStatus.FAILED
-                        job.result = {
-                            "success": False,
-                            "message": auth_result.get("message", ""),
-                            "error": auth_result.get("error"),
-                        }
-                        await db.commit()
-
-                        # Mantener navegador abierto para inspección
-                        logger.info(
-                            "🔍 Navegador abierto por 120 segundos para inspección..."
-                        )
-                        import asyncio
-
-                        await asyncio.sleep(120)
-
-                        return {
-                            "success": False,
-                            "job_id": job_id,
-                            "error": auth_result.get("error"),
-                            "message": "Revisa el navegador que se abrió para ver qué salió mal",
-                        }
-
-                    # Paso 2: Extracción de categorías
-                    logger.info("📋 Extrayendo categorías...")
-                    categories_component = NoriegaCategoriesComponent(
-                        importer_name=importer_name,
-                        job_id=job_id,
-                        db=db,
-                        browser=browser,
-                        page=page,
-                        context=context,
-                    )
-                    categories_result = await categories_component.execute()
-
-                    # Actualizar job
-                    job.status = (
-                        JobStatus.COMPLETED
-                        if categories_result["success"]
-                        else JobStatus.FAILED
-                    )
-                    job.result = categories_result
-                    job.progress = 100
-                    await db.commit()
-
-                    logger.info(f"✅ Importación completada: {job_id}")
-
-                    # ⚠️ MANTENER NAVEGADOR ABIERTO INDEFINIDAMENTE PARA DESARROLLO
-                    logger.info("=" * 80)
-                    logger.info("🔧 MODO DESARROLLO - NAVEGADOR PERMANECERÁ ABIERTO")
-                    logger.info("=" * 80)
-                    logger.info("")
-                    logger.info(
-                        f"✅ {categories_result.get('saved', 0)} categorías importadas"
-                    )
-                    logger.info("🏠 Navegador en la página de categorías")
-                    logger.info("")
-                    logger.info("📋 AHORA PUEDES:")
-                    logger.info("   1. Inspeccionar las categorías en el navegador")
-                    logger.info("   2. Verificar la estructura de las tablas")
-                    logger.info("   3. Navegar a una categoría de prueba")
-                    logger.info("   4. Desarrollar selectores si es necesario")
-                    logger.info("")
-                    logger.info("⏸️  El navegador NO se cerrará automáticamente")
-                    logger.info("🛑 Presiona Ctrl+C en esta terminal cuando termines")
-                    logger.info("")
-                    logger.info("=" * 80)
-
-                    # Esperar indefinidamente hasta Ctrl+C
-                    try:
-                        logger.info("⏳ Esperando... (Ctrl+C para cerrar)")
-                        while True:
-                            await asyncio.sleep(3600)  # Esperar 1 hora, repetir
-                    except (KeyboardInterrupt, asyncio.CancelledError):
-                        logger.info(
-                            "\n⚠️  Ctrl+C o reinicio detectado - Cerrando navegador..."
-                        )
-
-                    return {
-                        "success": True,
-                        "job_id": job_id,
-                        "categories": categories_result.get("categories", []),
-                        "total": categories_result.get("total", 0),
-                        "saved": categories_result.get("saved", 0),
-                        "message": "Importación completada exitosamente.",
-                    }
-
-                elif importer_name.upper() == "EMASA":
-                    logger.info("🔧 Ejecutando componente de EMASA")
-
-                    # Paso 1: Autenticación
-                    auth_component = EmasaAuthComponent(
-                        importer_name=importer_name,
-                        job_id=job_id,
-                        db=db,
-                        browser=browser,
-                        credentials=credentials,
-                        headless=False,
-                    )
-                    auth_result = await auth_component.execute()
-
-                    page = auth_result.get("page")
-                    context = auth_result.get("context")
-
-                    if not auth_result["success"]:
-                        logger.error("❌ Autenticación fallida")
-                        job.status = JobStatus.FAILED
-                        job.result = {
-                            "success": False,
-                            "message": auth_result.get("message", ""),
-                            "error": auth_result.get("error"),
-                        }
-                        await db.commit()
-
-                        # Mantener navegador abierto para inspección
-                        logger.info(
-                            "🔍 Navegador abierto por 120 segundos para inspección..."
-                        )
-                        import asyncio
-
-                        await asyncio.sleep(120)
-
-                        return {
-                            "success": False,
-                            "job_id": job_id,
-                            "error": auth_result.get("error"),
-                            "message": "Revisa el navegador que se abrió para ver qué salió mal",
-                        }
-
-                    # Paso 2: Extracción de categorías
-                    logger.info("📋 Extrayendo categorías...")
-                    categories_component = EmasaCategoriesComponent(
-                        importer_name=importer_name,
-                        job_id=job_id,
-                        db=db,
-                        browser=browser,
-                        page=page,
-                        context=context,
-                    )
-                    categories_result = await categories_component.execute()
-
-                    # Actualizar job
-                    job.status = (
-                        JobStatus.COMPLETED
-                        if categories_result["success"]
-                        else JobStatus.FAILED
-                    )
-                    job.result = categories_result
-                    job.progress = 100
-                    await db.commit()
-
-                    logger.info(f"✅ Importación completada: {job_id}")
-
-                    # Mantener navegador abierto brevemente para inspección
-                    logger.info("=" * 80)
-                    logger.info("🔧 MODO DESARROLLO - Navegador abierto por 3 segundos")
-                    logger.info("=" * 80)
-                    logger.info("")
-                    logger.info(
-                        f"✅ {categories_result.get('total', 0)} categorías encontradas"
-                    )
-                    logger.info("🏠 Navegador en la página de categorías")
-                    logger.info("")
-                    logger.info("⏳ Esperando 3 segundos antes de cerrar...")
-                    logger.info("=" * 80)
-
-                    # Esperar brevemente para poder inspeccionar
-                    import asyncio
-
-                    await asyncio.sleep(3)
-
-                    logger.info("✅ Proceso completado, cerrando navegador...")
-
-                    return {
-                        "success": True,
-                        "job_id": job_id,
-                        "categories": categories_result.get("categories", []),
-                        "total": categories_result.get("total", 0),
-                        "saved": categories_result.get("total", 0),
-                        "message": "Importación completada exitosamente.",
-                    }
-
-                else:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Modo desarrollo no implementado para '{importer_name}' aún",
-                    )
-
-            except Exception as e:
-                logger.error(f"❌ Error en scraping: {e}")
-                import traceback
-
-                logger.error(traceback.format_exc())
-
-                job.status = JobStatus.FAILED
-                job.error_message = str(e)
-                await db.commit()
-
-                # Mantener navegador abierto brevemente para debug
-                logger.info("🔍 Navegador abierto por 15 segundos para debug...")
-                import asyncio
-
-                await asyncio.sleep(15)
-
-                raise HTTPException(status_code=500, detail=str(e))
-
-            finally:
-                # El navegador se cerrará automáticamente al salir del context manager
-                logger.info("🔒 Cerrando navegador...")
+    logger.info(
+        f"🔧 DEV MODE: Iniciando importación de categorías: {importer_name} | Job ID: {job_id}"
+    )
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ Error general: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    job_id, attached = await _claim_dev_job(
+        db, importer_name, JobType.CATEGORIES, job_id
+    )
+    if attached:
+        return {
+            "success": False,
+            "job_id": job_id,
+            "attached": True,
+            "message": "Ya hay una importación de categorías en curso",
+        }
 
+    try:
+        dev_import_categories_task.apply_async(
+            args=[importer_name, job_id], task_id=job_id
+        )
+    except Exception as e:
+        await JobLease(importer_name, JobType.CATEGORIES, job_id).release()
+        raise HTTPException(status_code=503, detail=f"Runner no disponible: {e}")
 
-async def _execute_dev_import_products(
-    job_id: str,
-    importer_name: str,
-    selected_categories: List[str],
-    credentials: dict,
-    config: dict,
-    importer_id: int,
-):
-    """
-    Función auxiliar que ejecuta la importación de productos en background
-    """
-    from app.importers.noriega import NoriegaAuthComponent, NoriegaProductsComponent
-
-    # Crear nueva sesión de DB para este task
-    async for db in get_db():
-        try:
-            # Obtener el job
-            result = await db.execute(
-                select(ImportJob).where(ImportJob.job_id == job_id)
-            )
-            job = result.scalar_one_or_none()
-
-            if not job:
-                logger.error(f"Job {job_id} no encontrado")
-                return
-
-            # Actualizar a RUNNING
-            job.status = JobStatus.RUNNING
-            await db.commit()
-
-            # Ejecutar scraping con navegador VISIBLE
-            async with async_playwright() as p:
-                logger.info("🌐 Lanzando Safari (WebKit) en modo visible...")
-                browser = await p.webkit.launch(
-                    headless=False,
-                    slow_mo=500,
-                )
-
-                page = None
-                context = None
-
-                try:
-                    if importer_name.upper() == "NORIEGA":
-                        logger.info("🔧 Ejecutando componente de Noriega")
-
-                        # Paso 1: Autenticación
-                        auth_component = NoriegaAuthComponent(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                            credentials=credentials,
-                            headless=False,
-                        )
-                        auth_result = await auth_component.execute()
-
-                        page = auth_result.get("page")
-                        context = auth_result.get("context")
-
-                        if not auth_result["success"]:
-                            logger.error("❌ Autenticación fallida")
-                            job.status = JobStatus.FAILED
-                            job.result = {
-                                "success": False,
-                                "message": auth_result.get("message", ""),
-                                "error": auth_result.get("error"),
-                            }
-                            await db.commit()
-                            return
-
-                        logger.info(
-                            "✅ Autenticación exitosa, iniciando extracción de productos..."
-                        )
-
-                        # Paso 2: Extracción de productos
-                        products_component = NoriegaProductsComponent(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                            page=page,
-                            context=context,
-                            selected_categories=selected_categories,
-                            config=config,
-                        )
-                        products_result = await products_component.execute()
-
-                        # Actualizar job
-                        job.status = (
-                            JobStatus.COMPLETED
-                            if products_result["success"]
-                            else JobStatus.FAILED
-                        )
-                        job.result = products_result
-                        job.progress = 100
-                        await db.commit()
-
-                        logger.info(f"✅ Importación de productos completada: {job_id}")
-
-                        # ⚠️ MANTENER NAVEGADOR ABIERTO INDEFINIDAMENTE PARA DESARROLLO
-                        logger.info("=" * 80)
-                        logger.info(
-                            "🔧 MODO DESARROLLO - NAVEGADOR PERMANECERÁ ABIERTO"
-                        )
-                        logger.info("=" * 80)
-                        logger.info("")
-                        logger.info(
-                            f"✅ {products_result.get('total', 0)} productos importados"
-                        )
-                        logger.info("🏠 Navegador en la última página visitada")
-                        logger.info("")
-                        logger.info("� AHORA PUEDES:")
-                        logger.info("   1. Inspeccionar los productos en el navegador")
-                        logger.info("   2. Verificar la estructura de las páginas")
-                        logger.info("   3. Navegar manualmente por el sitio")
-                        logger.info(
-                            "   4. Desarrollar/ajustar selectores si es necesario"
-                        )
-                        logger.info("")
-                        logger.info("⏸️  El navegador NO se cerrará automáticamente")
-                        logger.info(
-                            "🛑 Presiona Ctrl+C en esta terminal cuando termines"
-                        )
-                        logger.info("")
-                        logger.info("=" * 80)
-
-                        # Esperar indefinidamente hasta Ctrl+C
-                        try:
-                            logger.info("⏳ Esperando... (Ctrl+C para cerrar)")
-                            while True:
-                                await asyncio.sleep(3600)  # Esperar 1 hora, repetir
-                        except (KeyboardInterrupt, asyncio.CancelledError):
-                            logger.info(
-                                "\n⚠️  Ctrl+C o reinicio detectado - Cerrando navegador..."
-                            )
-
-                    elif importer_name.upper() == "EMASA":
-                        logger.info("🔧 Ejecutando componente de EMASA")
-                        from app.importers.emasa import (
-                            EmasaAuthComponent,
-                            EmasaProductsComponent,
-                        )
-
-                        # Paso 1: Autenticación
-                        auth_component = EmasaAuthComponent(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                            credentials=credentials,
-                            headless=False,
-                        )
-                        auth_result = await auth_component.execute()
-
-                        page = auth_result.get("page")
-                        context = auth_result.get("context")
-
-                        if not auth_result["success"]:
-                            logger.error("❌ Autenticación fallida")
-                            job.status = JobStatus.FAILED
-                            job.result = {
-                                "success": False,
-                                "message": auth_result.get("message", ""),
-                                "error": auth_result.get("error"),
-                            }
-                            await db.commit()
-                            return
-
-                        logger.info(
-                            "✅ Autenticación exitosa, iniciando extracción de productos..."
-                        )
-
-                        # Paso 2: Extracción de productos
-                        products_component = EmasaProductsComponent(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                            page=page,
-                            context=context,
-                            selected_categories=selected_categories,
-                            config=config,
-                        )
-                        products_result = await products_component.execute()
-
-                        # Actualizar job
-                        job.status = (
-                            JobStatus.COMPLETED
-                            if products_result["success"]
-                            else JobStatus.FAILED
-                        )
-                        job.result = products_result
-                        job.progress = 100
-                        await db.commit()
-
-                        logger.info(f"✅ Importación de productos completada: {job_id}")
-
-                        # ⚠️ MANTENER NAVEGADOR ABIERTO INDEFINIDAMENTE PARA DESARROLLO
-                        logger.info("=" * 80)
-                        logger.info(
-                            "🔧 MODO DESARROLLO - NAVEGADOR PERMANECERÁ ABIERTO"
-                        )
-                        logger.info("=" * 80)
-                        logger.info("")
-                        logger.info(
-                            f"✅ {products_result.get('total', 0)} productos importados"
-                        )
-                        logger.info("🏠 Navegador en la última página visitada")
-                        logger.info("")
-                        logger.info("� AHORA PUEDES:")
-                        logger.info("   1. Inspeccionar los productos en el navegador")
-                        logger.info("   2. Verificar la estructura de las páginas")
-                        logger.info("   3. Navegar manualmente por el sitio")
-                        logger.info(
-                            "   4. Desarrollar/ajustar selectores si es necesario"
-                        )
-                        logger.info("")
-                        logger.info("⏸️  El navegador NO se cerrará automáticamente")
-                        logger.info(
-                            "🛑 Presiona Ctrl+C en esta terminal cuando termines"
-                        )
-                        logger.info("")
-                        logger.info("=" * 80)
-
-                        # Esperar indefinidamente hasta Ctrl+C
-                        try:
-                            logger.info("⏳ Esperando... (Ctrl+C para cerrar)")
-                            while True:
-                                await asyncio.sleep(3600)  # Esperar 1 hora, repetir
-                        except (KeyboardInterrupt, asyncio.CancelledError):
-                            logger.info(
-                                "\n⚠️  Ctrl+C o reinicio detectado - Cerrando navegador..."
-                            )
-
-                except asyncio.CancelledError:
-                    logger.warning("⚠️ Tarea cancelada (servidor reiniciando)")
-                    job.status = JobStatus.CANCELLED
-                    job.error_message = "Tarea cancelada por reinicio del servidor"
-                    await db.commit()
-                    raise  # Re-raise para que uvicorn maneje el shutdown
-
-                except Exception as e:
-                    logger.error(f"❌ Error en scraping: {e}")
-                    import traceback
-
-                    logger.error(traceback.format_exc())
-
-                    job.status = JobStatus.FAILED
-                    job.error_message = str(e)
-                    await db.commit()
-
-                finally:
-                    logger.info("🔒 Cerrando navegador...")
-                    try:
-                        if "browser" in locals():
-                            await browser.close()
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error cerrando browser: {e}")
-
-        except asyncio.CancelledError:
-            logger.warning("⚠️ Background task cancelada")
-            raise
-        except Exception as e:
-            logger.error(f"❌ Error en background task: {e}")
-        finally:
-            break  # Solo queremos una iteración del async for
+    # Sin success: el frontend lo trata como job en segundo plano
+    return {
+        "job_id": job_id,
+        "attached": False,
+        "pending": True,
+        "message": (
+            "Importación encolada en el runner de desarrollo (make dev-runner); "
+            "seguirla con /dev/status/{job_id}"
+        ),
+    }
 
 
 @router.post("/{importer_name}/import-products")
 async def dev_import_products(
     importer_name: str,
     request: ImportProductsRequest,
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """
     🔧 MODO DESARROLLO: Importa productos con navegador visible
 
-    Este endpoint inicia la importación en background y retorna el job_id
-    inmediatamente para que el frontend pueda hacer polling del progreso.
+    Encola el import en el runner de desarrollo (cola imports.dev) y retorna
+    el job_id inmediatamente para que el frontend pueda hacer polling del
+    progreso.
     """
     job_id = str(uuid.uuid4())
     selected_categories = request.selected_categories
@@ -623,66 +162,33 @@ async def dev_import_products(
     )
     logger.info(f"📋 Categorías seleccionadas: {selected_categories}")
 
-    # Obtener importador y configuración
-    result = await db.execute(
-        select(Importer)
-        .options(joinedload(Importer.config))
-        .where(Importer.name == importer_name.upper())
+    job_id, attached = await _claim_dev_job(
+        db, importer_name, JobType.PRODUCTS, job_id
     )
-    importer = result.unique().scalar_one_or_none()
-
-    if not importer:
-        raise HTTPException(
-            status_code=404, detail=f"Importador '{importer_name}' no encontrado"
-        )
+    if attached:
+        return {
+            "success": True,
+            "job_id": job_id,
+            "attached": True,
+            "message": "Ya hay una importación de productos en curso.",
+        }
 
-    if not importer.config:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Configuración no encontrada para '{importer_name}'",
+    try:
+        dev_import_products_task.apply_async(
+            args=[importer_name, job_id, selected_categories], task_id=job_id
         )
-
-    credentials = importer.config.credentials or {}
-
-    # Preparar configuración
-    config = {
-        "products_per_category": importer.config.products_per_category,
-        "scraping_speed_ms": importer.config.scraping_speed_ms,
-    }
-
-    logger.info(f"⚙️ Configuración:")
-    if config["products_per_category"]:
-        logger.info(f"   - Límite: {config['products_per_category']}")
-    else:
-        logger.info(f"   - Límite: SIN LÍMITE")
-    logger.info(f"   - Delay: {config['scraping_speed_ms']}ms")
-
-    # Crear job en la base de datos
-    job = ImportJob(
-        job_id=job_id,
-        importer_id=importer.id,
-        job_type=JobType.PRODUCTS,
-        status=JobStatus.PENDING,
-    )
-    db.add(job)
-    await db.commit()
-
-    # Ejecutar en background
-    background_tasks.add_task(
-        _execute_dev_import_products,
-        job_id,
-        importer_name,
-        selected_categories,
-        credentials,
-        config,
-        importer.id,
-    )
+    except Exception as e:
+        await JobLease(importer_name, JobType.PRODUCTS, job_id).release()
+        raise HTTPException(status_code=503, detail=f"Runner no disponible: {e}")
 
     # Retornar inmediatamente el job_id
     return {
         "success": True,
         "job_id": job_id,
-        "message": "Importación iniciada. El navegador se abrirá automáticamente.",
+        "message": (
+            "Importación encolada. El navegador se abrirá en el runner de "
+            "desarrollo (make dev-runner)."
+        ),
     }
 
 
@@ -712,6 +218,7 @@ async def get_dev_job_status(job_id: str, db: AsyncSession = Depends(get_db)):
         "status": job.status,
         "progress": job.progress,
         "result": job.result,
+        "profile": job.profile,
         "error": job.error_message,
         "created_at": job.created_at,
         "completed_at": job.completed_at,
@@ -728,8 +235,9 @@ async def cancel_job(job_id: str, db: AsyncSession = Depends(get_db)):
 
     Este endpoint:
     1. Marca el job como cancelado en la BD
-    2. El navegador se cerrará automáticamente cuando detecte el cambio de status
-    3. Los workers de Playwright limpiarán sus recursos
+    2. Si el job de /dev todavía está en cola, lo revoca en el runner
+    3. El navegador se cerrará automáticamente cuando detecte el cambio de status
+    4. Los workers de Playwright limpiarán sus recursos
     """
     logger.info(f"🛑 Cancelando job: {job_id}")
 
@@ -750,6 +258,10 @@ async def cancel_job(job_id: str, db: AsyncSession = Depends(get_db)):
                 "status": job.status,
             }
 
+        # Los imports de /dev se encolan con task_id = job_id
+        if job.status == JobStatus.PENDING:
+            celery_app.control.revoke(job_id)
+
         # Marcar como cancelado
         job.status = JobStatus.CANCELLED
         job.progress = 0
@@ -2,15 +2,31 @@
 Endpoints de importadores
 """
 
-from typing import Any, Dict, List
+import uuid
+from typing import Any, Dict, List, Optional
 
 from app.core.database import get_db
+from app.core.job_lock import claim_import_lease
 from app.core.logger import logger
-from app.models import Category, Importer, ImporterConfig, ImportJob, Product
-from app.tasks.import_tasks import import_categories_task, import_products_task
+from app.models import (
+    Category,
+    FailedItem,
+    Importer,
+    ImporterConfig,
+    ImportJob,
+    JobType,
+    Product,
+)
+from app.tasks.import_tasks import (
+    PRODUCT_COMPONENTS,
+    import_categories_task,
+    import_products_task,
+    quick_refresh_task,
+    retry_failed_items_task,
+)
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
@@ -26,6 +42,8 @@ class ImporterConfigSchema(BaseModel):
     enabled: bool
     categoryLimit: int = 100  # Límite de productos por categoría
     productsPerMinute: int = 60  # Velocidad de importación
+    requestsPerSecond: Optional[float] = None  # Rate limit compartido
+    requestBurst: Optional[int] = None
 
 
 class ConfigsRequest(BaseModel):
@@ -70,13 +88,33 @@ async def start_category_import(importer_name: str, db: AsyncSession = Depends(g
             detail=f"Importer '{importer_name}' not configured in database",
         )
 
+    job_id = str(uuid.uuid4())
+
+    # Si ya hay un import de categorías corriendo, devolver ese job
+    lease, running_job_id = await claim_import_lease(
+        db, importer_name, JobType.CATEGORIES, job_id
+    )
+    if running_job_id:
+        return {
+            "message": "Category import already running",
+            "job_id": running_job_id,
+            "attached": True,
+            "importer": importer_name,
+        }
+
     # Iniciar tarea de Celery
     logger.info(f"🚀 Iniciando importación de categorías para {importer_name}")
-    task = import_categories_task.delay(importer_name)
+    try:
+        task = import_categories_task.delay(importer_name, job_id)
+    except Exception:
+        await lease.release()
+        raise
 
     return {
         "message": "Category import started",
-        "job_id": task.id,
+        "job_id": job_id,
+        "task_id": task.id,
+        "attached": False,
         "importer": importer_name,
     }
 
@@ -114,24 +152,259 @@ async def start_product_import(
         raise HTTPException(status_code=404, detail="Importer not found")
 
     # Generar job_id único para el seguimiento
-    import uuid
-
     job_id = str(uuid.uuid4())
 
-    # Iniciar tarea de Celery (pasar nombre en mayúsculas y job_id)
-    task = import_products_task.delay(
-        importer_name.upper(), selected_categories, job_id
+    # Si ya hay un import de productos corriendo, devolver ese job
+    lease, running_job_id = await claim_import_lease(
+        db, importer_name, JobType.PRODUCTS, job_id
     )
+    if running_job_id:
+        logger.info(
+            f"🔗 Import de productos de {importer_name} ya en curso: {running_job_id}"
+        )
+        return {
+            "message": "Product import already running",
+            "job_id": running_job_id,
+            "attached": True,
+            "importer": importer_name,
+            "categories": selected_categories,
+        }
+
+    # Iniciar tarea de Celery (pasar nombre en mayúsculas y job_id)
+    try:
+        task = import_products_task.delay(
+            importer_name.upper(), selected_categories, job_id
+        )
+    except Exception:
+        await lease.release()
+        raise
 
     return {
         "message": "Product import started",
         "job_id": job_id,  # Devolver el job_id de la BD, no el task.id de Celery
         "task_id": task.id,  # También devolver el task_id por si acaso
+        "attached": False,
         "importer": importer_name,
         "categories": selected_categories,
     }
 
 
+@router.post("/{importer_name}/quick-refresh")
+async def start_quick_refresh(
+    importer_name: str,
+    request: ImportProductsRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Inicia un refresh rápido: solo precio y stock, leídos de los listados
+
+    No abre páginas de detalle (sin imágenes, descripciones ni
+    aplicaciones) y solo actualiza productos ya importados.
+
+    Args:
+        importer_name: Nombre del importador
+        request: Request con lista de categorías a refrescar
+
+    Returns:
+        Job ID para trackear el progreso
+    """
+    selected_categories = request.selected_categories
+    result = await db.execute(
+        select(Importer).where(Importer.name == importer_name.upper())
+    )
+    importer = result.scalar_one_or_none()
+
+    if not importer:
+        raise HTTPException(status_code=404, detail="Importer not found")
+
+    components = PRODUCT_COMPONENTS.get(importer_name.upper())
+    if not components or not components[1].supports_quick_refresh():
+        raise HTTPException(
+            status_code=400, detail="Quick refresh not supported for importer"
+        )
+
+    job_id = str(uuid.uuid4())
+
+    lease, running_job_id = await claim_import_lease(
+        db, importer_name, JobType.QUICK_REFRESH, job_id
+    )
+    if running_job_id:
+        return {
+            "message": "Quick refresh already running",
+            "job_id": running_job_id,
+            "attached": True,
+            "importer": importer_name,
+            "categories": selected_categories,
+        }
+
+    try:
+        task = quick_refresh_task.delay(
+            importer_name.upper(), selected_categories, job_id
+        )
+    except Exception:
+        await lease.release()
+        raise
+
+    return {
+        "message": "Quick refresh started",
+        "job_id": job_id,
+        "task_id": task.id,
+        "attached": False,
+        "importer": importer_name,
+        "categories": selected_categories,
+    }
+
+
+@router.get("/{importer_name}/failed-items")
+async def get_failed_items(
+    importer_name: str, limit: int = 100, db: AsyncSession = Depends(get_db)
+):
+    """
+    Lista los ítems que agotaron sus reintentos y siguen sin resolverse
+
+    Args:
+        importer_name: Nombre del importador
+        limit: Máximo de ítems a devolver
+
+    Returns:
+        Total pendiente, conteo por clase de error e ítems más recientes
+    """
+    result = await db.execute(
+        select(Importer.id).where(Importer.name == importer_name.upper())
+    )
+    importer_id = result.scalar_one_or_none()
+    if importer_id is None:
+        raise HTTPException(status_code=404, detail="Importer not found")
+
+    pending = (FailedItem.importer_id == importer_id, FailedItem.resolved_at.is_(None))
+
+    result = await db.execute(
+        select(FailedItem.error_class, func.count())
+        .where(*pending)
+        .group_by(FailedItem.error_class)
+    )
+    by_error_class = {error_class: count for error_class, count in result.all()}
+
+    result = await db.execute(
+        select(FailedItem)
+        .where(*pending)
+        .order_by(FailedItem.last_failed_at.desc())
+        .limit(limit)
+    )
+    items = result.scalars().all()
+
+    return {
+        "importer": importer_name,
+        "total": sum(by_error_class.values()),
+        "by_error_class": by_error_class,
+        "items": [
+            {
+                "sku": item.sku,
+                "url": item.url,
+                "category_id": item.category_id,
+                "stage": item.stage,
+                "error_class": item.error_class,
+                "error_message": item.error_message,
+                "attempts": item.attempts,
+                "failure_count": item.failure_count,
+                "job_id": item.job_id,
+                "last_failed_at": (
+                    item.last_failed_at.isoformat() if item.last_failed_at else None
+                ),
+            }
+            for item in items
+        ],
+    }
+
+
+@router.post("/{importer_name}/retry-failed")
+async def start_retry_failed_items(
+    importer_name: str, db: AsyncSession = Depends(get_db)
+):
+    """
+    Inicia un job que reprocesa solo los ítems fallidos del importador
+
+    Usa el mismo lease que los imports de productos: si hay uno en curso se
+    devuelve ese job.
+
+    Returns:
+        Job ID para trackear el progreso
+    """
+    result = await db.execute(
+        select(Importer).where(Importer.name == importer_name.upper())
+    )
+    importer = result.scalar_one_or_none()
+
+    if not importer:
+        raise HTTPException(status_code=404, detail="Importer not found")
+
+    components = PRODUCT_COMPONENTS.get(importer_name.upper())
+    if not components or not components[1].supports_item_retry():
+        raise HTTPException(
+            status_code=400, detail="Failed items retry not supported for importer"
+        )
+
+    job_id = str(uuid.uuid4())
+
+    lease, running_job_id = await claim_import_lease(
+        db, importer_name, JobType.PRODUCTS, job_id
+    )
+    if running_job_id:
+        return {
+            "message": "Product import already running",
+            "job_id": running_job_id,
+            "attached": True,
+            "importer": importer_name,
+        }
+
+    try:
+        task = retry_failed_items_task.delay(importer_name.upper(), job_id)
+    except Exception:
+        await lease.release()
+        raise
+
+    return {
+        "message": "Failed items retry started",
+        "job_id": job_id,
+        "task_id": task.id,
+        "attached": False,
+        "importer": importer_name,
+    }
+
+
+@router.get("/{importer_name}/refresh-plan")
+async def get_refresh_plan(importer_name: str, db: AsyncSession = Depends(get_db)):
+    """
+    Plan del scheduler de refresh: intervalo y atraso de cada categoría
+
+    Returns:
+        Presupuesto diario, gasto de las últimas 24 horas y plan por categoría
+    """
+    from app.tasks.refresh_scheduler import load_refresh_plan, select_due
+    from sqlalchemy.orm import joinedload
+
+    result = await db.execute(
+        select(Importer)
+        .options(joinedload(Importer.config))
+        .where(Importer.name == importer_name.upper())
+    )
+    importer = result.unique().scalar_one_or_none()
+    if not importer:
+        raise HTTPException(status_code=404, detail="Importer not found")
+
+    plan = await load_refresh_plan(db, importer)
+    next_batch = select_due(plan["plans"], plan["remaining"])
+
+    return {
+        "importer": importer_name,
+        "daily_budget": plan["daily_budget"],
+        "spent_last_24h": plan["spent_last_24h"],
+        "remaining": plan["remaining"],
+        "next_batch": [entry.category_id for entry in next_batch],
+        "categories": [entry.to_dict() for entry in plan["plans"]],
+    }
+
+
 @router.get("/status/{job_id}")
 async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)):
     """
@@ -155,16 +428,29 @@ async def get_job_status(job_id: str, db: AsyncSession = Depends(get_db)):
     # Extraer datos del resultado si existen
     result_data = job.result or {}
 
+    # Jobs repartidos en chunks: cada chunk reporta sus propios contadores
+    chunks = result_data.get("chunks") or {}
+    if chunks:
+        total_items = sum((c.get("total_items") or 0) for c in chunks.values())
+        processed_items = sum(
+            (c.get("processed_items") or 0) for c in chunks.values()
+        )
+    else:
+        total_items = result_data.get("total_items", 0)
+        processed_items = result_data.get("processed_items", 0)
+
     return {
         "job_id": job.job_id,
         "status": job.status.value,
         "progress": job.progress,
-        "total_items": job.total_items or result_data.get("total_items", 0),
-        "processed_items": job.processed_items or result_data.get("processed_items", 0),
+        "total_items": job.total_items or total_items,
+        "processed_items": job.processed_items or processed_items,
         "current_item": result_data.get("current_item", 0),
         "current_sku": result_data.get("current_sku", ""),
         "error_message": job.error_message,
         "result": result_data,
+        # Tiempos por fase (se completa al terminar el job)
+        "profile": job.profile,
         "created_at": job.created_at.isoformat() if job.created_at else None,
     }
 
@@ -207,6 +493,8 @@ async def get_configs(db: AsyncSession = Depends(get_db)):
                 "enabled": config.is_active,
                 "categoryLimit": config.products_per_category,
                 "productsPerMinute": products_per_minute,
+                "requestsPerSecond": config.rate_limit_per_second,
+                "requestBurst": config.rate_limit_burst,
             }
         )
 
@@ -270,6 +558,10 @@ async def save_configs(request: ConfigsRequest, db: AsyncSession = Depends(get_d
                 importer_config.is_active = config_data.enabled
                 importer_config.products_per_category = config_data.categoryLimit
                 importer_config.scraping_speed_ms = scraping_speed_ms
+                if config_data.requestsPerSecond is not None:
+                    importer_config.rate_limit_per_second = config_data.requestsPerSecond
+                if config_data.requestBurst is not None:
+                    importer_config.rate_limit_burst = config_data.requestBurst
             else:
                 # Crear nueva configuración
                 importer_config = ImporterConfig(
@@ -278,6 +570,8 @@ async def save_configs(request: ConfigsRequest, db: AsyncSession = Depends(get_d
                     is_active=config_data.enabled,
                     products_per_category=config_data.categoryLimit,
                     scraping_speed_ms=scraping_speed_ms,
+                    rate_limit_per_second=config_data.requestsPerSecond,
+                    rate_limit_burst=config_data.requestBurst,
                 )
                 db.add(importer_config)
 
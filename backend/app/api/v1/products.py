@@ -1,29 +1,50 @@
 """
 Endpoints para productos
 """
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.models import Product, Category, Importer
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select
+from app.models import Product, Category, Importer, ProductPriceHistory
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+from sqlalchemy import func, not_, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 router = APIRouter()
 
 
+class LiveRefreshRequest(BaseModel):
+    importer: str
+    skus: List[str] = Field(..., min_length=1)
+    # Espera máxima en segundos (default: LIVE_REFRESH_WAIT_SECONDS)
+    wait_seconds: Optional[float] = Field(None, ge=0)
+
+
 @router.get("")
 async def get_products(
     importer: Optional[str] = Query(None, description="Filtrar por importador"),
     category: Optional[str] = Query(None, description="Filtrar por categoría (ID o slug)"),
     search: Optional[str] = Query(None, description="Buscar por nombre o SKU"),
+    is_offer: Optional[bool] = Query(None, description="Filtrar por productos en oferta"),
+    characteristic: Optional[List[str]] = Query(
+        None, description="Característica exacta (se puede repetir, deben cumplirse todas)"
+    ),
+    car_brand: Optional[str] = Query(None, description="Marca de vehículo en aplicaciones"),
+    car_model: Optional[str] = Query(None, description="Modelo de vehículo en aplicaciones"),
+    origin: Optional[str] = Query(None, description="Origen del producto"),
+    has_images: Optional[bool] = Query(None, description="Solo productos con/sin imágenes"),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Obtiene lista de productos con filtros opcionales
+
+    Los filtros sobre extra_data se resuelven en SQL con el operador de
+    contención JSONB (@>), que usa el índice GIN ix_products_extra_data_gin.
     """
     # Construir query base
     query = select(Product).options(
@@ -64,6 +85,38 @@ async def get_products(
             (Product.name.ilike(search_pattern)) | (Product.sku.ilike(search_pattern))
         )
 
+    # Filtros JSONB (contención @>, resueltos por el índice GIN)
+    if is_offer is not None:
+        offer_filter = Product.extra_data.contains({"is_offer": True})
+        if is_offer:
+            query = query.where(offer_filter)
+        else:
+            query = query.where(
+                or_(Product.extra_data.is_(None), not_(offer_filter))
+            )
+
+    if characteristic:
+        query = query.where(
+            Product.extra_data.contains({"characteristics": characteristic})
+        )
+
+    if car_brand or car_model:
+        application = {}
+        if car_brand:
+            application["car_brand"] = car_brand
+        if car_model:
+            application["car_model"] = car_model
+        query = query.where(
+            Product.extra_data.contains({"applications": [application]})
+        )
+
+    if origin:
+        query = query.where(Product.extra_data.contains({"origin": origin}))
+
+    if has_images is not None:
+        images_count = func.coalesce(func.jsonb_array_length(Product.images), 0)
+        query = query.where(images_count > 0 if has_images else images_count == 0)
+
     # Ordenar por fecha de actualización (más recientes primero)
     query = query.order_by(Product.updated_at.desc())
 
@@ -106,6 +159,186 @@ async def get_products(
     }
 
 
+# Top movers: último valor dentro de la ventana vs. valor vigente al inicio
+# (último punto anterior a la ventana o, si no existe, el primero dentro de ella)
+PRICE_MOVERS_SQL = text(
+    """
+    SELECT m.product_id, p.sku, p.name, m.previous_price, m.current_price,
+           m.current_stock, m.recorded_at,
+           (m.current_price - m.previous_price) / m.previous_price * 100 AS change_pct
+    FROM (
+        SELECT h.product_id, h.price AS current_price, h.stock AS current_stock,
+               h.recorded_at,
+               COALESCE(
+                   (SELECT b.price FROM product_price_history b
+                    WHERE b.product_id = h.product_id AND b.recorded_at < :since
+                    ORDER BY b.recorded_at DESC LIMIT 1),
+                   (SELECT b.price FROM product_price_history b
+                    WHERE b.product_id = h.product_id AND b.recorded_at >= :since
+                    ORDER BY b.recorded_at ASC LIMIT 1)
+               ) AS previous_price
+        FROM (
+            SELECT DISTINCT ON (product_id) product_id, price, stock, recorded_at
+            FROM product_price_history
+            WHERE importer_id = :importer_id AND recorded_at >= :since
+            ORDER BY product_id, recorded_at DESC
+        ) h
+    ) m
+    JOIN products p ON p.id = m.product_id
+    WHERE m.previous_price > 0
+      AND m.current_price IS DISTINCT FROM m.previous_price
+    ORDER BY abs((m.current_price - m.previous_price) / m.previous_price) DESC
+    LIMIT :limit
+    """
+)
+
+
+@router.get("/price-movers")
+async def get_price_movers(
+    importer: str = Query(..., description="Importador"),
+    days: int = Query(7, ge=1, le=365, description="Ventana en días"),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Obtiene los productos con mayor variación de precio en la ventana indicada
+    """
+    importer_result = await db.execute(
+        select(Importer).where(Importer.name == importer.upper())
+    )
+    importer_obj = importer_result.scalar_one_or_none()
+    if not importer_obj:
+        raise HTTPException(status_code=404, detail="Importador no encontrado")
+
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    result = await db.execute(
+        PRICE_MOVERS_SQL,
+        {"importer_id": importer_obj.id, "since": since, "limit": limit},
+    )
+
+    return {
+        "importer": importer.lower(),
+        "days": days,
+        "movers": [
+            {
+                "product_id": row.product_id,
+                "sku": row.sku,
+                "name": row.name,
+                "previous_price": row.previous_price,
+                "current_price": row.current_price,
+                "current_stock": row.current_stock,
+                "change_pct": round(row.change_pct, 2),
+                "changed_at": row.recorded_at.isoformat(),
+            }
+            for row in result
+        ],
+    }
+
+
+@router.post("/live-refresh")
+async def live_refresh_products(request: LiveRefreshRequest):
+    """
+    Precio y stock en vivo del proveedor para uno o pocos SKUs
+
+    Responde desde la caché (TTL corto) lo refrescado hace poco; el resto lo
+    refresca un worker con una sesión ya autenticada, actualizando también
+    el producto en la BD. Las consultas simultáneas del mismo SKU comparten
+    un solo refresh. Lo que no llegue dentro de la espera máxima vuelve con
+    status "pending" (se puede volver a consultar: quedará en la caché).
+    """
+    from app.importers.live_refresh import (
+        claim_skus,
+        get_cached_results,
+        release_claims,
+        wait_for_results,
+    )
+    from app.tasks.import_tasks import PRODUCT_COMPONENTS, live_refresh_task
+
+    importer_name = request.importer.upper()
+    components = PRODUCT_COMPONENTS.get(importer_name)
+    if not components or not components[1].supports_item_retry():
+        raise HTTPException(
+            status_code=404, detail="Importador sin refresh en vivo"
+        )
+
+    skus = list(dict.fromkeys(sku.strip() for sku in request.skus if sku.strip()))
+    if len(skus) > settings.LIVE_REFRESH_MAX_SKUS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo {settings.LIVE_REFRESH_MAX_SKUS} SKUs por consulta",
+        )
+
+    cached = await get_cached_results(importer_name, skus)
+    missing = [sku for sku in skus if sku not in cached]
+
+    claimed = await claim_skus(importer_name, missing)
+    if claimed:
+        try:
+            live_refresh_task.delay(importer_name, claimed)
+        except Exception:
+            await release_claims(importer_name, claimed)
+            raise
+
+    wait_seconds = request.wait_seconds
+    if wait_seconds is None:
+        wait_seconds = settings.LIVE_REFRESH_WAIT_SECONDS
+    fresh = await wait_for_results(
+        importer_name, missing, min(wait_seconds, settings.LIVE_REFRESH_WAIT_SECONDS)
+    )
+
+    results = []
+    for sku in skus:
+        if sku in cached:
+            results.append({**cached[sku], "cached": True})
+        elif sku in fresh:
+            results.append({**fresh[sku], "cached": False})
+        else:
+            results.append({"sku": sku, "status": "pending", "cached": False})
+
+    return {
+        "importer": importer_name.lower(),
+        "results": results,
+        "pending": sum(1 for entry in results if entry["status"] == "pending"),
+    }
+
+
+@router.get("/{product_id}/price-history")
+async def get_product_price_history(
+    product_id: int,
+    days: Optional[int] = Query(None, ge=1, description="Últimos N días (default: todo)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Obtiene la serie de tiempo de precio y stock de un producto
+
+    Cada punto corresponde a un cambio real (no a cada scraping).
+    """
+    query = (
+        select(ProductPriceHistory)
+        .where(ProductPriceHistory.product_id == product_id)
+        .order_by(ProductPriceHistory.recorded_at)
+    )
+    if days:
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        query = query.where(ProductPriceHistory.recorded_at >= since)
+
+    result = await db.execute(query)
+    points = result.scalars().all()
+
+    return {
+        "product_id": product_id,
+        "points": [
+            {
+                "recorded_at": point.recorded_at.isoformat(),
+                "price": point.price,
+                "stock": point.stock,
+            }
+            for point in points
+        ],
+        "total": len(points),
+    }
+
+
 @router.get("/{product_id}")
 async def get_product(
     product_id: int,
@@ -62,8 +62,109 @@ class Settings(BaseSettings):
     PLAYWRIGHT_BROWSERS_PATH: str = "/ms-playwright"
     HEADLESS: bool = True  # True en producción (sin UI), False en desarrollo local
 
+    # Imports de /dev: los ejecuta el runner de la cola imports.dev (make
+    # dev-runner) con navegador visible
+    DEV_BROWSER: str = "webkit"  # webkit, chromium o firefox
+    DEV_BROWSER_SLOW_MO_MS: int = 500
+    DEV_BROWSER_KEEP_OPEN_SECONDS: int = 300
+
+    # Disponibilidad: horas que un producto puede faltar del listado del
+    # proveedor antes de marcarse como no disponible
+    AVAILABILITY_GRACE_HOURS: int = 24
+
+    # Ingesta de productos: "orm" (upsert por sesión) o "copy" (COPY a
+    # products_staging + merge por categoría). Cada importador puede
+    # sobrescribirlo con extra_config["ingestion_mode"]
+    PRODUCT_INGESTION_MODE: str = "orm"
+
+    # Pipeline de scraping (fetch → parse → normalize → sink). Cada
+    # importador puede sobrescribirlos con extra_config
+    PIPELINE_FETCH_WORKERS: int = 1
+    PIPELINE_QUEUE_SIZE: int = 8
+    PIPELINE_BATCH_SIZE: int = 50
+
+    # Reintentos por ítem dentro del job (fetch + parse). Los que agotan los
+    # intentos quedan en failed_items. Sobrescribibles con extra_config
+    # item_max_attempts / item_retry_backoff_seconds
+    ITEM_MAX_ATTEMPTS: int = 3
+    ITEM_RETRY_BACKOFF_SECONDS: float = 2.0
+
+    # Categorías por subtask al repartir un import de productos en chunks
+    PRODUCT_IMPORT_CHUNK_SIZE: int = 1
+
+    # Imports de productos de hasta este tamaño estimado van a la cola
+    # interactiva (imports.refresh); los mayores a la cola bulk
+    QUICK_IMPORT_MAX_PRODUCTS: int = 300
+    # Productos supuestos para categorías que nunca se importaron
+    CATEGORY_SIZE_ESTIMATE: int = 200
+
+    # Rate limit por proveedor (token bucket en Redis compartido por todos
+    # los workers). ImporterConfig.rate_limit_* los sobrescribe
+    SUPPLIER_RATE_LIMIT_PER_SECOND: float = 2.0
+    SUPPLIER_RATE_LIMIT_BURST: int = 5
+
+    # Scheduler de refresh (Celery beat): reparte un presupuesto diario de
+    # requests al proveedor entre las categorías seleccionadas según su tasa
+    # de cambio. extra_config["refresh_daily_budget"] lo sobrescribe.
+    # Desactivado por defecto: scrapea a los proveedores sin intervención, se
+    # activa explícitamente con REFRESH_SCHEDULER_ENABLED=true en el entorno
+    # del proceso beat
+    REFRESH_SCHEDULER_ENABLED: bool = False
+    REFRESH_SCHEDULER_INTERVAL_MINUTES: int = 15
+    REFRESH_DAILY_REQUEST_BUDGET: int = 5000
+    REFRESH_MIN_INTERVAL_HOURS: float = 2.0
+    REFRESH_MAX_INTERVAL_HOURS: float = 168.0
+    # Tasa supuesta (cambios por SKU y día) para categorías sin historial
+    REFRESH_DEFAULT_CHANGE_RATE: float = 0.1
+    CHANGE_RATE_EMA_ALPHA: float = 0.3
+
+    # Lease por importador y tipo de job (Redis): evita imports duplicados.
+    # Se renueva cada TTL/3 mientras el job corre
+    JOB_LEASE_TTL_SECONDS: int = 900
+    # Con el lease libre, un job PENDING/RUNNING de la BD solo bloquea uno
+    # nuevo si tuvo heartbeat (o arrancó) hace menos de estos TTLs; si no, se
+    # lo da por muerto (worker caído, chord sin despachar, runner apagado)
+    JOB_HEARTBEAT_GRACE_TTLS: int = 3
+
+    # Refresh en vivo de SKUs puntuales (POST /products/live-refresh): caché
+    # del resultado en Redis, espera máxima de la API y vida de la sesión
+    # autenticada que el worker mantiene abierta por importador
+    LIVE_REFRESH_CACHE_TTL_SECONDS: int = 120
+    LIVE_REFRESH_ERROR_TTL_SECONDS: int = 15
+    LIVE_REFRESH_WAIT_SECONDS: float = 20.0
+    LIVE_REFRESH_MAX_SKUS: int = 20
+    LIVE_SESSION_MAX_AGE_SECONDS: int = 1800
+
+    # Métricas Prometheus: GET /metrics en la API y exporter HTTP propio en
+    # cada worker de Celery (un puerto por worker en el mismo host; 0 lo
+    # desactiva)
+    METRICS_ENABLED: bool = True
+    METRICS_WORKER_PORT: int = 9808
+
+    # Tracing OpenTelemetry (API, Celery, SQL y navegación de importadores):
+    # "otlp" envía a un collector (OTLP/HTTP), "file" escribe un span JSON
+    # por línea en TRACING_FILE_PATH
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "otlp"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318/v1/traces"
+    TRACING_FILE_PATH: str = "logs/traces.jsonl"
+    TRACING_SAMPLE_RATIO: float = 1.0
+
+    # Registro de red de Playwright (opcional): requests de una muestra de
+    # páginas por job y reporte de hosts/recursos lentos al terminar
+    NETWORK_RECORDER_ENABLED: bool = False
+    NETWORK_RECORDER_SAMPLE_RATE: float = 0.1
+    NETWORK_REPORT_DIR: str = "logs/network"
+
     # Logging
     LOG_LEVEL: str = "INFO"
+    # "text" o "json" (vacío: json en producción, text en el resto)
+    LOG_FORMAT: str = ""
+    # Escritura en un thread aparte: el loop de scraping no espera al disco
+    LOG_ENQUEUE: bool = True
+    # Mensajes INFO por ítem (logger.bind(per_item=True)): se emite 1 de cada
+    # N por punto del código y job; warnings y errores siempre salen
+    LOG_ITEM_SAMPLE_RATE: int = 20
 
     # Importadores credentials
     ALSACIA_USERNAME: str = ""
@@ -1,25 +1,107 @@
 """
 Configuración de base de datos con SQLAlchemy async
+
+Las conexiones de asyncpg quedan atadas al event loop que las abrió, así
+que cada loop usa su propio motor: el primero que pide una sesión (el de
+FastAPI, o el runtime de un worker de Celery) usa `engine` y cualquier otro
+loop recibe un motor propio. AsyncSessionLocal() elige el del loop actual.
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import time
+import weakref
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    create_async_engine,
+    AsyncSession,
+    async_sessionmaker,
+)
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import AsyncGenerator, Optional
 from .config import settings
+from .metrics import DB_POOL_CHECKOUT_SECONDS, pool_collector
+from .tracing import instrument_engine
+
+
+class _TimedQueuePool(AsyncAdaptedQueuePool):
+    """Pool que mide la espera por una conexión (syncar_db_pool_checkout_seconds)"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
 
+def _create_engine() -> AsyncEngine:
+    new_engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        future=True,
+        poolclass=_TimedQueuePool,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+    )
+    pool_collector.track(new_engine.sync_engine.pool)
+    instrument_engine(new_engine)
+    return new_engine
 
-# Motor de base de datos async
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+
+# Motor de base de datos async (del primer loop que lo use)
+engine = _create_engine()
+_engine_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_engines: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncEngine]" = (
+    weakref.WeakKeyDictionary()
 )
 
+
+def get_engine() -> AsyncEngine:
+    """Motor del event loop actual"""
+    global _engine_loop
+
+    loop = asyncio.get_running_loop()
+    if _engine_loop is None:
+        _engine_loop = loop
+    if loop is _engine_loop:
+        return engine
+
+    loop_engine = _loop_engines.get(loop)
+    if loop_engine is None:
+        loop_engine = _create_engine()
+        _loop_engines[loop] = loop_engine
+    return loop_engine
+
+
+async def dispose_engine():
+    """Cierra el pool del motor del loop actual"""
+    loop = asyncio.get_running_loop()
+    loop_engine = engine if loop is _engine_loop else _loop_engines.pop(loop, None)
+    if loop_engine is not None:
+        await loop_engine.dispose()
+
+
+class _LoopSessionFactory:
+    """async_sessionmaker sobre el motor del loop actual"""
+
+    def __init__(self, **kwargs):
+        self._kwargs = kwargs
+        self._makers: "weakref.WeakKeyDictionary[AsyncEngine, async_sessionmaker]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def __call__(self, **kwargs) -> AsyncSession:
+        loop_engine = get_engine()
+        maker = self._makers.get(loop_engine)
+        if maker is None:
+            maker = async_sessionmaker(loop_engine, **self._kwargs)
+            self._makers[loop_engine] = maker
+        return maker(**kwargs)
+
+
 # Session factory
-AsyncSessionLocal = async_sessionmaker(
-    engine,
+AsyncSessionLocal = _LoopSessionFactory(
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
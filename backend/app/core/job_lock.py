@@ -0,0 +1,290 @@
+"""
+Lease distribuido por importador y tipo de job
+
+Evita que dos imports del mismo tipo corran a la vez para un importador
+(doble click en la UI, reintento de Celery + reinicio manual, endpoints dev
+y prod). El lease es una clave Redis con el job_id dueño y TTL:
+
+    joblock:{IMPORTER}:{job_type} = job_id  (PX = JOB_LEASE_TTL_SECONDS)
+
+Quien corre el job la renueva con un heartbeat y la libera al terminar; si
+el worker muere, el lease expira solo. Renovar y liberar comparan el dueño
+(Lua) para no pisar el lease de otro job.
+
+Cada heartbeat también actualiza import_jobs.heartbeat_at. Un job en chunks
+no tiene heartbeat mientras sus chunks esperan en la cola, así que el lease
+puede expirar con el job aún activo: por eso claim_import_lease confirma
+contra import_jobs y no arranca un job nuevo si hay otro PENDING o RUNNING
+del mismo tipo con actividad en los últimos JOB_HEARTBEAT_GRACE_TTLS TTLs.
+Sin actividad reciente se lo da por muerto. Esto también cubre el caso sin
+Redis (fail-open).
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.redis import get_redis
+
+RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+TAKEOVER_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('SET', KEYS[1], ARGV[2], 'PX', ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+class JobLease:
+    """
+    Lease de un job sobre (importador, tipo de job)
+
+    Args:
+        importer_name: Nombre del importador
+        job_type: Tipo de job ("products", "categories")
+        job_id: Job dueño del lease
+        ttl_seconds: Vida del lease sin heartbeat
+    """
+
+    def __init__(
+        self,
+        importer_name: str,
+        job_type: str,
+        job_id: str,
+        ttl_seconds: Optional[int] = None,
+    ):
+        self.importer_name = importer_name.upper()
+        self.job_type = getattr(job_type, "value", job_type)
+        self.job_id = job_id
+        self.ttl_ms = int((ttl_seconds or settings.JOB_LEASE_TTL_SECONDS) * 1000)
+        self.key = f"joblock:{self.importer_name}:{self.job_type}"
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    async def acquire(self) -> Optional[str]:
+        """
+        Toma el lease si está libre (o lo renueva si ya es de este job)
+
+        Returns:
+            None si el lease es de este job, o el job_id que lo tiene
+        """
+        try:
+            client = get_redis()
+            if await client.set(self.key, self.job_id, nx=True, px=self.ttl_ms):
+                return None
+
+            holder = await client.get(self.key)
+            if holder is None:
+                # Expiró entre el SET y el GET: reintentar una vez
+                if await client.set(self.key, self.job_id, nx=True, px=self.ttl_ms):
+                    return None
+                holder = await client.get(self.key)
+
+            if holder == self.job_id:
+                await self.renew()
+                return None
+            return holder
+        except Exception as e:
+            logger.warning(f"⚠️  Lease {self.key} sin Redis ({e}); se continúa")
+            return None
+
+    async def takeover(self, stale_holder: str) -> bool:
+        """Reemplaza el lease de un job que ya terminó (compare-and-set)"""
+        try:
+            taken = await get_redis().eval(
+                TAKEOVER_LUA, 1, self.key, stale_holder, self.job_id, self.ttl_ms
+            )
+            return bool(taken)
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo reemplazar el lease {self.key}: {e}")
+            return True
+
+    async def renew(self) -> bool:
+        """Extiende el TTL si el lease sigue siendo de este job"""
+        try:
+            renewed = await get_redis().eval(
+                RENEW_LUA, 1, self.key, self.job_id, self.ttl_ms
+            )
+            return bool(renewed)
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo renovar el lease {self.key}: {e}")
+            return False
+
+    async def release(self):
+        """Detiene el heartbeat y libera el lease si sigue siendo de este job"""
+        await self.stop_heartbeat()
+        try:
+            await get_redis().eval(RELEASE_LUA, 1, self.key, self.job_id)
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo liberar el lease {self.key}: {e}")
+
+    async def _touch_job(self):
+        """Registra el heartbeat en import_jobs.heartbeat_at"""
+        from app.core.database import AsyncSessionLocal
+        from app.models import ImportJob
+        from sqlalchemy import func, update
+
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(ImportJob)
+                    .where(ImportJob.job_id == self.job_id)
+                    .values(heartbeat_at=func.now())
+                )
+                await db.commit()
+        except Exception as e:
+            logger.warning(
+                f"⚠️  No se pudo registrar el heartbeat de {self.job_id}: {e}"
+            )
+
+    async def _heartbeat(self):
+        interval = self.ttl_ms / 1000 / 3
+        await self._touch_job()
+        while True:
+            await asyncio.sleep(interval)
+            await self._touch_job()
+            if not await self.renew():
+                # Expiró (ej. worker pausado) o Redis cayó: intentar retomarlo
+                holder = await self.acquire()
+                if holder:
+                    logger.warning(
+                        f"⚠️  Lease {self.key} perdido: ahora lo tiene el job {holder}"
+                    )
+                    return
+
+    def start_heartbeat(self):
+        """Empieza a renovar el lease cada ttl/3 en segundo plano"""
+        if self._heartbeat_task is None:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def stop_heartbeat(self):
+        task, self._heartbeat_task = self._heartbeat_task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    @asynccontextmanager
+    async def keep_alive(self) -> AsyncIterator["JobLease"]:
+        """Renueva el lease mientras dure el bloque"""
+        self.start_heartbeat()
+        try:
+            yield self
+        finally:
+            await self.stop_heartbeat()
+
+
+# Tipos de ImportJob que comparten el lease de cada tipo de job
+LEASE_JOB_TYPES = {
+    "products": ("products", "retry_failed"),
+}
+
+
+async def _active_job_in_db(
+    db, importer_name: str, job_type: str, job_id: str
+) -> Optional[str]:
+    """
+    Otro job PENDING/RUNNING del importador que use el mismo lease y siga
+    vivo: con heartbeat (o arrancado, o creado) en los últimos
+    JOB_HEARTBEAT_GRACE_TTLS TTLs del lease
+    """
+    from app.models import Importer, ImportJob, JobStatus, JobType
+    from sqlalchemy import func, select
+
+    job_types = [
+        JobType(value) for value in LEASE_JOB_TYPES.get(job_type, (job_type,))
+    ]
+    since = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.JOB_LEASE_TTL_SECONDS * settings.JOB_HEARTBEAT_GRACE_TTLS
+    )
+    last_activity = func.coalesce(
+        ImportJob.heartbeat_at, ImportJob.started_at, ImportJob.created_at
+    )
+    result = await db.execute(
+        select(ImportJob.job_id)
+        .join(Importer, Importer.id == ImportJob.importer_id)
+        .where(
+            Importer.name == importer_name,
+            ImportJob.job_type.in_(job_types),
+            ImportJob.status.in_((JobStatus.PENDING, JobStatus.RUNNING)),
+            ImportJob.job_id != job_id,
+            last_activity >= since,
+        )
+        .order_by(last_activity.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def claim_import_lease(db, importer_name: str, job_type: str, job_id: str):
+    """
+    Reserva el lease para un job nuevo o devuelve el job que ya está corriendo
+
+    Si el dueño del lease es un job que ya terminó en la BD (completado,
+    fallido o cancelado) el lease se considera huérfano y se reemplaza. Si
+    el lease estaba libre pero la BD tiene otro job del mismo tipo con
+    actividad reciente (lease expirado mientras sus chunks esperaban en la
+    cola) se devuelve ese job y el lease queda libre: lo retoma el heartbeat
+    del próximo chunk que arranque.
+
+    Returns:
+        (lease, None) si el job puede arrancar, o (None, job_id_existente)
+    """
+    from app.models import ImportJob, JobStatus
+    from sqlalchemy import select
+
+    lease = JobLease(importer_name, job_type, job_id)
+
+    for _ in range(3):
+        holder = await lease.acquire()
+        if holder is None:
+            break
+
+        result = await db.execute(
+            select(ImportJob.status).where(ImportJob.job_id == holder)
+        )
+        status = result.scalar_one_or_none()
+        if status not in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED):
+            # Activo, o encolado y aún sin fila en la BD
+            logger.info(f"🔗 {lease.key} ocupado por el job {holder}")
+            return None, holder
+
+        logger.info(f"♻️  Lease {lease.key} huérfano (job {holder}: {status})")
+        if await lease.takeover(holder):
+            holder = None
+            break
+
+    if holder is not None:
+        return None, holder
+
+    active_job_id = await _active_job_in_db(
+        db, lease.importer_name, lease.job_type, job_id
+    )
+    if active_job_id is None:
+        return lease, None
+
+    logger.info(
+        f"🔗 {lease.key} libre pero el job {active_job_id} tuvo actividad "
+        f"reciente; no se arranca {job_id}"
+    )
+    await lease.release()
+    return None, active_job_id
@@ -1,7 +1,18 @@
 """
 Logger configurado con loguru
+
+- Formato "text" (consola con colores) o "json" (una línea JSON por
+  registro, con el contexto bindeado: importer, job_id, chunk...)
+- enqueue: los handlers escriben desde un thread propio
+- Muestreo de mensajes por ítem: los logs bindeados con per_item=True
+  (un producto, un SKU) de nivel menor a WARNING se emiten 1 de cada
+  LOG_ITEM_SAMPLE_RATE por punto del código y job
 """
+import json
 import sys
+import traceback
+from typing import Any, Dict, Tuple
+
 from loguru import logger
 from .config import settings
 
@@ -17,23 +28,95 @@ log_format = (
     "<level>{message}</level>"
 )
 
+# Claves internas de extra que no se serializan
+_INTERNAL_EXTRA = ("per_item", "_json")
+
+
+def json_format(record: Dict[str, Any]) -> str:
+    """Formato JSON de una línea (el contexto bindeado va en el nivel raíz)"""
+    payload = {
+        "ts": record["time"].isoformat(),
+        "level": record["level"].name,
+        "msg": record["message"],
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+    payload.update(
+        (key, value)
+        for key, value in record["extra"].items()
+        if key not in _INTERNAL_EXTRA
+    )
+    if record["exception"]:
+        exc_type, exc_value, exc_tb = record["exception"]
+        payload["exception"] = "".join(
+            traceback.format_exception(exc_type, exc_value, exc_tb)
+        )
+
+    record["extra"]["_json"] = json.dumps(payload, ensure_ascii=False, default=str)
+    return "{extra[_json]}\n"
+
+
+class ItemSampler:
+    """
+    Filtro de loguru que muestrea los mensajes por ítem
+
+    Cuenta por (job_id, función, línea): la primera ocurrencia de cada
+    mensaje del loop sale siempre y luego 1 de cada `rate`. Los registros
+    emitidos llevan extra.sampled = rate. Cada handler necesita su propia
+    instancia (loguru llama al filtro una vez por handler).
+    """
+
+    # Tope de contadores (jobs x puntos del código) antes de reiniciarlos
+    MAX_KEYS = 10_000
+
+    def __init__(self, rate: int):
+        self.rate = rate
+        self._counters: Dict[Tuple[Any, str, int], int] = {}
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        extra = record["extra"]
+        if self.rate <= 1 or not extra.get("per_item"):
+            return True
+        if record["level"].no >= logger.level("WARNING").no:
+            return True
+
+        key = (extra.get("job_id"), record["function"], record["line"])
+        count = self._counters.get(key, 0)
+        if len(self._counters) >= self.MAX_KEYS:
+            self._counters.clear()
+        self._counters[key] = count + 1
+        if count % self.rate:
+            return False
+
+        extra["sampled"] = self.rate
+        return True
+
+
+log_output = settings.LOG_FORMAT or ("json" if settings.is_production else "text")
+use_json = log_output.lower() == "json"
+
 # Handler para consola
 logger.add(
     sys.stdout,
-    format=log_format,
+    format=json_format if use_json else log_format,
     level=settings.LOG_LEVEL,
-    colorize=True,
+    colorize=not use_json,
+    enqueue=settings.LOG_ENQUEUE,
+    filter=ItemSampler(settings.LOG_ITEM_SAMPLE_RATE),
 )
 
 # Handler para archivo (opcional)
 if settings.is_production:
     logger.add(
         "logs/app.log",
-        format=log_format,
+        format=json_format if use_json else log_format,
         level=settings.LOG_LEVEL,
         rotation="100 MB",
         retention="30 days",
         compression="zip",
+        enqueue=settings.LOG_ENQUEUE,
+        filter=ItemSampler(settings.LOG_ITEM_SAMPLE_RATE),
     )
 
 
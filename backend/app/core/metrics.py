@@ -0,0 +1,169 @@
+"""
+Métricas Prometheus de la API, los importadores y los workers de Celery
+
+Los nombres (prefijo syncar_) y las etiquetas son estables: los usan los
+dashboards y alertas. Las métricas de importadores se etiquetan con el
+nombre del importador en mayúsculas.
+
+- API: GET /metrics (app/main.py), con la profundidad de las colas Celery
+- Workers: exporter HTTP propio en METRICS_WORKER_PORT (se levanta en la
+  señal worker_ready, ver app/tasks/celery_app.py). Varios workers en un
+  mismo host necesitan puertos distintos (METRICS_WORKER_PORT en el entorno
+  de cada uno; 0 lo desactiva)
+"""
+
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Iterator
+
+from app.core.config import settings
+from app.core.logger import logger
+from prometheus_client import Counter, Gauge, Histogram, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import REGISTRY, Collector
+
+# Segundos: de requests rápidos de la API a navegaciones lentas del proveedor
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+POOL_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30)
+
+# ===== API =====
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "syncar_http_request_duration_seconds",
+    "Latencia de los requests HTTP por ruta",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# ===== Base de datos =====
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "syncar_db_pool_checkout_seconds",
+    "Espera para obtener una conexión del pool",
+    buckets=POOL_WAIT_BUCKETS,
+)
+
+DB_SAVE_BATCH_SECONDS = Histogram(
+    "syncar_db_save_batch_seconds",
+    "Duración del guardado de un lote de productos",
+    ["importer"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# ===== Importadores =====
+
+PRODUCTS_SCRAPED = Counter(
+    "syncar_products_scraped_total",
+    "Productos scrapeados y guardados (rate() = productos por segundo)",
+    ["importer", "mode"],
+)
+
+PAGE_NAVIGATION_SECONDS = Histogram(
+    "syncar_page_navigation_seconds",
+    "Latencia de las navegaciones al sitio del proveedor",
+    ["importer"],
+    buckets=LATENCY_BUCKETS,
+)
+
+BROWSERS_ACTIVE = Gauge(
+    "syncar_browsers_active", "Navegadores Chromium abiertos en el proceso"
+)
+
+BROWSER_CONTEXTS_ACTIVE = Gauge(
+    "syncar_browser_contexts_active", "Contextos de navegador abiertos en el proceso"
+)
+
+# ===== Celery =====
+
+CELERY_QUEUE_DEPTH = Gauge(
+    "syncar_celery_queue_depth", "Mensajes esperando en cada cola", ["queue"]
+)
+
+CELERY_TASK_SECONDS = Histogram(
+    "syncar_celery_task_duration_seconds",
+    "Duración de las tareas de Celery",
+    ["task", "state"],
+    buckets=LATENCY_BUCKETS + (300, 900, 3600),
+)
+
+
+@contextmanager
+def observe_seconds(histogram, **labels) -> Iterator[None]:
+    """Mide la duración del bloque en `histogram` (con etiquetas opcionales)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric = histogram.labels(**labels) if labels else histogram
+        metric.observe(time.perf_counter() - started)
+
+
+class _PoolCollector(Collector):
+    """Uso de los pools de conexiones de los motores del proceso"""
+
+    def __init__(self):
+        self._pools: "weakref.WeakSet" = weakref.WeakSet()
+
+    def track(self, pool):
+        self._pools.add(pool)
+
+    def collect(self):
+        usage = GaugeMetricFamily(
+            "syncar_db_pool_connections",
+            "Conexiones del pool por estado",
+            labels=["state"],
+        )
+        totals = {"checked_out": 0, "idle": 0, "overflow": 0, "size": 0}
+        for pool in list(self._pools):
+            totals["checked_out"] += pool.checkedout()
+            totals["idle"] += pool.checkedin()
+            totals["overflow"] += max(pool.overflow(), 0)
+            totals["size"] += pool.size()
+        for state, value in totals.items():
+            usage.add_metric([state], value)
+        yield usage
+
+
+pool_collector = _PoolCollector()
+REGISTRY.register(pool_collector)
+
+
+async def update_queue_depth():
+    """
+    Actualiza CELERY_QUEUE_DEPTH leyendo las listas del broker Redis
+
+    Con prioridades, kombu guarda cada nivel en su propia lista
+    ("cola", "cola:1", ..., ver broker_transport_options).
+    """
+    from app.core.redis import get_redis
+    from app.tasks.celery_app import celery_app
+
+    options = celery_app.conf.broker_transport_options
+    steps = options.get("priority_steps") or [0]
+    sep = options.get("sep", ":")
+
+    client = get_redis()
+    for queue in celery_app.conf.task_queues or []:
+        keys = [
+            queue.name if step == 0 else f"{queue.name}{sep}{step}" for step in steps
+        ]
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.llen(key)
+            depth = sum(await pipe.execute())
+        CELERY_QUEUE_DEPTH.labels(queue=queue.name).set(depth)
+
+
+def start_worker_exporter():
+    """Levanta el endpoint de métricas del worker (si está habilitado)"""
+    if not settings.METRICS_ENABLED or not settings.METRICS_WORKER_PORT:
+        return
+    try:
+        start_http_server(settings.METRICS_WORKER_PORT)
+    except OSError as e:
+        # Otro worker del host ya usa el puerto: el worker sigue sin exporter
+        logger.warning(
+            f"⚠️  Exporter de métricas sin levantar en el puerto "
+            f"{settings.METRICS_WORKER_PORT} ({e}); usar otro METRICS_WORKER_PORT"
+        )
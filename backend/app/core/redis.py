@@ -0,0 +1,30 @@
+"""
+Cliente Redis async compartido
+
+Los clientes de redis.asyncio quedan atados al event loop donde se crean.
+La API usa el loop de uvicorn y cada worker de Celery un único loop
+persistente compartido por todas sus tareas (ver app/tasks/runtime.py); otros
+loops (scripts, tests) reciben su propio cliente, así que se mantiene uno
+por loop.
+"""
+
+import asyncio
+import weakref
+
+import redis.asyncio as redis
+
+from .config import settings
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, redis.Redis]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_redis() -> redis.Redis:
+    """Cliente Redis (decode_responses) del event loop actual"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        _clients[loop] = client
+    return client
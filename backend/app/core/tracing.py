@@ -0,0 +1,184 @@
+"""
+Tracing distribuido con OpenTelemetry
+
+Una importación queda como un único trace: el request HTTP que la dispara,
+las tareas Celery (el contexto viaja en los headers del mensaje: tarea
+principal, chunks y finalizador), los statements SQL y los spans de cada
+fase de los importadores (navegación, listados, extracción, guardado).
+
+- setup_tracing(): lo llaman la API (main.py) y cada worker (señal
+  worker_init). Sin TRACING_ENABLED no instala nada y los helpers usan el
+  tracer no-op de la API de OpenTelemetry.
+- instrument_engine(): cada motor async (uno por event loop, ver
+  app/core/database.py)
+- carry_context(): las corutinas que los threads de Celery envían al loop
+  del runtime conservan el span de la tarea
+"""
+
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Awaitable, Iterator, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from opentelemetry import context as otel_context
+from opentelemetry import trace
+
+_tracer = trace.get_tracer("syncar")
+_configured = False
+# Motores ya instrumentados (SQLAlchemyInstrumentor es un singleton: solo
+# instrumentaría el primero, así que cada motor recibe su EngineTracer)
+_instrumented_engines: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_connections_usage = None
+
+
+def _build_exporter():
+    """Exporter según TRACING_EXPORTER (otlp o file)"""
+    if settings.TRACING_EXPORTER == "file":
+        import os
+
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        os.makedirs(os.path.dirname(settings.TRACING_FILE_PATH) or ".", exist_ok=True)
+        return ConsoleSpanExporter(
+            out=open(settings.TRACING_FILE_PATH, "a", encoding="utf-8"),
+            formatter=lambda span: span.to_json(indent=None) + "\n",
+        )
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+        OTLPSpanExporter,
+    )
+
+    return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+
+
+def setup_tracing(service_name: str, app: Any = None) -> bool:
+    """
+    Configura el TracerProvider global y la instrumentación
+
+    Instrumenta Celery en ambos lados (la API inyecta el contexto al
+    publicar, el worker lo extrae al ejecutar) y, si se pasa `app`, las
+    rutas de FastAPI.
+
+    Returns:
+        True si el tracing quedó activo
+    """
+    global _configured
+
+    if not settings.TRACING_ENABLED:
+        return False
+    if _configured:
+        return True
+
+    from opentelemetry.instrumentation.celery import CeleryInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create(
+            {
+                "service.name": service_name,
+                "service.version": settings.APP_VERSION,
+                "deployment.environment": settings.ENVIRONMENT,
+            }
+        ),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(_build_exporter()))
+    trace.set_tracer_provider(provider)
+
+    CeleryInstrumentor().instrument()
+    if app is not None:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+        FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics,health")
+
+    _configured = True
+    logger.info(
+        f"🔭 Tracing activo ({service_name}) → {settings.TRACING_EXPORTER}"
+    )
+    return True
+
+
+def instrument_engine(engine: Any):
+    """Spans por statement SQL del motor async (una vez por motor)"""
+    global _connections_usage
+
+    if not settings.TRACING_ENABLED:
+        return
+    sync_engine = engine.sync_engine
+    if sync_engine in _instrumented_engines:
+        return
+
+    from opentelemetry.instrumentation.sqlalchemy import __name__ as module_name
+    from opentelemetry.instrumentation.sqlalchemy.engine import EngineTracer
+    from opentelemetry.metrics import get_meter
+    from opentelemetry.semconv.metrics import MetricInstruments
+
+    if _connections_usage is None:
+        _connections_usage = get_meter(module_name).create_up_down_counter(
+            name=MetricInstruments.DB_CLIENT_CONNECTIONS_USAGE,
+            unit="connections",
+            description="Conexiones del pool por estado",
+        )
+    EngineTracer(trace.get_tracer(module_name), sync_engine, _connections_usage)
+    _instrumented_engines.add(sync_engine)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Span hijo del span actual (los atributos None se omiten)"""
+    with _tracer.start_as_current_span(name) as current:
+        for key, value in attributes.items():
+            if value is not None:
+                current.set_attribute(key, value)
+        yield current
+
+
+def record_span(name: str, seconds: float, **attributes: Any):
+    """Span de un intervalo ya medido que terminó ahora"""
+    end = time.time_ns()
+    current = _tracer.start_span(
+        name,
+        start_time=end - int(seconds * 1e9),
+        attributes={k: v for k, v in attributes.items() if v is not None},
+    )
+    current.end(end_time=end)
+
+
+def set_attributes(**attributes: Any):
+    """Agrega atributos al span actual (ej. job_id en el span de la tarea)"""
+    current = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+
+def carry_context(coro: Awaitable[Any]) -> Awaitable[Any]:
+    """
+    Envuelve `coro` para que corra con el contexto de trace del llamador
+
+    run_coroutine_threadsafe crea la tarea con el contexto del thread del
+    loop, no con el del thread de Celery que la envía.
+    """
+    ctx = otel_context.get_current()
+
+    async def run():
+        token = otel_context.attach(ctx)
+        try:
+            return await coro
+        finally:
+            otel_context.detach(token)
+
+    return run()
+
+
+def current_trace_id() -> Optional[str]:
+    """trace_id del span actual en hex (None fuera de un trace)"""
+    span_context = trace.get_current_span().get_span_context()
+    if not span_context.is_valid:
+        return None
+    return format(span_context.trace_id, "032x")
@@ -0,0 +1,10 @@
+"""
+python -m app.importers run <importer> ... (ver app/importers/cli.py)
+"""
+
+import sys
+
+from app.importers.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -3,15 +3,58 @@ Componentes base para importación modular
 """
 
 from abc import ABC, abstractmethod
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Any, Dict, List, Optional
-
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from app.core.config import settings
 from app.core.logger import logger
+from app.core.metrics import (
+    DB_SAVE_BATCH_SECONDS,
+    PAGE_NAVIGATION_SECONDS,
+    PRODUCTS_SCRAPED,
+    observe_seconds,
+)
+from app.importers.parsing import find_listing_columns, parse_price, parse_stock_label
+from app.importers.persistence import (
+    MAX_REPORTED_SKUS,
+    StagingProductLoader,
+    apply_quick_refresh,
+    mark_products_seen,
+    merge_job_result,
+    record_category_change_rate,
+    record_failed_items,
+    resolve_failed_items,
+    resolve_ingestion_mode,
+    save_products,
+    set_chunk_progress,
+    sweep_unseen_products,
+)
+from app.importers.pipeline import ScrapePipeline
+from app.importers.profiling import count_items, profile_span, record_span
+from app.importers.rate_limit import SupplierRateLimiter, build_rate_limiter
 from app.models import ImportJob, JobLog, JobStatus
 from playwright.async_api import Browser, BrowserContext, Page, async_playwright
-from sqlalchemy import select, update
+from sqlalchemy import insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# (índice, total) del chunk en ejecución cuando un job de productos se reparte
+# en subtasks; None si el job corre en un solo task
+current_chunk: ContextVar[Optional[Tuple[int, int]]] = ContextVar(
+    "current_chunk", default=None
+)
+
 
 class ImporterComponentBase(ABC):
     """
@@ -40,6 +83,9 @@ class ImporterComponentBase(ABC):
         self.logger = logger.bind(
             importer=importer_name, job_id=job_id, component=self.__class__.__name__
         )
+        # Mensajes por producto/SKU: muestreados en INFO (ver core.logger)
+        self.item_logger = self.logger.bind(per_item=True)
+        self.rate_limiter: Optional[SupplierRateLimiter] = None
 
     @abstractmethod
     async def execute(self) -> Dict[str, Any]:
@@ -51,6 +97,50 @@ class ImporterComponentBase(ABC):
         """
         pass
 
+    async def get_rate_limiter(self) -> SupplierRateLimiter:
+        """
+        Limiter compartido del proveedor (se crea en el primer uso)
+
+        Usa self.db, así que conviene llamarlo antes de arrancar etapas
+        concurrentes que naveguen (ver run_category_pipeline).
+        """
+        if self.rate_limiter is None:
+            self.rate_limiter = await build_rate_limiter(self.db, self.importer_name)
+        return self.rate_limiter
+
+    async def throttle(self) -> float:
+        """
+        Espera un token del rate limiter del proveedor
+
+        Debe llamarse antes de cada request al sitio (navegación, click que
+        dispara una carga, fetch HTTP).
+
+        Returns:
+            Segundos esperados (se registran como fase "pacing" del job)
+        """
+        limiter = await self.get_rate_limiter()
+        waited = await limiter.acquire()
+        record_span("pacing", waited)
+        return waited
+
+    async def navigate(
+        self, page: Page, url: str, phase: str = "navigation", **kwargs
+    ):
+        """
+        page.goto respetando el rate limit compartido del proveedor
+
+        Args:
+            page: Página de Playwright
+            url: URL destino
+            phase: Fase del perfil del job ("listing" para listados)
+            **kwargs: Argumentos de page.goto (wait_until, timeout...)
+        """
+        await self.throttle()
+        with profile_span(phase, url=url), observe_seconds(
+            PAGE_NAVIGATION_SECONDS, importer=self.importer_name.upper()
+        ):
+            return await page.goto(url, **kwargs)
+
     async def update_progress(self, message: str, progress: int, level: str = "INFO"):
         """
         Actualiza el progreso del job en la base de datos
@@ -60,24 +150,33 @@ class ImporterComponentBase(ABC):
             progress: Porcentaje de progreso (0-100)
             level: Nivel del log (INFO, WARNING, ERROR)
         """
+        chunk = current_chunk.get()
         try:
-            # Actualizar job
-            stmt = (
-                update(ImportJob)
-                .where(ImportJob.job_id == self.job_id)
-                .values(progress=progress)
-            )
-            await self.db.execute(stmt)
+            if chunk:
+                # Cada chunk reporta su propio progreso; el del job es el promedio
+                chunk_index, chunk_count = chunk
+                await set_chunk_progress(
+                    self.db, self.job_id, chunk_index, chunk_count, progress
+                )
+                message = f"[{chunk_index + 1}/{chunk_count}] {message}"
+            else:
+                await self.db.execute(
+                    update(ImportJob)
+                    .where(ImportJob.job_id == self.job_id)
+                    .values(progress=progress)
+                )
 
             # Crear log
             job_result = await self.db.execute(
-                select(ImportJob).where(ImportJob.job_id == self.job_id)
+                select(ImportJob.id).where(ImportJob.job_id == self.job_id)
             )
-            job = job_result.scalar_one_or_none()
+            job_pk = job_result.scalar_one_or_none()
 
-            if job:
-                log_entry = JobLog(job_id=job.id, level=level, message=message)
-                self.db.add(log_entry)
+            if job_pk:
+                # INSERT directo: los JobLog no se acumulan en la sesión del job
+                await self.db.execute(
+                    insert(JobLog).values(job_id=job_pk, level=level, message=message)
+                )
 
             await self.db.commit()
 
@@ -95,12 +194,14 @@ class ImporterComponentBase(ABC):
             True si el job está en estado CANCELLED
         """
         try:
+            # Solo la columna: una entidad ya cargada en la sesión no se
+            # refresca con un nuevo SELECT (expire_on_commit=False)
             result = await self.db.execute(
-                select(ImportJob).where(ImportJob.job_id == self.job_id)
+                select(ImportJob.status).where(ImportJob.job_id == self.job_id)
             )
-            job = result.scalar_one_or_none()
+            status = result.scalar_one_or_none()
 
-            if job and job.status == JobStatus.CANCELLED:
+            if status == JobStatus.CANCELLED:
                 self.logger.warning("⚠️ Job cancelado por el usuario")
                 return True
 
@@ -136,6 +237,28 @@ class ImporterComponentBase(ABC):
         except Exception as e:
             self.logger.error(f"Error marking job status: {e}")
 
+    async def _update_job_result(self, result_data: Dict[str, Any]):
+        """
+        Actualiza el campo result del job con información detallada
+
+        El merge es atómico en la BD; si el job está repartido en chunks,
+        los datos quedan en result.chunks.<índice>.
+
+        Args:
+            result_data: Diccionario con datos actualizados (se mezcla con el actual)
+        """
+        chunk = current_chunk.get()
+        try:
+            await merge_job_result(
+                self.db,
+                self.job_id,
+                result_data,
+                chunk=chunk[0] if chunk else None,
+            )
+        except Exception as e:
+            await self.db.rollback()
+            self.logger.error(f"Error actualizando job result: {e}")
+
 
 class AuthComponent(ImporterComponentBase):
     """
@@ -278,6 +401,517 @@ class ProductsComponent(ImporterComponentBase):
         self.selected_categories = selected_categories
         self.config = config
 
+        # Resumen de cambios detectados al guardar (se reporta en el job)
+        self.change_summary: Dict[str, Any] = {
+            "created": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "changed_skus": [],
+        }
+
+        # SKUs vistos en el listado por categoría y categorías completas
+        self.seen_skus: Dict[int, Set[str]] = {}
+        self.completed_category_ids: List[int] = []
+
+        # Ítems que agotaron sus reintentos (quedan en failed_items)
+        self.failed_item_count = 0
+
+        # Filas de historial escritas (SKUs nuevos o con cambio de precio/stock)
+        self.history_count = 0
+
+        # Modo de ingesta: "orm" (upsert por sesión) o "copy" (staging + merge)
+        self.ingestion_mode = resolve_ingestion_mode(config)
+        self.staging_loader: Optional[StagingProductLoader] = (
+            StagingProductLoader(db, job_id) if self.ingestion_mode == "copy" else None
+        )
+
+    async def sink_products(self, category: Any, rows: List[Dict[str, Any]]) -> int:
+        """
+        Persiste un lote de productos normalizados de una categoría
+
+        En modo "orm" el lote queda guardado (y visible) al volver; en modo
+        "copy" solo se copia a products_staging y se fusiona en
+        finish_category.
+
+        Returns:
+            Número de filas aceptadas
+        """
+        importer = self.importer_name.upper()
+        with profile_span("save"), observe_seconds(
+            DB_SAVE_BATCH_SECONDS, importer=importer
+        ):
+            if self.staging_loader:
+                saved = await self.staging_loader.stage(category, rows)
+            else:
+                stats = await save_products(self.db, category, rows)
+                self.record_save_stats(stats)
+                saved = stats["saved"]
+
+        PRODUCTS_SCRAPED.labels(importer=importer, mode="full").inc(saved)
+        count_items(saved)
+        return saved
+
+    async def finish_category(self, category: Any) -> Optional[Dict[str, Any]]:
+        """
+        Cierra la ingesta de una categoría (merge del staging en modo "copy")
+
+        Returns:
+            Estadísticas del merge o None en modo "orm"
+        """
+        if not self.staging_loader:
+            return None
+
+        try:
+            with profile_span("save"), observe_seconds(
+                DB_SAVE_BATCH_SECONDS, importer=self.importer_name.upper()
+            ):
+                stats = await self.staging_loader.merge(category)
+        except Exception:
+            # No dejar filas huérfanas en staging
+            await self.db.rollback()
+            await self.staging_loader.discard()
+            raise
+
+        self.record_save_stats(stats)
+        return stats
+
+    async def run_category_pipeline(
+        self,
+        category: Any,
+        source: AsyncIterator[Any],
+        fetch: Callable[[Any], Awaitable[Any]],
+        parse: Callable[[Any], Awaitable[Optional[Dict[str, Any]]]],
+        normalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+        total_items: Optional[int] = None,
+        learn_change_rate: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Scrapea y persiste una categoría con ScrapePipeline
+
+        Cada lote del sink se guarda con sink_products y actualiza el result
+        del job (procesados y métricas por etapa). Los ítems que agotan los
+        reintentos se registran en failed_items y los SKUs guardados
+        resuelven sus fallos anteriores. Config opcional: fetch_workers,
+        batch_size, queue_size, item_max_attempts, item_retry_backoff_seconds.
+
+        Con learn_change_rate, al terminar se actualiza la tasa de cambio de
+        la categoría (ver record_category_change_rate).
+
+        Returns:
+            Resultado de ScrapePipeline.run más 'saved' de la categoría
+        """
+        pipeline: Optional[ScrapePipeline] = None
+        processed = 0
+        stored_skus: Set[str] = set()
+        history_before = self.history_count
+
+        # El limiter se crea aquí: los workers de fetch no deben usar self.db
+        limiter = await self.get_rate_limiter()
+
+        async def sink(rows: List[Dict[str, Any]]):
+            nonlocal processed
+            processed += await self.sink_products(category, rows)
+            stored_skus.update(row["sku"] for row in rows if row.get("sku"))
+            await self._update_job_result(
+                {
+                    "total_items": total_items,
+                    "processed_items": processed,
+                    "current_sku": rows[-1].get("sku"),
+                    "category": category.name,
+                    "pipeline": pipeline.metrics(),
+                    "rate_limit": limiter.snapshot(),
+                }
+            )
+
+        pipeline = ScrapePipeline(
+            source=source,
+            fetch=fetch,
+            parse=parse,
+            normalize=normalize,
+            sink=sink,
+            fetch_workers=self.config.get("fetch_workers")
+            or settings.PIPELINE_FETCH_WORKERS,
+            queue_size=self.config.get("queue_size") or settings.PIPELINE_QUEUE_SIZE,
+            batch_size=self.config.get("batch_size") or settings.PIPELINE_BATCH_SIZE,
+            delay_seconds=(self.config.get("scraping_speed_ms") or 0) / 1000,
+            should_cancel=self.is_job_cancelled,
+            max_attempts=self.config.get("item_max_attempts")
+            or settings.ITEM_MAX_ATTEMPTS,
+            retry_backoff_seconds=self.config.get("item_retry_backoff_seconds")
+            or settings.ITEM_RETRY_BACKOFF_SECONDS,
+        )
+        result = await pipeline.run()
+        result["rate_limit"] = limiter.snapshot()
+
+        await self.record_failures(category, pipeline.failed_items)
+
+        if result["cancelled"]:
+            if self.staging_loader:
+                await self.staging_loader.discard()
+            return result
+
+        merge_stats = await self.finish_category(category)
+        result["saved"] = merge_stats["saved"] if merge_stats else processed
+
+        await resolve_failed_items(
+            self.db, category.importer_id, stored_skus, self.job_id
+        )
+
+        if learn_change_rate:
+            try:
+                result["change_rate"] = await record_category_change_rate(
+                    self.db,
+                    category,
+                    changed=self.history_count - history_before,
+                    scraped=result["saved"],
+                )
+            except Exception as e:
+                await self.db.rollback()
+                self.logger.warning(f"⚠️  No se pudo actualizar la tasa de cambio: {e}")
+        return result
+
+    def describe_failed_item(self, item: Any) -> Tuple[str, Optional[str]]:
+        """
+        (sku, url) de un ítem del pipeline para registrarlo en failed_items
+
+        Soporta los ítems de los componentes actuales: SKU suelto (Noriega),
+        tupla (sku, url, ...) (EMASA) o fila normalizada (fallos del sink).
+        """
+        if isinstance(item, dict):
+            return str(item.get("sku") or ""), item.get("url")
+        if isinstance(item, (tuple, list)):
+            return str(item[0]), item[1] if len(item) > 1 else None
+        return str(item), None
+
+    def build_retry_item(self, category: Any, sku: str, url: Optional[str]) -> Any:
+        """
+        Reconstruye el ítem de la fuente del pipeline desde un failed_item
+
+        Cada componente lo implementa según lo que espera su fetch; None
+        omite el ítem (lo que hace el componente genérico: ver
+        supports_item_retry).
+        """
+        return None
+
+    @classmethod
+    def supports_item_retry(cls) -> bool:
+        """True si el componente reprocesa SKUs sueltos (retry y refresh en vivo)"""
+        return cls.build_retry_item is not ProductsComponent.build_retry_item
+
+    async def record_failures(self, category: Any, failures: List[Dict[str, Any]]):
+        """Registra en failed_items los ítems que agotaron sus reintentos"""
+        if not failures:
+            return
+
+        rows = []
+        for failure in failures:
+            sku, url = self.describe_failed_item(failure["item"])
+            rows.append({**failure, "sku": sku, "url": url})
+
+        try:
+            recorded = await record_failed_items(
+                self.db, category.importer_id, category.id, self.job_id, rows
+            )
+        except Exception as e:
+            await self.db.rollback()
+            self.logger.error(f"❌ No se pudieron registrar los ítems fallidos: {e}")
+            return
+
+        self.failed_item_count += recorded
+        self.logger.warning(
+            f"⚠️  {recorded} ítems de {category.name} quedaron en failed_items"
+        )
+
+    async def retry_failed_items(self, failed_items: List[Any]) -> Dict[str, Any]:
+        """
+        Reprocesa solo los failed_items indicados (job RETRY_FAILED)
+
+        Los ítems se agrupan por categoría y pasan por el mismo pipeline que
+        un import normal; los que se guardan quedan resueltos y los que
+        vuelven a fallar actualizan su registro.
+
+        Args:
+            failed_items: Filas FailedItem pendientes
+
+        Returns:
+            {'success', 'total', 'retried', 'resolved', 'failed', 'skipped'}
+        """
+        from app.models import Category
+
+        by_category: Dict[Optional[int], List[Any]] = {}
+        for failed in failed_items:
+            by_category.setdefault(failed.category_id, []).append(failed)
+
+        summary = {"total": 0, "retried": 0, "resolved": 0, "failed": 0, "skipped": 0}
+        processed_groups = 0
+
+        for category_id, items in by_category.items():
+            category = await self.db.get(Category, category_id) if category_id else None
+            if category is None:
+                # Sin categoría no hay dónde guardar el producto
+                summary["skipped"] += len(items)
+                continue
+
+            async def source(category=category, items=items):
+                for failed in items:
+                    item = self.build_retry_item(category, failed.sku, failed.url)
+                    if item is not None:
+                        yield item
+
+            result = await self.run_category_pipeline(
+                category,
+                source(),
+                fetch=self._fetch_product_page,
+                parse=self._parse_product_page,
+                normalize=self._normalize_product,
+                total_items=len(items),
+                # Solo SKUs fallidos: no es una muestra de la categoría
+                learn_change_rate=False,
+            )
+            summary["retried"] += result.get("items", 0)
+            summary["resolved"] += result.get("saved", 0)
+            summary["failed"] += result.get("failed_items", 0)
+            summary["total"] += result.get("saved", 0)
+
+            processed_groups += 1
+            await self.update_progress(
+                f"Reintentados {summary['retried']}/{len(failed_items)} ítems",
+                int(processed_groups / len(by_category) * 100),
+            )
+
+            if result.get("cancelled"):
+                break
+
+        return {"success": True, "changes": self.change_summary, **summary}
+
+    async def list_category_prices(self, category: Any) -> List[Dict[str, Any]]:
+        """
+        Lee SKU, precio y stock del listado de una categoría (sin detalles)
+
+        Cada componente lo implementa para su listado; lo usa quick_refresh.
+        El componente genérico no lee listados (ver supports_quick_refresh).
+
+        Returns:
+            Dicts con sku, price y stock (None si el listado no lo informa)
+        """
+        return []
+
+    @classmethod
+    def supports_quick_refresh(cls) -> bool:
+        """True si el componente lee precio y stock desde los listados"""
+        return cls.list_category_prices is not ProductsComponent.list_category_prices
+
+    async def read_listing_columns(
+        self, page: Page, header_selector: str
+    ) -> Dict[str, Optional[int]]:
+        """
+        Índices de las columnas de precio y stock según los encabezados
+
+        config["listing_columns"] ({"price": i, "stock": j}) tiene prioridad
+        sobre lo detectado, para listados con encabezados poco claros.
+
+        Raises:
+            ValueError: Si el listado no tiene ni precio ni stock
+        """
+        headers = [
+            (await header.text_content() or "")
+            for header in await page.query_selector_all(header_selector)
+        ]
+        columns = find_listing_columns(headers)
+        overrides = self.config.get("listing_columns") or {}
+        columns.update({key: overrides[key] for key in columns if key in overrides})
+
+        if columns["price"] is None and columns["stock"] is None:
+            raise ValueError(
+                f"Listado sin columnas de precio ni stock (encabezados: {headers})"
+            )
+        return columns
+
+    async def read_listing_entry(
+        self, sku: str, cells: List[Any], columns: Dict[str, Optional[int]]
+    ) -> Dict[str, Any]:
+        """Precio y stock de una fila del listado (None si falta la celda)"""
+        entry: Dict[str, Any] = {"sku": sku, "price": None, "stock": None}
+
+        price_index = columns.get("price")
+        if price_index is not None and price_index < len(cells):
+            entry["price"] = parse_price(await cells[price_index].text_content())
+
+        stock_index = columns.get("stock")
+        if stock_index is not None and stock_index < len(cells):
+            entry["stock"] = parse_stock_label(await cells[stock_index].text_content())
+
+        return entry
+
+    async def quick_refresh(self) -> Dict[str, Any]:
+        """
+        Refresca precio y stock de las categorías seleccionadas (job QUICK_REFRESH)
+
+        Solo recorre los listados: no abre páginas de detalle ni toca
+        imágenes, descripciones o aplicaciones. Los SKUs que no existen en la
+        BD se cuentan como 'unknown' (necesitan un import completo). No hay
+        barrido de disponibilidad; sí se actualiza la tasa de cambio de cada
+        categoría.
+
+        Returns:
+            {'success', 'categories_processed', 'listed', 'refreshed',
+             'updated', 'unchanged', 'unknown', 'failed_categories', 'changes'}
+        """
+        from app.models import Category
+
+        summary = {
+            "listed": 0,
+            "refreshed": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "unknown": 0,
+            "failed_categories": [],
+        }
+        processed = 0
+
+        for index, category_id in enumerate(self.selected_categories, 1):
+            if await self.is_job_cancelled():
+                self.logger.warning("❌ Refresh rápido cancelado por el usuario")
+                return {
+                    "success": False,
+                    "error": "Importación cancelada por el usuario",
+                    "categories_processed": processed,
+                    "changes": self.change_summary,
+                    **summary,
+                }
+
+            category = (
+                await self.db.get(Category, int(category_id))
+                if str(category_id).isdigit()
+                else None
+            )
+            if category is None:
+                self.logger.warning(f"⚠️  Categoría {category_id} no encontrada en BD")
+                continue
+
+            try:
+                entries = await self.list_category_prices(category)
+            except Exception as e:
+                self.logger.error(f"❌ Error leyendo el listado de {category.name}: {e}")
+                summary["failed_categories"].append(category.name)
+                continue
+
+            importer = self.importer_name.upper()
+            with profile_span("save"), observe_seconds(
+                DB_SAVE_BATCH_SECONDS, importer=importer
+            ):
+                stats = await apply_quick_refresh(
+                    self.db, category.importer_id, entries
+                )
+            PRODUCTS_SCRAPED.labels(importer=importer, mode="quick").inc(
+                stats["matched"]
+            )
+            count_items(stats["matched"])
+            self.record_save_stats(stats)
+            summary["listed"] += stats["listed"]
+            summary["refreshed"] += stats["matched"]
+            summary["updated"] += stats["updated"]
+            summary["unchanged"] += stats["unchanged"]
+            summary["unknown"] += stats["unknown"]
+
+            try:
+                await record_category_change_rate(
+                    self.db,
+                    category,
+                    changed=stats["updated"],
+                    scraped=stats["matched"],
+                )
+            except Exception as e:
+                await self.db.rollback()
+                self.logger.warning(f"⚠️  No se pudo actualizar la tasa de cambio: {e}")
+
+            processed += 1
+            self.logger.info(
+                f"⚡ {category.name}: {stats['matched']} refrescados, "
+                f"{stats['updated']} con cambios, {stats['unknown']} SKUs nuevos"
+            )
+            await self.update_progress(
+                f"Refrescadas {index}/{len(self.selected_categories)} categorías",
+                int(index / len(self.selected_categories) * 100),
+            )
+
+        return {
+            "success": True,
+            "categories_processed": processed,
+            "changes": self.change_summary,
+            **summary,
+        }
+
+    def record_save_stats(self, stats: Dict[str, Any]):
+        """
+        Acumula las estadísticas de un guardado en change_summary
+
+        Args:
+            stats: Resultado de app.importers.persistence.save_products
+        """
+        for key in ("created", "updated", "unchanged"):
+            self.change_summary[key] += stats.get(key, 0)
+        self.history_count += stats.get("history", 0)
+
+        changed_skus = self.change_summary["changed_skus"]
+        remaining = MAX_REPORTED_SKUS - len(changed_skus)
+        if remaining > 0:
+            changed_skus.extend(stats.get("changed_skus", [])[:remaining])
+
+    def mark_skus_seen(self, category_id: int, skus: Iterable[str]):
+        """
+        Registra SKUs presentes en el listado de una categoría
+
+        Args:
+            category_id: ID de la categoría
+            skus: SKUs vistos en el listado del proveedor
+        """
+        self.seen_skus.setdefault(category_id, set()).update(skus)
+
+    def mark_category_complete(self, category_id: int):
+        """
+        Indica que el listado de la categoría se recorrió completo
+
+        Solo las categorías completas participan en el barrido de disponibilidad.
+        """
+        if category_id not in self.completed_category_ids:
+            self.completed_category_ids.append(category_id)
+
+    async def flush_seen_skus(self, category: Any) -> int:
+        """
+        Persiste (last_seen_at) los SKUs vistos en una categoría y libera el set
+
+        Args:
+            category: Categoría procesada
+
+        Returns:
+            Número de productos marcados como vistos
+        """
+        skus = self.seen_skus.pop(category.id, set())
+        return await mark_products_seen(
+            self.db, category.importer_id, skus, category_id=category.id
+        )
+
+    async def run_availability_sweep(self, importer_id: int) -> int:
+        """
+        Marca como no disponibles los productos no vistos en esta corrida
+
+        Con config["defer_sweep"] (job repartido en chunks) no hace nada: el
+        finalizador del job barre todas las categorías completas juntas.
+
+        Returns:
+            Número de productos marcados como no disponibles
+        """
+        if self.config.get("defer_sweep"):
+            return 0
+
+        swept = await sweep_unseen_products(
+            self.db, importer_id, self.job_id, self.completed_category_ids
+        )
+        if swept:
+            self.logger.info(f"🧹 {swept} productos marcados como no disponibles")
+        return swept
+
     async def execute(self) -> Dict[str, Any]:
         """
         Ejecuta la extracción de productos
@@ -0,0 +1,360 @@
+"""
+Runner local de importadores (sin API, Celery ni Redis)
+
+Ejecuta los componentes de auth, categorías y productos de un importador
+en el proceso, con un navegador propio, y al terminar imprime el perfil por
+fase del job (ver profiling.py), productos por minuto y el pico de memoria
+del proceso y del navegador. Pensado para iterar sobre el rendimiento de
+los importadores.
+
+Uso (desde backend/):
+    python -m app.importers run noriega --categories 12 15 --limit 50
+    python -m app.importers run emasa --skip-categories --limit 20 \\
+        --profile cprofile --profile-output emasa.prof
+    python -m app.importers run noriega --profile pyinstrument --headed
+
+Necesita la BD (los jobs y productos se guardan igual que en un import
+normal). El barrido de disponibilidad no se ejecuta: con --limit el listado
+queda incompleto y marcaría productos como no disponibles. Sin Redis el
+rate limiter usa el bucket local del proceso.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logger import logger
+from app.importers.emasa import (
+    EmasaAuthComponent,
+    EmasaCategoriesComponent,
+    EmasaProductsComponent,
+)
+from app.importers.noriega import (
+    NoriegaAuthComponent,
+    NoriegaCategoriesComponent,
+    NoriegaProductsComponent,
+)
+from app.importers.profiling import JobProfiler, current_profiler, profile_span
+from app.models import Category, Importer, ImportJob, JobStatus, JobType
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload
+
+# Importador -> (auth, categorías, productos)
+COMPONENTS = {
+    "NORIEGA": (
+        NoriegaAuthComponent,
+        NoriegaCategoriesComponent,
+        NoriegaProductsComponent,
+    ),
+    "EMASA": (EmasaAuthComponent, EmasaCategoriesComponent, EmasaProductsComponent),
+}
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+async def _create_job(db, importer_id: int, job_type: JobType) -> str:
+    job_id = f"cli-{uuid.uuid4()}"
+    db.add(
+        ImportJob(
+            job_id=job_id,
+            importer_id=importer_id,
+            job_type=job_type,
+            status=JobStatus.RUNNING,
+            started_at=datetime.now(timezone.utc),
+            params={"source": "cli"},
+        )
+    )
+    await db.commit()
+    return job_id
+
+
+async def _finish_job(
+    db, job_id: str, result: Dict[str, Any], profile: Optional[dict]
+):
+    await db.execute(
+        update(ImportJob)
+        .where(ImportJob.job_id == job_id)
+        .values(
+            status=JobStatus.COMPLETED if result.get("success") else JobStatus.FAILED,
+            progress=100,
+            processed_items=result.get("total", 0) or 0,
+            completed_at=datetime.now(timezone.utc),
+            error_message=result.get("error"),
+            profile=profile,
+        )
+    )
+    await db.commit()
+
+
+async def _selected_categories(db, importer_id: int, category_ids: List[str]):
+    """IDs pedidos, o los de las categorías marcadas como seleccionadas"""
+    if category_ids:
+        return category_ids
+    result = await db.execute(
+        select(Category.id).where(
+            Category.importer_id == importer_id, Category.selected.is_(True)
+        )
+    )
+    return [str(category_id) for category_id in result.scalars().all()]
+
+
+async def run_importer(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Auth -> categorías (opcional) -> productos, con un JobProfiler propio
+
+    Returns:
+        {'importer', 'job_ids', 'success', 'total', 'categories',
+         'profile', 'error'}
+    """
+    from app.tasks.import_tasks import _build_products_config
+    from app.tasks.runtime import launch_browser
+    from playwright.async_api import async_playwright
+
+    importer_name = args.importer.upper()
+    auth_cls, categories_cls, products_cls = COMPONENTS[importer_name]
+    profiler = JobProfiler()
+    token = current_profiler.set(profiler)
+    summary: Dict[str, Any] = {
+        "importer": importer_name,
+        "job_ids": [],
+        "success": False,
+        "total": 0,
+        "categories": [],
+    }
+
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Importer)
+                .options(joinedload(Importer.config))
+                .where(Importer.name == importer_name)
+            )
+            importer = result.unique().scalar_one_or_none()
+            if importer is None:
+                summary["error"] = f"Importador no encontrado: {importer_name}"
+                return summary
+
+            credentials = (importer.config.credentials if importer.config else {}) or {}
+            config = {
+                **_build_products_config(importer.config),
+                # Sin barrido: con --limit el listado queda incompleto
+                "defer_sweep": True,
+            }
+            if args.limit:
+                config["products_per_category"] = args.limit
+
+            async with async_playwright() as playwright:
+                browser = await launch_browser(playwright)
+                try:
+                    job_id = await _create_job(db, importer.id, JobType.PRODUCTS)
+                    summary["job_ids"].append(job_id)
+
+                    auth_component = auth_cls(
+                        importer_name=importer_name,
+                        job_id=job_id,
+                        db=db,
+                        browser=browser,
+                        credentials=credentials,
+                        headless=settings.HEADLESS,
+                    )
+                    with profile_span("auth"):
+                        auth_result = await auth_component.execute()
+                    if not auth_result["success"]:
+                        summary["error"] = auth_result.get("error") or "Auth fallida"
+                        await _finish_job(db, job_id, summary, profiler.summary())
+                        return summary
+
+                    page = auth_result.get("page")
+                    context = auth_result.get("context")
+
+                    if not args.skip_categories:
+                        categories_job_id = await _create_job(
+                            db, importer.id, JobType.CATEGORIES
+                        )
+                        summary["job_ids"].append(categories_job_id)
+                        categories_result = await categories_cls(
+                            importer_name=importer_name,
+                            job_id=categories_job_id,
+                            db=db,
+                            browser=browser,
+                            page=page,
+                            context=context,
+                        ).execute()
+                        await _finish_job(
+                            db, categories_job_id, categories_result, None
+                        )
+
+                    selected = await _selected_categories(
+                        db, importer.id, args.categories
+                    )
+                    summary["categories"] = selected
+                    if not selected:
+                        summary["error"] = (
+                            "Sin categorías: usar --categories o marcar categorías "
+                            "como seleccionadas"
+                        )
+                        await _finish_job(db, job_id, summary, profiler.summary())
+                        return summary
+
+                    products_result = await products_cls(
+                        importer_name=importer_name,
+                        job_id=job_id,
+                        db=db,
+                        browser=browser,
+                        page=page,
+                        context=context,
+                        selected_categories=selected,
+                        config=config,
+                    ).execute()
+
+                    summary.update(
+                        success=bool(products_result.get("success")),
+                        total=products_result.get("total", 0),
+                        error=products_result.get("error"),
+                    )
+                    summary["profile"] = profiler.summary()
+                    await _finish_job(db, job_id, summary, summary["profile"])
+                finally:
+                    await browser.close()
+    finally:
+        current_profiler.reset(token)
+
+    return summary
+
+
+def _max_rss_mb(who: int) -> float:
+    # ru_maxrss está en KB en Linux (en bytes en macOS)
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(resource.getrusage(who).ru_maxrss / scale, 1)
+
+
+@contextmanager
+def _code_profiler(kind: Optional[str], output: Optional[str]) -> Iterator[None]:
+    """cProfile o pyinstrument alrededor del run (None: sin profiler)"""
+    if kind is None:
+        yield
+        return
+
+    if kind == "cprofile":
+        import cProfile
+        import pstats
+
+        code_profiler = cProfile.Profile()
+        code_profiler.enable()
+        try:
+            yield
+        finally:
+            code_profiler.disable()
+            stats = pstats.Stats(code_profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(30)
+            if output:
+                stats.dump_stats(output)
+                logger.info(f"📝 cProfile guardado en {output} (snakeviz/pstats)")
+        return
+
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        raise SystemExit("pyinstrument no está instalado (pip install pyinstrument)")
+
+    code_profiler = Profiler(async_mode="enabled")
+    code_profiler.start()
+    try:
+        yield
+    finally:
+        code_profiler.stop()
+        print(code_profiler.output_text(unicode=True, color=False), file=sys.stderr)
+        if output:
+            with open(output, "w", encoding="utf-8") as output_file:
+                output_file.write(code_profiler.output_html())
+            logger.info(f"📝 Reporte de pyinstrument guardado en {output}")
+
+
+def _print_summary(summary: Dict[str, Any]):
+    profile = summary.get("profile") or {}
+    lines = [
+        "",
+        f"Importador: {summary['importer']}  Jobs: {', '.join(summary['job_ids'])}",
+        f"Resultado: {'OK' if summary['success'] else 'ERROR'}"
+        + (f" ({summary['error']})" if summary.get("error") else ""),
+        f"Productos: {summary['total']} en {summary['wall_seconds']}s "
+        f"({profile.get('items_per_minute') or 0} productos/min)",
+        f"Memoria pico: proceso {summary['python_peak_mb']} MB | "
+        f"navegador {summary['browser_peak_mb']} MB",
+    ]
+    if profile.get("phases"):
+        lines.append("")
+        lines.append(
+            f"{'fase':<14}{'count':>8}{'total s':>10}{'share':>8}"
+            f"{'p50':>9}{'p95':>9}{'max':>9}"
+        )
+        for phase, stats in profile["phases"].items():
+            lines.append(
+                f"{phase:<14}{stats['count']:>8}{stats['total_seconds']:>10}"
+                f"{stats['share'] or 0:>8}{stats['p50']:>9}{stats['p95']:>9}"
+                f"{stats['max']:>9}"
+            )
+    print("\n".join(lines))
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.importers",
+        description="Ejecuta un importador localmente con perfil de rendimiento",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Auth, categorías y productos")
+    run.add_argument(
+        "importer", type=str.lower, choices=[name.lower() for name in COMPONENTS]
+    )
+    run.add_argument(
+        "--categories",
+        nargs="+",
+        default=[],
+        help="IDs de categoría (default: las marcadas como seleccionadas)",
+    )
+    run.add_argument("--limit", type=int, help="Máximo de productos por categoría")
+    run.add_argument(
+        "--skip-categories",
+        action="store_true",
+        help="No re-extraer el árbol de categorías",
+    )
+    run.add_argument("--profile", choices=PROFILERS, help="Profiler de código")
+    run.add_argument(
+        "--profile-output",
+        help="Archivo del profiler (.prof para cProfile, .html para pyinstrument)",
+    )
+    run.add_argument("--headed", action="store_true", help="Navegador visible")
+    run.add_argument("--json", help="Guarda el resumen en este archivo")
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    if args.headed:
+        settings.HEADLESS = False
+
+    started = time.perf_counter()
+    with _code_profiler(args.profile, args.profile_output):
+        summary = asyncio.run(run_importer(args))
+
+    summary["wall_seconds"] = round(time.perf_counter() - started, 1)
+    summary["python_peak_mb"] = _max_rss_mb(resource.RUSAGE_SELF)
+    # Procesos hijos ya terminados: el mayor (Chromium) tras cerrar Playwright
+    summary["browser_peak_mb"] = _max_rss_mb(resource.RUSAGE_CHILDREN)
+
+    _print_summary(summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(summary, json_file, indent=2, default=str)
+    return 0 if summary["success"] else 1
@@ -3,13 +3,16 @@ Componente de extracción de categorías para EMASA
 """
 
 import re
-import unicodedata
 from typing import Any, Dict
 
 from app.importers.base import CategoriesComponent
+from app.importers.parsing import slugify
 from playwright.async_api import Browser, Page
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# external_id de la categoría: parámetro cod_familia del link del menú
+_COD_FAMILIA = re.compile(r"cod_familia=([^&]+)")
+
 
 class EmasaCategoriesComponent(CategoriesComponent):
     """
@@ -49,8 +52,11 @@ class EmasaCategoriesComponent(CategoriesComponent):
                 categories_url = "https://ecommerce.emasa.cl/b2b/buscador_googleo.jsp"
                 self.logger.info(f"🔗 Navegando a página de buscador: {categories_url}")
                 try:
-                    await self.page.goto(
-                        categories_url, wait_until="networkidle", timeout=60000
+                    await self.navigate(
+                        self.page,
+                        categories_url,
+                        wait_until="networkidle",
+                        timeout=60000,
                     )
                     self.logger.info("✅ Página de buscador cargada")
                 except Exception as e:
@@ -85,19 +91,6 @@ class EmasaCategoriesComponent(CategoriesComponent):
                 f"🔍 Encontrados {len(category_elements)} elementos de categoría (Nuestras Líneas)"
             )
 
-            # Helper local para generar slugs seguros (no nulos)
-            def slugify(text: str) -> str:
-                text = text or ""
-                # Normalizar acentos
-                text = unicodedata.normalize("NFKD", text)
-                text = text.encode("ascii", "ignore").decode("ascii")
-                text = re.sub(r"[^a-zA-Z0-9\-\s]", "", text)
-                text = text.strip().lower()
-                text = re.sub(r"[\s]+", "-", text)
-                if not text:
-                    text = "categoria"
-                return text
-
             categories = []
             for element in category_elements:
                 # Verificar si el job fue cancelado
@@ -127,7 +120,7 @@ class EmasaCategoriesComponent(CategoriesComponent):
                             category_url = href
 
                         # Extraer cod_familia del href para usarlo como external_id
-                        cod_familia_match = re.search(r"cod_familia=([^&]+)", href)
+                        cod_familia_match = _COD_FAMILIA.search(href)
                         external_id = (
                             cod_familia_match.group(1)
                             if cod_familia_match
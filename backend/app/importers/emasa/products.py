@@ -2,9 +2,17 @@
 Componente de extracción de productos para EMASA
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from app.importers.base import ProductsComponent
+from app.importers.parsing import (
+    parse_int,
+    parse_price,
+    parse_total_records,
+    parse_year_range,
+)
+from app.importers.profiling import profile_span
 from playwright.async_api import Browser, Page
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -57,38 +65,6 @@ class EmasaProductsComponent(ProductsComponent):
             self.logger.info("   - Límite por categoría: SIN LÍMITE (scrapeará todos)")
         self.logger.info(f"   - Velocidad: {self.scraping_speed_ms}ms entre productos")
 
-    async def _update_job_result(self, result_data: Dict[str, Any]):
-        """
-        Actualiza el campo result del job con información detallada
-
-        Args:
-            result_data: Diccionario con datos actualizados
-        """
-        from app.models import ImportJob
-        from sqlalchemy import select, update
-
-        try:
-            # Obtener job actual
-            stmt = select(ImportJob).where(ImportJob.job_id == self.job_id)
-            result = await self.db.execute(stmt)
-            job = result.scalar_one_or_none()
-
-            if job:
-                # Merge con el result existente
-                current_result = job.result or {}
-                updated_result = {**current_result, **result_data}
-
-                # Actualizar
-                update_stmt = (
-                    update(ImportJob)
-                    .where(ImportJob.job_id == self.job_id)
-                    .values(result=updated_result)
-                )
-                await self.db.execute(update_stmt)
-                await self.db.commit()
-        except Exception as e:
-            self.logger.error(f"Error actualizando job result: {e}")
-
     async def execute(self) -> Dict[str, Any]:
         """
         Extrae productos de las categorías seleccionadas
@@ -139,7 +115,8 @@ class EmasaProductsComponent(ProductsComponent):
             self.logger.info(f"✅ Categorías en BD: {len(all_categories)}")
             self.logger.info("")
 
-            all_products = []
+            total_extracted = 0
+            total_saved = 0
             categories_processed = 0
 
             # Iterar por cada categoría seleccionada
@@ -176,8 +153,12 @@ class EmasaProductsComponent(ProductsComponent):
                     self.logger.info(f"🔗 URL: {category.url}")
                     self.logger.info("📍 Navegando a la lista de productos...")
 
-                    await self.page.goto(
-                        category.url, wait_until="networkidle", timeout=60000
+                    await self.navigate(
+                        self.page,
+                        category.url,
+                        phase="listing",
+                        wait_until="networkidle",
+                        timeout=60000,
                     )
 
                     # Screenshot de la categoría
@@ -188,17 +169,31 @@ class EmasaProductsComponent(ProductsComponent):
                     except Exception as e:
                         self.logger.warning(f"⚠️ Error en screenshot: {e}")
 
-                    # Extraer productos de esta categoría
-                    products = await self._extract_products_from_category(
+                    # Extraer y guardar productos de esta categoría (pipeline por lotes)
+                    pipeline_result = await self._extract_products_from_category(
                         category=category, limit=self.products_per_category
                     )
+                    saved_count = pipeline_result.get("saved", 0)
+                    total_extracted += pipeline_result.get("items", 0)
+                    total_saved += saved_count
+                    await self.flush_seen_skus(category)
 
-                    all_products.extend(products)
-                    categories_processed += 1
+                    if pipeline_result.get("cancelled"):
+                        self.logger.warning("❌ Importación cancelada por el usuario")
+                        return {
+                            "success": False,
+                            "error": "Importación cancelada por el usuario",
+                            "products": [],
+                            "total": total_saved,
+                            "categories_processed": categories_processed,
+                        }
 
                     self.logger.info(
-                        f"✅ Productos extraídos de {category.name}: {len(products)}"
+                        f"✅ {category.name}: {saved_count} productos guardados "
+                        f"({pipeline_result.get('errors', 0)} errores)"
                     )
+
+                    categories_processed += 1
                     self.logger.info("")
 
                 except Exception as e:
@@ -210,27 +205,29 @@ class EmasaProductsComponent(ProductsComponent):
                     self.logger.error(traceback.format_exc())
                     continue
 
-            # Guardar productos en la base de datos
-            if all_products:
-                await self.update_progress(
-                    f"Guardando {len(all_products)} productos...", 90
-                )
-                saved_count = await self._save_products(all_products)
-                self.logger.info(f"✅ {saved_count} productos guardados exitosamente")
+            # 🧹 Productos que desaparecieron del listado
+            marked_unavailable = await self.run_availability_sweep(importer.id)
 
             await self.update_progress("✅ Importación completada", 100)
 
             self.logger.info("=" * 80)
             self.logger.info("✅ SCRAPING COMPLETADO")
-            self.logger.info(f"   Total de productos extraídos: {len(all_products)}")
+            self.logger.info(f"   Total de productos extraídos: {total_extracted}")
+            self.logger.info(f"   Total de productos guardados: {total_saved}")
             self.logger.info(f"   Categorías procesadas: {categories_processed}")
             self.logger.info("=" * 80)
 
             return {
                 "success": True,
                 "products": [],  # No devolver productos completos (muy pesado)
-                "total": len(all_products),
+                # Guardados, igual que Noriega (el job suma "total" de todos
+                # los chunks); los listados van aparte
+                "total": total_saved,
+                "extracted": total_extracted,
                 "categories_processed": categories_processed,
+                "changes": self.change_summary,
+                "marked_unavailable": marked_unavailable,
+                "failed_items": self.failed_item_count,
                 "message": f"Se procesaron {categories_processed} categorías. Navegador listo para inspección.",
             }
 
@@ -250,45 +247,43 @@ class EmasaProductsComponent(ProductsComponent):
 
     async def _extract_products_from_category(
         self, category: Any, limit: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """
-        Extrae productos de una categoría navegando por todas las páginas
+        Extrae y guarda los productos de una categoría navegando por todas las páginas
+
+        El listado paginado alimenta el pipeline (fetch del detalle en
+        pestaña propia → parse → normalize → sink por lotes).
 
         Args:
             category: Objeto Category de SQLAlchemy
             limit: Límite máximo de productos a extraer (None = todos)
 
         Returns:
-            Lista de productos extraídos
+            Resultado de run_category_pipeline
         """
-        products = []
+        empty_result = {"saved": 0, "items": 0, "errors": 0, "cancelled": False}
 
         try:
-            import asyncio
-            import re
-
             # Esperar a que cargue la tabla de productos
             await asyncio.sleep(2)
 
             # 1. EXTRAER TOTAL DE PRODUCTOS
             # Buscar el texto "Mostrando registros del X al Y de un total de Z registros"
-            info_selector = "#tblProd_info"
-            info_element = await self.page.query_selector(info_selector)
+            info_element = await self.page.query_selector("#tblProd_info")
 
             total_products = 0
             if info_element:
-                info_text = await info_element.text_content()
-                # Extraer el número total con regex
-                match = re.search(r"de un total de (\d+) registros", info_text)
-                if match:
-                    total_products = int(match.group(1))
+                total_products = (
+                    parse_total_records(await info_element.text_content()) or 0
+                )
+                if total_products:
                     self.logger.info(
                         f"📦 Total de productos en categoría: {total_products}"
                     )
 
             if total_products == 0:
                 self.logger.warning(f"⚠️ No se encontraron productos en {category.name}")
-                return products
+                return empty_result
 
             # Aplicar límite si existe
             products_to_extract = (
@@ -296,115 +291,99 @@ class EmasaProductsComponent(ProductsComponent):
             )
             self.logger.info(f"🎯 Se extraerán {products_to_extract} productos")
 
-            # 2. NAVEGAR POR TODAS LAS PÁGINAS
-            current_page = 1
-            products_extracted = 0
-
-            while products_extracted < products_to_extract:
-                # ✋ Verificar cancelación antes de cada página
-                if await self.is_job_cancelled():
-                    self.logger.warning("❌ Importación cancelada por el usuario")
-                    return products
-
-                self.logger.info(f"\n📄 Procesando página {current_page}...")
-
-                # 3. EXTRAER PRODUCTOS DE LA PÁGINA ACTUAL
-                # Selector de filas de la tabla
-                row_selector = "#tblProd tbody tr"
-                rows = await self.page.query_selector_all(row_selector)
-
-                self.logger.info(f"   Productos en página: {len(rows)}")
+            result = await self.run_category_pipeline(
+                category,
+                self._iter_listing(category, products_to_extract, total_products, limit),
+                fetch=self._fetch_product_page,
+                parse=self._parse_product_page,
+                normalize=self._normalize_product,
+                total_items=products_to_extract,
+            )
 
-                for idx, row in enumerate(rows, 1):
-                    # ✋ Verificar cancelación
-                    if await self.is_job_cancelled():
-                        self.logger.warning("❌ Importación cancelada")
-                        return products
+            self.logger.info(
+                f"\n✅ Extracción completada: {result['saved']} productos de {category.name}"
+            )
+            return result
 
-                    # Verificar límite
-                    if products_extracted >= products_to_extract:
-                        break
+        except Exception as e:
+            self.logger.error(f"❌ Error en _extract_products_from_category: {e}")
+            import traceback
 
-                    try:
-                        # Actualizar job result
-                        await self._update_job_result(
-                            {
-                                "total_items": products_to_extract,
-                                "processed_items": products_extracted,
-                                "current_item": products_extracted + 1,
-                                "category": category.name,
-                                "current_page": current_page,
-                            }
-                        )
+            self.logger.error(traceback.format_exc())
+            return {**empty_result, "errors": 1}
 
-                        # Extraer datos del producto (fila)
-                        product_data = await self._extract_product_from_row(
-                            row, category
-                        )
+    async def _iter_listing(
+        self,
+        category: Any,
+        products_to_extract: int,
+        total_products: int,
+        limit: Optional[int],
+    ) -> AsyncIterator[Tuple[str, str, Any]]:
+        """
+        Recorre el listado paginado y entrega (sku, url de detalle, categoría)
 
-                        if product_data:
-                            products.append(product_data)
-                            products_extracted += 1
+        Es la fuente del pipeline: solo avanza de página cuando las etapas
+        siguientes tienen espacio en su cola.
+        """
+        current_page = 1
+        listed = 0
 
-                            self.logger.info(
-                                f"  ✓ [{products_extracted}/{products_to_extract}] "
-                                f"{product_data.get('sku', 'N/A')} - {product_data.get('name', 'Sin nombre')[:50]}"
-                            )
+        while listed < products_to_extract:
+            self.logger.info(f"\n📄 Procesando página {current_page}...")
 
-                        # Delay entre productos
-                        await asyncio.sleep(self.scraping_speed_ms / 1000.0)
+            # Leer la página completa antes de entregar (los handles de filas
+            # dejan de ser válidos al cambiar de página)
+            with profile_span("listing"):
+                rows = await self.page.query_selector_all("#tblProd tbody tr")
+                self.logger.info(f"   Productos en página: {len(rows)}")
 
-                    except Exception as e:
-                        self.logger.warning(f"⚠️ Error extrayendo producto {idx}: {e}")
-                        continue
+                entries = []
+                for row in rows:
+                    entry = await self._read_listing_row(row)
+                    if entry:
+                        entries.append(entry)
 
-                # 4. NAVEGAR A LA SIGUIENTE PÁGINA SI HAY MÁS PRODUCTOS
-                if products_extracted < products_to_extract:
-                    # Buscar botón "Siguiente"
-                    next_button = await self.page.query_selector(
-                        "#tblProd_next:not(.disabled)"
-                    )
+            for sku, detail_url in entries:
+                if listed >= products_to_extract:
+                    break
+                self.mark_skus_seen(category.id, [sku])
+                listed += 1
+                yield sku, detail_url, category
+
+            # NAVEGAR A LA SIGUIENTE PÁGINA SI HAY MÁS PRODUCTOS
+            if listed < products_to_extract:
+                next_button = await self.page.query_selector(
+                    "#tblProd_next:not(.disabled)"
+                )
 
-                    if next_button:
-                        self.logger.info(f"➡️  Navegando a página {current_page + 1}...")
+                if next_button:
+                    self.logger.info(f"➡️  Navegando a página {current_page + 1}...")
+                    await self.throttle()
+                    with profile_span("listing"):
                         await next_button.click()
                         await asyncio.sleep(2)  # Esperar a que cargue la nueva página
-                        current_page += 1
-                    else:
-                        self.logger.info("✅ No hay más páginas disponibles")
-                        break
+                    current_page += 1
                 else:
+                    self.logger.info("✅ No hay más páginas disponibles")
+                    if not limit or limit >= total_products:
+                        self.mark_category_complete(category.id)
                     break
+            else:
+                if not limit or limit >= total_products:
+                    self.mark_category_complete(category.id)
+                break
 
-            self.logger.info(
-                f"\n✅ Extracción completada: {len(products)} productos de {category.name}"
-            )
-
-        except Exception as e:
-            self.logger.error(f"❌ Error en _extract_products_from_category: {e}")
-            import traceback
-
-            self.logger.error(traceback.format_exc())
-
-        return products
-
-    async def _extract_product_from_row(
-        self, row: Any, category: Any
-    ) -> Optional[Dict[str, Any]]:
+    async def _read_listing_row(self, row: Any) -> Optional[Tuple[str, str]]:
         """
-        Extrae datos de una fila de la tabla de productos y navega al detalle
+        Lee SKU y URL de detalle de una fila de la tabla de productos
 
         Args:
             row: Elemento <tr> de la tabla de productos
-            category: Categoría del producto
 
         Returns:
-            Dict con datos del producto o None si falla
+            (sku, url de detalle) o None si la fila no es válida
         """
         try:
-            import asyncio
-
-            # 1. EXTRAER DATOS BÁSICOS DE LA FILA
             cells = await row.query_selector_all("td")
 
             if len(cells) < 3:  # Verificar que tenga al menos 3 columnas
@@ -426,8 +405,9 @@ class EmasaProductsComponent(ProductsComponent):
                 return None
 
             # Extraer SKU del texto del enlace
-            sku_text = await item_link.text_content()
-            sku = sku_text.strip()
+            sku = (await item_link.text_content()).strip()
+            if not sku:
+                return None
 
             # Extraer URL del detalle (puede estar en data-src o href)
             detail_url = await item_link.get_attribute("data-src")
@@ -442,39 +422,106 @@ class EmasaProductsComponent(ProductsComponent):
             if not detail_url.startswith("http"):
                 detail_url = f"https://ecommerce.emasa.cl/b2b/{detail_url.lstrip('/')}"
 
-            self.logger.info(f"   🔗 Navegando a detalle: {detail_url}")
+            return sku, detail_url
 
-            # 2. NAVEGAR AL DETALLE DEL PRODUCTO EN NUEVA PESTAÑA
-            # Guardar la página actual
-            current_page = self.page
-
-            # Abrir el detalle en nueva pestaña
-            context = current_page.context
-            detail_page = await context.new_page()
+        except Exception as e:
+            self.logger.warning(f"⚠️ Error leyendo fila del listado: {e}")
+            return None
 
-            try:
-                await detail_page.goto(
-                    detail_url, wait_until="domcontentloaded", timeout=30000
-                )
-                await asyncio.sleep(1.5)
+    async def list_category_prices(self, category: Any) -> List[Dict[str, Any]]:
+        """
+        Precio y stock de todos los SKUs del listado paginado de una categoría
 
-                # 3. EXTRAER DATOS DEL DETALLE
-                product_data = await self._extract_product_detail(
-                    detail_page, sku, category, detail_url
-                )
+        Sin límite por categoría: no se abren detalles, solo páginas del listado.
+        """
+        await self.navigate(
+            self.page,
+            category.url,
+            phase="listing",
+            wait_until="networkidle",
+            timeout=60000,
+        )
 
-                return product_data
+        with profile_span("listing"):
+            await asyncio.sleep(2)
+            columns = await self.read_listing_columns(self.page, "#tblProd thead th")
+
+        entries = []
+        current_page = 1
+        while True:
+            with profile_span("listing"):
+                for row in await self.page.query_selector_all("#tblProd tbody tr"):
+                    listing = await self._read_listing_row(row)
+                    if listing:
+                        cells = await row.query_selector_all("td")
+                        entries.append(
+                            await self.read_listing_entry(listing[0], cells, columns)
+                        )
 
-            finally:
-                # Cerrar la pestaña del detalle
-                await detail_page.close()
+            next_button = await self.page.query_selector(
+                "#tblProd_next:not(.disabled)"
+            )
+            if not next_button:
+                break
 
-        except Exception as e:
-            self.logger.warning(f"⚠️ Error extrayendo producto de fila: {e}")
-            import traceback
+            await self.throttle()
+            with profile_span("listing"):
+                await next_button.click()
+                await asyncio.sleep(2)  # Esperar a que cargue la nueva página
+            current_page += 1
 
-            self.logger.debug(traceback.format_exc())
+        self.logger.info(
+            f"📋 {category.name}: {len(entries)} SKUs en {current_page} páginas"
+        )
+        return entries
+
+    def build_retry_item(
+        self, category: Any, sku: str, url: Optional[str]
+    ) -> Optional[Tuple[str, str, Any]]:
+        """Mismo formato que _iter_listing; sin URL de detalle no se reintenta"""
+        if not url:
+            self.logger.warning(f"⚠️ SKU {sku} sin URL de detalle, no se reintenta")
             return None
+        return sku, url, category
+
+    async def _fetch_product_page(
+        self, entry: Tuple[str, str, Any]
+    ) -> Tuple[str, str, Any, Page]:
+        """Abre el detalle del producto en una pestaña nueva"""
+        sku, detail_url, category = entry
+        self.item_logger.info(f"   🔗 Navegando a detalle: {detail_url}")
+
+        detail_page = await self.page.context.new_page()
+        try:
+            await self.navigate(
+                detail_page, detail_url, wait_until="domcontentloaded", timeout=30000
+            )
+            await asyncio.sleep(1.5)
+        except Exception:
+            await detail_page.close()
+            raise
+
+        return sku, detail_url, category, detail_page
+
+    async def _parse_product_page(
+        self, fetched: Tuple[str, str, Any, Page]
+    ) -> Optional[Dict[str, Any]]:
+        """Extrae el producto de la pestaña de detalle y la cierra"""
+        sku, detail_url, category, detail_page = fetched
+        try:
+            with profile_span("extraction", sku=sku):
+                product_data = await self._extract_product_detail(
+                    detail_page, sku, category, detail_url
+                )
+        finally:
+            await detail_page.close()
+
+        if product_data:
+            self.item_logger.info(
+                f"  ✓ {product_data.get('sku', 'N/A')} - "
+                f"{product_data.get('name', 'Sin nombre')[:50]}"
+            )
+        return product_data
 
     async def _extract_product_detail(
         self, page: Any, sku: str, category: Any, url: str
@@ -492,8 +539,6 @@ class EmasaProductsComponent(ProductsComponent):
             Dict con datos completos del producto o None si falla
         """
         try:
-            import re
-
             # EXTRAER NOMBRE (h3 dentro de box-body)
             name_element = await page.query_selector(".box-body h3")
             name = "Sin nombre"
@@ -514,11 +559,7 @@ class EmasaProductsComponent(ProductsComponent):
             if len(price_elements) >= 2:  # El segundo precio es "PRECIO CON IVA"
                 price_text = await price_elements[1].text_content()
                 # Limpiar precio: $37.604 -> 37604
-                price_clean = re.sub(r"[^\d]", "", price_text)
-                try:
-                    price = float(price_clean) if price_clean else 0.0
-                except:
-                    price = 0.0
+                price = parse_price(price_text) or 0.0
 
             # EXTRAER DESCRIPCIÓN/CARACTERÍSTICAS (dentro del jumbotron)
             characteristics = []
@@ -553,57 +594,44 @@ class EmasaProductsComponent(ProductsComponent):
             image_url = images[0] if images else ""
 
             # EXTRAER COMPATIBILIDAD (tabla de aplicaciones)
-            compatibility = []
-            app_rows = await page.query_selector_all("#tb1 tbody tr")
-            for row in app_rows:
-                cells = await row.query_selector_all("td")
-                if len(cells) >= 3:
-                    brand_auto = await cells[0].text_content()
-                    model = await cells[1].text_content()
-                    years = await cells[2].text_content()
-
-                    # Separar año inicio y término
-                    year_match = re.search(r"(\d{4})\s*-\s*(\d{4}|--)", years.strip())
-                    year_start = None
-                    year_end = None
-                    if year_match:
-                        try:
-                            year_start = int(year_match.group(1))
-                            if year_match.group(2) != "--":
-                                year_end = int(year_match.group(2))
-                        except ValueError:
-                            pass
-
-                    # Extraer nombre secundario del modelo (después del "/")
-                    model_text = model.strip()
-                    secondary_name = ""
-                    if "/" in model_text:
-                        parts = model_text.split("/", 1)
-                        model_text = parts[0].strip()
-                        secondary_name = parts[1].strip() if len(parts) > 1 else ""
-
-                    compatibility.append(
-                        {
-                            "car_brand": brand_auto.strip(),
-                            "car_model": model_text,
-                            "secondary_name": secondary_name
-                            if secondary_name
-                            else None,
-                            "year_start": year_start,
-                            "year_end": year_end,
-                        }
-                    )
+            with profile_span("applications", sku=sku):
+                compatibility = []
+                app_rows = await page.query_selector_all("#tb1 tbody tr")
+                for row in app_rows:
+                    cells = await row.query_selector_all("td")
+                    if len(cells) >= 3:
+                        brand_auto = await cells[0].text_content()
+                        model = await cells[1].text_content()
+                        years = await cells[2].text_content()
+
+                        # Separar año inicio y término
+                        year_start, year_end = parse_year_range(years)
+
+                        # Extraer nombre secundario del modelo (después del "/")
+                        model_text = model.strip()
+                        secondary_name = ""
+                        if "/" in model_text:
+                            parts = model_text.split("/", 1)
+                            model_text = parts[0].strip()
+                            secondary_name = parts[1].strip() if len(parts) > 1 else ""
+
+                        compatibility.append(
+                            {
+                                "car_brand": brand_auto.strip(),
+                                "car_model": model_text,
+                                "secondary_name": secondary_name
+                                if secondary_name
+                                else None,
+                                "year_start": year_start,
+                                "year_end": year_end,
+                            }
+                        )
 
             # EXTRAER STOCK (del input max)
             stock = 0
             stock_input = await page.query_selector("#txtAgrega")
             if stock_input:
-                max_stock = await stock_input.get_attribute("max")
-                if max_stock:
-                    try:
-                        stock = int(max_stock)
-                    except:
-                        stock = 0
+                stock = parse_int(await stock_input.get_attribute("max"))
 
             # VERIFICAR SI ESTÁ EN OFERTA
             is_offer = False
@@ -611,15 +639,12 @@ class EmasaProductsComponent(ProductsComponent):
             if offer_badge:
                 is_offer = True
 
-            # LOG de debug para ver qué se extrajo
-            self.logger.info(f"   📊 Datos extraídos:")
-            self.logger.info(f"      - Nombre: {name[:50]}...")
-            self.logger.info(f"      - Marca: {brand}")
-            self.logger.info(f"      - Precio: ${price}")
-            self.logger.info(f"      - Imágenes: {len(images)}")
-            self.logger.info(f"      - Compatibilidades: {len(compatibility)}")
-            self.logger.info(f"      - Stock: {stock}")
-            self.logger.info(f"      - Es oferta: {is_offer}")
+            # Resumen de lo extraído (muestreado, ver core.logger)
+            self.item_logger.info(
+                f"   📊 {sku}: {name[:50]} | marca={brand} | precio=${price} | "
+                f"imágenes={len(images)} | compat={len(compatibility)} | "
+                f"stock={stock} | oferta={is_offer}"
+            )
 
             return {
                 "name": name,
@@ -645,128 +670,25 @@ class EmasaProductsComponent(ProductsComponent):
             self.logger.debug(traceback.format_exc())
             return None
 
-    async def _save_products(self, products: List[Dict[str, Any]]) -> int:
+    def _normalize_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Guarda productos en la base de datos
+        Convierte los datos extraídos al formato de columnas de Product
 
-        Args:
-            products: Lista de productos a guardar
-
-        Returns:
-            Número de productos guardados
+        Aplicaciones, características y oferta se guardan en extra_data.
         """
-        from app.models import Importer, Product
-        from sqlalchemy import select
-
-        try:
-            # ✋ Verificar cancelación antes de guardar
-            if await self.is_job_cancelled():
-                self.logger.warning("❌ Importación cancelada por el usuario")
-                await self.db.rollback()
-                return 0
-
-            # Obtener el importador
-            result = await self.db.execute(
-                select(Importer).where(Importer.name == self.importer_name.upper())
-            )
-            importer = result.scalar_one_or_none()
-
-            if not importer:
-                raise Exception(f"Importador {self.importer_name} no encontrado")
-
-            saved_count = 0
-            for product_data in products:
-                try:
-                    # LOG: Ver qué estamos intentando guardar
-                    apps_count = len(product_data.get("applications", []))
-                    self.logger.info(
-                        f"💾 Guardando {product_data['sku']}: {apps_count} aplicaciones"
-                    )
-
-                    # Verificar si el producto ya existe
-                    result = await self.db.execute(
-                        select(Product).where(
-                            Product.sku == product_data["sku"],
-                            Product.importer_id == importer.id,
-                        )
-                    )
-                    existing_product = result.scalar_one_or_none()
-
-                    if existing_product:
-                        # Actualizar producto existente
-                        existing_product.name = product_data["name"]
-                        existing_product.price = product_data["price"]
-                        existing_product.stock = product_data["stock"]
-                        existing_product.url = product_data.get("url", "")
-                        existing_product.image_url = product_data.get("image_url", "")
-                        existing_product.description = product_data.get(
-                            "description", ""
-                        )
-                        existing_product.brand = product_data.get("brand", "")
-                        existing_product.images = product_data.get("images", [])
-
-                        # Guardar aplicaciones/compatibilidades en extra_data
-                        # IMPORTANTE: Crear un nuevo dict para forzar la actualización en SQLAlchemy
-                        extra_data = dict(existing_product.extra_data or {})
-                        extra_data["applications"] = product_data.get(
-                            "applications", []
-                        )
-                        extra_data["characteristics"] = product_data.get(
-                            "characteristics", []
-                        )
-                        extra_data["is_offer"] = product_data.get("is_offer", False)
-                        existing_product.extra_data = extra_data
-
-                        # Marcar explícitamente que extra_data fue modificado
-                        from sqlalchemy.orm.attributes import flag_modified
-
-                        flag_modified(existing_product, "extra_data")
-
-                        self.logger.info(
-                            f"   ✏️ Actualizado (existía): {apps_count} apps en extra_data"
-                        )
-                    else:
-                        # Crear nuevo producto
-                        # Preparar extra_data con aplicaciones/compatibilidades
-                        extra_data = {
-                            "applications": product_data.get("applications", []),
-                            "characteristics": product_data.get("characteristics", []),
-                            "is_offer": product_data.get("is_offer", False),
-                        }
-
-                        product = Product(
-                            name=product_data["name"],
-                            sku=product_data["sku"],
-                            price=product_data["price"],
-                            stock=product_data["stock"],
-                            category_id=product_data["category_id"],
-                            importer_id=importer.id,
-                            url=product_data.get("url", ""),
-                            image_url=product_data.get("image_url", ""),
-                            description=product_data.get("description", ""),
-                            brand=product_data.get("brand", ""),
-                            images=product_data.get("images", []),
-                            extra_data=extra_data,
-                        )
-                        self.db.add(product)
-                        self.logger.info(
-                            f"   ➕ Creado (nuevo): {apps_count} apps en extra_data"
-                        )
-
-                    saved_count += 1
-
-                except Exception as e:
-                    self.logger.error(
-                        f"❌ Error guardando producto {product_data.get('sku')}: {e}"
-                    )
-                    continue
-
-            await self.db.commit()
-            return saved_count
-
-        except Exception as e:
-            self.logger.error(f"❌ Error en _save_products: {e}")
-            import traceback
-
-            self.logger.error(traceback.format_exc())
-            return 0
+        return {
+            "sku": product_data["sku"],
+            "name": product_data["name"],
+            "price": product_data["price"],
+            "stock": product_data["stock"],
+            "url": product_data.get("url", ""),
+            "image_url": product_data.get("image_url", ""),
+            "description": product_data.get("description", ""),
+            "brand": product_data.get("brand", ""),
+            "images": product_data.get("images", []),
+            "extra_data": {
+                "applications": product_data.get("applications", []),
+                "characteristics": product_data.get("characteristics", []),
+                "is_offer": product_data.get("is_offer", False),
+            },
+        }
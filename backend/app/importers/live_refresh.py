@@ -0,0 +1,220 @@
+"""
+Refresh en vivo de SKUs puntuales
+
+Para consultar el precio/stock del proveedor de uno o pocos SKUs sin correr
+un import. La API (POST /products/live-refresh) y el worker se coordinan por
+Redis:
+
+    live:{IMPORTER}:{SKU}           último resultado (JSON, TTL corto)
+    live:{IMPORTER}:{SKU}:inflight  hay un refresh en curso (SET NX)
+
+1. La API responde desde la caché los SKUs refrescados hace poco.
+2. Para el resto toma la marca inflight; solo los SKUs que marcó ella se
+   encolan (las consultas simultáneas del mismo SKU esperan el mismo refresh).
+3. El worker abre el detalle de cada SKU con una sesión ya autenticada,
+   actualiza el producto en la BD y publica el resultado en la caché.
+4. La API espera los resultados como máximo LIVE_REFRESH_WAIT_SECONDS; lo
+   que no llegue se devuelve como "pending".
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import PRODUCTS_SCRAPED
+from app.core.redis import get_redis
+
+# Intervalo de consulta de la caché mientras se espera al worker
+POLL_INTERVAL_SECONDS = 0.25
+
+
+def result_key(importer_name: str, sku: str) -> str:
+    return f"live:{importer_name.upper()}:{sku}"
+
+
+def inflight_key(importer_name: str, sku: str) -> str:
+    return f"{result_key(importer_name, sku)}:inflight"
+
+
+async def get_cached_results(
+    importer_name: str, skus: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    """Resultados vigentes en la caché (sin Redis se devuelve vacío)"""
+    if not skus:
+        return {}
+    try:
+        values = await get_redis().mget(
+            [result_key(importer_name, sku) for sku in skus]
+        )
+    except Exception as e:
+        logger.warning(f"⚠️  Caché de refresh en vivo sin Redis: {e}")
+        return {}
+    return {sku: json.loads(value) for sku, value in zip(skus, values) if value}
+
+
+async def claim_skus(importer_name: str, skus: List[str]) -> List[str]:
+    """
+    Marca como en curso los SKUs que nadie está refrescando
+
+    La marca dura lo mismo que la espera máxima más un margen, por si el
+    worker muere sin publicar.
+
+    Returns:
+        SKUs que este llamador debe encolar
+    """
+    ttl_ms = int((settings.LIVE_REFRESH_WAIT_SECONDS + 30) * 1000)
+    try:
+        client = get_redis()
+        claimed = []
+        for sku in skus:
+            if await client.set(
+                inflight_key(importer_name, sku), "1", nx=True, px=ttl_ms
+            ):
+                claimed.append(sku)
+        return claimed
+    except Exception as e:
+        logger.warning(f"⚠️  Coalescing de refresh en vivo sin Redis: {e}")
+        return list(skus)
+
+
+async def release_claims(importer_name: str, skus: Iterable[str]):
+    """Quita las marcas inflight (ej. si no se pudo encolar la tarea)"""
+    keys = [inflight_key(importer_name, sku) for sku in skus]
+    if not keys:
+        return
+    try:
+        await get_redis().delete(*keys)
+    except Exception as e:
+        logger.warning(f"⚠️  No se pudieron liberar las marcas inflight: {e}")
+
+
+async def publish_result(importer_name: str, sku: str, result: Dict[str, Any]):
+    """Guarda el resultado de un SKU en la caché y libera su marca inflight"""
+    ttl = (
+        settings.LIVE_REFRESH_CACHE_TTL_SECONDS
+        if result.get("status") == "ok"
+        else settings.LIVE_REFRESH_ERROR_TTL_SECONDS
+    )
+    try:
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.set(result_key(importer_name, sku), json.dumps(result), ex=ttl)
+            pipe.delete(inflight_key(importer_name, sku))
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"⚠️  No se pudo publicar el refresh de {sku}: {e}")
+
+
+async def wait_for_results(
+    importer_name: str, skus: List[str], timeout: float
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Espera (como máximo `timeout` segundos) los resultados de `skus`
+
+    Returns:
+        Resultados que llegaron a tiempo
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    while True:
+        missing = [sku for sku in skus if sku not in results]
+        results.update(await get_cached_results(importer_name, missing))
+        if len(results) == len(skus) or loop.time() >= deadline:
+            return results
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def refresh_skus(
+    db: Any, component: Any, importer_id: int, skus: List[str]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Refresca SKUs ya importados desde su página de detalle (lado worker)
+
+    Los detalles se abren en paralelo (hasta fetch_workers pestañas) con el
+    fetch/parse/normalize del componente de productos; luego se guardan con
+    save_products, que actualiza el producto y su historial.
+
+    Args:
+        db: Sesión de base de datos
+        component: ProductsComponent sobre una sesión autenticada
+        importer_id: ID del importador
+        skus: SKUs a refrescar
+
+    Returns:
+        Resultado por SKU (status: ok, not_found o error)
+    """
+    from app.importers.persistence import save_products
+    from app.models import Product
+    from sqlalchemy import select
+    from sqlalchemy.orm import joinedload
+
+    result = await db.execute(
+        select(Product)
+        .options(joinedload(Product.category))
+        .where(Product.importer_id == importer_id, Product.sku.in_(skus))
+    )
+    products = {product.sku: product for product in result.scalars()}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    semaphore = asyncio.Semaphore(
+        component.config.get("fetch_workers") or settings.PIPELINE_FETCH_WORKERS
+    )
+
+    async def scrape(sku: str) -> Optional[Dict[str, Any]]:
+        product = products.get(sku)
+        if product is None or product.category is None:
+            results[sku] = {"sku": sku, "status": "not_found"}
+            return None
+
+        item = component.build_retry_item(product.category, sku, product.url)
+        if item is None:
+            results[sku] = {"sku": sku, "status": "error", "error": "Sin URL"}
+            return None
+
+        async with semaphore:
+            try:
+                fetched = await component._fetch_product_page(item)
+                data = await component._parse_product_page(fetched)
+                if not data:
+                    raise ValueError("El detalle no devolvió datos")
+                return component._normalize_product(data)
+            except Exception as e:
+                results[sku] = {
+                    "sku": sku,
+                    "status": "error",
+                    "error": f"{type(e).__name__}: {e}",
+                }
+                return None
+
+    rows = await asyncio.gather(*(scrape(sku) for sku in skus))
+
+    for sku, row in zip(skus, rows):
+        if row is None:
+            continue
+        product = products[sku]
+        previous = (product.price, product.stock)
+        try:
+            await save_products(db, product.category, [row])
+        except Exception as e:
+            await db.rollback()
+            results[sku] = {"sku": sku, "status": "error", "error": str(e)}
+            continue
+
+        PRODUCTS_SCRAPED.labels(
+            importer=component.importer_name.upper(), mode="live"
+        ).inc()
+        results[sku] = {
+            "sku": sku,
+            "status": "ok",
+            "name": row.get("name"),
+            "price": row.get("price"),
+            "stock": row.get("stock"),
+            "changed": previous != (row.get("price"), row.get("stock")),
+            "refreshed_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    return results
@@ -0,0 +1,308 @@
+"""
+Registro opcional de la red de Playwright durante un job
+
+Con NETWORK_RECORDER_ENABLED, el contexto del navegador del job (el que
+abre el componente de auth) registra los requests de una muestra de sus
+páginas (NETWORK_RECORDER_SAMPLE_RATE): duración, tiempo hasta el primer
+byte, tamaño, tipo de recurso y status. Al terminar el job se escribe un
+reporte en NETWORK_REPORT_DIR/<job_id>.json con los hosts, tipos de
+recurso y recursos más lentos y pesados: es la base para decidir qué
+bloquear (scripts de terceros, imágenes) y qué esperar en cada página.
+
+Igual que el profiler (ver profiling.py), el recorder del job vive en un
+ContextVar y su estado se puede sumar entre chunks de un mismo job.
+"""
+
+import asyncio
+import json
+import os
+import random
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Optional, Set
+from urllib.parse import urlsplit
+
+from app.core.config import settings
+from app.core.logger import logger
+from playwright.async_api import BrowserContext, Page, Request
+
+# Recursos distintos (URL sin query) que se guardan por job
+MAX_RESOURCES = 500
+# Filas por sección del reporte
+REPORT_TOP = 20
+# Espera máxima por las mediciones pendientes al cerrar el job
+DRAIN_TIMEOUT_SECONDS = 5.0
+
+
+def _new_stats() -> Dict[str, Any]:
+    return {
+        "count": 0,
+        "failed": 0,
+        "total_ms": 0.0,
+        "max_ms": 0.0,
+        "ttfb_ms": 0.0,
+        "bytes": 0,
+    }
+
+
+def _add_stats(target: Dict[str, Any], stats: Dict[str, Any]):
+    for key in ("count", "failed", "total_ms", "ttfb_ms", "bytes"):
+        target[key] += stats[key]
+    target["max_ms"] = max(target["max_ms"], stats["max_ms"])
+
+
+def _resource_key(url: str) -> str:
+    """URL sin query ni fragmento (las variantes de un recurso se agrupan)"""
+    parts = urlsplit(url)
+    if parts.scheme == "data":
+        return "data:"
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"[:300]
+
+
+class NetworkRecorder:
+    """Acumula la red de las páginas muestreadas de un contexto"""
+
+    def __init__(self, sample_rate: float):
+        self.sample_rate = sample_rate
+        self.pages_seen = 0
+        self.pages_sampled = 0
+        self.hosts: Dict[str, Dict[str, Any]] = {}
+        self.types: Dict[str, Dict[str, Any]] = {}
+        self.resources: Dict[str, Dict[str, Any]] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    def attach(self, context: BrowserContext):
+        """Muestrea las páginas actuales y futuras del contexto"""
+        context.on("page", self._on_page)
+        for page in context.pages:
+            self._on_page(page)
+
+    def _on_page(self, page: Page):
+        self.pages_seen += 1
+        if random.random() >= self.sample_rate:
+            return
+        self.pages_sampled += 1
+        page.on("requestfinished", self._on_request_finished)
+        page.on("requestfailed", self._on_request_failed)
+
+    def _on_request_finished(self, request: Request):
+        task = asyncio.create_task(self._measure(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _on_request_failed(self, request: Request):
+        timing = request.timing
+        self.record(
+            request.url,
+            request.resource_type,
+            status=None,
+            duration_ms=max(timing.get("responseEnd", -1), 0),
+            ttfb_ms=0.0,
+            size=0,
+            failed=True,
+        )
+
+    async def _measure(self, request: Request):
+        # sizes() y response() consultan al navegador; si la página ya se
+        # cerró el request se registra sin tamaño ni status
+        status = None
+        size = 0
+        try:
+            response = await request.response()
+            status = response.status if response else None
+            sizes = await request.sizes()
+            size = sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        except Exception:
+            pass
+
+        timing = request.timing
+        request_start = timing.get("requestStart", -1)
+        response_start = timing.get("responseStart", -1)
+        ttfb = (
+            response_start - request_start
+            if request_start >= 0 and response_start >= 0
+            else 0.0
+        )
+        self.record(
+            request.url,
+            request.resource_type,
+            status=status,
+            duration_ms=max(timing.get("responseEnd", -1), 0),
+            ttfb_ms=ttfb,
+            size=max(size, 0),
+            failed=status is not None and status >= 400,
+        )
+
+    def record(
+        self,
+        url: str,
+        resource_type: str,
+        status: Optional[int],
+        duration_ms: float,
+        ttfb_ms: float,
+        size: int,
+        failed: bool = False,
+    ):
+        """Suma un request a las estadísticas por host, tipo y recurso"""
+        sample = {
+            "count": 1,
+            "failed": int(failed),
+            "total_ms": duration_ms,
+            "max_ms": duration_ms,
+            "ttfb_ms": ttfb_ms,
+            "bytes": size,
+        }
+        host = urlsplit(url).netloc or "(sin host)"
+        _add_stats(self.hosts.setdefault(host, _new_stats()), sample)
+        _add_stats(self.types.setdefault(resource_type, _new_stats()), sample)
+
+        key = _resource_key(url)
+        resource = self.resources.get(key)
+        if resource is None:
+            if len(self.resources) >= MAX_RESOURCES:
+                return
+            resource = self.resources[key] = {**_new_stats(), "type": resource_type}
+        _add_stats(resource, sample)
+        if status is not None:
+            resource["status"] = status
+
+    async def drain(self):
+        """Espera las mediciones en curso (requests terminados sin tamaño aún)"""
+        if not self._pending:
+            return
+        await asyncio.wait(list(self._pending), timeout=DRAIN_TIMEOUT_SECONDS)
+
+    def state(self) -> Dict[str, Any]:
+        """Estado serializable y sumable (ver merge_states)"""
+        return {
+            "pages_seen": self.pages_seen,
+            "pages_sampled": self.pages_sampled,
+            "hosts": self.hosts,
+            "types": self.types,
+            "resources": self.resources,
+        }
+
+
+current_network_recorder: ContextVar[Optional[NetworkRecorder]] = ContextVar(
+    "current_network_recorder", default=None
+)
+
+
+def new_network_recorder() -> Optional[NetworkRecorder]:
+    """Recorder para un job (None si el registro de red está desactivado)"""
+    if not settings.NETWORK_RECORDER_ENABLED:
+        return None
+    return NetworkRecorder(settings.NETWORK_RECORDER_SAMPLE_RATE)
+
+
+def attach_network_recorder(context: Optional[BrowserContext]):
+    """Registra la red del contexto en el recorder del job en curso (si hay)"""
+    recorder = current_network_recorder.get()
+    if recorder is not None and context is not None:
+        recorder.attach(context)
+
+
+def merge_states(states: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Suma los estados de varios recorders (chunks de un mismo job)"""
+    merged: Dict[str, Any] = {
+        "pages_seen": 0,
+        "pages_sampled": 0,
+        "hosts": {},
+        "types": {},
+        "resources": {},
+    }
+    for state in states:
+        if not state:
+            continue
+        merged["pages_seen"] += state.get("pages_seen", 0)
+        merged["pages_sampled"] += state.get("pages_sampled", 0)
+        for section in ("hosts", "types"):
+            for key, stats in (state.get(section) or {}).items():
+                _add_stats(merged[section].setdefault(key, _new_stats()), stats)
+        for key, stats in (state.get("resources") or {}).items():
+            resource = merged["resources"].get(key)
+            if resource is None:
+                if len(merged["resources"]) >= MAX_RESOURCES:
+                    continue
+                resource = merged["resources"][key] = {
+                    **_new_stats(),
+                    "type": stats.get("type"),
+                }
+            _add_stats(resource, stats)
+            if "status" in stats:
+                resource["status"] = stats["status"]
+    return merged
+
+
+def _rows(section: Dict[str, Dict[str, Any]], order: str, label: str) -> list:
+    rows = []
+    for key, stats in sorted(
+        section.items(), key=lambda item: item[1][order], reverse=True
+    )[:REPORT_TOP]:
+        count = stats["count"] or 1
+        row = {
+            label: key,
+            "count": stats["count"],
+            "failed": stats["failed"],
+            "total_ms": round(stats["total_ms"], 1),
+            "avg_ms": round(stats["total_ms"] / count, 1),
+            "max_ms": round(stats["max_ms"], 1),
+            "avg_ttfb_ms": round(stats["ttfb_ms"] / count, 1),
+            "bytes": stats["bytes"],
+        }
+        for extra in ("type", "status"):
+            if extra in stats:
+                row[extra] = stats[extra]
+        rows.append(row)
+    return rows
+
+
+def build_report(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Reporte agregado de la red de un job
+
+    Returns:
+        {'pages_seen', 'pages_sampled', 'requests', 'failed', 'bytes',
+         'hosts', 'types', 'slowest_resources', 'heaviest_resources'}
+        (hosts y types ordenados por tiempo total)
+    """
+    types = state.get("types", {})
+    resources = state.get("resources", {})
+    return {
+        "pages_seen": state.get("pages_seen", 0),
+        "pages_sampled": state.get("pages_sampled", 0),
+        "requests": sum(stats["count"] for stats in types.values()),
+        "failed": sum(stats["failed"] for stats in types.values()),
+        "bytes": sum(stats["bytes"] for stats in types.values()),
+        "hosts": _rows(state.get("hosts", {}), "total_ms", "host"),
+        "types": _rows(types, "total_ms", "type"),
+        "slowest_resources": _rows(resources, "max_ms", "url"),
+        "heaviest_resources": _rows(resources, "bytes", "url"),
+    }
+
+
+def write_report(job_id: str, state: Dict[str, Any]) -> Optional[str]:
+    """
+    Escribe el reporte del job en NETWORK_REPORT_DIR y loguea los hosts
+    más lentos
+
+    Returns:
+        Ruta del reporte (None si no se registró ningún request)
+    """
+    report = build_report(state)
+    if not report["requests"]:
+        return None
+
+    os.makedirs(settings.NETWORK_REPORT_DIR, exist_ok=True)
+    path = os.path.join(settings.NETWORK_REPORT_DIR, f"{job_id}.json")
+    with open(path, "w", encoding="utf-8") as report_file:
+        json.dump({"job_id": job_id, **report}, report_file, indent=2)
+
+    slowest = ", ".join(
+        f"{row['host']} ({row['total_ms'] / 1000:.1f}s)" for row in report["hosts"][:3]
+    )
+    logger.info(
+        f"🌐 Red del job {job_id}: {report['requests']} requests en "
+        f"{report['pages_sampled']}/{report['pages_seen']} páginas | "
+        f"hosts más lentos: {slowest} | reporte: {path}"
+    )
+    return path
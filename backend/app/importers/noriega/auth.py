@@ -50,7 +50,9 @@ class NoriegaAuthComponent(AuthComponent):
             logger.info("📄 Nueva página creada")
 
             # Navegar a la página de login
-            await page.goto(self.base_url, wait_until="networkidle", timeout=60000)
+            await self.navigate(
+                page, self.base_url, wait_until="networkidle", timeout=60000
+            )
             logger.info(f"✅ Página cargada: {self.base_url}")
 
             # 📸 Screenshot ANTES de completar formulario
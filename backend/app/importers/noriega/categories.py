@@ -2,12 +2,16 @@
 Componente de extracción de categorías para Noriega
 """
 
+import re
 from typing import Any, Dict
 
 from app.importers.base import CategoriesComponent
 from playwright.async_api import Browser, Page
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Slug de categoría: cualquier tramo fuera de [a-z0-9] pasa a ser un guion
+_SLUG_SEPARATORS = re.compile(r"[^a-z0-9]+")
+
 
 class NoriegaCategoriesComponent(CategoriesComponent):
     """
@@ -43,8 +47,8 @@ class NoriegaCategoriesComponent(CategoriesComponent):
             )
 
             self.logger.info(f"🔗 Navegando a página de categorías: {categories_url}")
-            await self.page.goto(
-                categories_url, wait_until="networkidle", timeout=60000
+            await self.navigate(
+                self.page, categories_url, wait_until="networkidle", timeout=60000
             )
             self.logger.info("✅ Página de categorías cargada")
 
@@ -220,9 +224,7 @@ class NoriegaCategoriesComponent(CategoriesComponent):
 
                 try:
                     # Crear slug del nombre
-                    import re
-
-                    slug = re.sub(r"[^a-z0-9]+", "-", cat_data["name"].lower()).strip(
+                    slug = _SLUG_SEPARATORS.sub("-", cat_data["name"].lower()).strip(
                         "-"
                     )
 
@@ -2,12 +2,21 @@
 Componente de extracción de productos para Noriega
 """
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+import urllib.parse
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.importers.base import ProductsComponent
+from app.importers.parsing import parse_price, parse_result_count
+from app.importers.persistence import PRODUCT_FIELDS
+from app.importers.profiling import profile_span, record_span
 from playwright.async_api import Browser, Page
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import func
+
+NORIEGA_DETAIL_URL = (
+    "https://ecommerce.noriegavanzulli.cl/b2b/producto.jsp?codigo={sku}&ref=resultado_medida"
+)
 
 
 class NoriegaProductsComponent(ProductsComponent):
@@ -60,38 +69,6 @@ class NoriegaProductsComponent(ProductsComponent):
             self.logger.info(f"   - Límite por categoría: SIN LÍMITE (scrapeará todos)")
         self.logger.info(f"   - Velocidad: {self.scraping_speed_ms}ms entre productos")
 
-    async def _update_job_result(self, result_data: Dict[str, Any]):
-        """
-        Actualiza el campo result del job con información detallada
-
-        Args:
-            result_data: Diccionario con datos actualizados
-        """
-        from app.models import ImportJob
-        from sqlalchemy import select, update
-
-        try:
-            # Obtener job actual
-            stmt = select(ImportJob).where(ImportJob.job_id == self.job_id)
-            result = await self.db.execute(stmt)
-            job = result.scalar_one_or_none()
-
-            if job:
-                # Merge con el result existente
-                current_result = job.result or {}
-                updated_result = {**current_result, **result_data}
-
-                # Actualizar
-                update_stmt = (
-                    update(ImportJob)
-                    .where(ImportJob.job_id == self.job_id)
-                    .values(result=updated_result)
-                )
-                await self.db.execute(update_stmt)
-                await self.db.commit()
-        except Exception as e:
-            self.logger.error(f"Error actualizando job result: {e}")
-
     async def execute(self) -> Dict[str, Any]:
         """
         Extrae productos de las categorías seleccionadas
@@ -217,8 +194,12 @@ class NoriegaProductsComponent(ProductsComponent):
                             "categories_processed": processed_categories,
                         }
 
-                    await self.page.goto(
-                        category_url, wait_until="networkidle", timeout=60000
+                    await self.navigate(
+                        self.page,
+                        category_url,
+                        phase="listing",
+                        wait_until="networkidle",
+                        timeout=60000,
                     )
                     self.logger.info("✅ Página de productos cargada")
 
@@ -239,24 +220,36 @@ class NoriegaProductsComponent(ProductsComponent):
                         category.product_count = product_count
                         await self.db.commit()
 
-                    # 📦 EXTRAER PRODUCTOS DE LA PÁGINA
-                    category_products = await self._extract_products_from_page(
+                    # 📦 EXTRAER Y GUARDAR PRODUCTOS (pipeline por lotes)
+                    pipeline_result = await self._extract_products_from_page(
                         category, category_name
                     )
+                    saved_count = pipeline_result.get("saved", 0)
+                    total_products += saved_count
+                    await self.flush_seen_skus(category)
+
+                    if pipeline_result.get("cancelled"):
+                        self.logger.warning("❌ Importación cancelada por el usuario")
+                        return {
+                            "success": False,
+                            "error": "Importación cancelada por el usuario",
+                            "products": [],
+                            "total": total_products,
+                            "categories_processed": processed_categories,
+                        }
+
+                    # Actualizar contador de productos en la categoría
+                    category.product_count = saved_count
+                    await self.db.commit()
 
                     self.logger.info("")
                     self.logger.info(
-                        f"✅ Productos extraídos: {len(category_products)}"
+                        f"✅ Productos guardados: {saved_count} "
+                        f"({pipeline_result.get('items', 0)} del listado, "
+                        f"{pipeline_result.get('errors', 0)} errores)"
                     )
                     self.logger.info("")
 
-                    # � GUARDAR PRODUCTOS EN LA BASE DE DATOS
-                    saved_count = await self._save_products(category_products, category)
-                    total_products += saved_count
-
-                    self.logger.info(f"✅ Productos guardados: {saved_count}")
-                    self.logger.info("")
-
                     processed_categories += 1
 
                     # Actualizar progreso
@@ -274,6 +267,9 @@ class NoriegaProductsComponent(ProductsComponent):
                     )
                     continue
 
+            # 🧹 Productos que desaparecieron del listado
+            marked_unavailable = await self.run_availability_sweep(importer.id)
+
             await self.update_progress(
                 f"Extracción completada: {processed_categories} categorías procesadas",
                 100,
@@ -284,6 +280,9 @@ class NoriegaProductsComponent(ProductsComponent):
                 "products": [],
                 "total": total_products,
                 "categories_processed": processed_categories,
+                "changes": self.change_summary,
+                "marked_unavailable": marked_unavailable,
+                "failed_items": self.failed_item_count,
                 "message": f"Se procesaron {processed_categories} categorías. Navegador listo para inspección.",
             }
 
@@ -307,8 +306,6 @@ class NoriegaProductsComponent(ProductsComponent):
         Returns:
             URL completa para navegar a la lista de productos
         """
-        import urllib.parse
-
         base_url = "https://ecommerce.noriegavanzulli.cl/b2b/"
 
         # Determinar tipo de categoría basándose en la URL original
@@ -354,15 +351,11 @@ class NoriegaProductsComponent(ProductsComponent):
             if len(count_elements) >= 2:
                 # El segundo elemento contiene el número de resultados
                 count_text = await count_elements[1].text_content()
-                count_text = count_text.strip()
 
                 # Extraer el número del texto "236 resultados"
-                import re
-
-                match = re.search(r"(\d+)\s*resultados?", count_text, re.IGNORECASE)
+                product_count = parse_result_count(count_text)
 
-                if match:
-                    product_count = int(match.group(1))
+                if product_count is not None:
                     self.logger.info(
                         f"   📊 Conteo extraído: {product_count} productos"
                     )
@@ -377,27 +370,23 @@ class NoriegaProductsComponent(ProductsComponent):
 
     async def _extract_products_from_page(
         self, category: Any, category_name: str
-    ) -> List[Dict[str, Any]]:
+    ) -> Dict[str, Any]:
         """
-        Extrae productos de la página actual
+        Extrae y guarda los productos de la página actual
 
         Estrategia:
         1. Obtener lista de SKUs de la tabla principal
-        2. Por cada SKU, navegar a la página de detalle
-        3. Extraer datos completos (nombre, descripción, marca, origen, precio, stock, imágenes, OEM, aplicaciones)
-        4. Respetar límites y velocidad
+        2. Pasar los SKUs por el pipeline: fetch (detalle en pestaña propia)
+           → parse → normalize → sink por lotes
+        3. Respetar límites y velocidad
 
         Args:
             category: Objeto Category de la BD
             category_name: Nombre de la categoría
 
         Returns:
-            Lista de productos extraídos
+            Resultado de run_category_pipeline
         """
-        import asyncio
-
-        products = []
-
         try:
             self.logger.info("🔍 Extrayendo lista de productos de la categoría...")
 
@@ -407,24 +396,31 @@ class NoriegaProductsComponent(ProductsComponent):
                 "sku_link": "td.n_noriega a",  # Link con el SKU
             }
 
-            # Esperar a que cargue la tabla
-            await self.page.wait_for_selector(
-                SELECTORS["product_row"], state="visible", timeout=10000
-            )
+            with profile_span("listing"):
+                # Esperar a que cargue la tabla
+                await self.page.wait_for_selector(
+                    SELECTORS["product_row"], state="visible", timeout=10000
+                )
 
-            # Obtener todos los SKUs de la página
-            product_rows = await self.page.query_selector_all(SELECTORS["product_row"])
+                # Obtener todos los SKUs de la página
+                product_rows = await self.page.query_selector_all(
+                    SELECTORS["product_row"]
+                )
 
-            skus = []
-            for row in product_rows:
-                sku_elem = await row.query_selector(SELECTORS["sku_link"])
-                if sku_elem:
-                    sku = (await sku_elem.text_content()).strip()
-                    if sku:
-                        skus.append(sku)
+                skus = []
+                for row in product_rows:
+                    sku_elem = await row.query_selector(SELECTORS["sku_link"])
+                    if sku_elem:
+                        sku = (await sku_elem.text_content()).strip()
+                        if sku:
+                            skus.append(sku)
 
             self.logger.info(f"📋 SKUs encontrados en la categoría: {len(skus)}")
 
+            # El listado es una sola tabla: todos los SKUs de la categoría
+            self.mark_skus_seen(category.id, skus)
+            self.mark_category_complete(category.id)
+
             # Determinar cuántos productos procesar
             if self.products_per_category is None:
                 # Sin límite: scrapear todos
@@ -440,95 +436,119 @@ class NoriegaProductsComponent(ProductsComponent):
                 )
             self.logger.info("")
 
-            # 🔄 PROCESAR CADA PRODUCTO INDIVIDUALMENTE
-            for index, sku in enumerate(skus[:max_products], 1):
-                try:
-                    # ✋ Verificar cancelación antes de procesar cada producto
-                    if await self.is_job_cancelled():
-                        self.logger.warning("❌ Importación cancelada por el usuario")
-                        return products  # Retornar productos extraídos hasta ahora
-
-                    self.logger.info(f"📦 Producto {index}/{max_products}: SKU {sku}")
-
-                    # Actualizar progreso en tiempo real
-                    # Progreso: 20% al inicio, 90% al final de extracción
-                    current_progress = 20 + int((index / max_products) * 70)
-
-                    # Actualizar job result con información detallada
-                    await self._update_job_result(
-                        {
-                            "total_items": max_products,
-                            "processed_items": len(products),
-                            "current_item": index,
-                            "current_sku": sku,
-                            "category": category_name,
-                        }
-                    )
+            async def source():
+                for sku in skus[:max_products]:
+                    yield sku
+
+            result = await self.run_category_pipeline(
+                category,
+                source(),
+                fetch=self._fetch_product_page,
+                parse=self._parse_product_page,
+                normalize=self._normalize_product,
+                total_items=max_products,
+            )
 
-                    # Actualizar progreso
-                    await self.update_progress(
-                        f"Extrayendo producto {index}/{max_products} (SKU: {sku})",
-                        current_progress,
-                    )
+            self.logger.info(
+                f"✅ Extracción completada: {result['saved']} productos procesados"
+            )
+            return result
 
-                    # Construir URL de detalle
-                    detail_url = f"https://ecommerce.noriegavanzulli.cl/b2b/producto.jsp?codigo={sku}&ref=resultado_medida"
+        except Exception as e:
+            self.logger.error(f"❌ Error extrayendo productos de la página: {e}")
+            return {"saved": 0, "items": 0, "errors": 1, "cancelled": False}
 
-                    # Navegar a la página de detalle
-                    self.logger.info(f"   🔗 Navegando a: {detail_url}")
-                    await self.page.goto(
-                        detail_url, wait_until="networkidle", timeout=30000
-                    )
+    async def list_category_prices(self, category: Any) -> List[Dict[str, Any]]:
+        """
+        Precio y stock de todos los SKUs del listado de una categoría
 
-                    # Extraer datos completos del producto
-                    product_data = await self._extract_product_detail(sku)
+        El listado de Noriega es una sola tabla, así que basta una navegación
+        por categoría (sin límite por categoría: no se abren detalles).
+        """
+        category_url = self._build_category_url(category.name, category)
+        await self.navigate(
+            self.page,
+            category_url,
+            phase="listing",
+            wait_until="networkidle",
+            timeout=60000,
+        )
 
-                    if product_data:
-                        products.append(product_data)
-                        self.logger.info(
-                            f"   ✅ Extraído: {product_data.get('name', 'Sin nombre')[:50]}"
-                        )
-                    else:
-                        self.logger.warning(
-                            f"   ⚠️  No se pudieron extraer datos del producto"
-                        )
+        with profile_span("listing"):
+            await self.page.wait_for_selector(
+                "table tbody tr", state="visible", timeout=10000
+            )
 
-                    # ⏹️ DETENER SI ALCANZAMOS EL LÍMITE
-                    if (
-                        self.products_per_category
-                        and len(products) >= self.products_per_category
-                    ):
-                        self.logger.info("")
-                        self.logger.info(
-                            f"🛑 LÍMITE ALCANZADO: {len(products)}/{self.products_per_category} productos"
-                        )
-                        self.logger.info("⏹️  Deteniendo scraping de esta categoría")
-                        break
+            columns = await self.read_listing_columns(self.page, "table thead th")
 
-                    # Respetar velocidad de scraping
-                    if index < max_products:
-                        delay = self.scraping_speed_ms / 1000
-                        self.logger.info(
-                            f"   ⏳ Esperando {delay}s antes del siguiente producto..."
-                        )
-                        await asyncio.sleep(delay)
+            entries = []
+            for row in await self.page.query_selector_all("table tbody tr"):
+                sku_elem = await row.query_selector("td.n_noriega a")
+                if not sku_elem:
+                    continue
+                sku = (await sku_elem.text_content()).strip()
+                if sku:
+                    cells = await row.query_selector_all("td")
+                    entries.append(await self.read_listing_entry(sku, cells, columns))
 
-                    self.logger.info("")
+        self.logger.info(f"📋 {category.name}: {len(entries)} SKUs en el listado")
+        return entries
 
-                except Exception as e:
-                    self.logger.error(f"   ❌ Error procesando SKU {sku}: {e}")
-                    continue
+    def build_retry_item(self, category: Any, sku: str, url: Optional[str]) -> str:
+        """La fuente del pipeline de Noriega entrega SKUs sueltos"""
+        return sku
 
-            self.logger.info(
-                f"✅ Extracción completada: {len(products)} productos procesados"
+    async def _fetch_product_page(self, sku: str) -> Tuple[str, str, Page]:
+        """
+        Abre la página de detalle de un SKU en una pestaña nueva
+
+        La pestaña la cierra _parse_product_page; el listado queda intacto
+        en self.page.
+        """
+        detail_url = NORIEGA_DETAIL_URL.format(sku=sku)
+        self.item_logger.info(f"📦 SKU {sku} → {detail_url}")
+
+        detail_page = await self.page.context.new_page()
+        try:
+            await self.navigate(
+                detail_page, detail_url, wait_until="networkidle", timeout=30000
             )
+        except Exception:
+            await detail_page.close()
+            raise
 
-        except Exception as e:
-            self.logger.error(f"❌ Error extrayendo productos de la página: {e}")
+        return sku, detail_url, detail_page
+
+    async def _parse_product_page(
+        self, fetched: Tuple[str, str, Page]
+    ) -> Optional[Dict[str, Any]]:
+        """Extrae el producto de la pestaña de detalle y la cierra"""
+        sku, detail_url, detail_page = fetched
+        try:
+            with profile_span("extraction", sku=sku):
+                product_data = await self._extract_product_detail(detail_page, sku)
+        finally:
+            await detail_page.close()
+
+        if not product_data:
+            self.logger.warning(f"   ⚠️  No se pudieron extraer datos del SKU {sku}")
+            return None
+
+        product_data["url"] = detail_url
+        self.item_logger.info(
+            f"   ✅ Extraído: {product_data.get('name', 'Sin nombre')[:50]}"
+        )
+        return product_data
 
-        return products
+    def _normalize_product(self, product_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Deja solo las columnas de Product (el detalle ya usa sus nombres)
+        """
+        return {key: product_data[key] for key in PRODUCT_FIELDS if key in product_data}
 
-    async def _extract_product_detail(self, sku: str) -> Optional[Dict[str, Any]]:
+    async def _extract_product_detail(
+        self, page: Page, sku: str
+    ) -> Optional[Dict[str, Any]]:
         """
         Extrae los datos completos de un producto desde su página de detalle
 
@@ -546,6 +566,7 @@ class NoriegaProductsComponent(ProductsComponent):
         - Aplicaciones: table.tablaAA > tbody > tr.contenidoAA
 
         Args:
+            page: Pestaña con la página de detalle cargada
             sku: SKU del producto
 
         Returns:
@@ -556,20 +577,20 @@ class NoriegaProductsComponent(ProductsComponent):
 
             # === NOMBRE DEL PRODUCTO ===
             try:
-                name_elem = await self.page.query_selector("#titulo")
+                name_elem = await page.query_selector("#titulo")
                 if name_elem:
                     product_data["name"] = (await name_elem.text_content()).strip()
-                    self.logger.info(f"      ✓ Nombre: {product_data['name'][:40]}...")
+                    self.item_logger.info(f"      ✓ Nombre: {product_data['name'][:40]}...")
             except Exception as e:
                 self.logger.warning(f"      ⚠️  No se pudo extraer nombre: {e}")
 
             # === DESCRIPCIÓN ===
             try:
-                desc_elem = await self.page.query_selector("#producto_descripcion")
+                desc_elem = await page.query_selector("#producto_descripcion")
                 if desc_elem:
                     desc_text = (await desc_elem.text_content()).strip()
                     product_data["description"] = desc_text.replace("\xa0", " ")
-                    self.logger.info(
+                    self.item_logger.info(
                         f"      ✓ Descripción: {len(desc_text)} caracteres"
                     )
             except Exception as e:
@@ -577,21 +598,21 @@ class NoriegaProductsComponent(ProductsComponent):
 
             # === MARCA ===
             try:
-                brand_elem = await self.page.query_selector("#marca")
+                brand_elem = await page.query_selector("#marca")
                 if brand_elem:
                     product_data["brand"] = (await brand_elem.text_content()).strip()
-                    self.logger.info(f"      ✓ Marca: {product_data['brand']}")
+                    self.item_logger.info(f"      ✓ Marca: {product_data['brand']}")
             except Exception as e:
                 self.logger.warning(f"      ⚠️  No se pudo extraer marca: {e}")
 
             # === ORIGEN ===
             try:
-                origin_elem = await self.page.query_selector("#origen")
+                origin_elem = await page.query_selector("#origen")
                 if origin_elem:
                     product_data["extra_data"]["origin"] = (
                         await origin_elem.text_content()
                     ).strip()
-                    self.logger.info(
+                    self.item_logger.info(
                         f"      ✓ Origen: {product_data['extra_data']['origin']}"
                     )
             except Exception as e:
@@ -599,13 +620,13 @@ class NoriegaProductsComponent(ProductsComponent):
 
             # === PRECIO ===
             try:
-                price_container = await self.page.query_selector("#precio_lista")
+                price_container = await page.query_selector("#precio_lista")
                 if price_container:
                     price_elem = await price_container.query_selector(".valor")
                     if price_elem:
                         price_text = (await price_elem.text_content()).strip()
-                        product_data["price"] = self._parse_price(price_text)
-                        self.logger.info(
+                        product_data["price"] = parse_price(price_text)
+                        self.item_logger.info(
                             f"      ✓ Precio: {product_data.get('price', 'N/A')}"
                         )
             except Exception as e:
@@ -613,7 +634,7 @@ class NoriegaProductsComponent(ProductsComponent):
 
             # === STOCK ===
             try:
-                stock_container = await self.page.query_selector("#precio_descuento")
+                stock_container = await page.query_selector("#precio_descuento")
                 if stock_container:
                     stock_elem = await stock_container.query_selector(".texto")
                     if stock_elem:
@@ -621,20 +642,20 @@ class NoriegaProductsComponent(ProductsComponent):
                         # "Disponible" = 999, "Agotado" = 0
                         if "disponible" in stock_text.lower():
                             product_data["stock"] = 999
-                            self.logger.info(f"      ✓ Stock: Disponible (999)")
+                            self.item_logger.info(f"      ✓ Stock: Disponible (999)")
                         elif "agotado" in stock_text.lower():
                             product_data["stock"] = 0
-                            self.logger.info(f"      ✓ Stock: Agotado (0)")
+                            self.item_logger.info(f"      ✓ Stock: Agotado (0)")
                         else:
                             product_data["stock"] = 0
-                            self.logger.info(f"      ✓ Stock: {stock_text} → 0")
+                            self.item_logger.info(f"      ✓ Stock: {stock_text} → 0")
             except Exception as e:
                 self.logger.warning(f"      ⚠️  No se pudo extraer stock: {e}")
 
             # === IMÁGENES ===
             images = []
             try:
-                fotos_container = await self.page.query_selector("#fotos")
+                fotos_container = await page.query_selector("#fotos")
                 if fotos_container:
                     img_elements = await fotos_container.query_selector_all("img")
                     for img in img_elements:
@@ -653,7 +674,7 @@ class NoriegaProductsComponent(ProductsComponent):
                         0
                     ]  # Primera imagen como principal
                     product_data["images"] = images  # Todas las imágenes en array
-                    self.logger.info(f"      ✓ Imágenes: {len(images)} encontradas")
+                    self.item_logger.info(f"      ✓ Imágenes: {len(images)} encontradas")
             except Exception as e:
                 self.logger.warning(f"      ⚠️  No se pudieron extraer imágenes: {e}")
 
@@ -661,14 +682,14 @@ class NoriegaProductsComponent(ProductsComponent):
             oem_codes = []
             try:
                 # Extraer de numero_original
-                num_original = await self.page.query_selector("#numero_original")
+                num_original = await page.query_selector("#numero_original")
                 if num_original:
                     original_text = (await num_original.text_content()).strip()
                     if original_text:
                         oem_codes.append(original_text)
 
                 # Extraer de numero_fabrica
-                num_fabrica = await self.page.query_selector("#numero_fabrica")
+                num_fabrica = await page.query_selector("#numero_fabrica")
                 if num_fabrica:
                     fabrica_text = (await num_fabrica.text_content()).strip()
                     if fabrica_text and fabrica_text not in oem_codes:
@@ -676,30 +697,29 @@ class NoriegaProductsComponent(ProductsComponent):
 
                 if oem_codes:
                     product_data["extra_data"]["oem"] = oem_codes
-                    self.logger.info(
+                    self.item_logger.info(
                         f"      ✓ OEM: {len(oem_codes)} códigos - {oem_codes}"
                     )
             except Exception as e:
                 self.logger.warning(f"      ⚠️  No se pudieron extraer códigos OEM: {e}")
 
             # === APLICACIONES (COMPATIBILIDAD DE VEHÍCULOS) ===
+            applications_started = time.perf_counter()
             try:
-                import asyncio
-
                 # CLAVE: Las aplicaciones están en un TabbedPanel que se carga con JavaScript
                 # Necesitamos hacer click en el tab "VER APLICACIÓN" primero
                 try:
                     # Buscar el tab de aplicaciones por su texto
-                    app_tab = await self.page.query_selector(
+                    app_tab = await page.query_selector(
                         'li.TabbedPanelsTab:has-text("VER APLICACIÓN")'
                     )
                     if app_tab:
                         await app_tab.click()
-                        self.logger.info(f"      🔍 Click en tab 'VER APLICACIÓN'")
+                        self.item_logger.info(f"      🔍 Click en tab 'VER APLICACIÓN'")
                         # Esperar a que se cargue el contenido del tab
                         await asyncio.sleep(1.2)
                     else:
-                        self.logger.info(
+                        self.item_logger.info(
                             f"      ℹ️  No se encontró el tab de aplicaciones"
                         )
                 except Exception as e:
@@ -710,16 +730,16 @@ class NoriegaProductsComponent(ProductsComponent):
                 # 2. <div class="contenido_tabla"> con las filas de datos
                 # Debemos buscar las filas directamente en toda la página
 
-                self.logger.info(f"      🔍 Buscando filas de aplicaciones...")
+                self.item_logger.info(f"      🔍 Buscando filas de aplicaciones...")
 
                 # Buscar TODAS las filas con clase contenidoAA en la página
-                app_rows = await self.page.query_selector_all("tr.contenidoAA")
-                self.logger.info(
+                app_rows = await page.query_selector_all("tr.contenidoAA")
+                self.item_logger.info(
                     f"      🔍 Filas encontradas con 'tr.contenidoAA': {len(app_rows)}"
                 )
 
                 if not app_rows:
-                    self.logger.info(
+                    self.item_logger.info(
                         f"      ℹ️  No se encontraron aplicaciones para este producto"
                     )
                 else:
@@ -770,11 +790,11 @@ class NoriegaProductsComponent(ProductsComponent):
 
                     if applications:
                         product_data["extra_data"]["applications"] = applications
-                        self.logger.info(
+                        self.item_logger.info(
                             f"      ✓ Aplicaciones: {len(applications)} vehículos"
                         )
                     else:
-                        self.logger.info(
+                        self.item_logger.info(
                             f"      ℹ️  No se encontraron aplicaciones válidas"
                         )
 
@@ -782,12 +802,15 @@ class NoriegaProductsComponent(ProductsComponent):
                 self.logger.warning(
                     f"      ⚠️  No se pudieron extraer aplicaciones: {e}"
                 )
+            record_span(
+                "applications", time.perf_counter() - applications_started, sku=sku
+            )
 
             # === SCREENSHOT DE LA PÁGINA DE DETALLE ===
             try:
                 screenshot_path = f"/tmp/noriega_product_{sku}.png"
-                await self.page.screenshot(path=screenshot_path)
-                self.logger.info(f"      📸 Screenshot guardado: {screenshot_path}")
+                await page.screenshot(path=screenshot_path)
+                self.item_logger.info(f"      📸 Screenshot guardado: {screenshot_path}")
             except Exception as e:
                 self.logger.warning(f"      ⚠️  No se pudo tomar screenshot: {e}")
 
@@ -801,191 +824,3 @@ class NoriegaProductsComponent(ProductsComponent):
         except Exception as e:
             self.logger.error(f"      ❌ Error extrayendo detalle del producto: {e}")
             return None
-
-    def _parse_price(self, price_text: str) -> Optional[float]:
-        """
-        Convierte texto de precio a float
-
-        Noriega usa punto como separador de miles, sin símbolo $
-        Ejemplos:
-        - "17.920" -> 17920.0
-        - "1.234.567" -> 1234567.0
-        - "12990" -> 12990.0
-        """
-        try:
-            if not price_text:
-                return None
-
-            # Remover espacios
-            cleaned = price_text.strip()
-
-            # Si tiene puntos, removerlos (son separadores de miles)
-            if "." in cleaned:
-                cleaned = cleaned.replace(".", "")
-
-            # Remover cualquier símbolo de moneda si existe
-            cleaned = cleaned.replace("$", "").replace("CLP", "").strip()
-
-            # Convertir a float
-            return float(cleaned) if cleaned else None
-
-        except (ValueError, AttributeError):
-            return None
-
-    def _parse_stock(self, stock_text: str) -> Optional[int]:
-        """
-        Convierte texto de stock a entero
-
-        Noriega muestra:
-        - "X" = Tiene stock (cantidad desconocida)
-        - "Oct-2025" = Disponible en fecha futura
-        - "" (vacío) = Sin stock
-
-        Ejemplos:
-        - "X" -> 1 (disponible)
-        - "Oct-2025" -> 0 (no disponible ahora, llega después)
-        - "" -> 0 (sin stock)
-        """
-        try:
-            if not stock_text:
-                return 0
-
-            stock_text = stock_text.strip().upper()
-
-            # Si es "X" significa que hay stock
-            if stock_text == "X":
-                return 1  # Disponible, cantidad desconocida
-
-            # Si contiene un guión o es una fecha, no está disponible ahora
-            if "-" in stock_text or any(
-                month in stock_text.upper()
-                for month in [
-                    "JAN",
-                    "FEB",
-                    "MAR",
-                    "APR",
-                    "MAY",
-                    "JUN",
-                    "JUL",
-                    "AUG",
-                    "SEP",
-                    "OCT",
-                    "NOV",
-                    "DEC",
-                    "ENE",
-                    "FEB",
-                    "MAR",
-                    "ABR",
-                    "MAY",
-                    "JUN",
-                    "JUL",
-                    "AGO",
-                    "SEP",
-                    "OCT",
-                    "NOV",
-                    "DIC",
-                ]
-            ):
-                return 0  # Llegará en el futuro
-
-            # Intentar extraer número si lo hay
-            import re
-
-            numbers = re.findall(r"\d+", stock_text)
-            if numbers:
-                return int(numbers[0])
-
-            return 0
-
-        except (ValueError, AttributeError):
-            return 0
-
-    async def _save_products(
-        self, products: List[Dict[str, Any]], category: Any
-    ) -> int:
-        """
-        Guarda productos en la base de datos
-
-        Args:
-            products: Lista de diccionarios con datos de productos
-            category: Categoría a la que pertenecen
-
-        Returns:
-            Número de productos guardados
-        """
-        from app.models import Product
-        from sqlalchemy import select
-
-        saved_count = 0
-
-        try:
-            # ✋ Verificar cancelación antes de guardar
-            if await self.is_job_cancelled():
-                self.logger.warning("❌ Importación cancelada por el usuario")
-                await self.db.rollback()
-                return 0
-
-            self.logger.info(f"💾 Guardando {len(products)} productos en BD...")
-
-            for product_data in products:
-                try:
-                    # Verificar si el producto ya existe (por SKU)
-                    result = await self.db.execute(
-                        select(Product).where(
-                            Product.importer_id == category.importer_id,
-                            Product.sku == product_data["sku"],
-                        )
-                    )
-                    existing_product = result.scalar_one_or_none()
-
-                    if existing_product:
-                        # Actualizar producto existente
-                        for key, value in product_data.items():
-                            if hasattr(existing_product, key):
-                                setattr(existing_product, key, value)
-                        existing_product.last_scraped_at = func.now()
-                        self.logger.info(
-                            f"   ✓ Actualizado: {product_data.get('name', '')[:40]}"
-                        )
-                    else:
-                        # Crear nuevo producto
-                        new_product = Product(
-                            importer_id=category.importer_id,
-                            category_id=category.id,
-                            sku=product_data.get("sku"),
-                            name=product_data.get("name"),
-                            description=product_data.get("description"),
-                            price=product_data.get("price"),
-                            stock=product_data.get("stock"),
-                            brand=product_data.get("brand"),
-                            image_url=product_data.get("image_url"),
-                            images=product_data.get("images"),  # Array de imágenes
-                            extra_data=product_data.get("extra_data"),
-                            available=True,
-                            last_scraped_at=func.now(),
-                        )
-                        self.db.add(new_product)
-                        self.logger.info(
-                            f"   ✓ Nuevo: {product_data.get('name', '')[:40]}"
-                        )
-
-                    saved_count += 1
-
-                except Exception as e:
-                    self.logger.warning(f"   ⚠️  Error guardando producto: {e}")
-                    continue
-
-            # Commit de todos los productos
-            await self.db.commit()
-
-            # Actualizar contador de productos en la categoría
-            category.product_count = saved_count
-            await self.db.commit()
-
-            self.logger.info(f"✅ {saved_count} productos guardados exitosamente")
-
-        except Exception as e:
-            await self.db.rollback()
-            self.logger.error(f"❌ Error guardando productos: {e}")
-
-        return saved_count
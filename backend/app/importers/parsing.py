@@ -0,0 +1,163 @@
+"""
+Helpers de parseo compartidos por los componentes de productos
+
+Las expresiones regulares se compilan una sola vez a nivel de módulo.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+_NON_DIGITS = re.compile(r"[^\d]")
+_DIGITS = re.compile(r"\d+")
+_YEAR_RANGE = re.compile(r"(\d{4})\s*-\s*(\d{4}|--)")
+_RESULT_COUNT = re.compile(r"(\d+)\s*resultados?", re.IGNORECASE)
+_TOTAL_RECORDS = re.compile(r"de un total de (\d+) registros")
+_SLUG_INVALID = re.compile(r"[^a-zA-Z0-9\-\s]")
+_SLUG_SPACES = re.compile(r"\s+")
+
+# Encabezados (en mayúsculas) de las columnas de precio y stock en los listados
+_LISTING_HEADERS = {
+    "price": ("PRECIO", "VALOR"),
+    "stock": ("STOCK", "DISPONIB", "EXISTENCIA"),
+}
+
+# Abreviaturas de meses (inglés y español) que indican stock futuro
+_MONTHS = frozenset(
+    "JAN FEB MAR APR MAY JUN JUL AUG SEP OCT NOV DEC ENE ABR AGO DIC".split()
+)
+
+
+def parse_price(price_text: Optional[str]) -> Optional[float]:
+    """
+    Convierte texto de precio CLP a float
+
+    Los proveedores usan punto como separador de miles y sin decimales:
+    - "17.920" -> 17920.0
+    - "$37.604" -> 37604.0
+    - "" -> None
+    """
+    if not price_text:
+        return None
+    cleaned = _NON_DIGITS.sub("", price_text)
+    return float(cleaned) if cleaned else None
+
+
+def parse_int(value: Optional[str], default: int = 0) -> int:
+    """Convierte texto a entero, devolviendo `default` si no es numérico"""
+    try:
+        return int(value.strip()) if value else default
+    except (ValueError, AttributeError):
+        return default
+
+
+def parse_stock(stock_text: Optional[str]) -> int:
+    """
+    Convierte texto de stock a entero
+
+    - "X" -> 1 (disponible, cantidad desconocida)
+    - "Oct-2025" -> 0 (llega en una fecha futura)
+    - "12" -> 12
+    - "" -> 0
+    """
+    if not stock_text:
+        return 0
+
+    stock_text = stock_text.strip().upper()
+    if stock_text == "X":
+        return 1
+    if "-" in stock_text or any(month in stock_text for month in _MONTHS):
+        return 0
+
+    match = _DIGITS.search(stock_text)
+    return int(match.group()) if match else 0
+
+
+def parse_stock_label(stock_text: Optional[str]) -> int:
+    """
+    Convierte el stock de una celda de listado a entero
+
+    Además de lo que acepta parse_stock, entiende las etiquetas de
+    disponibilidad (mismo criterio que el detalle de Noriega):
+    - "Disponible" -> 999
+    - "Agotado" / "Sin stock" -> 0
+    """
+    label = (stock_text or "").strip().upper()
+    if "AGOTADO" in label or "SIN STOCK" in label:
+        return 0
+    if "DISPONIBLE" in label:
+        return 999
+    return parse_stock(stock_text)
+
+
+def find_listing_columns(headers: List[str]) -> Dict[str, Optional[int]]:
+    """
+    Ubica las columnas de precio y stock de un listado por su encabezado
+
+    Si hay varias columnas de precio se prefiere la que incluye IVA (es el
+    precio que se guarda desde el detalle); si no, la última.
+
+    Returns:
+        {'price': índice o None, 'stock': índice o None}
+    """
+    normalized = [(header or "").strip().upper() for header in headers]
+    columns: Dict[str, Optional[int]] = {}
+
+    for field, keywords in _LISTING_HEADERS.items():
+        matches = [
+            index
+            for index, header in enumerate(normalized)
+            if any(keyword in header for keyword in keywords)
+        ]
+        if field == "price":
+            with_tax = [
+                index
+                for index in matches
+                if "IVA" in normalized[index] and "SIN IVA" not in normalized[index]
+            ]
+            matches = with_tax or matches
+        columns[field] = matches[-1] if matches else None
+
+    return columns
+
+
+def parse_year_range(text: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Extrae año de inicio y término de un rango "2010 - 2015" / "2010 - --"
+
+    Returns:
+        (year_start, year_end); year_end es None si el rango sigue abierto
+    """
+    match = _YEAR_RANGE.search(text.strip()) if text else None
+    if not match:
+        return None, None
+
+    year_start = int(match.group(1))
+    year_end = int(match.group(2)) if match.group(2) != "--" else None
+    return year_start, year_end
+
+
+def parse_result_count(text: Optional[str]) -> Optional[int]:
+    """Extrae el número de "236 resultados" (listados de Noriega)"""
+    match = _RESULT_COUNT.search(text) if text else None
+    return int(match.group(1)) if match else None
+
+
+def parse_total_records(text: Optional[str]) -> Optional[int]:
+    """Extrae Z de "Mostrando registros del X al Y de un total de Z registros" (EMASA)"""
+    match = _TOTAL_RECORDS.search(text) if text else None
+    return int(match.group(1)) if match else None
+
+
+def slugify(text: Optional[str], default: str = "categoria") -> str:
+    """
+    Slug ASCII en minúsculas (nunca vacío)
+
+    - "Filtros de Aceite" -> "filtros-de-aceite"
+    - "Embragues / Clutch" -> "embragues-clutch"
+    - "" -> "categoria"
+    """
+    text = unicodedata.normalize("NFKD", text or "")
+    text = text.encode("ascii", "ignore").decode("ascii")
+    text = _SLUG_INVALID.sub("", text).strip().lower()
+    return _SLUG_SPACES.sub("-", text) or default
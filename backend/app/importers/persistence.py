@@ -0,0 +1,1141 @@
+"""
+Persistencia compartida de productos para todos los importadores
+
+Los componentes de productos entregan filas ya normalizadas (mismas claves
+que las columnas de Product) y este módulo se encarga de:
+- Insertar o actualizar los productos de una categoría
+- Omitir el UPDATE de filas cuyo content_hash no cambió
+- Registrar en product_price_history solo los cambios reales de precio/stock
+- Marcar como vistos los SKUs del listado y barrer los que desaparecieron
+- Cargas masivas vía COPY a products_staging + merge atómico por categoría
+- Merge atómico (JSONB ||) del result de jobs con varios workers en paralelo
+- Registro (y resolución) de los SKUs que agotaron sus reintentos
+- Tasa de cambio por categoría (la usa el scheduler de refresh)
+- Refresh rápido de precio/stock en bloque (solo productos ya conocidos)
+"""
+
+import hashlib
+import json
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+from app.core.config import settings
+from app.core.database import get_engine
+from app.core.logger import logger
+from app.models import (
+    Category,
+    FailedItem,
+    ImportJob,
+    Product,
+    ProductPriceHistory,
+)
+from sqlalchemy import bindparam, insert, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+# Columnas de Product que los componentes pueden entregar en cada fila
+PRODUCT_FIELDS = (
+    "sku",
+    "name",
+    "description",
+    "price",
+    "stock",
+    "brand",
+    "url",
+    "image_url",
+    "images",
+    "extra_data",
+)
+
+# Máximo de SKUs modificados que se reportan en el resultado del job
+MAX_REPORTED_SKUS = 200
+
+# Modos de ingesta soportados (ver settings.PRODUCT_INGESTION_MODE)
+INGESTION_MODES = ("orm", "copy")
+
+# Columnas que se copian a products_staging (en este orden)
+STAGING_COLUMNS = (
+    "job_id",
+    "category_id",
+    "importer_id",
+    *PRODUCT_FIELDS,
+    "content_hash",
+)
+
+# Tabla UNLOGGED: no escribe WAL, se trunca tras un crash (solo datos en tránsito)
+STAGING_TABLE_DDL = """
+CREATE UNLOGGED TABLE IF NOT EXISTS products_staging (
+    id BIGSERIAL PRIMARY KEY,
+    job_id VARCHAR(100) NOT NULL,
+    category_id INTEGER NOT NULL,
+    importer_id INTEGER NOT NULL,
+    sku VARCHAR(100) NOT NULL,
+    name VARCHAR(500),
+    description TEXT,
+    price DOUBLE PRECISION,
+    stock INTEGER,
+    brand VARCHAR(100),
+    url VARCHAR(500),
+    image_url VARCHAR(500),
+    images JSONB,
+    extra_data JSONB,
+    content_hash VARCHAR(64)
+)
+"""
+
+STAGING_INDEX_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_products_staging_job_category "
+    "ON products_staging (job_id, category_id)"
+)
+
+# Productos sin cambios: solo se marcan como vistos (updated_at intacto)
+TOUCH_STAGED_SQL = text(
+    """
+    UPDATE products AS p
+    SET last_scraped_at = now(), last_seen_at = now(), available = true
+    FROM products_staging AS s
+    WHERE s.job_id = :job_id
+      AND s.category_id = :category_id
+      AND p.importer_id = s.importer_id
+      AND p.sku = s.sku
+      AND p.content_hash = s.content_hash
+    """
+)
+
+# Upsert desde staging + historial de precio/stock en una sola sentencia.
+# DISTINCT ON conserva la última fila copiada por SKU; el ON CONFLICT solo
+# reescribe filas cuyo content_hash cambió y el historial compara contra
+# el snapshot previo (las CTE ven los datos anteriores a la sentencia).
+MERGE_STAGED_SQL = text(
+    """
+    WITH staged AS (
+        SELECT DISTINCT ON (sku) *
+        FROM products_staging
+        WHERE job_id = :job_id AND category_id = :category_id
+        ORDER BY sku, id DESC
+    ),
+    previous AS (
+        SELECT p.id, p.price, p.stock
+        FROM products AS p
+        JOIN staged AS s ON p.importer_id = s.importer_id AND p.sku = s.sku
+    ),
+    merged AS (
+        INSERT INTO products AS p (
+            importer_id, category_id, sku, name, description, price, stock,
+            brand, url, image_url, images, extra_data, content_hash,
+            currency, available, last_scraped_at, last_seen_at
+        )
+        SELECT
+            importer_id, category_id, sku, name, description, price, stock,
+            brand, url, image_url, images, extra_data, content_hash,
+            'CLP', true, now(), now()
+        FROM staged
+        ON CONFLICT (importer_id, sku) DO UPDATE SET
+            name = EXCLUDED.name,
+            description = EXCLUDED.description,
+            price = EXCLUDED.price,
+            stock = EXCLUDED.stock,
+            brand = EXCLUDED.brand,
+            url = EXCLUDED.url,
+            image_url = EXCLUDED.image_url,
+            images = EXCLUDED.images,
+            extra_data = EXCLUDED.extra_data,
+            content_hash = EXCLUDED.content_hash,
+            available = true,
+            updated_at = now(),
+            last_scraped_at = now(),
+            last_seen_at = now()
+        WHERE p.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+        RETURNING p.id, p.importer_id, p.sku, p.price, p.stock, (xmax = 0) AS inserted
+    ),
+    history AS (
+        INSERT INTO product_price_history (product_id, recorded_at, importer_id, price, stock)
+        SELECT m.id, now(), m.importer_id, m.price, m.stock
+        FROM merged AS m
+        LEFT JOIN previous AS pr ON pr.id = m.id
+        WHERE m.inserted
+           OR pr.price IS DISTINCT FROM m.price
+           OR pr.stock IS DISTINCT FROM m.stock
+        RETURNING 1
+    )
+    SELECT
+        (SELECT count(*) FROM staged) AS staged,
+        (SELECT count(*) FROM merged WHERE inserted) AS created,
+        (SELECT count(*) FROM merged WHERE NOT inserted) AS updated,
+        (SELECT count(*) FROM history) AS history,
+        (SELECT array_agg(sku) FROM (SELECT sku FROM merged LIMIT :max_skus) AS c) AS changed_skus
+    """
+)
+
+# Refresh rápido: precio/stock leídos del listado para SKUs ya conocidos.
+# Un precio o stock NULL (columna ausente en el listado) conserva el valor
+# actual. Las filas que cambian pierden su content_hash para que el próximo
+# import completo las reescriba aunque su payload coincida con el anterior.
+QUICK_REFRESH_SQL = text(
+    """
+    WITH listed AS (
+        SELECT DISTINCT ON (sku) sku, price, stock
+        FROM unnest(
+            CAST(:skus AS text[]),
+            CAST(:prices AS double precision[]),
+            CAST(:stocks AS integer[])
+        ) AS l (sku, price, stock)
+        ORDER BY sku
+    ),
+    diff AS (
+        SELECT
+            p.id,
+            l.price AS new_price,
+            l.stock AS new_stock,
+            (l.price IS NOT NULL AND p.price IS DISTINCT FROM l.price)
+                OR (l.stock IS NOT NULL AND p.stock IS DISTINCT FROM l.stock)
+                AS changed
+        FROM products AS p
+        JOIN listed AS l ON p.sku = l.sku
+        WHERE p.importer_id = :importer_id
+    ),
+    refreshed AS (
+        UPDATE products AS p
+        SET
+            price = COALESCE(d.new_price, p.price),
+            stock = COALESCE(d.new_stock, p.stock),
+            content_hash = CASE WHEN d.changed THEN NULL ELSE p.content_hash END,
+            updated_at = CASE WHEN d.changed THEN now() ELSE p.updated_at END,
+            available = true,
+            last_scraped_at = now(),
+            last_seen_at = now()
+        FROM diff AS d
+        WHERE p.id = d.id
+        RETURNING p.id, p.importer_id, p.sku, p.price, p.stock, d.changed
+    ),
+    history AS (
+        INSERT INTO product_price_history (product_id, recorded_at, importer_id, price, stock)
+        SELECT id, now(), importer_id, price, stock
+        FROM refreshed
+        WHERE changed
+        RETURNING 1
+    )
+    SELECT
+        (SELECT count(*) FROM listed) AS listed,
+        (SELECT count(*) FROM refreshed) AS matched,
+        (SELECT count(*) FROM refreshed WHERE changed) AS updated,
+        (SELECT count(*) FROM history) AS history,
+        (SELECT array_agg(sku) FROM (
+            SELECT sku FROM refreshed WHERE changed LIMIT :max_skus
+        ) AS c) AS changed_skus
+    """
+)
+
+# Merge del result del job en una sola sentencia (sin leer-modificar-escribir)
+JOB_RESULT_MERGE_SQL = text(
+    """
+    UPDATE import_jobs
+    SET result = COALESCE(result, '{}'::jsonb) || CAST(:data AS jsonb)
+    WHERE job_id = :job_id
+    """
+)
+
+# Igual que el anterior pero dentro de result.chunks.<chunk>
+JOB_CHUNK_RESULT_MERGE_SQL = text(
+    """
+    UPDATE import_jobs
+    SET result = jsonb_set(
+        COALESCE(result, '{}'::jsonb),
+        '{chunks}',
+        COALESCE(result -> 'chunks', '{}'::jsonb) || jsonb_build_object(
+            CAST(:chunk AS text),
+            COALESCE(result -> 'chunks' -> CAST(:chunk AS text), '{}'::jsonb)
+                || CAST(:data AS jsonb)
+        )
+    )
+    WHERE job_id = :job_id
+    """
+)
+
+# Progreso global = promedio del progreso de los chunks
+JOB_PROGRESS_FROM_CHUNKS_SQL = text(
+    """
+    UPDATE import_jobs
+    SET progress = (
+        SELECT COALESCE(SUM((value ->> 'progress')::numeric), 0) / :chunk_count
+        FROM jsonb_each(COALESCE(result -> 'chunks', '{}'::jsonb))
+    )::int
+    WHERE job_id = :job_id
+    """
+)
+
+# Meses con partición ya creada en este proceso (evita DDL repetido)
+_ensured_partitions: Set[date] = set()
+
+T = TypeVar("T")
+
+
+def _month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _next_month(value: date) -> date:
+    if value.month == 12:
+        return date(value.year + 1, 1, 1)
+    return date(value.year, value.month + 1, 1)
+
+
+async def ensure_price_history_partition(db: AsyncSession, when: datetime) -> None:
+    """
+    Crea (si no existe) la partición mensual de product_price_history para `when`
+
+    El DDL corre en una conexión propia en autocommit y necesita un lock
+    ACCESS EXCLUSIVE sobre product_price_history: no llamarla con una
+    transacción abierta que ya escribió en la tabla (se bloquearía contra sí
+    misma). Las particiones se crean por adelantado (ver
+    ensure_upcoming_price_history_partitions); las escrituras solo la usan
+    como respaldo, después de deshacer su savepoint.
+
+    Args:
+        db: Sesión de base de datos (solo se usa su motor)
+        when: Fecha que debe quedar cubierta por una partición
+    """
+    month = _month_start(when)
+    if month in _ensured_partitions:
+        return
+
+    partition = f"product_price_history_{month:%Y_%m}"
+    bounds = f"FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+    async with (db.bind or get_engine()).connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition} "
+                f"PARTITION OF product_price_history "
+                f"FOR VALUES {bounds}"
+            )
+        )
+    _ensured_partitions.add(month)
+
+
+async def ensure_upcoming_price_history_partitions(
+    db: AsyncSession, months: int = 2
+) -> List[date]:
+    """
+    Crea las particiones del mes actual y de los siguientes (`months` en
+    total) antes de que las escrituras las necesiten
+
+    La llaman cada worker al arrancar y la tarea diaria de beat, fuera de
+    cualquier transacción de import.
+
+    Returns:
+        Meses cubiertos
+    """
+    month = _month_start(datetime.now(timezone.utc))
+    covered = []
+    for _ in range(months):
+        await ensure_price_history_partition(
+            db, datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+        )
+        covered.append(month)
+        month = _next_month(month)
+    return covered
+
+
+def _is_missing_partition(error: DBAPIError) -> bool:
+    return "no partition of relation" in str(error.orig)
+
+
+async def _write_with_history_partition(
+    db: AsyncSession, when: datetime, write: Callable[[], Awaitable[T]]
+) -> T:
+    """
+    Ejecuta `write` (escribe en product_price_history) en un savepoint
+
+    Las particiones se crean por adelantado, así que la escritura no corre
+    DDL. Si aun así falta la del mes (worker que arrancó sin crearla, o una
+    partición borrada), se deshace el savepoint (libera los locks que tomó
+    sobre la tabla), se crea la partición y se reintenta una vez. Los
+    llamadores no escriben en la tabla antes de esto dentro de la misma
+    transacción.
+    """
+    try:
+        async with db.begin_nested():
+            return await write()
+    except DBAPIError as e:
+        if not _is_missing_partition(e):
+            raise
+        month = _month_start(when)
+        logger.warning(
+            f"⚠️ Falta la partición de historial de {month:%Y-%m}, creándola"
+        )
+        _ensured_partitions.discard(month)
+        await ensure_price_history_partition(db, when)
+        return await write()
+
+
+async def record_price_history(
+    db: AsyncSession, entries: Iterable[Dict[str, Any]]
+) -> int:
+    """
+    Inserta en bloque los cambios de precio/stock
+
+    Args:
+        db: Sesión de base de datos (el commit lo hace el llamador)
+        entries: Dicts con product_id, importer_id, price y stock
+
+    Returns:
+        Número de filas insertadas
+    """
+    rows = list(entries)
+    if not rows:
+        return 0
+
+    recorded_at = datetime.now(timezone.utc)
+    for row in rows:
+        row["recorded_at"] = recorded_at
+
+    async def write():
+        await db.execute(insert(ProductPriceHistory), rows)
+
+    await _write_with_history_partition(db, recorded_at, write)
+    return len(rows)
+
+
+def compute_content_hash(row: Dict[str, Any]) -> str:
+    """
+    Calcula el hash SHA-256 del payload normalizado de un producto
+
+    Solo considera las columnas de PRODUCT_FIELDS, con claves ordenadas,
+    para que el mismo contenido produzca siempre el mismo hash.
+    """
+    payload = {key: row.get(key) for key in PRODUCT_FIELDS}
+    encoded = json.dumps(
+        payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _price_or_stock_changed(current: Dict[str, Any], row: Dict[str, Any]) -> bool:
+    return current["price"] != row.get("price") or current["stock"] != row.get("stock")
+
+
+async def touch_products(db: AsyncSession, product_ids: List[int]) -> None:
+    """
+    Marca como vistos productos sin cambios (solo last_scraped_at)
+
+    updated_at se fija a su propio valor para que no se dispare el onupdate.
+    """
+    if not product_ids:
+        return
+
+    await db.execute(
+        update(Product)
+        .where(Product.id.in_(product_ids))
+        .values(
+            last_scraped_at=func.now(),
+            available=True,
+            updated_at=Product.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _group_by_keys(rows: Iterable[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Agrupa filas por conjunto de claves (un executemany por grupo)"""
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    return list(groups.values())
+
+
+async def save_products(
+    db: AsyncSession,
+    category: Category,
+    rows: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Guarda los productos de una categoría y su historial de precio/stock
+
+    Busca los productos existentes del lote en una sola query (solo id,
+    content_hash, precio y stock). Las filas cuyo content_hash coincide no
+    se reescriben (solo se actualiza last_scraped_at en un único UPDATE); el
+    resto se inserta o actualiza con executemany de Core y el historial se
+    escribe en bloque al final (solo para filas nuevas o cuyo precio/stock
+    cambió). No se cargan instancias de Product en la sesión: en un job de
+    horas el identity map no crece con el catálogo.
+
+    Args:
+        db: Sesión de base de datos
+        category: Categoría a la que pertenecen los productos
+        rows: Productos normalizados (claves de PRODUCT_FIELDS)
+
+    Returns:
+        {'saved', 'created', 'updated', 'unchanged', 'errors', 'history',
+         'changed_skus'}
+    """
+    stats = {
+        "saved": 0,
+        "created": 0,
+        "updated": 0,
+        "unchanged": 0,
+        "errors": 0,
+        "history": 0,
+        "changed_skus": [],
+    }
+    if not rows:
+        return stats
+
+    products = Product.__table__
+    skus = [row["sku"] for row in rows]
+    result = await db.execute(
+        select(
+            products.c.id,
+            products.c.sku,
+            products.c.content_hash,
+            products.c.price,
+            products.c.stock,
+        ).where(
+            products.c.importer_id == category.importer_id,
+            products.c.sku.in_(skus),
+        )
+    )
+    existing = {row.sku: row._asdict() for row in result}
+
+    history: List[Dict[str, Any]] = []
+    updates: Dict[str, Dict[str, Any]] = {}
+    inserts: Dict[str, Dict[str, Any]] = {}
+    unchanged_ids: List[int] = []
+
+    for row in rows:
+        try:
+            values = {key: row[key] for key in PRODUCT_FIELDS if key in row}
+            values["content_hash"] = compute_content_hash(values)
+            sku = row["sku"]
+            current = existing.get(sku)
+
+            if current and current["content_hash"] == values["content_hash"]:
+                if current["id"] is not None:
+                    unchanged_ids.append(current["id"])
+                stats["unchanged"] += 1
+            elif current and current["id"] is not None:
+                if _price_or_stock_changed(current, values):
+                    history.append(
+                        {
+                            "product_id": current["id"],
+                            "importer_id": category.importer_id,
+                            "price": values.get("price"),
+                            "stock": values.get("stock"),
+                        }
+                    )
+                updates[sku] = {"_product_id": current["id"], **values}
+                current.update(
+                    content_hash=values["content_hash"],
+                    price=values.get("price"),
+                    stock=values.get("stock"),
+                )
+                stats["updated"] += 1
+                stats["changed_skus"].append(sku)
+            else:
+                # SKU nuevo (o repetido en el mismo lote: gana la última fila)
+                if current:
+                    stats["updated"] += 1
+                else:
+                    stats["created"] += 1
+                inserts[sku] = values
+                existing[sku] = {
+                    "id": None,
+                    "content_hash": values["content_hash"],
+                    "price": values.get("price"),
+                    "stock": values.get("stock"),
+                }
+                stats["changed_skus"].append(sku)
+
+            stats["saved"] += 1
+
+        except Exception as e:
+            stats["errors"] += 1
+            logger.warning(f"⚠️  Error guardando producto {row.get('sku')}: {e}")
+
+    # Los productos nuevos necesitan id antes de escribir su primer punto.
+    # Otro chunk del mismo job puede insertar el mismo SKU a la vez (Noriega
+    # lista un SKU en varias categorías): el que pierde no falla, sus filas
+    # siguen por el camino de UPDATE/historial de abajo. Ordenar por SKU evita
+    # deadlocks entre chunks que insertan los mismos SKUs
+    for group in _group_by_keys(sorted(inserts.values(), key=lambda v: v["sku"])):
+        created = await db.execute(
+            pg_insert(products)
+            .values(
+                importer_id=category.importer_id,
+                category_id=category.id,
+                available=True,
+                last_scraped_at=func.now(),
+            )
+            .on_conflict_do_nothing(
+                index_elements=[products.c.importer_id, products.c.sku]
+            )
+            .returning(
+                products.c.id, products.c.sku, products.c.price, products.c.stock
+            ),
+            group,
+        )
+        for product_id, sku, price, stock in created:
+            inserts.pop(sku)
+            history.append(
+                {
+                    "product_id": product_id,
+                    "importer_id": category.importer_id,
+                    "price": price,
+                    "stock": stock,
+                }
+            )
+
+    if inserts:
+        result = await db.execute(
+            select(
+                products.c.id,
+                products.c.sku,
+                products.c.content_hash,
+                products.c.price,
+                products.c.stock,
+            ).where(
+                products.c.importer_id == category.importer_id,
+                products.c.sku.in_(list(inserts)),
+            )
+        )
+        for current in result:
+            values = inserts[current.sku]
+            stats["created"] -= 1
+            if current.content_hash == values["content_hash"]:
+                unchanged_ids.append(current.id)
+                stats["unchanged"] += 1
+                continue
+            if _price_or_stock_changed(current._asdict(), values):
+                history.append(
+                    {
+                        "product_id": current.id,
+                        "importer_id": category.importer_id,
+                        "price": values.get("price"),
+                        "stock": values.get("stock"),
+                    }
+                )
+            updates[current.sku] = {"_product_id": current.id, **values}
+            stats["updated"] += 1
+
+    for group in _group_by_keys(updates.values()):
+        await db.execute(
+            update(products)
+            .where(products.c.id == bindparam("_product_id"))
+            .values(available=True, last_scraped_at=func.now()),
+            group,
+        )
+
+    await touch_products(db, unchanged_ids)
+    stats["history"] = await record_price_history(db, history)
+    await db.commit()
+
+    return stats
+
+
+async def apply_quick_refresh(
+    db: AsyncSession, importer_id: int, entries: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Actualiza en bloque precio, stock y last_scraped_at desde un listado
+
+    Solo toca productos que ya existen (los SKUs nuevos necesitan un import
+    completo para tener nombre, imágenes, etc.). Escribe historial para los
+    que cambiaron y hace commit.
+
+    Args:
+        db: Sesión de base de datos
+        importer_id: ID del importador
+        entries: Dicts con sku, price y stock (None = no informado)
+
+    Returns:
+        {'listed', 'matched', 'updated', 'unchanged', 'unknown', 'history',
+         'changed_skus'}
+    """
+    if not entries:
+        return {
+            "listed": 0,
+            "matched": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "unknown": 0,
+            "history": 0,
+            "changed_skus": [],
+        }
+
+    params = {
+        "importer_id": importer_id,
+        "skus": [entry["sku"] for entry in entries],
+        "prices": [entry.get("price") for entry in entries],
+        "stocks": [entry.get("stock") for entry in entries],
+        "max_skus": MAX_REPORTED_SKUS,
+    }
+
+    async def write():
+        return (await db.execute(QUICK_REFRESH_SQL, params)).one()
+
+    refreshed = await _write_with_history_partition(
+        db, datetime.now(timezone.utc), write
+    )
+    await db.commit()
+
+    return {
+        "listed": refreshed.listed,
+        "matched": refreshed.matched,
+        "updated": refreshed.updated,
+        "unchanged": refreshed.matched - refreshed.updated,
+        "unknown": refreshed.listed - refreshed.matched,
+        "history": refreshed.history,
+        "changed_skus": list(refreshed.changed_skus or []),
+    }
+
+
+async def merge_job_result(
+    db: AsyncSession,
+    job_id: str,
+    data: Dict[str, Any],
+    chunk: Optional[int] = None,
+) -> None:
+    """
+    Mezcla `data` en import_jobs.result de forma atómica y hace commit
+
+    Varios subtasks de un mismo job escriben en paralelo, así que el merge
+    se hace en la BD con JSONB || en lugar de leer, mezclar y reescribir.
+
+    Args:
+        db: Sesión de base de datos
+        job_id: ID del job
+        data: Claves a mezclar
+        chunk: Si se indica, se mezcla en result.chunks.<chunk>
+    """
+    params = {"job_id": job_id, "data": json.dumps(data, default=str)}
+    if chunk is None:
+        await db.execute(JOB_RESULT_MERGE_SQL, params)
+    else:
+        await db.execute(JOB_CHUNK_RESULT_MERGE_SQL, {**params, "chunk": str(chunk)})
+    await db.commit()
+
+
+async def set_chunk_progress(
+    db: AsyncSession, job_id: str, chunk: int, chunk_count: int, progress: int
+) -> None:
+    """
+    Registra el progreso de un chunk y recalcula el progreso global del job
+    """
+    await db.execute(
+        JOB_CHUNK_RESULT_MERGE_SQL,
+        {
+            "job_id": job_id,
+            "chunk": str(chunk),
+            "data": json.dumps({"progress": progress}),
+        },
+    )
+    await db.execute(
+        JOB_PROGRESS_FROM_CHUNKS_SQL,
+        {"job_id": job_id, "chunk_count": max(chunk_count, 1)},
+    )
+
+
+def resolve_ingestion_mode(config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Devuelve el modo de ingesta efectivo ("orm" o "copy")
+
+    Args:
+        config: Configuración del componente (puede traer 'ingestion_mode')
+    """
+    mode = (config or {}).get("ingestion_mode") or settings.PRODUCT_INGESTION_MODE
+    if mode not in INGESTION_MODES:
+        logger.warning(f"⚠️  Modo de ingesta desconocido '{mode}', usando 'orm'")
+        return "orm"
+    return mode
+
+
+class StagingProductLoader:
+    """
+    Ingesta masiva de productos vía COPY a products_staging
+
+    Las filas normalizadas se copian con asyncpg copy_records_to_table
+    (protocolo COPY binario) y al cerrar cada categoría se fusionan en
+    products con un único INSERT ... ON CONFLICT dentro de una transacción,
+    de modo que los lectores ven la categoría actualizada de una sola vez.
+    """
+
+    _table_ready = False
+
+    def __init__(self, db: AsyncSession, job_id: str):
+        self.db = db
+        self.job_id = job_id
+
+    async def _ensure_table(self) -> None:
+        # En desarrollo las tablas salen de create_all (sin migraciones)
+        if StagingProductLoader._table_ready:
+            return
+        await self.db.execute(text(STAGING_TABLE_DDL))
+        await self.db.execute(text(STAGING_INDEX_DDL))
+        await self.db.commit()
+        StagingProductLoader._table_ready = True
+
+    def _to_record(self, category: Category, row: Dict[str, Any]) -> tuple:
+        values = {key: row.get(key) for key in PRODUCT_FIELDS}
+        content_hash = compute_content_hash(values)
+
+        # asyncpg codifica jsonb desde texto
+        for key in ("images", "extra_data"):
+            if values[key] is not None:
+                values[key] = json.dumps(values[key], ensure_ascii=False, default=str)
+
+        price = values["price"]
+        values["price"] = float(price) if price is not None else None
+
+        return (
+            self.job_id,
+            category.id,
+            category.importer_id,
+            *(values[key] for key in PRODUCT_FIELDS),
+            content_hash,
+        )
+
+    async def stage(self, category: Category, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Copia filas normalizadas a products_staging
+
+        Args:
+            category: Categoría a la que pertenecen las filas
+            rows: Productos normalizados (claves de PRODUCT_FIELDS)
+
+        Returns:
+            Número de filas copiadas
+        """
+        records = [self._to_record(category, row) for row in rows if row.get("sku")]
+        if not records:
+            return 0
+
+        await self._ensure_table()
+
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            "products_staging", records=records, columns=list(STAGING_COLUMNS)
+        )
+        await self.db.commit()
+        return len(records)
+
+    async def merge(self, category: Category) -> Dict[str, Any]:
+        """
+        Fusiona en products lo copiado para una categoría (una transacción)
+
+        Marca como vistos los productos sin cambios, hace el upsert con
+        historial y limpia el staging de la categoría antes del commit.
+
+        Returns:
+            Mismo formato que save_products
+        """
+        params = {"job_id": self.job_id, "category_id": category.id}
+
+        touched = await self.db.execute(TOUCH_STAGED_SQL, params)
+
+        async def write():
+            return (
+                await self.db.execute(
+                    MERGE_STAGED_SQL, {**params, "max_skus": MAX_REPORTED_SKUS}
+                )
+            ).one()
+
+        merged = await _write_with_history_partition(
+            self.db, datetime.now(timezone.utc), write
+        )
+        await self.db.execute(
+            text(
+                "DELETE FROM products_staging "
+                "WHERE job_id = :job_id AND category_id = :category_id"
+            ),
+            params,
+        )
+        await self.db.commit()
+
+        return {
+            "saved": merged.staged,
+            "created": merged.created,
+            "updated": merged.updated,
+            "unchanged": touched.rowcount,
+            "errors": 0,
+            "history": merged.history,
+            "changed_skus": list(merged.changed_skus or []),
+        }
+
+    async def discard(self) -> None:
+        """Elimina todo lo copiado por este job (cancelación o error)"""
+        if not StagingProductLoader._table_ready:
+            return
+        await self.db.execute(
+            text("DELETE FROM products_staging WHERE job_id = :job_id"),
+            {"job_id": self.job_id},
+        )
+        await self.db.commit()
+
+
+async def mark_products_seen(
+    db: AsyncSession,
+    importer_id: int,
+    skus: Iterable[str],
+    category_id: Optional[int] = None,
+) -> int:
+    """
+    Registra los SKUs vistos en el listado de una categoría
+
+    Un único UPDATE fija last_seen_at y vuelve a marcar como disponibles
+    los productos que reaparecen en el listado. Con category_id el producto
+    pasa a esa categoría: el barrido juzga cada producto por la última
+    categoría que lo listó (un SKU que se movió, o que aparece en varias
+    categorías, no se barre por una categoría que ya no lo lista).
+
+    Args:
+        db: Sesión de base de datos
+        importer_id: ID del importador
+        skus: SKUs presentes en el listado del proveedor
+        category_id: Categoría del listado
+
+    Returns:
+        Número de productos marcados
+    """
+    sku_list = list(skus)
+    if not sku_list:
+        return 0
+
+    values = {
+        "last_seen_at": func.now(),
+        "available": True,
+        "updated_at": Product.updated_at,
+    }
+    if category_id is not None:
+        values["category_id"] = category_id
+
+    result = await db.execute(
+        update(Product)
+        .where(Product.importer_id == importer_id, Product.sku.in_(sku_list))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def sweep_unseen_products(
+    db: AsyncSession,
+    importer_id: int,
+    job_id: str,
+    category_ids: List[int],
+    grace_hours: int = None,
+) -> int:
+    """
+    Marca como no disponibles los productos que ya no aparecen en el listado
+
+    Solo afecta a categorías procesadas completamente en la corrida; cada
+    producto cuenta en la última categoría que lo listó (ver
+    mark_products_seen). El inicio de la corrida se toma de
+    import_jobs.created_at (hora de la BD), y un producto se barre si no fue
+    visto desde ese momento menos el periodo de gracia.
+
+    Args:
+        db: Sesión de base de datos
+        importer_id: ID del importador
+        job_id: ID del job de la corrida
+        category_ids: Categorías con listado completo en esta corrida
+        grace_hours: Periodo de gracia (default: settings.AVAILABILITY_GRACE_HOURS)
+
+    Returns:
+        Número de productos marcados como no disponibles
+    """
+    if not category_ids:
+        return 0
+
+    if grace_hours is None:
+        grace_hours = settings.AVAILABILITY_GRACE_HOURS
+
+    run_started_at = (
+        select(ImportJob.created_at)
+        .where(ImportJob.job_id == job_id)
+        .scalar_subquery()
+    )
+    cutoff = run_started_at - timedelta(hours=grace_hours)
+
+    result = await db.execute(
+        update(Product)
+        .where(
+            Product.importer_id == importer_id,
+            Product.category_id.in_(category_ids),
+            Product.available.is_(True),
+            or_(Product.last_seen_at.is_(None), Product.last_seen_at < cutoff),
+        )
+        .values(available=False)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def record_failed_items(
+    db: AsyncSession,
+    importer_id: int,
+    category_id: Optional[int],
+    job_id: str,
+    failures: List[Dict[str, Any]],
+) -> int:
+    """
+    Guarda en failed_items los SKUs que agotaron sus reintentos
+
+    Un SKU que ya estaba registrado actualiza su último error, suma
+    failure_count y vuelve a quedar pendiente.
+
+    Args:
+        db: Sesión de base de datos
+        importer_id: ID del importador
+        category_id: Categoría donde falló
+        job_id: Job donde falló
+        failures: Dicts {sku, url, stage, error_class, error, attempts}
+
+    Returns:
+        Número de SKUs registrados
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    for failure in failures:
+        sku = failure.get("sku")
+        if not sku:
+            continue
+        # Un mismo SKU no puede aparecer dos veces en el ON CONFLICT
+        rows[sku] = {
+            "importer_id": importer_id,
+            "category_id": category_id,
+            "sku": sku[:100],
+            "url": (failure.get("url") or "")[:500] or None,
+            "stage": failure["stage"],
+            "error_class": failure["error_class"][:100],
+            "error_message": failure.get("error"),
+            "attempts": failure.get("attempts", 1),
+            "failure_count": 1,
+            "job_id": job_id,
+        }
+    if not rows:
+        return 0
+
+    stmt = pg_insert(FailedItem).values(list(rows.values()))
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FailedItem.importer_id, FailedItem.sku],
+        set_={
+            "category_id": excluded.category_id,
+            "url": func.coalesce(excluded.url, FailedItem.url),
+            "stage": excluded.stage,
+            "error_class": excluded.error_class,
+            "error_message": excluded.error_message,
+            "attempts": excluded.attempts,
+            "failure_count": FailedItem.failure_count + 1,
+            "job_id": excluded.job_id,
+            "last_failed_at": func.now(),
+            "resolved_at": None,
+            "resolved_job_id": None,
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+    return len(rows)
+
+
+async def resolve_failed_items(
+    db: AsyncSession, importer_id: int, skus: Iterable[str], job_id: str
+) -> int:
+    """
+    Marca como resueltos los failed_items pendientes de SKUs ya guardados
+
+    Returns:
+        Número de ítems resueltos
+    """
+    sku_list = list(skus)
+    if not sku_list:
+        return 0
+
+    result = await db.execute(
+        update(FailedItem)
+        .where(
+            FailedItem.importer_id == importer_id,
+            FailedItem.sku.in_(sku_list),
+            FailedItem.resolved_at.is_(None),
+        )
+        .values(resolved_at=func.now(), resolved_job_id=job_id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def get_pending_failed_items(
+    db: AsyncSession, importer_id: int, limit: Optional[int] = None
+) -> List[FailedItem]:
+    """failed_items sin resolver de un importador, agrupados por categoría"""
+    query = (
+        select(FailedItem)
+        .where(
+            FailedItem.importer_id == importer_id,
+            FailedItem.resolved_at.is_(None),
+        )
+        .order_by(FailedItem.category_id, FailedItem.id)
+    )
+    if limit:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def record_category_change_rate(
+    db: AsyncSession, category: Category, changed: int, scraped: int
+) -> Optional[float]:
+    """
+    Actualiza la tasa de cambio aprendida de una categoría tras un refresh
+
+    La fracción de SKUs con cambio de precio/stock (o nuevos) desde el
+    refresh anterior se convierte en tasa diaria asumiendo cambios Poisson
+    (λ = -ln(1 - fracción) / días) y se suaviza con una EMA.
+
+    Args:
+        db: Sesión de base de datos
+        category: Categoría refrescada (en la sesión `db`)
+        changed: SKUs con cambio (filas de historial escritas)
+        scraped: SKUs guardados en el refresh
+
+    Returns:
+        Nueva tasa (cambios por SKU y día) o None si no hubo muestra
+    """
+    if scraped <= 0:
+        return None
+
+    now = datetime.now(timezone.utc)
+    share = min(changed / scraped, 0.99)
+    if category.last_refreshed_at:
+        elapsed_days = (now - category.last_refreshed_at).total_seconds() / 86400
+    else:
+        elapsed_days = 1.0
+    elapsed_days = max(elapsed_days, 1 / 24)
+
+    observed = -math.log(1 - share) / elapsed_days
+    if category.change_rate is None:
+        rate = observed
+    else:
+        alpha = settings.CHANGE_RATE_EMA_ALPHA
+        rate = alpha * observed + (1 - alpha) * category.change_rate
+
+    category.change_rate = rate
+    category.last_refreshed_at = now
+    await db.commit()
+    return rate
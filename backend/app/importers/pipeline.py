@@ -0,0 +1,394 @@
+"""
+Pipeline de scraping por etapas con colas acotadas
+
+    fuente → fetch (N workers) → parse → normalize → sink por lotes
+
+Cada etapa corre como una tarea asyncio y se comunica con la siguiente por
+una asyncio.Queue de tamaño fijo: si el sink (BD) se atrasa, las colas se
+llenan y la fuente deja de producir. La memoria por categoría queda acotada
+a queue_size elementos por etapa más un lote del sink, y cada lote se
+persiste apenas se completa.
+
+Un ítem que falla en fetch o parse se reintenta (fetch + parse de nuevo)
+con backoff exponencial en una tarea aparte, sin frenar al resto. Si agota
+max_attempts queda en failed_items con la etapa y la clase del error.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.logger import logger
+from app.importers.profiling import profile_span
+
+# Marca de fin de stream entre etapas
+_DONE = object()
+
+
+class EmptyItemError(Exception):
+    """parse no pudo extraer datos del ítem"""
+
+
+@dataclass
+class StageMetrics:
+    """Métricas de una etapa: cola de entrada, procesados y throughput"""
+
+    name: str
+    queue: Optional[asyncio.Queue] = None
+    processed: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize() if self.queue is not None else 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        return {
+            "processed": self.processed,
+            "errors": self.errors,
+            "queue_depth": self.queue_depth,
+            "per_minute": round(self.processed / elapsed * 60, 2),
+            "busy_seconds": round(self.busy_seconds, 2),
+        }
+
+
+class ScrapePipeline:
+    """
+    Ejecuta fuente → fetch → parse → normalize → sink con colas acotadas
+
+    Args:
+        source: Iterador asíncrono de ítems a scrapear (ej. SKUs o URLs)
+        fetch: Descarga un ítem (ej. abre la página de detalle)
+        parse: Extrae un dict del resultado de fetch (None = descartar)
+        normalize: Convierte el dict a columnas de Product
+        sink: Persiste un lote de filas normalizadas
+        fetch_workers: Workers de fetch concurrentes
+        queue_size: Capacidad de cada cola entre etapas
+        batch_size: Filas por lote del sink (un commit por lote)
+        delay_seconds: Pausa de cada worker de fetch entre ítems
+        should_cancel: Consulta de cancelación (se sondea periódicamente)
+        cancel_poll_seconds: Intervalo de sondeo de cancelación
+        max_attempts: Intentos por ítem (fetch + parse) antes de darlo por fallido
+        retry_backoff_seconds: Espera antes del primer reintento (se duplica)
+
+    El sink y should_cancel comparten la sesión de BD del componente, así que
+    se ejecutan bajo el mismo lock (db_lock) y nunca en paralelo.
+    """
+
+    def __init__(
+        self,
+        source: AsyncIterator[Any],
+        fetch: Callable[[Any], Awaitable[Any]],
+        parse: Callable[[Any], Awaitable[Optional[Dict[str, Any]]]],
+        normalize: Callable[[Dict[str, Any]], Dict[str, Any]],
+        sink: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        fetch_workers: int = 1,
+        queue_size: int = 8,
+        batch_size: int = 50,
+        delay_seconds: float = 0.0,
+        should_cancel: Optional[Callable[[], Awaitable[bool]]] = None,
+        cancel_poll_seconds: float = 5.0,
+        max_attempts: int = 1,
+        retry_backoff_seconds: float = 1.0,
+    ):
+        self.source = source
+        self.fetch = fetch
+        self.parse = parse
+        self.normalize = normalize
+        self.sink = sink
+        self.fetch_workers = max(1, fetch_workers)
+        self.batch_size = max(1, batch_size)
+        self.delay_seconds = delay_seconds
+        self.should_cancel = should_cancel
+        self.cancel_poll_seconds = cancel_poll_seconds
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff_seconds = retry_backoff_seconds
+
+        # Ítems que agotaron los reintentos: {item, stage, error_class, ...}
+        self.failed_items: List[Dict[str, Any]] = []
+        self._retries: Set[asyncio.Task] = set()
+        self._retry_slots = asyncio.Semaphore(self.fetch_workers)
+
+        self.db_lock = asyncio.Lock()
+        self.cancelled = False
+        self._finished = asyncio.Event()
+
+        self.fetch_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.parse_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.normalize_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.sink_queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+        self.stages: Dict[str, StageMetrics] = {
+            "source": StageMetrics("source"),
+            "fetch": StageMetrics("fetch", self.fetch_queue),
+            "parse": StageMetrics("parse", self.parse_queue),
+            "normalize": StageMetrics("normalize", self.normalize_queue),
+            "sink": StageMetrics("sink", self.sink_queue),
+            # processed = recuperados al reintentar, errors = fallidos finales
+            "retry": StageMetrics("retry"),
+        }
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot de métricas por etapa"""
+        return {name: stage.to_dict() for name, stage in self.stages.items()}
+
+    async def _produce(self):
+        stage = self.stages["source"]
+        try:
+            async for item in self.source:
+                if self.cancelled:
+                    break
+                await self.fetch_queue.put(item)
+                stage.processed += 1
+        except Exception as e:
+            stage.errors += 1
+            logger.error(f"❌ Pipeline: error en la fuente: {e}")
+        finally:
+            for _ in range(self.fetch_workers):
+                await self.fetch_queue.put(_DONE)
+
+    async def _fetch_worker(self):
+        stage = self.stages["fetch"]
+        first = True
+        while True:
+            item = await self.fetch_queue.get()
+            if item is _DONE:
+                return
+
+            if not first and self.delay_seconds:
+                with profile_span("pacing"):
+                    await asyncio.sleep(self.delay_seconds)
+            first = False
+
+            started = time.monotonic()
+            try:
+                fetched = await self.fetch(item)
+                stage.processed += 1
+            except Exception as e:
+                stage.errors += 1
+                logger.warning(f"⚠️  Pipeline: error en fetch de {item}: {e}")
+                self._schedule_retry(item, "fetch", e)
+                continue
+            finally:
+                stage.busy_seconds += time.monotonic() - started
+
+            await self.parse_queue.put((item, fetched))
+
+    async def _fetch_all(self):
+        try:
+            await asyncio.gather(
+                *(self._fetch_worker() for _ in range(self.fetch_workers))
+            )
+        finally:
+            await self.parse_queue.put(_DONE)
+
+    async def _parse_item(self, fetched: Any) -> Dict[str, Any]:
+        result = await self.parse(fetched)
+        if result is None:
+            raise EmptyItemError("parse no devolvió datos")
+        return result
+
+    async def _parse_stage(self):
+        stage = self.stages["parse"]
+        try:
+            while True:
+                entry = await self.parse_queue.get()
+                if entry is _DONE:
+                    return
+
+                item, fetched = entry
+                started = time.monotonic()
+                try:
+                    result = await self._parse_item(fetched)
+                    stage.processed += 1
+                except Exception as e:
+                    stage.errors += 1
+                    logger.warning(f"⚠️  Pipeline: error en parse de {item}: {e}")
+                    self._schedule_retry(item, "parse", e)
+                    continue
+                finally:
+                    stage.busy_seconds += time.monotonic() - started
+
+                await self.normalize_queue.put(result)
+        finally:
+            # Los reintentos pendientes entregan a normalize: esperar antes
+            # de cerrar el stream
+            if self._retries:
+                await asyncio.gather(*self._retries, return_exceptions=True)
+            await self.normalize_queue.put(_DONE)
+
+    def _schedule_retry(self, item: Any, stage_name: str, error: Exception):
+        task = asyncio.create_task(self._retry(item, stage_name, error))
+        self._retries.add(task)
+
+    def _record_failure(
+        self, item: Any, stage_name: str, error: Exception, attempts: int
+    ):
+        self.stages["retry"].errors += 1
+        self.failed_items.append(
+            {
+                "item": item,
+                "stage": stage_name,
+                "error_class": type(error).__name__,
+                "error": str(error)[:1000],
+                "attempts": attempts,
+            }
+        )
+        logger.error(
+            f"❌ Pipeline: {item} falló tras {attempts} intento(s) en {stage_name}: "
+            f"{type(error).__name__}"
+        )
+
+    async def _retry(self, item: Any, stage_name: str, error: Exception):
+        """Reintenta fetch + parse de un ítem con backoff exponencial"""
+        attempt = 1
+        while attempt < self.max_attempts and not self.cancelled:
+            with profile_span("pacing"):
+                await asyncio.sleep(self.retry_backoff_seconds * 2 ** (attempt - 1))
+            attempt += 1
+
+            async with self._retry_slots:
+                stage_name = "fetch"
+                try:
+                    fetched = await self.fetch(item)
+                    stage_name = "parse"
+                    result = await self._parse_item(fetched)
+                except Exception as e:
+                    error = e
+                    logger.warning(
+                        f"⚠️  Pipeline: reintento {attempt}/{self.max_attempts} "
+                        f"de {item} falló en {stage_name}: {e}"
+                    )
+                    continue
+
+            self.stages["retry"].processed += 1
+            await self.normalize_queue.put(result)
+            return
+
+        # Cancelado: el ítem no falló, solo no se procesó
+        if not self.cancelled:
+            self._record_failure(item, stage_name, error, attempt)
+
+    async def _map_stage(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        inbox: asyncio.Queue,
+        outbox: asyncio.Queue,
+    ):
+        stage = self.stages[name]
+        try:
+            while True:
+                item = await inbox.get()
+                if item is _DONE:
+                    return
+
+                started = time.monotonic()
+                try:
+                    result = func(item)
+                    if asyncio.iscoroutine(result):
+                        result = await result
+                    stage.processed += 1
+                except Exception as e:
+                    stage.errors += 1
+                    logger.warning(f"⚠️  Pipeline: error en {name}: {e}")
+                    continue
+                finally:
+                    stage.busy_seconds += time.monotonic() - started
+
+                if result is not None:
+                    await outbox.put(result)
+        finally:
+            await outbox.put(_DONE)
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        stage = self.stages["sink"]
+        started = time.monotonic()
+        try:
+            async with self.db_lock:
+                await self.sink(batch)
+            stage.processed += len(batch)
+        except Exception as e:
+            stage.errors += len(batch)
+            logger.error(f"❌ Pipeline: error guardando lote de {len(batch)}: {e}")
+            # Las filas perdidas también quedan visibles como fallidas
+            for row in batch:
+                self._record_failure(row, "sink", e, 1)
+        finally:
+            stage.busy_seconds += time.monotonic() - started
+
+    async def _consume(self):
+        batch: List[Dict[str, Any]] = []
+        while True:
+            row = await self.sink_queue.get()
+            if row is _DONE:
+                break
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                await self._flush(batch)
+                batch = []
+
+        if batch:
+            await self._flush(batch)
+
+    async def _watch_cancellation(self):
+        # No se cancela la tarea a mitad de una query: se espera a _finished
+        while not self.cancelled:
+            try:
+                await asyncio.wait_for(
+                    self._finished.wait(), timeout=self.cancel_poll_seconds
+                )
+                return
+            except asyncio.TimeoutError:
+                pass
+            async with self.db_lock:
+                if await self.should_cancel():
+                    logger.warning("❌ Pipeline: cancelación detectada")
+                    self.cancelled = True
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Ejecuta el pipeline hasta agotar la fuente (o hasta cancelación)
+
+        Returns:
+            {'items', 'saved', 'errors', 'retried', 'failed_items',
+             'cancelled', 'stages'}. errors cuenta ítems perdidos (no los
+            errores recuperados con reintentos).
+        """
+        watcher = (
+            asyncio.create_task(self._watch_cancellation())
+            if self.should_cancel
+            else None
+        )
+
+        try:
+            await asyncio.gather(
+                self._produce(),
+                self._fetch_all(),
+                self._parse_stage(),
+                self._map_stage(
+                    "normalize", self.normalize, self.normalize_queue, self.sink_queue
+                ),
+                self._consume(),
+            )
+        finally:
+            self._finished.set()
+            if watcher:
+                await watcher
+
+        stages = self.metrics()
+        return {
+            "items": stages["source"]["processed"],
+            "saved": stages["sink"]["processed"],
+            "errors": len(self.failed_items)
+            + stages["source"]["errors"]
+            + stages["normalize"]["errors"],
+            "retried": stages["retry"]["processed"],
+            "failed_items": len(self.failed_items),
+            "cancelled": self.cancelled,
+            "stages": stages,
+        }
@@ -0,0 +1,264 @@
+"""
+Perfil de tiempos por fase de cada job de importación
+
+Los componentes marcan spans por fase y el job guarda un perfil agregado en
+import_jobs.profile (lo devuelve GET /importers/status/{job_id}):
+
+- auth: login en el proveedor
+- listing: navegación y lectura de los listados de categoría
+- navigation: navegación a páginas de detalle (y demás navegaciones)
+- extraction: extracción del DOM del detalle (incluye applications)
+- applications: tabla de aplicaciones/compatibilidades
+- save: escritura de lotes en la BD
+- pacing: esperas del rate limiter y pausas entre productos
+
+Además registra el RSS del proceso worker (al crear el profiler, en cada
+lote guardado y al final): memory.rss_peak_mb y rss_growth_mb del perfil
+permiten ver si un job largo hace crecer la memoria. Con varios jobs en
+paralelo en el mismo worker el RSS es el del proceso, no el de un job.
+
+El profiler del job en curso vive en un ContextVar, así que las tareas
+asyncio creadas por el pipeline lo heredan y los helpers no registran nada
+fuera de un job. Cada span de fase es también un span de tracing
+(importer.<fase>, ver app/core/tracing.py).
+
+Las duraciones se guardan en buckets logarítmicos: el estado es acotado y
+se puede sumar entre chunks de un mismo job (p50/p95 con ~10% de error).
+"""
+
+import math
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from app.core import tracing
+
+PHASES = (
+    "auth",
+    "listing",
+    "navigation",
+    "extraction",
+    "applications",
+    "save",
+    "pacing",
+)
+
+# Buckets: [MIN·G^i, MIN·G^(i+1)); todo lo menor a MIN cae en el bucket 0
+_BUCKET_MIN_SECONDS = 0.001
+_BUCKET_GROWTH = 1.2
+
+
+def current_rss_mb() -> float:
+    """RSS actual del proceso (en plataformas sin /proc, el pico histórico)"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _bucket(seconds: float) -> int:
+    if seconds <= _BUCKET_MIN_SECONDS:
+        return 0
+    return int(math.log(seconds / _BUCKET_MIN_SECONDS) / math.log(_BUCKET_GROWTH))
+
+
+def _bucket_value(index: int) -> float:
+    """Punto medio geométrico del bucket"""
+    return _BUCKET_MIN_SECONDS * _BUCKET_GROWTH ** (index + 0.5)
+
+
+class JobProfiler:
+    """Acumula los spans de un job (o de un chunk del job)"""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.items = 0
+        self._phases: Dict[str, Dict[str, Any]] = {}
+        self._rss_start = current_rss_mb()
+        self._rss_peak = self._rss_start
+
+    def sample_memory(self) -> float:
+        """Toma una muestra del RSS y actualiza el pico"""
+        rss = current_rss_mb()
+        self._rss_peak = max(self._rss_peak, rss)
+        return rss
+
+    def record(self, phase: str, seconds: float):
+        """Suma un span de `seconds` a la fase"""
+        stats = self._phases.setdefault(
+            phase, {"count": 0, "total": 0.0, "max": 0.0, "buckets": {}}
+        )
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        index = str(_bucket(seconds))
+        stats["buckets"][index] = stats["buckets"].get(index, 0) + 1
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def state(self) -> Dict[str, Any]:
+        """Estado serializable y sumable (ver merge_states)"""
+        rss = self.sample_memory()
+        return {
+            "wall_seconds": time.perf_counter() - self._started,
+            "items": self.items,
+            "phases": self._phases,
+            "rss": {"peak_mb": self._rss_peak, "growth_mb": rss - self._rss_start},
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return build_profile(self.state())
+
+
+current_profiler: ContextVar[Optional[JobProfiler]] = ContextVar(
+    "current_profiler", default=None
+)
+
+
+@contextmanager
+def profile_span(phase: str, **attributes: Any) -> Iterator[None]:
+    """
+    Mide el bloque como un span de `phase` del job en curso (si hay uno)
+
+    Los atributos (url, sku...) solo van al span de tracing.
+    """
+    profiler = current_profiler.get()
+    with tracing.span(f"importer.{phase}", **attributes):
+        if profiler is None:
+            yield
+            return
+        with profiler.span(phase):
+            yield
+
+
+def record_span(phase: str, seconds: float, **attributes: Any):
+    """Registra un span ya medido (ej. la espera devuelta por el limiter)"""
+    if seconds <= 0:
+        return
+    tracing.record_span(f"importer.{phase}", seconds, **attributes)
+    profiler = current_profiler.get()
+    if profiler is not None:
+        profiler.record(phase, seconds)
+
+
+def count_items(count: int):
+    """
+    Suma productos guardados al job en curso (para items_per_minute) y
+    muestrea el RSS del worker
+    """
+    profiler = current_profiler.get()
+    if profiler is not None:
+        profiler.items += count
+        profiler.sample_memory()
+
+
+def merge_states(states: Iterable[Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Suma los estados de varios profilers (chunks de un mismo job)
+
+    wall_seconds queda como la suma de los tiempos de cada chunk (tiempo de
+    worker ocupado); build_profile recibe aparte la duración real del job.
+    Del RSS se toma el máximo pico y el máximo crecimiento entre chunks.
+    """
+    merged: Dict[str, Any] = {"wall_seconds": 0.0, "items": 0, "phases": {}}
+    for state in states:
+        if not state:
+            continue
+        merged["wall_seconds"] += state.get("wall_seconds", 0.0)
+        merged["items"] += state.get("items", 0)
+        if state.get("rss"):
+            rss = merged.setdefault("rss", {"peak_mb": 0.0, "growth_mb": 0.0})
+            rss["peak_mb"] = max(rss["peak_mb"], state["rss"]["peak_mb"])
+            rss["growth_mb"] = max(rss["growth_mb"], state["rss"]["growth_mb"])
+        for phase, stats in (state.get("phases") or {}).items():
+            target = merged["phases"].setdefault(
+                phase, {"count": 0, "total": 0.0, "max": 0.0, "buckets": {}}
+            )
+            target["count"] += stats["count"]
+            target["total"] += stats["total"]
+            target["max"] = max(target["max"], stats["max"])
+            for index, count in stats["buckets"].items():
+                target["buckets"][index] = target["buckets"].get(index, 0) + count
+    return merged
+
+
+def _percentile(stats: Dict[str, Any], quantile: float) -> float:
+    rank = quantile * stats["count"]
+    seen = 0
+    for index in sorted(stats["buckets"], key=int):
+        seen += stats["buckets"][index]
+        if seen >= rank:
+            return min(_bucket_value(int(index)), stats["max"])
+    return stats["max"]
+
+
+def build_profile(
+    state: Dict[str, Any], wall_seconds: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Perfil agregado que se guarda en import_jobs.profile
+
+    share es total / wall por fase: con fetch en paralelo (o chunks en
+    paralelo) la suma de las fases puede superar 1.
+
+    Args:
+        state: Estado de JobProfiler.state o merge_states
+        wall_seconds: Duración real del job (default: la del estado)
+
+    Returns:
+        {'wall_seconds', 'busy_seconds', 'items', 'items_per_minute',
+         'phases': {fase: {'count', 'total_seconds', 'share', 'p50', 'p95',
+         'max'}}, 'memory': {'rss_peak_mb', 'rss_growth_mb'}}
+    """
+    busy_seconds = state.get("wall_seconds", 0.0)
+    wall = wall_seconds if wall_seconds is not None else busy_seconds
+    items = state.get("items", 0)
+    rss = state.get("rss")
+
+    phases = {}
+    ordered = sorted(
+        state.get("phases", {}),
+        key=lambda phase: PHASES.index(phase) if phase in PHASES else len(PHASES),
+    )
+    for phase in ordered:
+        stats = state["phases"][phase]
+        if not stats["count"]:
+            continue
+        phases[phase] = {
+            "count": stats["count"],
+            "total_seconds": round(stats["total"], 3),
+            "share": round(stats["total"] / wall, 3) if wall else None,
+            "p50": round(_percentile(stats, 0.5), 3),
+            "p95": round(_percentile(stats, 0.95), 3),
+            "max": round(stats["max"], 3),
+        }
+
+    memory = None
+    if rss:
+        memory = {
+            "rss_peak_mb": round(rss["peak_mb"], 1),
+            "rss_growth_mb": round(rss["growth_mb"], 1),
+        }
+
+    return {
+        "wall_seconds": round(wall, 3),
+        "busy_seconds": round(busy_seconds, 3),
+        "items": items,
+        "items_per_minute": round(items / (wall / 60), 2) if wall else None,
+        "phases": phases,
+        "memory": memory,
+    }
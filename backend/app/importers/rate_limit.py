@@ -0,0 +1,177 @@
+"""
+Rate limiter distribuido por proveedor (token bucket en Redis)
+
+Todos los workers (threads y hosts) que scrapean un mismo proveedor
+comparten un bucket en Redis, así que el techo de requests por segundo se
+respeta aunque haya varios chunks en paralelo. El bucket se actualiza con
+un script Lua (atómico) usando la hora del servidor Redis.
+
+Si Redis no responde se cae a un bucket local del proceso con la misma tasa.
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.redis import get_redis
+
+# Reserva un token: el bucket puede quedar en negativo y el llamador espera
+# el tiempo necesario para "pagar" la deuda (orden FIFO, un solo round-trip).
+# Devuelve la espera en milisegundos.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000) - 1
+
+local wait = 0
+if tokens < 0 then
+    wait = math.ceil(-tokens * 1000 / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((burst - tokens) * 1000 / rate) + 1000)
+return wait
+"""
+
+# Estadísticas acumuladas por importador en este proceso
+_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "acquired": 0,
+        "waited": 0,
+        "wait_seconds": 0.0,
+        "max_wait_seconds": 0.0,
+        "fallback": 0,
+    }
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """Estadísticas de espera por importador acumuladas en este proceso"""
+    return {name: dict(stats) for name, stats in _stats.items()}
+
+
+class SupplierRateLimiter:
+    """
+    Token bucket compartido por importador
+
+    Args:
+        importer_name: Nombre del importador (clave del bucket)
+        rate_per_second: Requests por segundo sostenidos
+        burst: Capacidad del bucket (requests seguidos sin esperar)
+    """
+
+    def __init__(self, importer_name: str, rate_per_second: float, burst: int):
+        self.importer_name = importer_name.upper()
+        self.rate_per_second = max(rate_per_second, 0.01)
+        self.burst = max(burst, 1)
+        self.key = f"ratelimit:supplier:{self.importer_name}"
+
+        # Fallback local si Redis no está disponible
+        self._local_next_at = 0.0
+        self._local_lock = asyncio.Lock()
+        self._script = None
+
+        # Estadísticas de esta instancia (job) y acumuladas del proceso
+        self.stats = _empty_stats()
+        self._process_stats = _stats.setdefault(self.importer_name, _empty_stats())
+
+    async def _reserve_redis(self) -> float:
+        if self._script is None:
+            self._script = get_redis().register_script(TOKEN_BUCKET_LUA)
+        wait_ms = await self._script(
+            keys=[self.key], args=[self.rate_per_second, self.burst]
+        )
+        return int(wait_ms) / 1000
+
+    async def _reserve_local(self) -> float:
+        async with self._local_lock:
+            now = time.monotonic()
+            interval = 1 / self.rate_per_second
+            start_at = max(now, self._local_next_at)
+            self._local_next_at = start_at + interval
+            return start_at - now
+
+    async def acquire(self) -> float:
+        """
+        Espera hasta obtener un token para un request al proveedor
+
+        Returns:
+            Segundos esperados
+        """
+        try:
+            wait = await self._reserve_redis()
+        except Exception as e:
+            if not self.stats["fallback"]:
+                logger.warning(
+                    f"⚠️  Rate limiter sin Redis ({e}); usando límite local "
+                    f"para {self.importer_name}"
+                )
+            self.stats["fallback"] += 1
+            self._process_stats["fallback"] += 1
+            wait = await self._reserve_local()
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        for stats in (self.stats, self._process_stats):
+            stats["acquired"] += 1
+            if wait > 0:
+                stats["waited"] += 1
+                stats["wait_seconds"] = round(stats["wait_seconds"] + wait, 3)
+                stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait)
+        return wait
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estadísticas de este importador para el result del job"""
+        return {
+            "rate_per_second": self.rate_per_second,
+            "burst": self.burst,
+            **self.stats,
+        }
+
+
+async def build_rate_limiter(db: Any, importer_name: str) -> SupplierRateLimiter:
+    """
+    Crea el limiter de un importador con la tasa de su ImporterConfig
+
+    Sin valores en ImporterConfig se usan SUPPLIER_RATE_LIMIT_PER_SECOND y
+    SUPPLIER_RATE_LIMIT_BURST.
+    """
+    from app.models import Importer, ImporterConfig
+    from sqlalchemy import select
+
+    rate: Optional[float] = None
+    burst: Optional[int] = None
+    try:
+        result = await db.execute(
+            select(ImporterConfig.rate_limit_per_second, ImporterConfig.rate_limit_burst)
+            .join(Importer, Importer.id == ImporterConfig.importer_id)
+            .where(Importer.name == importer_name.upper())
+        )
+        row = result.one_or_none()
+        if row:
+            rate, burst = row
+    except Exception as e:
+        await db.rollback()
+        logger.warning(f"⚠️  No se pudo leer el rate limit de {importer_name}: {e}")
+
+    return SupplierRateLimiter(
+        importer_name,
+        rate_per_second=rate or settings.SUPPLIER_RATE_LIMIT_PER_SECOND,
+        burst=burst or settings.SUPPLIER_RATE_LIMIT_BURST,
+    )
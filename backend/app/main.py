@@ -2,14 +2,18 @@
 Aplicación principal FastAPI
 """
 
+import time
 from contextlib import asynccontextmanager
 
 from app.api.v1 import api_router
 from app.core.config import settings
 from app.core.database import Base, engine
 from app.core.logger import logger
-from fastapi import FastAPI
+from app.core.metrics import HTTP_REQUEST_SECONDS, update_queue_depth
+from app.core.tracing import setup_tracing
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 
 @asynccontextmanager
@@ -62,6 +66,41 @@ app.add_middleware(
 # Incluir routers
 app.include_router(api_router, prefix="/api/v1")
 
+# Tracing: spans por ruta y contexto propagado a las tareas Celery
+setup_tracing("syncar-api", app=app)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Latencia por ruta (la plantilla, no la URL: /products/{product_id})"""
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        ).observe(time.perf_counter() - started)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas Prometheus de la API (incluye la profundidad de las colas)"""
+    if not settings.METRICS_ENABLED:
+        return Response(status_code=404)
+
+    try:
+        await update_queue_depth()
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudo leer la profundidad de las colas: {e}")
+
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 
 # Health check
 @app.get("/health")
@@ -7,8 +7,20 @@ from datetime import datetime
 from typing import List, Optional
 
 from app.core.database import Base
-from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy import Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -39,6 +51,8 @@ class JobType(str, enum.Enum):
 
     CATEGORIES = "categories"
     PRODUCTS = "products"
+    RETRY_FAILED = "retry_failed"  # Reprocesa solo los failed_items pendientes
+    QUICK_REFRESH = "quick_refresh"  # Solo precio y stock desde los listados
 
 
 # ===== MODELOS =====
@@ -175,6 +189,13 @@ class Category(Base):
     selected: Mapped[bool] = mapped_column(
         Boolean, default=False
     )  # Para guardar selección del usuario
+
+    # Tasa de cambio aprendida (cambios de precio/stock por SKU y día, EMA)
+    # y último refresh completo: los usa el scheduler de refresh
+    change_rate: Mapped[Optional[float]] = mapped_column(Float)
+    last_refreshed_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True)
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -199,7 +220,7 @@ class Product(Base):
         Integer, ForeignKey("importers.id"), nullable=False
     )
     category_id: Mapped[Optional[int]] = mapped_column(
-        Integer, ForeignKey("categories.id")
+        Integer, ForeignKey("categories.id"), index=True
     )
 
     # Información básica
@@ -222,7 +243,7 @@ class Product(Base):
 
     # Imágenes
     image_url: Mapped[Optional[str]] = mapped_column(String(500))
-    images: Mapped[Optional[dict]] = mapped_column(JSON)
+    images: Mapped[Optional[list]] = mapped_column(JSONB)
 
     # Metadata adicional
     brand: Mapped[Optional[str]] = mapped_column(String(100))
@@ -230,8 +251,11 @@ class Product(Base):
     year_start: Mapped[Optional[int]] = mapped_column(Integer)
     year_end: Mapped[Optional[int]] = mapped_column(Integer)
 
-    # Datos adicionales flexibles
-    extra_data: Mapped[Optional[dict]] = mapped_column(JSON)
+    # Datos adicionales flexibles (JSONB: indexable y consultable con @>)
+    extra_data: Mapped[Optional[dict]] = mapped_column(JSONB)
+
+    # Hash del payload normalizado del scraping (detecta re-scrapes sin cambios)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64))
 
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
@@ -241,6 +265,8 @@ class Product(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
     last_scraped_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    # Última vez que el SKU apareció en el listado del proveedor
+    last_seen_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relaciones
     importer: Mapped["Importer"] = relationship("Importer", back_populates="products")
@@ -248,6 +274,52 @@ class Product(Base):
         "Category", back_populates="products"
     )
 
+    __table_args__ = (
+        # GIN sobre extra_data para filtros por contención (@>):
+        # is_offer, characteristics, applications, origin...
+        Index(
+            "ix_products_extra_data_gin",
+            "extra_data",
+            postgresql_using="gin",
+            postgresql_ops={"extra_data": "jsonb_path_ops"},
+        ),
+        # Índice parcial para listar ofertas por importador
+        Index(
+            "ix_products_offers",
+            "importer_id",
+            postgresql_where=text("extra_data @> '{\"is_offer\": true}'"),
+        ),
+        # Un SKU por importador: destino del INSERT ... ON CONFLICT de la
+        # ingesta por staging
+        Index("uq_products_importer_sku", "importer_id", "sku", unique=True),
+    )
+
+
+class ProductPriceHistory(Base):
+    """
+    Historial append-only de precio y stock
+
+    Solo se inserta una fila cuando el precio o el stock cambian respecto
+    al último valor guardado. Tabla particionada por mes (recorded_at).
+    """
+
+    __tablename__ = "product_price_history"
+
+    product_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    recorded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), primary_key=True, server_default=func.now()
+    )
+    importer_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    price: Mapped[Optional[float]] = mapped_column(Float)
+    stock: Mapped[Optional[int]] = mapped_column(Integer)
+
+    __table_args__ = (
+        Index("ix_product_price_history_importer_recorded", "importer_id", "recorded_at"),
+        {"postgresql_partition_by": "RANGE (recorded_at)"},
+    )
+
 
 class ImportJob(Base):
     """Modelo de trabajos de importación"""
@@ -277,8 +349,10 @@ class ImportJob(Base):
     processed_items: Mapped[int] = mapped_column(Integer, default=0)
 
     # Resultados
-    result: Mapped[Optional[dict]] = mapped_column(JSON)
+    result: Mapped[Optional[dict]] = mapped_column(JSONB)
     error_message: Mapped[Optional[str]] = mapped_column(Text)
+    # Perfil de tiempos por fase (app/importers/profiling.py)
+    profile: Mapped[Optional[dict]] = mapped_column(JSONB)
 
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
@@ -286,6 +360,8 @@ class ImportJob(Base):
     )
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    # Último heartbeat del lease mientras una tarea del job corre
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
     # Relaciones
     importer: Mapped["Importer"] = relationship("Importer", back_populates="jobs")
@@ -294,6 +370,56 @@ class ImportJob(Base):
     )
 
 
+class FailedItem(Base):
+    """
+    Ítems (SKUs) que fallaron tras agotar los reintentos dentro del job
+
+    Una fila por SKU e importador: si vuelve a fallar se actualiza el error
+    y se suma failure_count. Queda resuelta (resolved_at) cuando un import
+    posterior guarda el SKU, p. ej. un job RETRY_FAILED.
+    """
+
+    __tablename__ = "failed_items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    importer_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("importers.id", ondelete="CASCADE"), nullable=False
+    )
+    category_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("categories.id", ondelete="SET NULL")
+    )
+    sku: Mapped[str] = mapped_column(String(100), nullable=False)
+    url: Mapped[Optional[str]] = mapped_column(String(500))
+
+    # Último error: etapa del pipeline (fetch/parse), clase y mensaje
+    stage: Mapped[str] = mapped_column(String(20), nullable=False)
+    error_class: Mapped[str] = mapped_column(String(100), nullable=False)
+    error_message: Mapped[Optional[str]] = mapped_column(Text)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    failure_count: Mapped[int] = mapped_column(Integer, default=1)
+    job_id: Mapped[Optional[str]] = mapped_column(String(100))
+
+    first_failed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    last_failed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    resolved_job_id: Mapped[Optional[str]] = mapped_column(String(100))
+
+    __table_args__ = (
+        Index("uq_failed_items_importer_sku", "importer_id", "sku", unique=True),
+        # Pendientes por importador (lo que reprocesa RETRY_FAILED)
+        Index(
+            "ix_failed_items_pending",
+            "importer_id",
+            "category_id",
+            postgresql_where=text("resolved_at IS NULL"),
+        ),
+    )
+
+
 class JobLog(Base):
     """Logs de los trabajos de importación"""
 
@@ -338,6 +464,10 @@ class ImporterConfig(Base):
     scraping_speed_ms: Mapped[int] = mapped_column(Integer, default=1000)
     category_order: Mapped[Optional[List[str]]] = mapped_column(JSON)
 
+    # Rate limit compartido por todos los workers (None = valor de settings)
+    rate_limit_per_second: Mapped[Optional[float]] = mapped_column(Float)
+    rate_limit_burst: Mapped[Optional[int]] = mapped_column(Integer)
+
     # Configuración adicional
     extra_config: Mapped[Optional[dict]] = mapped_column(JSON)
 
@@ -0,0 +1,554 @@
+"""
+Generador de catálogo sintético para pruebas a escala de producción
+
+Llena la BD con importadores, categorías, productos (aplicaciones,
+características, origen y OEM en extra_data), historial de precio/stock,
+jobs de importación y sus logs. Las distribuciones imitan las de los
+proveedores: pocas categorías concentran la mayoría de los SKUs, ~35% de
+productos sin stock, precios CLP log-normales y varias aplicaciones por
+producto.
+
+Los productos se cargan con COPY (igual que la ingesta por staging) y el
+historial se genera en el servidor con generate_series, así que millones
+de filas toman minutos.
+
+Uso (desde backend/, con la BD migrada):
+    python -m app.scripts.generate_catalog --products 2000000
+    python -m app.scripts.generate_catalog --importers EMASA NORIEGA --products 500000
+    python -m app.scripts.generate_catalog --purge
+
+Todo lo generado lleva prefijo SYN-/syn- (SKUs, slugs y job_id) y se borra
+con --purge. No corre con ENVIRONMENT=production.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Tuple
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logger import logger
+from app.importers.parsing import slugify
+from app.importers.persistence import ensure_price_history_partition
+from app.models import (
+    Category,
+    Importer,
+    ImporterType,
+    ImportJob,
+    JobStatus,
+    JobType,
+    Product,
+)
+from sqlalchemy import func, insert, select, text
+
+SKU_PREFIX = "SYN-"
+
+BASE_URLS = {
+    ImporterType.ALSACIA: "https://www.alsacia.cl",
+    ImporterType.REFAX: "https://www.refax.cl",
+    ImporterType.NORIEGA: "https://ecommerce.noriegavanzulli.cl/b2b/",
+    ImporterType.EMASA: "https://ecommerce.emasa.cl/b2b/",
+}
+
+PART_TYPES = [
+    "Pastilla de freno",
+    "Disco de freno",
+    "Filtro de aceite",
+    "Filtro de aire",
+    "Filtro de combustible",
+    "Amortiguador",
+    "Bujía",
+    "Correa de distribución",
+    "Kit de embrague",
+    "Bomba de agua",
+    "Rodamiento de rueda",
+    "Terminal de dirección",
+    "Rótula",
+    "Radiador",
+    "Sensor de oxígeno",
+    "Bobina de encendido",
+    "Empaquetadura de culata",
+    "Soporte de motor",
+    "Bieleta",
+    "Cazoleta",
+]
+
+POSITIONS = ["delantero", "trasero", "izquierdo", "derecho", "", "", ""]
+
+PART_BRANDS = [
+    "BOSCH",
+    "FRASLE",
+    "TRW",
+    "NGK",
+    "GATES",
+    "SKF",
+    "MONROE",
+    "KYB",
+    "VALEO",
+    "DENSO",
+    "MAHLE",
+    "NIPPON",
+]
+
+CAR_MODELS = {
+    "TOYOTA": ["YARIS", "COROLLA", "HILUX", "RAV4"],
+    "NISSAN": ["V16", "SENTRA", "NAVARA", "TIIDA"],
+    "CHEVROLET": ["SAIL", "SPARK", "AVEO", "D-MAX"],
+    "HYUNDAI": ["ACCENT", "TUCSON", "ELANTRA", "H-1"],
+    "KIA": ["RIO", "MORNING", "SPORTAGE", "FRONTIER"],
+    "SUZUKI": ["SWIFT", "ALTO", "BALENO", "GRAND VITARA"],
+    "MAZDA": ["3", "6", "BT-50", "CX-5"],
+    "PEUGEOT": ["208", "301", "PARTNER", "3008"],
+}
+
+CHARACTERISTICS = [
+    "Cerámica",
+    "Semimetálica",
+    "Con sensor",
+    "Sin sensor",
+    "Ventilado",
+    "Sólido",
+    "Gas",
+    "Hidráulico",
+    "12V",
+    "Original",
+]
+
+ORIGINS = ["JAPON", "COREA", "CHINA", "BRASIL", "ALEMANIA", "TAIWAN", "INDIA"]
+
+LOG_MESSAGES = [
+    ("INFO", "📦 SKU {sku} guardado"),
+    ("INFO", "📄 Página {page} del listado procesada"),
+    ("INFO", "✅ Categoría {category} completada"),
+    ("WARNING", "⚠️  Timeout abriendo el detalle de {sku}, reintentando"),
+    ("WARNING", "⚠️  SKU {sku} sin imágenes"),
+    ("ERROR", "❌ {sku} falló tras 3 intento(s) en fetch: TimeoutError"),
+]
+LOG_WEIGHTS = [60, 20, 10, 5, 3, 2]
+
+PRODUCT_COPY_COLUMNS = (
+    "importer_id",
+    "category_id",
+    "sku",
+    "name",
+    "description",
+    "price",
+    "currency",
+    "stock",
+    "available",
+    "url",
+    "image_url",
+    "images",
+    "brand",
+    "extra_data",
+    "created_at",
+    "updated_at",
+    "last_scraped_at",
+    "last_seen_at",
+)
+
+JOB_LOG_COPY_COLUMNS = ("job_id", "level", "message", "timestamp")
+
+# Historial: puntos aleatorios en la ventana, precio ±15% y stock ±5
+HISTORY_SQL = text(
+    """
+    INSERT INTO product_price_history (
+        product_id, recorded_at, importer_id, price, stock
+    )
+    SELECT p.id,
+           now() - random() * :days * interval '1 day',
+           p.importer_id,
+           round((p.price * (0.85 + random() * 0.3))::numeric, -1),
+           greatest(0, coalesce(p.stock, 0) + (random() * 10 - 5)::int)
+    FROM products p
+    CROSS JOIN LATERAL generate_series(
+        1, (1 + random() * 2 * :points + p.id * 0)::int
+    ) AS g(n)
+    WHERE p.id > :first_id AND p.id <= :last_id
+    ON CONFLICT DO NOTHING
+    """
+)
+
+PRODUCT_COUNT_SQL = text(
+    """
+    UPDATE categories c SET product_count = s.total
+    FROM (
+        SELECT category_id, count(*) AS total FROM products
+        WHERE sku LIKE :prefix GROUP BY category_id
+    ) s
+    WHERE c.id = s.category_id
+    """
+)
+
+
+async def _copy(db, table: str, columns: Tuple[str, ...], records: List[tuple]):
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table, records=records, columns=list(columns)
+    )
+
+
+async def ensure_importers(db, names: List[str]) -> List[Importer]:
+    """Importadores pedidos (los crea si no existen)"""
+    importers = []
+    for name in names:
+        importer_type = ImporterType(name.upper())
+        importer = await db.scalar(
+            select(Importer).where(Importer.name == importer_type)
+        )
+        if importer is None:
+            importer = Importer(
+                name=importer_type,
+                display_name=importer_type.value.title(),
+                base_url=BASE_URLS[importer_type],
+            )
+            db.add(importer)
+            await db.flush()
+        importers.append(importer)
+    await db.commit()
+    return importers
+
+
+async def create_categories(
+    db, rnd: random.Random, importers: List[Importer], per_importer: int, tag: str
+) -> List[Tuple[int, int, float]]:
+    """
+    Categorías por importador con tamaños de cola larga (Pareto)
+
+    Returns:
+        [(category_id, importer_id, peso)]
+    """
+    categories = []
+    for importer in importers:
+        rows = []
+        for index in range(per_importer):
+            part = rnd.choice(PART_TYPES)
+            car_brand = rnd.choice(list(CAR_MODELS))
+            name = f"{part} {car_brand} {index}"
+            rows.append(
+                {
+                    "importer_id": importer.id,
+                    "name": name,
+                    "slug": f"syn-{tag}-{slugify(name)}",
+                    "url": f"{importer.base_url}familia.aspx?cod_familia={index}",
+                    "external_id": f"SYN{tag}{index}",
+                    "selected": rnd.random() < 0.3,
+                    "change_rate": round(rnd.lognormvariate(-3, 1), 4),
+                }
+            )
+        result = await db.execute(insert(Category).returning(Category.id), rows)
+        for category_id in result.scalars():
+            categories.append((category_id, importer.id, rnd.paretovariate(1.2)))
+    await db.commit()
+    logger.info(f"📁 {len(categories)} categorías creadas")
+    return categories
+
+
+def build_product(
+    rnd: random.Random,
+    sku: str,
+    importer_id: int,
+    category_id: int,
+    now: datetime,
+    days: int,
+) -> tuple:
+    """Fila de products (en el orden de PRODUCT_COPY_COLUMNS)"""
+    part = rnd.choice(PART_TYPES)
+    brand = rnd.choice(PART_BRANDS)
+    car_brand = rnd.choice(list(CAR_MODELS))
+    car_model = rnd.choice(CAR_MODELS[car_brand])
+    name = f"{part} {rnd.choice(POSITIONS)}".strip().upper()
+
+    applications = []
+    for _ in range(min(int(rnd.expovariate(1 / 3)), 20)):
+        app_brand = rnd.choice(list(CAR_MODELS))
+        year_start = rnd.randint(1995, 2022)
+        applications.append(
+            {
+                "car_brand": app_brand,
+                "car_model": rnd.choice(CAR_MODELS[app_brand]),
+                "year_start": year_start,
+                "year_end": (
+                    year_start + rnd.randint(0, 10) if rnd.random() < 0.7 else None
+                ),
+            }
+        )
+
+    draw = rnd.random()
+    if draw < 0.35:
+        stock = 0
+    elif draw < 0.40:
+        stock = 999
+    else:
+        stock = int(rnd.expovariate(1 / 15)) + 1
+
+    images = [
+        f"https://cdn.syncar.test/{sku}_{index}.jpg"
+        for index in range(rnd.choice([0, 1, 1, 2, 3, 4]))
+    ]
+    extra_data = {
+        "applications": applications,
+        "characteristics": rnd.sample(CHARACTERISTICS, rnd.randint(0, 3)),
+        "is_offer": rnd.random() < 0.05,
+        "origin": rnd.choice(ORIGINS),
+        "oem": [f"{rnd.randint(10000, 99999)}-{rnd.randint(100, 999)}"],
+    }
+
+    created_at = now - timedelta(days=rnd.uniform(0, days))
+    updated_at = created_at + (now - created_at) * rnd.random()
+    scraped_at = now - timedelta(hours=rnd.uniform(0, 72))
+
+    return (
+        importer_id,
+        category_id,
+        sku,
+        f"{name} {car_brand} {car_model}",
+        f"{name} {brand} para {car_brand} {car_model}",
+        float(round(rnd.lognormvariate(10.2, 0.9), -1)),
+        "CLP",
+        stock,
+        True,
+        f"https://proveedor.test/detalle?item={sku}",
+        images[0] if images else None,
+        json.dumps(images),
+        brand,
+        json.dumps(extra_data, ensure_ascii=False),
+        created_at,
+        updated_at,
+        scraped_at,
+        scraped_at,
+    )
+
+
+async def copy_products(
+    db,
+    rnd: random.Random,
+    categories: List[Tuple[int, int, float]],
+    total: int,
+    batch_size: int,
+    days: int,
+    tag: str,
+):
+    """Carga `total` productos repartidos por peso de categoría"""
+    now = datetime.now(timezone.utc)
+    cum_weights = []
+    acc = 0.0
+    for _, _, weight in categories:
+        acc += weight
+        cum_weights.append(acc)
+
+    started = time.monotonic()
+    for offset in range(0, total, batch_size):
+        count = min(batch_size, total - offset)
+        picked = rnd.choices(categories, cum_weights=cum_weights, k=count)
+        records = [
+            build_product(
+                rnd,
+                f"{SKU_PREFIX}{tag}-{offset + index:08d}",
+                importer_id,
+                category_id,
+                now,
+                days,
+            )
+            for index, (category_id, importer_id, _) in enumerate(picked)
+        ]
+        await _copy(db, "products", PRODUCT_COPY_COLUMNS, records)
+        await db.commit()
+
+        done = offset + count
+        rate = done / max(time.monotonic() - started, 1e-6)
+        logger.info(f"📦 {done:,}/{total:,} productos ({rate:,.0f}/s)")
+
+    await db.execute(PRODUCT_COUNT_SQL, {"prefix": f"{SKU_PREFIX}%"})
+    await db.commit()
+
+
+async def generate_history(
+    db, first_id: int, last_id: int, days: int, points: int, step: int
+):
+    """Historial de precio/stock de los productos con id en (first_id, last_id]"""
+    now = datetime.now(timezone.utc)
+    month = now - timedelta(days=days)
+    while month <= now + timedelta(days=31):
+        await ensure_price_history_partition(db, month)
+        month += timedelta(days=28)
+    await db.commit()
+
+    for start in range(first_id, last_id, step):
+        end = min(start + step, last_id)
+        await db.execute(
+            HISTORY_SQL,
+            {"days": days, "points": points, "first_id": start, "last_id": end},
+        )
+        await db.commit()
+        logger.info(f"📈 Historial: productos hasta id {end:,}/{last_id:,}")
+
+
+async def create_jobs(
+    db,
+    rnd: random.Random,
+    importers: List[Importer],
+    categories: List[Tuple[int, int, float]],
+    per_importer: int,
+    logs_per_job: int,
+    days: int,
+):
+    """Jobs terminados (la mayoría exitosos) con sus logs"""
+    now = datetime.now(timezone.utc)
+    job_types = [JobType.PRODUCTS, JobType.QUICK_REFRESH, JobType.CATEGORIES]
+    statuses = [JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED]
+
+    for importer in importers:
+        own = [c for c in categories if c[1] == importer.id]
+        jobs = []
+        for _ in range(per_importer):
+            started_at = now - timedelta(days=rnd.uniform(0, days))
+            processed = rnd.randint(50, 20_000)
+            selected = [str(c[0]) for c in rnd.sample(own, min(len(own), 10))]
+            jobs.append(
+                {
+                    "job_id": f"syn-{uuid.uuid4()}",
+                    "importer_id": importer.id,
+                    "job_type": rnd.choices(job_types, weights=[70, 25, 5])[0],
+                    "status": rnd.choices(statuses, weights=[90, 7, 3])[0],
+                    "params": {"selected_categories": selected},
+                    "progress": 100,
+                    "total_items": processed,
+                    "processed_items": processed,
+                    "result": {"success": True, "total": processed},
+                    "created_at": started_at,
+                    "started_at": started_at,
+                    "completed_at": started_at
+                    + timedelta(seconds=processed * rnd.uniform(0.5, 3)),
+                }
+            )
+        result = await db.execute(
+            insert(ImportJob).returning(ImportJob.id, ImportJob.started_at), jobs
+        )
+
+        records = []
+        for job_pk, started_at in result:
+            for index in range(logs_per_job):
+                level, template = rnd.choices(LOG_MESSAGES, weights=LOG_WEIGHTS)[0]
+                message = template.format(
+                    sku=f"{SKU_PREFIX}{rnd.randint(0, 10**7):08d}",
+                    page=rnd.randint(1, 200),
+                    category=rnd.choice(PART_TYPES),
+                )
+                records.append(
+                    (job_pk, level, message, started_at + timedelta(seconds=index))
+                )
+        await _copy(db, "job_logs", JOB_LOG_COPY_COLUMNS, records)
+        await db.commit()
+        logger.info(
+            f"🧾 {importer.name.value}: {len(jobs)} jobs y {len(records):,} logs"
+        )
+
+
+async def purge(db):
+    """Borra todo lo generado (el historial cae en cascada con los productos)"""
+    await db.execute(
+        text(
+            "DELETE FROM job_logs WHERE job_id IN "
+            "(SELECT id FROM import_jobs WHERE job_id LIKE 'syn-%')"
+        )
+    )
+    await db.execute(text("DELETE FROM import_jobs WHERE job_id LIKE 'syn-%'"))
+    deleted = await db.execute(
+        text("DELETE FROM products WHERE sku LIKE :prefix"),
+        {"prefix": f"{SKU_PREFIX}%"},
+    )
+    await db.execute(text("DELETE FROM categories WHERE slug LIKE 'syn-%'"))
+    await db.commit()
+    logger.info(f"🧹 {deleted.rowcount:,} productos sintéticos eliminados")
+
+
+async def generate(args: argparse.Namespace) -> Dict[str, Any]:
+    rnd = random.Random(args.seed)
+    # Distinto en cada corrida: SKUs y slugs no chocan con cargas anteriores
+    tag = uuid.uuid4().hex[:4]
+    started = time.monotonic()
+
+    async with AsyncSessionLocal() as db:
+        if args.purge:
+            await purge(db)
+            return {"purged": True}
+
+        importers = await ensure_importers(db, args.importers)
+        categories = await create_categories(
+            db, rnd, importers, args.categories, tag
+        )
+
+        first_id = await db.scalar(select(func.coalesce(func.max(Product.id), 0)))
+        await copy_products(
+            db, rnd, categories, args.products, args.batch_size, args.days, tag
+        )
+        last_id = await db.scalar(select(func.coalesce(func.max(Product.id), 0)))
+
+        if args.history_points:
+            await generate_history(
+                db, first_id, last_id, args.days, args.history_points, 200_000
+            )
+        if args.jobs:
+            await create_jobs(
+                db, rnd, importers, categories, args.jobs, args.logs_per_job, args.days
+            )
+
+        for table in ("products", "product_price_history", "categories", "job_logs"):
+            await db.execute(text(f"ANALYZE {table}"))
+        await db.commit()
+
+    summary = {
+        "importers": [importer.name.value for importer in importers],
+        "categories": len(categories),
+        "products": args.products,
+        "seconds": round(time.monotonic() - started, 1),
+    }
+    logger.info(f"✅ Catálogo sintético generado: {summary}")
+    return summary
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Genera un catálogo sintético")
+    parser.add_argument(
+        "--importers",
+        nargs="+",
+        default=[importer.value for importer in ImporterType],
+        help="Importadores a poblar (default: todos)",
+    )
+    parser.add_argument("--products", type=int, default=1_000_000)
+    parser.add_argument("--categories", type=int, default=300, help="Por importador")
+    parser.add_argument(
+        "--history-points",
+        type=int,
+        default=4,
+        help="Puntos de historial promedio por producto (0 = sin historial)",
+    )
+    parser.add_argument("--days", type=int, default=180, help="Antigüedad máxima")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs por importador")
+    parser.add_argument("--logs-per-job", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--purge", action="store_true", help="Borra lo generado y termina"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    if settings.is_production:
+        logger.error("❌ El generador no corre con ENVIRONMENT=production")
+        return 1
+    asyncio.run(generate(parse_args(argv)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
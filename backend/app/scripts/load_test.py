@@ -0,0 +1,365 @@
+"""
+Prueba de carga de la API de catálogo
+
+Reproduce una mezcla de requests parecida a la del frontend (listados de
+productos con filtros, búsquedas, filtros por aplicación, detalle,
+historial de precios, categorías y polling del estado de jobs) con N
+clientes concurrentes, y reporta por escenario p50/p95/p99, máximo,
+requests por segundo y tasa de error.
+
+Los IDs (productos, categorías, jobs) se toman de la propia API al
+arrancar, así que sirve tanto contra un catálogo real como contra uno
+generado con app.scripts.generate_catalog.
+
+Uso (desde backend/):
+    python -m app.scripts.load_test --base-url http://localhost:8000 \\
+        --concurrency 50 --duration 60
+    python -m app.scripts.load_test --mix products_search=50,job_status=20 \\
+        --requests 5000 --json resultados.json
+
+Con --fail-p95-ms / --fail-error-rate el proceso termina con código 1 si
+algún escenario supera el umbral (útil para comparar antes/después de un
+cambio de índices o queries).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from app.scripts.generate_catalog import CAR_MODELS, PART_TYPES
+
+API_PREFIX = "/api/v1"
+
+# Escenario -> peso por defecto (proporción aproximada del tráfico real)
+DEFAULT_MIX = {
+    "products_list": 15,
+    "products_by_category": 20,
+    "products_search": 20,
+    "products_by_application": 10,
+    "product_detail": 10,
+    "price_history": 5,
+    "categories": 10,
+    "job_status": 10,
+}
+
+
+@dataclass
+class Targets:
+    """IDs reales para armar los requests"""
+
+    importers: List[str] = field(default_factory=list)
+    categories: List[Tuple[str, int]] = field(default_factory=list)
+    product_ids: List[int] = field(default_factory=list)
+    skus: List[str] = field(default_factory=list)
+    job_ids: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ScenarioStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    status_codes: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, seconds: float, status_code: Optional[int]):
+        self.latencies.append(seconds)
+        if status_code is not None:
+            self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+
+
+def percentile(sorted_values: List[float], quantile: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(quantile * len(sorted_values)), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def discover_targets(client: httpx.AsyncClient, sample: int) -> Targets:
+    """Toma categorías, productos y jobs existentes para los escenarios"""
+    targets = Targets()
+
+    response = await client.get(f"{API_PREFIX}/categories")
+    response.raise_for_status()
+    for category in response.json()["categories"]:
+        if category.get("importer"):
+            targets.categories.append((category["importer"], category["id"]))
+    targets.importers = sorted({importer for importer, _ in targets.categories})
+
+    # Productos de distintas "páginas" para no pegarle siempre a los mismos
+    for skip in (0, 1_000, 10_000, 100_000):
+        response = await client.get(
+            f"{API_PREFIX}/products", params={"skip": skip, "limit": sample}
+        )
+        if response.status_code != 200:
+            break
+        products = response.json()["products"]
+        targets.product_ids.extend(product["id"] for product in products)
+        targets.skus.extend(product["sku"] for product in products)
+        if len(products) < sample:
+            break
+
+    response = await client.get(f"{API_PREFIX}/dev/import-jobs", params={"limit": 200})
+    if response.status_code == 200:
+        targets.job_ids = [job["job_id"] for job in response.json().get("jobs", [])]
+
+    return targets
+
+
+def build_scenarios(
+    targets: Targets,
+) -> Dict[str, Callable[[random.Random], Tuple[str, Dict[str, Any]]]]:
+    """Escenario -> función que arma (path, params) de un request"""
+
+    def products_list(rnd):
+        return "/products", {"skip": rnd.choice([0, 0, 0, 100, 500]), "limit": 50}
+
+    def products_by_category(rnd):
+        importer, category_id = rnd.choice(targets.categories)
+        return "/products", {
+            "importer": importer,
+            "category": category_id,
+            "limit": 100,
+        }
+
+    def products_search(rnd):
+        if targets.skus and rnd.random() < 0.4:
+            # Búsqueda por SKU parcial (como el buscador del catálogo)
+            term = rnd.choice(targets.skus)[-6:]
+        else:
+            term = rnd.choice(PART_TYPES).split()[0].lower()
+        return "/products", {"search": term, "limit": 50}
+
+    def products_by_application(rnd):
+        car_brand = rnd.choice(list(CAR_MODELS))
+        params = {"car_brand": car_brand, "limit": 50}
+        if rnd.random() < 0.6:
+            params["car_model"] = rnd.choice(CAR_MODELS[car_brand])
+        return "/products", params
+
+    def product_detail(rnd):
+        return f"/products/{rnd.choice(targets.product_ids)}", {}
+
+    def price_history(rnd):
+        return f"/products/{rnd.choice(targets.product_ids)}/price-history", {}
+
+    def categories(rnd):
+        if targets.importers and rnd.random() < 0.7:
+            return "/categories", {"importer": rnd.choice(targets.importers)}
+        return "/categories", {}
+
+    def job_status(rnd):
+        return f"/importers/status/{rnd.choice(targets.job_ids)}", {}
+
+    scenarios = {
+        "products_list": products_list,
+        "products_search": products_search,
+        "products_by_application": products_by_application,
+    }
+    if targets.categories:
+        scenarios["products_by_category"] = products_by_category
+        scenarios["categories"] = categories
+    if targets.product_ids:
+        scenarios["product_detail"] = product_detail
+        scenarios["price_history"] = price_history
+    if targets.job_ids:
+        scenarios["job_status"] = job_status
+    return scenarios
+
+
+def parse_mix(value: Optional[str]) -> Dict[str, int]:
+    """'products_search=50,job_status=20' -> pesos (el resto queda en 0)"""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Escenario desconocido: {name}")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+async def run_load(args: argparse.Namespace) -> Dict[str, Any]:
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, headers=headers, limits=limits, timeout=args.timeout
+    ) as client:
+        targets = await discover_targets(client, args.sample)
+        scenarios = build_scenarios(targets)
+        mix = {
+            name: weight
+            for name, weight in parse_mix(args.mix).items()
+            if weight > 0 and name in scenarios
+        }
+        if not mix:
+            raise RuntimeError("Ningún escenario tiene datos (¿BD vacía?)")
+
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        stats = {name: ScenarioStats() for name in names}
+
+        print(
+            f"🎯 {len(targets.categories)} categorías, "
+            f"{len(targets.product_ids)} productos, {len(targets.job_ids)} jobs"
+        )
+        print(
+            f"🚀 {args.concurrency} clientes | mezcla: "
+            + ", ".join(f"{name}={mix[name]}" for name in names)
+        )
+
+        deadline = time.monotonic() + args.duration if args.duration else None
+        remaining = [args.requests] if args.requests else None
+
+        async def worker(worker_index: int):
+            rnd = random.Random(args.seed + worker_index)
+            while True:
+                if deadline and time.monotonic() >= deadline:
+                    return
+                if remaining is not None:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+
+                name = rnd.choices(names, weights=weights)[0]
+                path, params = scenarios[name](rnd)
+                started = time.perf_counter()
+                try:
+                    response = await client.get(API_PREFIX + path, params=params)
+                    status_code = response.status_code
+                except httpx.HTTPError:
+                    status_code = None
+                stats[name].record(time.perf_counter() - started, status_code)
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker(index) for index in range(args.concurrency)))
+        elapsed = time.monotonic() - started
+
+    return build_report(stats, elapsed, args.concurrency)
+
+
+def build_report(
+    stats: Dict[str, ScenarioStats], elapsed: float, concurrency: int
+) -> Dict[str, Any]:
+    scenarios = {}
+    all_latencies: List[float] = []
+    total_errors = 0
+    for name, scenario in sorted(stats.items()):
+        latencies = sorted(scenario.latencies)
+        all_latencies.extend(latencies)
+        total_errors += scenario.errors
+        count = len(latencies)
+        scenarios[name] = {
+            "requests": count,
+            "errors": scenario.errors,
+            "error_rate": round(scenario.errors / count, 4) if count else 0.0,
+            "rps": round(count / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round((latencies[-1] if latencies else 0) * 1000, 1),
+            "status_codes": scenario.status_codes,
+        }
+
+    all_latencies.sort()
+    total = len(all_latencies)
+    return {
+        "elapsed_seconds": round(elapsed, 2),
+        "concurrency": concurrency,
+        "total": {
+            "requests": total,
+            "errors": total_errors,
+            "error_rate": round(total_errors / total, 4) if total else 0.0,
+            "rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(percentile(all_latencies, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(all_latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(all_latencies, 0.99) * 1000, 1),
+            "max_ms": round((all_latencies[-1] if all_latencies else 0) * 1000, 1),
+        },
+        "scenarios": scenarios,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    header = (
+        f"{'escenario':<26}{'reqs':>8}{'err%':>8}{'rps':>9}"
+        f"{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"
+    )
+    print()
+    print(header)
+    print("-" * len(header))
+    rows = list(report["scenarios"].items()) + [("TOTAL", report["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<26}{row['requests']:>8}{row['error_rate'] * 100:>7.2f}%"
+            f"{row['rps']:>9.1f}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}"
+            f"{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}"
+        )
+    print(
+        f"\n⏱️  {report['elapsed_seconds']}s con {report['concurrency']} clientes "
+        "(latencias en ms)"
+    )
+
+
+def check_thresholds(report: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    failures = []
+    for name, row in report["scenarios"].items():
+        if args.fail_p95_ms and row["p95_ms"] > args.fail_p95_ms:
+            failures.append(f"{name}: p95 {row['p95_ms']}ms > {args.fail_p95_ms}ms")
+        max_error_rate = args.fail_error_rate
+        if max_error_rate is not None and row["error_rate"] > max_error_rate:
+            failures.append(
+                f"{name}: error rate {row['error_rate']} > {max_error_rate}"
+            )
+    return failures
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--duration", type=float, default=60, help="Segundos (0 = usar --requests)"
+    )
+    parser.add_argument("--requests", type=int, default=0, help="Total de requests")
+    parser.add_argument(
+        "--mix", help="Pesos por escenario, ej. products_search=50,job_status=20"
+    )
+    parser.add_argument("--sample", type=int, default=200, help="IDs por página")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--token", help="Bearer token (si la API lo exige)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Guardar el reporte en este archivo")
+    parser.add_argument("--fail-p95-ms", type=float)
+    parser.add_argument("--fail-error-rate", type=float)
+    args = parser.parse_args(argv)
+    if not args.duration and not args.requests:
+        parser.error("Indica --duration o --requests")
+    return args
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_load(args))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Reporte guardado en {args.json}")
+
+    failures = check_thresholds(report, args)
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,10 +2,30 @@
 Módulo de tareas de Celery
 """
 from .celery_app import celery_app
-from .import_tasks import import_categories_task, import_products_task
+from .dev_tasks import dev_import_categories_task, dev_import_products_task
+from .import_tasks import (
+    ensure_history_partitions_task,
+    finalize_products_import_task,
+    import_categories_task,
+    import_products_chunk_task,
+    import_products_task,
+    live_refresh_task,
+    quick_refresh_task,
+    retry_failed_items_task,
+    schedule_refreshes_task,
+)
 
 __all__ = [
     'celery_app',
     'import_categories_task',
     'import_products_task',
+    'import_products_chunk_task',
+    'finalize_products_import_task',
+    'retry_failed_items_task',
+    'quick_refresh_task',
+    'live_refresh_task',
+    'schedule_refreshes_task',
+    'ensure_history_partitions_task',
+    'dev_import_categories_task',
+    'dev_import_products_task',
 ]
@@ -1,15 +1,31 @@
 """
 Configuración de Celery
 """
+import time
+from datetime import timedelta
+
 from celery import Celery
+from celery.signals import task_postrun, task_prerun, worker_init, worker_ready
+from kombu import Exchange, Queue
 from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import CELERY_TASK_SECONDS, start_worker_exporter
+from app.core.tracing import setup_tracing
+from app.tasks.routing import (
+    PRIORITY_DEFAULT,
+    QUEUE_CATEGORIES,
+    QUEUE_DEV,
+    QUEUE_PRODUCTS,
+    QUEUE_REFRESH,
+    TASK_ROUTES,
+)
 
 # Crear instancia de Celery
 celery_app = Celery(
     "importapp",
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
-    include=['app.tasks.import_tasks']
+    include=['app.tasks.import_tasks', 'app.tasks.dev_tasks']
 )
 
 # Configuración de Celery optimizada para scraping
@@ -37,12 +53,8 @@ celery_app.conf.update(
     task_acks_late=True,  # Acknowledge después de completar, no al empezar
     task_reject_on_worker_lost=True,
     
-    # Retry
-    task_autoretry_for=(Exception,),
-    task_retry_kwargs={'max_retries': 3},
-    task_retry_backoff=True,
-    task_retry_backoff_max=600,
-    task_retry_jitter=True,
+    # Sin autoretry de tareas completas: los ítems se reintentan dentro del
+    # job (ScrapePipeline) y los que fallan quedan en failed_items
     
     # Broker
     broker_connection_retry_on_startup=True,
@@ -54,17 +66,80 @@ celery_app.conf.update(
     result_extended=True,
 )
 
-# Configuración de rutas de tareas
-celery_app.conf.task_routes = {
-    'app.tasks.import_tasks.*': {'queue': 'imports'},
+# Colas por tipo de trabajo (ver app/tasks/routing.py). Un worker sin -Q
+# consume todas; en producción cada lane tiene su propio worker
+celery_app.conf.task_queues = tuple(
+    Queue(name, Exchange(name), routing_key=name)
+    for name in (QUEUE_CATEGORIES, QUEUE_REFRESH, QUEUE_PRODUCTS, QUEUE_DEV)
+)
+celery_app.conf.task_default_queue = QUEUE_PRODUCTS
+celery_app.conf.task_routes = TASK_ROUTES
+
+# Prioridades en Redis: 10 niveles (0 = más alta), consumidos en orden
+celery_app.conf.task_default_priority = PRIORITY_DEFAULT
+celery_app.conf.broker_transport_options = {
+    'priority_steps': list(range(10)),
+    'sep': ':',
+    'queue_order_strategy': 'priority',
 }
 
-# Beat schedule (tareas programadas - opcional)
+# Beat schedule (tareas programadas)
 celery_app.conf.beat_schedule = {
-    # Ejemplo: importar automáticamente cada día a las 3 AM
-    # 'auto-import-alsacia': {
-    #     'task': 'app.tasks.import_tasks.import_products',
-    #     'schedule': crontab(hour=3, minute=0),
-    #     'args': ('alsacia', ['Frenos'])
-    # },
+    # Particiones de product_price_history creadas antes de que se necesiten
+    'ensure-history-partitions': {
+        'task': 'ensure_history_partitions',
+        'schedule': timedelta(days=1),
+    },
 }
+
+if settings.REFRESH_SCHEDULER_ENABLED:
+    # Refresh por tasa de cambio dentro del presupuesto diario de requests
+    # (ver app/tasks/refresh_scheduler.py)
+    celery_app.conf.beat_schedule['schedule-refreshes'] = {
+        'task': 'schedule_refreshes',
+        'schedule': timedelta(minutes=settings.REFRESH_SCHEDULER_INTERVAL_MINUTES),
+    }
+
+
+# ===== Tracing (el contexto del trace viaja en los headers de cada tarea) =====
+
+
+@worker_init.connect
+def _setup_worker_tracing(**kwargs):
+    setup_tracing("syncar-worker")
+
+
+# ===== Métricas (exporter HTTP propio de cada worker) =====
+
+_task_started = {}
+
+
+@worker_ready.connect
+def _start_metrics_exporter(**kwargs):
+    start_worker_exporter()
+
+
+# ===== Particiones de historial (ver ensure_history_partitions) =====
+
+
+@worker_ready.connect
+def _ensure_history_partitions(**kwargs):
+    # Encolada: cubre el mes en curso aunque beat no haya corrido aún
+    try:
+        celery_app.send_task('ensure_history_partitions')
+    except Exception as e:
+        logger.warning(f"⚠️  No se pudo encolar ensure_history_partitions: {e}")
+
+
+@task_prerun.connect
+def _task_started_at(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _record_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        CELERY_TASK_SECONDS.labels(task=task.name, state=state or "UNKNOWN").observe(
+            time.perf_counter() - started
+        )
@@ -0,0 +1,225 @@
+"""
+Imports de desarrollo (/dev) con navegador visible
+
+Corren en la cola imports.dev, que ningún worker de producción consume: la
+atiende un worker local con pantalla (make dev-runner, --pool=solo). Así el
+navegador visible y el loop de scraping no corren dentro del proceso de la
+API. El progreso y la cancelación son los mismos de siempre (el job en la
+BD: GET /dev/status/{job_id}, POST /dev/cancel/{job_id}).
+
+Al terminar, el navegador queda abierto DEV_BROWSER_KEEP_OPEN_SECONDS para
+inspeccionarlo (se cierra antes si el job se cancela).
+"""
+
+import asyncio
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.logger import logger
+from app.importers.emasa import (
+    EmasaAuthComponent,
+    EmasaCategoriesComponent,
+    EmasaProductsComponent,
+)
+from app.importers.noriega import (
+    NoriegaAuthComponent,
+    NoriegaCategoriesComponent,
+    NoriegaProductsComponent,
+)
+from app.models import Importer, ImportJob, JobStatus, JobType
+from app.tasks.celery_app import celery_app
+from app.tasks.import_tasks import _build_products_config, _run_async, _run_leased
+from playwright.async_api import async_playwright
+from sqlalchemy import select, update
+from sqlalchemy.orm import joinedload
+
+# Importador -> (auth, categorías, productos)
+DEV_COMPONENTS = {
+    "NORIEGA": (
+        NoriegaAuthComponent,
+        NoriegaCategoriesComponent,
+        NoriegaProductsComponent,
+    ),
+    "EMASA": (EmasaAuthComponent, EmasaCategoriesComponent, EmasaProductsComponent),
+}
+
+# Estados en los que el job ya no corre (el navegador se puede cerrar)
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+async def _launch_dev_browser(playwright):
+    """Navegador visible (DEV_BROWSER: webkit, chromium o firefox)"""
+    browser_type = getattr(playwright, settings.DEV_BROWSER)
+    logger.info(
+        f"🌐 Lanzando {settings.DEV_BROWSER} visible "
+        f"(slow_mo={settings.DEV_BROWSER_SLOW_MO_MS}ms)"
+    )
+    return await browser_type.launch(
+        headless=False, slow_mo=settings.DEV_BROWSER_SLOW_MO_MS
+    )
+
+
+async def _job_status(db, job_id: str):
+    result = await db.execute(
+        select(ImportJob.status).where(ImportJob.job_id == job_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _set_job(db, job_id: str, **values):
+    await db.execute(
+        update(ImportJob).where(ImportJob.job_id == job_id).values(**values)
+    )
+    await db.commit()
+
+
+async def _keep_browser_open(db, job_id: str):
+    """Deja el navegador abierto para inspección (hasta cancelar el job)"""
+    seconds = settings.DEV_BROWSER_KEEP_OPEN_SECONDS
+    if seconds <= 0:
+        return
+    logger.info(
+        f"🔍 Navegador abierto {seconds}s para inspección "
+        f"(POST /dev/cancel/{job_id} para cerrarlo antes)"
+    )
+    deadline = asyncio.get_running_loop().time() + seconds
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(2)
+        if await _job_status(db, job_id) == JobStatus.CANCELLED:
+            break
+    logger.info("🔒 Cerrando navegador de desarrollo")
+
+
+async def _run_dev_import(
+    importer_name: str, job_id: str, selected_categories=None
+) -> dict:
+    """
+    Auth + categorías (selected_categories None) o auth + productos con
+    navegador visible, sobre el job creado por el endpoint /dev
+    """
+    auth_cls, categories_cls, products_cls = DEV_COMPONENTS[importer_name.upper()]
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Importer)
+            .options(joinedload(Importer.config))
+            .where(Importer.name == importer_name.upper())
+        )
+        importer = result.unique().scalar_one_or_none()
+        if importer is None or importer.config is None:
+            error = f"Importador o configuración no encontrados: {importer_name}"
+            await _set_job(db, job_id, status=JobStatus.FAILED, error_message=error)
+            return {"success": False, "error": error}
+
+        if await _job_status(db, job_id) == JobStatus.CANCELLED:
+            return {"success": False, "error": "Importación cancelada"}
+        await _set_job(db, job_id, status=JobStatus.RUNNING)
+
+        async with async_playwright() as playwright:
+            browser = await _launch_dev_browser(playwright)
+            try:
+                auth_result = await auth_cls(
+                    importer_name=importer_name,
+                    job_id=job_id,
+                    db=db,
+                    browser=browser,
+                    credentials=importer.config.credentials or {},
+                    headless=False,
+                ).execute()
+
+                if not auth_result["success"]:
+                    logger.error("❌ Autenticación fallida")
+                    result = {
+                        "success": False,
+                        "message": auth_result.get("message", ""),
+                        "error": auth_result.get("error"),
+                    }
+                    await _set_job(
+                        db, job_id, status=JobStatus.FAILED, result=result
+                    )
+                    await _keep_browser_open(db, job_id)
+                    return result
+
+                page = auth_result.get("page")
+                context = auth_result.get("context")
+                if selected_categories is None:
+                    result = await categories_cls(
+                        importer_name=importer_name,
+                        job_id=job_id,
+                        db=db,
+                        browser=browser,
+                        page=page,
+                        context=context,
+                    ).execute()
+                else:
+                    result = await products_cls(
+                        importer_name=importer_name,
+                        job_id=job_id,
+                        db=db,
+                        browser=browser,
+                        page=page,
+                        context=context,
+                        selected_categories=selected_categories,
+                        config=_build_products_config(importer.config),
+                    ).execute()
+
+                # Una cancelación durante el scraping deja el job en CANCELLED
+                if await _job_status(db, job_id) != JobStatus.CANCELLED:
+                    await _set_job(
+                        db,
+                        job_id,
+                        status=(
+                            JobStatus.COMPLETED
+                            if result.get("success")
+                            else JobStatus.FAILED
+                        ),
+                        result=result,
+                        progress=100,
+                    )
+                logger.info(f"✅ Import de desarrollo terminado: {job_id}")
+
+                await _keep_browser_open(db, job_id)
+                return result
+
+            except Exception as e:
+                logger.error(f"❌ Error en import de desarrollo {job_id}: {e}")
+                import traceback
+
+                logger.error(traceback.format_exc())
+                await db.rollback()
+                await _set_job(
+                    db, job_id, status=JobStatus.FAILED, error_message=str(e)
+                )
+                await _keep_browser_open(db, job_id)
+                return {"success": False, "error": str(e)}
+
+            finally:
+                await browser.close()
+
+
+@celery_app.task(bind=True, name="dev_import_categories")
+def dev_import_categories_task(self, importer_name: str, job_id: str) -> dict:
+    """Import de categorías de /dev (navegador visible, cola imports.dev)"""
+    return _run_async(
+        _run_leased(
+            importer_name,
+            JobType.CATEGORIES,
+            job_id,
+            lambda: _run_dev_import(importer_name, job_id),
+        )
+    )
+
+
+@celery_app.task(bind=True, name="dev_import_products")
+def dev_import_products_task(
+    self, importer_name: str, job_id: str, selected_categories: list
+) -> dict:
+    """Import de productos de /dev (navegador visible, cola imports.dev)"""
+    return _run_async(
+        _run_leased(
+            importer_name,
+            JobType.PRODUCTS,
+            job_id,
+            lambda: _run_dev_import(importer_name, job_id, selected_categories),
+        )
+    )
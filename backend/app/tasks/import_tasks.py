@@ -2,13 +2,18 @@
 Tareas de Celery para importación
 """
 
-import asyncio
 import uuid
-from typing import List
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import List, Optional
 
+from app.core import tracing
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal
+from app.core.job_lock import JobLease, claim_import_lease
 from app.core.logger import logger
+from app.importers.base import current_chunk
+from app.importers.live_refresh import publish_result, refresh_skus
 from app.importers.emasa import (
     EmasaAuthComponent,
     EmasaCategoriesComponent,
@@ -19,12 +24,29 @@ from app.importers.noriega import (
     NoriegaCategoriesComponent,
     NoriegaProductsComponent,
 )
+from app.importers import network
 from app.importers.orchestrator import ImportOrchestrator
+from app.importers.persistence import (
+    MAX_REPORTED_SKUS,
+    ensure_upcoming_price_history_partitions,
+    get_pending_failed_items,
+    merge_job_result,
+    sweep_unseen_products,
+)
+from app.importers.profiling import (
+    JobProfiler,
+    build_profile,
+    current_profiler,
+    merge_states,
+    profile_span,
+)
 from app.models import Importer, ImportJob, JobStatus, JobType
 from app.tasks.celery_app import celery_app
-from celery import Task
-from playwright.async_api import async_playwright
-from sqlalchemy import select
+from app.tasks.refresh_scheduler import load_refresh_plan, select_due
+from app.tasks.routing import estimate_products_import, route_products_import
+from app.tasks.runtime import worker_runtime
+from celery import Task, chord
+from sqlalchemy import select, update
 
 
 class DatabaseTask(Task):
@@ -39,6 +61,157 @@ class DatabaseTask(Task):
         return self._db
 
 
+def _run_async(coro):
+    """
+    Ejecuta una corutina en el event loop persistente del worker
+
+    Motor de BD, Redis y navegador se reutilizan entre tareas (ver
+    app/tasks/runtime.py). La corutina conserva el span de la tarea Celery.
+    """
+    return worker_runtime.run(tracing.carry_context(coro))
+
+
+async def _with_heartbeat(lease: JobLease, coro):
+    """Ejecuta `coro` renovando el lease del job mientras corre"""
+    async with lease.keep_alive():
+        return await coro
+
+
+async def _in_job_context(name: str, coro, **context):
+    """
+    Ejecuta `coro` dentro del span `name` y con `context` (importer, job_id,
+    chunk...) en cada log, junto al trace_id para ubicar el trace del job
+
+    El contexto se fija dentro del event loop del runtime, así que lo
+    heredan las tareas asyncio que cree la corutina (pipeline, fetchers).
+    """
+    with tracing.span(name, **context):
+        with logger.contextualize(trace_id=tracing.current_trace_id(), **context):
+            return await coro
+
+
+async def _run_leased(
+    importer_name: str,
+    job_type: JobType,
+    job_id: str,
+    run,
+    release: bool = True,
+    profile: bool = True,
+) -> dict:
+    """
+    Toma (o confirma) el lease del job y ejecuta `run()` con heartbeat
+
+    Si otro job activo tiene el lease no se ejecuta nada: un reintento de
+    Celery o un segundo disparo no duplican el scraping.
+
+    Con profile=True `run()` corre con un JobProfiler y el perfil por fase
+    queda en import_jobs.profile (los jobs en chunks lo arma el finalizador),
+    y con NETWORK_RECORDER_ENABLED se escribe además el reporte de red.
+    """
+    async with AsyncSessionLocal() as db:
+        lease, running_job_id = await claim_import_lease(
+            db, importer_name, job_type, job_id
+        )
+
+    if running_job_id:
+        logger.warning(
+            f"🔗 {importer_name} ya tiene un job de {job_type.value} en curso "
+            f"({running_job_id}); se descarta {job_id}"
+        )
+        return {
+            "success": False,
+            "error": f"Import already running: {running_job_id}",
+            "running_job_id": running_job_id,
+        }
+
+    profiler = JobProfiler() if profile else None
+    recorder = network.new_network_recorder() if profile else None
+    token = current_profiler.set(profiler)
+    recorder_token = network.current_network_recorder.set(recorder)
+    try:
+        return await _in_job_context(
+            f"job.{job_type.value}",
+            _with_heartbeat(lease, run()),
+            importer=importer_name,
+            job_id=job_id,
+        )
+    finally:
+        current_profiler.reset(token)
+        network.current_network_recorder.reset(recorder_token)
+        if profiler is not None:
+            await _store_profile(job_id, profiler.summary())
+        if recorder is not None:
+            await recorder.drain()
+            _write_network_report(job_id, recorder.state())
+        if release:
+            await lease.release()
+
+
+async def _store_profile(job_id: str, profile: dict):
+    """Guarda el perfil de tiempos del job (un error no afecta al job)"""
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ImportJob)
+                .where(ImportJob.job_id == job_id)
+                .values(profile=profile)
+            )
+            await db.commit()
+    except Exception as e:
+        logger.warning(f"⚠️  No se pudo guardar el perfil del job {job_id}: {e}")
+
+
+def _write_network_report(job_id: str, state: dict):
+    try:
+        network.write_report(job_id, state)
+    except Exception as e:
+        logger.warning(f"⚠️  No se pudo escribir el reporte de red de {job_id}: {e}")
+
+
+async def _authenticate(auth_component) -> dict:
+    """
+    Login del componente de auth, medido como fase "auth" del job
+
+    El contexto del navegador queda conectado al registro de red del job.
+    """
+    with profile_span("auth"):
+        auth_result = await auth_component.execute()
+    network.attach_network_recorder(auth_result.get("context"))
+    return auth_result
+
+
+@asynccontextmanager
+async def _worker_browser():
+    """
+    Navegador compartido del worker para una tarea
+
+    Al salir se cierran los contextos que abrió la tarea; el navegador sigue
+    abierto para las siguientes.
+    """
+    browser = await worker_runtime.get_browser()
+    try:
+        yield browser
+    finally:
+        await _close_task_browser(browser)
+
+
+async def _close_task_browser(browser, page=None, context=None):
+    """
+    Cierra la página, el contexto y los demás contextos que abrió la tarea
+
+    El navegador compartido del worker sigue abierto (ver TaskBrowser). Se
+    puede llamar más de una vez: lo que ya se cerró no se vuelve a cerrar.
+    """
+    try:
+        if page:
+            await page.close()
+        if context:
+            await context.close()
+        await browser.close()
+    except Exception as e:
+        logger.warning(f"⚠️ Error cerrando los contextos de la tarea: {e}")
+
+
 async def _run_import_categories(importer_name: str, job_id: str) -> dict:
     """Función async interna para importar categorías"""
     async with AsyncSessionLocal() as db:
@@ -73,28 +246,7 @@ async def _run_import_categories(importer_name: str, job_id: str) -> dict:
             await db.commit()
 
             # Ejecutar importación con Playwright
-            async with async_playwright() as p:
-                # Usar configuración de headless del settings (True en producción, False en desarrollo)
-                # Agregar args necesarios para headless en Docker
-                launch_args = []
-                if settings.HEADLESS:
-                    launch_args = [
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-accelerated-2d-canvas',
-                        '--no-first-run',
-                        '--no-zygote',
-                        '--disable-gpu'
-                    ]
-                
-                browser = await p.chromium.launch(
-                    headless=settings.HEADLESS,
-                    args=launch_args,
-                    slow_mo=500
-                    if not settings.HEADLESS
-                    else 0,  # Ralentizar solo en modo visible
-                )
+            async with _worker_browser() as browser:
 
                 page = None
                 context = None
@@ -113,7 +265,7 @@ async def _run_import_categories(importer_name: str, job_id: str) -> dict:
                             credentials=credentials,
                             headless=settings.HEADLESS,
                         )
-                        auth_result = await auth_component.execute()
+                        auth_result = await _authenticate(auth_component)
 
                         # Guardar referencias a page y context
                         page = auth_result.get("page")
@@ -158,7 +310,7 @@ async def _run_import_categories(importer_name: str, job_id: str) -> dict:
                             credentials=credentials,
                             headless=settings.HEADLESS,
                         )
-                        auth_result = await auth_component.execute()
+                        auth_result = await _authenticate(auth_component)
 
                         # Guardar referencias a page y context
                         page = auth_result.get("page")
@@ -226,16 +378,7 @@ async def _run_import_categories(importer_name: str, job_id: str) -> dict:
                     raise
 
                 finally:
-                    # Asegurar que el navegador se cierre siempre
-                    try:
-                        if page:
-                            await page.close()
-                        if context:
-                            await context.close()
-                        await browser.close()
-                        logger.info("🔒 Navegador y contextos cerrados correctamente")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error cerrando navegador: {e}")
+                    await _close_task_browser(browser, page, context)
 
         except Exception as e:
             logger.error(f"❌ Error en tarea {job_id}: {e}")
@@ -253,339 +396,1057 @@ async def _run_import_categories(importer_name: str, job_id: str) -> dict:
 
 
 @celery_app.task(bind=True, name="import_categories")
-def import_categories_task(self, importer_name: str) -> dict:
+def import_categories_task(self, importer_name: str, job_id: str = None) -> dict:
     """
     Tarea de Celery para importar categorías
 
     Args:
         importer_name: Nombre del importador (alsacia, refax, etc.)
+        job_id: ID del job (generado por el endpoint junto con el lease)
 
     Returns:
         Dict con el resultado de la importación
     """
-    job_id = str(uuid.uuid4())
+    if job_id is None:
+        job_id = str(uuid.uuid4())
     logger.info(
         f"🚀 Iniciando tarea de importación de categorías: {importer_name} | Job ID: {job_id}"
     )
 
-    # Crear un nuevo event loop para esta tarea
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    return _run_async(
+        _run_leased(
+            importer_name,
+            JobType.CATEGORIES,
+            job_id,
+            lambda: _run_import_categories(importer_name, job_id),
+        )
+    )
+
+
+def _build_products_config(importer_config) -> dict:
+    """
+    Arma la configuración del componente de productos desde ImporterConfig
+
+    Args:
+        importer_config: ImporterConfig del importador (o None)
+    """
+    if not importer_config:
+        return {"products_per_category": None, "scraping_speed_ms": 1000}
+
+    extra_config = importer_config.extra_config or {}
+    return {
+        "products_per_category": importer_config.products_per_category,
+        "scraping_speed_ms": importer_config.scraping_speed_ms,
+        "ingestion_mode": extra_config.get("ingestion_mode"),
+        "fetch_workers": extra_config.get("fetch_workers"),
+        "queue_size": extra_config.get("queue_size"),
+        "batch_size": extra_config.get("batch_size"),
+        "item_max_attempts": extra_config.get("item_max_attempts"),
+        "item_retry_backoff_seconds": extra_config.get("item_retry_backoff_seconds"),
+        "listing_columns": extra_config.get("listing_columns"),
+    }
+
+
+# Componentes específicos por importador (auth, productos)
+PRODUCT_COMPONENTS = {
+    "NORIEGA": (NoriegaAuthComponent, NoriegaProductsComponent),
+    "EMASA": (EmasaAuthComponent, EmasaProductsComponent),
+}
+
+
+def _chunk_categories(
+    selected_categories: List[str], chunk_size: int
+) -> List[List[str]]:
+    """Reparte las categorías seleccionadas en chunks de `chunk_size`"""
+    size = max(1, chunk_size)
+    return [
+        selected_categories[i : i + size]
+        for i in range(0, len(selected_categories), size)
+    ]
+
+
+async def _create_products_job(
+    importer_name: str,
+    selected_categories: List[str],
+    job_id: str,
+    chunks: List[List[str]],
+    extra_params: Optional[dict] = None,
+) -> dict:
+    """
+    Crea el ImportJob compartido por todos los chunks
+
+    También estima el tamaño del import y elige la cola de los chunks.
+    """
+    from sqlalchemy.orm import joinedload
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Importer)
+            .options(joinedload(Importer.config))
+            .where(Importer.name == importer_name)
+        )
+        importer = result.unique().scalar_one_or_none()
+
+        if not importer:
+            logger.error(f"❌ Importador no encontrado: {importer_name}")
+            return {"success": False, "error": "Importer not found"}
+
+        estimated_products = await estimate_products_import(
+            db,
+            importer.id,
+            selected_categories,
+            importer.config.products_per_category if importer.config else None,
+        )
+        route = route_products_import(estimated_products)
+
+        job = ImportJob(
+            job_id=job_id,
+            importer_id=importer.id,
+            job_type=JobType.PRODUCTS,
+            status=JobStatus.RUNNING,
+            params={
+                "selected_categories": selected_categories,
+                "chunks": chunks,
+                "estimated_products": estimated_products,
+                "queue": route["queue"],
+                **(extra_params or {}),
+            },
+            result={"chunk_count": len(chunks), "chunks": {}},
+            started_at=datetime.now(timezone.utc),
+        )
+        db.add(job)
+        await db.commit()
+
+        return {
+            "success": True,
+            "route": route,
+            "estimated_products": estimated_products,
+        }
+
+
+async def _run_import_products_chunk(
+    importer_name: str,
+    categories: List[str],
+    job_id: str,
+    chunk_index: int,
+    chunk_count: int,
+) -> dict:
+    """
+    Importa los productos de un chunk de categorías
+
+    Cada chunk abre su propio navegador y sesión con el proveedor. El
+    progreso y el resumen quedan en result.chunks.<chunk_index> del job; el
+    barrido de disponibilidad lo hace el finalizador.
+    """
+    logger.info(
+        f"🚀 Chunk {chunk_index + 1}/{chunk_count} de {importer_name} | "
+        f"Job ID: {job_id} | Categorías: {categories}"
+    )
+
+    token = current_chunk.set((chunk_index, chunk_count))
+    profiler = JobProfiler()
+    profiler_token = current_profiler.set(profiler)
+    recorder = network.new_network_recorder()
+    recorder_token = network.current_network_recorder.set(recorder)
+    summary = {
+        "chunk": chunk_index,
+        "categories": categories,
+        "success": False,
+        "total": 0,
+        "categories_processed": 0,
+        "completed_category_ids": [],
+        "changes": {},
+    }
+
     try:
-        return loop.run_until_complete(_run_import_categories(importer_name, job_id))
+        async with AsyncSessionLocal() as db:
+            try:
+                await merge_job_result(
+                    db,
+                    job_id,
+                    {"status": "running", "categories": categories, "progress": 0},
+                    chunk=chunk_index,
+                )
+
+                from sqlalchemy.orm import joinedload
+
+                result_config = await db.execute(
+                    select(Importer)
+                    .options(joinedload(Importer.config))
+                    .where(Importer.name == importer_name.upper())
+                )
+                importer = result_config.unique().scalar_one_or_none()
+                importer_config = importer.config if importer else None
+                credentials = (
+                    importer_config.credentials or {} if importer_config else {}
+                )
+
+                async with _worker_browser() as browser:
+                    page = None
+                    context = None
+
+                    try:
+                        components = PRODUCT_COMPONENTS.get(importer_name.upper())
+
+                        if components:
+                            auth_cls, products_cls = components
+                            logger.info(
+                                f"🔧 Usando componentes de {importer_name.upper()} para productos"
+                            )
+
+                            # Paso 1: Autenticación
+                            auth_component = auth_cls(
+                                importer_name=importer_name,
+                                job_id=job_id,
+                                db=db,
+                                browser=browser,
+                                credentials=credentials,
+                                headless=settings.HEADLESS,
+                            )
+                            auth_result = await _authenticate(auth_component)
+
+                            # Guardar referencias a page y context
+                            page = auth_result.get("page")
+                            context = auth_result.get("context")
+
+                            if not auth_result["success"]:
+                                logger.error("❌ Autenticación fallida")
+                                result = {
+                                    "success": False,
+                                    "message": auth_result.get("message", ""),
+                                    "error": auth_result.get("error"),
+                                }
+                            else:
+                                # Paso 2: Extracción de productos (sin barrido:
+                                # lo hace el finalizador para todo el job)
+                                config = {
+                                    **_build_products_config(importer_config),
+                                    "defer_sweep": True,
+                                }
+                                products_component = products_cls(
+                                    importer_name=importer_name,
+                                    job_id=job_id,
+                                    db=db,
+                                    browser=browser,
+                                    page=page,
+                                    context=context,
+                                    selected_categories=categories,
+                                    config=config,
+                                )
+                                result = await products_component.execute()
+                                summary["completed_category_ids"] = list(
+                                    products_component.completed_category_ids
+                                )
+
+                        else:
+                            # Usar orchestrator genérico para otros importadores
+                            orchestrator = ImportOrchestrator(
+                                importer_name=importer_name,
+                                job_id=job_id,
+                                db=db,
+                                browser=browser,
+                            )
+                            result = await orchestrator.import_products(categories)
+
+                    finally:
+                        await _close_task_browser(browser, page, context)
+
+                summary.update(
+                    success=bool(result.get("success")),
+                    total=result.get("total", 0),
+                    categories_processed=result.get("categories_processed", 0),
+                    changes=result.get("changes") or {},
+                    marked_unavailable=result.get("marked_unavailable", 0),
+                    failed_items=result.get("failed_items", 0),
+                    error=result.get("error"),
+                )
+
+            except Exception as e:
+                logger.error(f"❌ Error en chunk {chunk_index} del job {job_id}: {e}")
+                import traceback
+
+                logger.error(traceback.format_exc())
+                await db.rollback()
+                summary["error"] = str(e)
+
+            try:
+                await merge_job_result(
+                    db,
+                    job_id,
+                    {
+                        **summary,
+                        "status": "completed" if summary["success"] else "failed",
+                        "progress": 100,
+                    },
+                    chunk=chunk_index,
+                )
+            except Exception as db_error:
+                logger.error(f"❌ Error al actualizar job en BD: {db_error}")
+
     finally:
-        loop.close()
+        current_chunk.reset(token)
+        current_profiler.reset(profiler_token)
+        network.current_network_recorder.reset(recorder_token)
+
+    # Para el finalizador (no se guarda en result.chunks)
+    summary["profile_state"] = profiler.state()
+    if recorder is not None:
+        await recorder.drain()
+        summary["network_state"] = recorder.state()
+
+    logger.info(f"✅ Chunk {chunk_index + 1}/{chunk_count} terminado: {job_id}")
+    return summary
+
+
+def _merge_changes(chunk_results: List[dict]) -> dict:
+    """Suma los resúmenes de cambios de todos los chunks"""
+    changes = {"created": 0, "updated": 0, "unchanged": 0, "changed_skus": []}
+    for chunk_result in chunk_results:
+        chunk_changes = chunk_result.get("changes") or {}
+        for key in ("created", "updated", "unchanged"):
+            changes[key] += chunk_changes.get(key, 0)
+        remaining = MAX_REPORTED_SKUS - len(changes["changed_skus"])
+        if remaining > 0:
+            changes["changed_skus"].extend(
+                (chunk_changes.get("changed_skus") or [])[:remaining]
+            )
+    return changes
 
 
-async def _run_import_products(
-    importer_name: str, selected_categories: List[str], job_id: str
+async def _finalize_products_import(
+    importer_name: str, job_id: str, chunk_results: List[dict]
+) -> dict:
+    """
+    Cierra un job de productos repartido en chunks
+
+    Calcula los totales, barre la disponibilidad de las categorías que algún
+    chunk recorrió completas y marca el estado final del job.
+    """
+    chunk_results = [r for r in chunk_results if isinstance(r, dict)]
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ImportJob.importer_id, ImportJob.status, ImportJob.started_at).where(
+                ImportJob.job_id == job_id
+            )
+        )
+        row = result.one_or_none()
+        if row is None:
+            logger.error(f"❌ Job no encontrado al finalizar: {job_id}")
+            return {"success": False, "error": "Job not found"}
+
+        importer_id, status, started_at = row
+        cancelled = status == JobStatus.CANCELLED
+
+        completed_category_ids = sorted(
+            {
+                category_id
+                for chunk_result in chunk_results
+                for category_id in chunk_result.get("completed_category_ids", [])
+            }
+        )
+
+        marked_unavailable = 0
+        if not cancelled:
+            marked_unavailable = await sweep_unseen_products(
+                db, importer_id, job_id, completed_category_ids
+            )
+
+        failed_chunks = [r["chunk"] for r in chunk_results if not r.get("success")]
+        total = sum(r.get("total", 0) for r in chunk_results)
+        success = bool(chunk_results) and len(failed_chunks) < len(chunk_results)
+
+        summary = {
+            "success": success,
+            "products": [],
+            "total": total,
+            "processed_items": total,
+            "categories_processed": sum(
+                r.get("categories_processed", 0) for r in chunk_results
+            ),
+            "changes": _merge_changes(chunk_results),
+            "marked_unavailable": marked_unavailable,
+            "failed_items": sum(r.get("failed_items", 0) for r in chunk_results),
+            "chunk_count": len(chunk_results),
+            "failed_chunks": failed_chunks,
+        }
+        await merge_job_result(db, job_id, summary)
+
+        if cancelled:
+            final_status = JobStatus.CANCELLED
+        else:
+            final_status = JobStatus.COMPLETED if success else JobStatus.FAILED
+
+        completed_at = datetime.now(timezone.utc)
+        values = {
+            "status": final_status,
+            "progress": 100,
+            "processed_items": total,
+            "completed_at": completed_at,
+            # Perfil de todos los chunks sobre la duración real del job
+            "profile": build_profile(
+                merge_states(r.get("profile_state") for r in chunk_results),
+                wall_seconds=(
+                    (completed_at - started_at).total_seconds() if started_at else None
+                ),
+            ),
+        }
+        if final_status == JobStatus.FAILED:
+            errors = [r.get("error") for r in chunk_results if r.get("error")]
+            values["error_message"] = "; ".join(errors) or "Todos los chunks fallaron"
+
+        await db.execute(
+            update(ImportJob).where(ImportJob.job_id == job_id).values(**values)
+        )
+        await db.commit()
+
+    network_states = [r["network_state"] for r in chunk_results if "network_state" in r]
+    if network_states:
+        _write_network_report(job_id, network.merge_states(network_states))
+
+    logger.info(
+        f"✅ Job {job_id} finalizado: {total} productos, "
+        f"{len(failed_chunks)} chunks fallidos, {marked_unavailable} no disponibles"
+    )
+    return summary
+
+
+@celery_app.task(bind=True, name="import_products")
+def import_products_task(
+    self,
+    importer_name: str,
+    selected_categories: List[str],
+    job_id: str = None,
+    extra_params: dict = None,
 ) -> dict:
-    """Función async interna para importar productos"""
+    """
+    Tarea de Celery para importar productos
+
+    Crea el job y lo reparte en subtasks por chunk de categorías (chord):
+    los chunks corren en paralelo en los threads/workers disponibles y
+    finalize_products_import_task calcula los totales al terminar todos.
+    Los chunks van a la cola interactiva o a la bulk según el tamaño
+    estimado del import (ver app/tasks/routing.py).
+
+    Args:
+        importer_name: Nombre del importador
+        selected_categories: Lista de categorías a importar
+        job_id: ID del job (generado por el endpoint, opcional para compatibilidad)
+        extra_params: Datos extra para ImportJob.params (ej. refresh programado)
+
+    Returns:
+        Dict con el job_id y el número de chunks
+    """
+    # Si no se proporciona job_id, generar uno (compatibilidad con código antiguo)
+    if job_id is None:
+        job_id = str(uuid.uuid4())
+
     logger.info(
         f"🚀 Iniciando tarea de importación de productos: {importer_name} | Job ID: {job_id}"
     )
-    logger.info(f"Categorías: {selected_categories}")
 
-    # Crear una nueva sesión de base de datos para esta tarea
-    async with AsyncSessionLocal() as db:
-        job = None  # Inicializar job como None
-        try:
-            # Crear registro del job
-            result = await db.execute(
-                select(Importer).where(Importer.name == importer_name)
+    chunks = _chunk_categories(
+        selected_categories, settings.PRODUCT_IMPORT_CHUNK_SIZE
+    )
+
+    # El lease queda tomado hasta que finalize_products_import lo libere
+    lease = JobLease(importer_name, JobType.PRODUCTS, job_id)
+    try:
+        created = _run_async(
+            _run_leased(
+                importer_name,
+                JobType.PRODUCTS,
+                job_id,
+                lambda: _create_products_job(
+                    importer_name, selected_categories, job_id, chunks, extra_params
+                ),
+                release=False,
+                profile=False,
             )
-            importer = result.scalar_one_or_none()
+        )
+    except Exception as e:
+        logger.error(f"❌ Error crítico en import_products_task: {e}")
+        _run_async(lease.release())
+        return {"success": False, "error": str(e)}
 
-            if not importer:
-                logger.error(f"❌ Importador no encontrado: {importer_name}")
-                return {"success": False, "error": "Importer not found"}
+    if not created["success"]:
+        if not created.get("running_job_id"):
+            _run_async(lease.release())
+        return created
+
+    route = created["route"]
+    if not chunks:
+        finalize_products_import_task.delay([], importer_name, job_id)
+    else:
+        chord(
+            import_products_chunk_task.s(
+                importer_name, chunk, job_id, index, len(chunks)
+            ).set(**route)
+            for index, chunk in enumerate(chunks)
+        )(finalize_products_import_task.s(importer_name, job_id))
 
-            job = ImportJob(
+    logger.info(
+        f"📦 Job {job_id} repartido en {len(chunks)} chunks → {route['queue']} "
+        f"(~{created['estimated_products']} productos)"
+    )
+    return {
+        "success": True,
+        "job_id": job_id,
+        "chunks": len(chunks),
+        "queue": route["queue"],
+    }
+
+
+@celery_app.task(bind=True, name="import_products_chunk")
+def import_products_chunk_task(
+    self,
+    importer_name: str,
+    categories: List[str],
+    job_id: str,
+    chunk_index: int,
+    chunk_count: int,
+) -> dict:
+    """
+    Subtask de import_products: importa un chunk de categorías
+
+    Nunca lanza excepciones (un chunk fallido no debe impedir el finalizador
+    del chord); los errores quedan en el resumen del chunk. Mientras corre
+    renueva el lease del job.
+    """
+    lease = JobLease(importer_name, JobType.PRODUCTS, job_id)
+    try:
+        return _run_async(
+            _in_job_context(
+                "job.products.chunk",
+                _with_heartbeat(
+                    lease,
+                    _run_import_products_chunk(
+                        importer_name, categories, job_id, chunk_index, chunk_count
+                    ),
+                ),
+                importer=importer_name,
                 job_id=job_id,
-                importer_id=importer.id,
-                job_type=JobType.PRODUCTS,
-                status=JobStatus.RUNNING,
-                params={"selected_categories": selected_categories},
+                chunk=chunk_index,
             )
-            db.add(job)
-            await db.commit()
-            await db.refresh(job)  # Refrescar job para asegurar que está sincronizado
+        )
+    except Exception as e:
+        logger.error(f"❌ Error crítico en import_products_chunk_task: {e}")
+        return {"chunk": chunk_index, "success": False, "error": str(e)}
 
-            # Ejecutar importación con Playwright
-            async with async_playwright() as p:
-                # Agregar args necesarios para headless en Docker
-                launch_args = []
-                if settings.HEADLESS:
-                    launch_args = [
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-accelerated-2d-canvas',
-                        '--no-first-run',
-                        '--no-zygote',
-                        '--disable-gpu'
-                    ]
-                
-                browser = await p.chromium.launch(
-                    headless=settings.HEADLESS,
-                    args=launch_args,
-                    slow_mo=500 if not settings.HEADLESS else 0,
-                )
 
-                page = None
-                context = None
+@celery_app.task(bind=True, name="finalize_products_import")
+def finalize_products_import_task(
+    self, chunk_results: List[dict], importer_name: str, job_id: str
+) -> dict:
+    """
+    Callback del chord de import_products: totales, barrido y estado final
 
-                try:
-                    if importer_name.upper() == "NORIEGA":
-                        # Usar componentes específicos de Noriega
-                        logger.info("🔧 Usando componentes de Noriega para productos")
+    Libera el lease del job aunque el cierre falle.
+    """
+    lease = JobLease(importer_name, JobType.PRODUCTS, job_id)
+    try:
+        return _run_async(
+            _in_job_context(
+                "job.products.finalize",
+                _finalize_products_import(importer_name, job_id, chunk_results),
+                importer=importer_name,
+                job_id=job_id,
+            )
+        )
+    finally:
+        _run_async(lease.release())
 
-                        # Obtener credenciales
-                        from sqlalchemy.orm import joinedload
 
-                        result_config = await db.execute(
-                            select(Importer)
-                            .options(joinedload(Importer.config))
-                            .where(Importer.name == importer_name.upper())
-                        )
-                        importer_with_config = (
-                            result_config.unique().scalar_one_or_none()
-                        )
-                        credentials = (
-                            importer_with_config.config.credentials or {}
-                            if importer_with_config and importer_with_config.config
-                            else {}
-                        )
+@asynccontextmanager
+async def _products_session(
+    importer: Importer,
+    importer_name: str,
+    job_id: str,
+    db,
+    selected_categories: List[str],
+):
+    """
+    Login del importador y componente de productos sobre esa sesión
 
-                        # Paso 1: Autenticación
-                        auth_component = NoriegaAuthComponent(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                            credentials=credentials,
-                            headless=settings.HEADLESS,
-                        )
-                        auth_result = await auth_component.execute()
+    Para jobs que no pasan por el orquestador (reintentos, refresh rápido).
+    Entrega (componente, auth_result); el componente es None si falló el
+    login. Al salir se cierran la página, el contexto y el navegador.
+    """
+    auth_cls, products_cls = PRODUCT_COMPONENTS[importer_name.upper()]
 
-                        # Guardar referencias a page y context
-                        page = auth_result.get("page")
-                        context = auth_result.get("context")
+    async with _worker_browser() as browser:
+        page = None
+        context = None
 
-                        if not auth_result["success"]:
-                            logger.error("❌ Autenticación fallida")
-                            job.status = JobStatus.FAILED
-                            job.result = {
-                                "success": False,
-                                "message": auth_result.get("message", ""),
-                                "error": auth_result.get("error"),
-                            }
-                            await db.commit()
-                            return job.result
-
-                        # Obtener configuración del importador
-                        # products_per_category está en ImporterConfig (importer.config)
-                        config = {
-                            "products_per_category": (
-                                importer_with_config.config.products_per_category
-                                if importer_with_config.config
-                                else None
-                            ),
-                            "scraping_speed_ms": (
-                                importer_with_config.config.scraping_speed_ms
-                                if importer_with_config.config
-                                else 1000
-                            ),
-                        }
+        try:
+            auth_component = auth_cls(
+                importer_name=importer_name,
+                job_id=job_id,
+                db=db,
+                browser=browser,
+                credentials=importer.config.credentials or {},
+                headless=settings.HEADLESS,
+            )
+            auth_result = await _authenticate(auth_component)
+            page = auth_result.get("page")
+            context = auth_result.get("context")
+
+            products_component = None
+            if auth_result["success"]:
+                products_component = products_cls(
+                    importer_name=importer_name,
+                    job_id=job_id,
+                    db=db,
+                    browser=browser,
+                    page=page,
+                    context=context,
+                    selected_categories=selected_categories,
+                    config=_build_products_config(importer.config),
+                )
 
-                        # Paso 2: Extracción de productos
-                        products_component = NoriegaProductsComponent(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                            page=page,
-                            context=context,
-                            selected_categories=selected_categories,
-                            config=config,
-                        )
-                        result = await products_component.execute()
+            yield products_component, auth_result
 
-                    elif importer_name.upper() == "EMASA":
-                        # Usar componentes específicos de EMASA
-                        logger.info("🔧 Usando componentes de EMASA para productos")
+        finally:
+            await _close_task_browser(browser, page, context)
 
-                        # Obtener credenciales
-                        from sqlalchemy.orm import joinedload
 
-                        result_config = await db.execute(
-                            select(Importer)
-                            .options(joinedload(Importer.config))
-                            .where(Importer.name == importer_name.upper())
-                        )
-                        importer_with_config = (
-                            result_config.unique().scalar_one_or_none()
-                        )
-                        credentials = (
-                            importer_with_config.config.credentials or {}
-                            if importer_with_config and importer_with_config.config
-                            else {}
-                        )
+async def _finish_job(db, job_id: str, result: dict, processed_items: int):
+    """
+    Guarda el result y el estado final de un job de una sola tarea
 
-                        # Paso 1: Autenticación
-                        auth_component = EmasaAuthComponent(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                            credentials=credentials,
-                            headless=settings.HEADLESS,
-                        )
-                        auth_result = await auth_component.execute()
+    Respeta la cancelación hecha por el usuario mientras corría.
+    """
+    await merge_job_result(db, job_id, result)
 
-                        # Guardar referencias a page y context
-                        page = auth_result.get("page")
-                        context = auth_result.get("context")
+    job_status = await db.scalar(
+        select(ImportJob.status).where(ImportJob.job_id == job_id)
+    )
+    if job_status == JobStatus.CANCELLED:
+        final_status = JobStatus.CANCELLED
+    else:
+        final_status = (
+            JobStatus.COMPLETED if result.get("success") else JobStatus.FAILED
+        )
+
+    await db.execute(
+        update(ImportJob)
+        .where(ImportJob.job_id == job_id)
+        .values(
+            status=final_status,
+            progress=100,
+            processed_items=processed_items,
+            completed_at=datetime.now(timezone.utc),
+            error_message=result.get("error"),
+        )
+    )
+    await db.commit()
 
-                        if not auth_result["success"]:
-                            logger.error("❌ Autenticación fallida")
-                            job.status = JobStatus.FAILED
-                            job.result = {
-                                "success": False,
-                                "message": auth_result.get("message", ""),
-                                "error": auth_result.get("error"),
-                            }
-                            await db.commit()
-                            return job.result
-
-                        # Obtener configuración del importador
-                        config = {
-                            "products_per_category": (
-                                importer_with_config.config.products_per_category
-                                if importer_with_config.config
-                                else None
-                            ),
-                            "scraping_speed_ms": (
-                                importer_with_config.config.scraping_speed_ms
-                                if importer_with_config.config
-                                else 1000
-                            ),
-                        }
 
-                        # Paso 2: Extracción de productos
-                        products_component = EmasaProductsComponent(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                            page=page,
-                            context=context,
-                            selected_categories=selected_categories,
-                            config=config,
-                        )
-                        result = await products_component.execute()
+async def _run_retry_failed_items(importer_name: str, job_id: str) -> dict:
+    """
+    Reprocesa los failed_items pendientes de un importador
 
-                    else:
-                        # Usar orchestrator genérico para otros importadores
-                        orchestrator = ImportOrchestrator(
-                            importer_name=importer_name,
-                            job_id=job_id,
-                            db=db,
-                            browser=browser,
-                        )
-                        result = await orchestrator.import_products(selected_categories)
+    Solo visita las páginas de detalle de esos SKUs (sin listados ni
+    barrido de disponibilidad).
+    """
+    from sqlalchemy.orm import joinedload
 
-                    # Actualizar job con resultado
-                    job.status = (
-                        JobStatus.COMPLETED if result["success"] else JobStatus.FAILED
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Importer)
+            .options(joinedload(Importer.config))
+            .where(Importer.name == importer_name.upper())
+        )
+        importer = result.unique().scalar_one_or_none()
+
+        if not importer:
+            logger.error(f"❌ Importador no encontrado: {importer_name}")
+            return {"success": False, "error": "Importer not found"}
+
+        failed_items = await get_pending_failed_items(db, importer.id)
+        category_ids = sorted(
+            {str(item.category_id) for item in failed_items if item.category_id}
+        )
+
+        job = ImportJob(
+            job_id=job_id,
+            importer_id=importer.id,
+            job_type=JobType.RETRY_FAILED,
+            status=JobStatus.RUNNING,
+            params={"failed_items": len(failed_items), "categories": category_ids},
+            total_items=len(failed_items),
+            started_at=datetime.now(timezone.utc),
+        )
+        db.add(job)
+        await db.commit()
+
+        components = PRODUCT_COMPONENTS.get(importer_name.upper())
+        if not failed_items or not components:
+            job.status = JobStatus.COMPLETED if components else JobStatus.FAILED
+            job.result = {"success": bool(components), "total": 0, "retried": 0}
+            if not components:
+                job.error_message = f"Reintentos no soportados para {importer_name}"
+            job.progress = 100
+            job.completed_at = datetime.now(timezone.utc)
+            await db.commit()
+            return job.result
+
+        logger.info(
+            f"🔁 Reintentando {len(failed_items)} ítems fallidos de {importer_name}"
+        )
+
+        try:
+            async with _products_session(
+                importer, importer_name, job_id, db, category_ids
+            ) as (products_component, auth_result):
+                if products_component is None:
+                    result = {
+                        "success": False,
+                        "message": auth_result.get("message", ""),
+                        "error": auth_result.get("error"),
+                    }
+                else:
+                    result = await products_component.retry_failed_items(
+                        failed_items
                     )
-                    job.result = result
-                    job.progress = 100
-                    await db.commit()
 
-                    logger.info(f"✅ Tarea completada: {job_id}")
+        except Exception as e:
+            logger.error(f"❌ Error reintentando ítems del job {job_id}: {e}")
+            await db.rollback()
+            result = {"success": False, "error": str(e)}
 
-                    return result
+        await _finish_job(db, job_id, result, result.get("retried", 0))
 
-                finally:
-                    # Asegurar que el navegador se cierre siempre
-                    try:
-                        if page:
-                            await page.close()
-                        if context:
-                            await context.close()
-                        await browser.close()
-                        logger.info("🔒 Navegador y contextos cerrados correctamente")
-                    except Exception as e:
-                        logger.warning(f"⚠️ Error cerrando navegador: {e}")
+    logger.info(
+        f"✅ Reintento {job_id}: {result.get('resolved', 0)} resueltos, "
+        f"{result.get('failed', 0)} siguen fallando"
+    )
+    return result
 
-        except Exception as e:
-            logger.error(f"❌ Error en tarea {job_id}: {e}")
-            import traceback
 
-            logger.error(traceback.format_exc())
+@celery_app.task(bind=True, name="retry_failed_items")
+def retry_failed_items_task(self, importer_name: str, job_id: str) -> dict:
+    """
+    Tarea de Celery para reprocesar los failed_items de un importador
 
-            # Marcar job como fallido solo si fue creado
-            if job is not None:
-                try:
-                    job.status = JobStatus.FAILED
-                    job.error_message = str(e)
-                    await db.commit()
-                except Exception as db_error:
-                    logger.error(f"❌ Error al actualizar job en BD: {db_error}")
+    Toma el mismo lease que los imports de productos (trabaja sobre los
+    mismos SKUs).
 
-            return {"success": False, "error": str(e)}
+    Args:
+        importer_name: Nombre del importador
+        job_id: ID del job (generado por el endpoint junto con el lease)
+    """
+    logger.info(
+        f"🚀 Reintentando ítems fallidos: {importer_name} | Job ID: {job_id}"
+    )
 
+    return _run_async(
+        _run_leased(
+            importer_name,
+            JobType.PRODUCTS,
+            job_id,
+            lambda: _run_retry_failed_items(importer_name, job_id),
+        )
+    )
 
-@celery_app.task(bind=True, name="import_products")
-def import_products_task(
-    self, importer_name: str, selected_categories: List[str], job_id: str = None
+
+async def _run_quick_refresh(
+    importer_name: str, selected_categories: List[str], job_id: str
 ) -> dict:
     """
-    Tarea de Celery para importar productos
+    Refresca precio y stock de las categorías leyendo solo sus listados
+
+    Ver ProductsComponent.quick_refresh.
+    """
+    from sqlalchemy.orm import joinedload
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Importer)
+            .options(joinedload(Importer.config))
+            .where(Importer.name == importer_name.upper())
+        )
+        importer = result.unique().scalar_one_or_none()
+
+        if not importer:
+            logger.error(f"❌ Importador no encontrado: {importer_name}")
+            return {"success": False, "error": "Importer not found"}
+
+        job = ImportJob(
+            job_id=job_id,
+            importer_id=importer.id,
+            job_type=JobType.QUICK_REFRESH,
+            status=JobStatus.RUNNING,
+            params={"selected_categories": selected_categories},
+            started_at=datetime.now(timezone.utc),
+        )
+        db.add(job)
+        await db.commit()
+
+        components = PRODUCT_COMPONENTS.get(importer_name.upper())
+        if not components or not components[1].supports_quick_refresh():
+            result = {
+                "success": False,
+                "error": f"Refresh rápido no soportado para {importer_name}",
+            }
+            await _finish_job(db, job_id, result, 0)
+            return result
+
+        logger.info(
+            f"⚡ Refresh rápido de {importer_name}: "
+            f"{len(selected_categories)} categorías"
+        )
+
+        try:
+            async with _products_session(
+                importer, importer_name, job_id, db, selected_categories
+            ) as (products_component, auth_result):
+                if products_component is None:
+                    result = {
+                        "success": False,
+                        "message": auth_result.get("message", ""),
+                        "error": auth_result.get("error"),
+                    }
+                else:
+                    result = await products_component.quick_refresh()
+
+        except Exception as e:
+            logger.error(f"❌ Error en el refresh rápido del job {job_id}: {e}")
+            await db.rollback()
+            result = {"success": False, "error": str(e)}
+
+        await _finish_job(db, job_id, result, result.get("refreshed", 0))
+
+    logger.info(
+        f"✅ Refresh rápido {job_id}: {result.get('refreshed', 0)} productos, "
+        f"{result.get('updated', 0)} con cambios"
+    )
+    return result
+
+
+@celery_app.task(bind=True, name="quick_refresh")
+def quick_refresh_task(
+    self, importer_name: str, selected_categories: List[str], job_id: str
+) -> dict:
+    """
+    Tarea de Celery para refrescar solo precio y stock desde los listados
+
+    Tiene su propio lease (QUICK_REFRESH): puede correr junto a un import
+    completo, pero no dos refresh rápidos del mismo importador.
 
     Args:
         importer_name: Nombre del importador
-        selected_categories: Lista de categorías a importar
-        job_id: ID del job (generado por el endpoint, opcional para compatibilidad)
+        selected_categories: IDs de las categorías a refrescar
+        job_id: ID del job (generado por el endpoint junto con el lease)
+    """
+    logger.info(f"🚀 Refresh rápido: {importer_name} | Job ID: {job_id}")
+
+    return _run_async(
+        _run_leased(
+            importer_name,
+            JobType.QUICK_REFRESH,
+            job_id,
+            lambda: _run_quick_refresh(importer_name, selected_categories, job_id),
+        )
+    )
 
-    Returns:
-        Dict con el resultado de la importación
+
+async def _run_live_refresh(importer_name: str, skus: List[str]) -> dict:
     """
-    # Si no se proporciona job_id, generar uno (compatibilidad con código antiguo)
-    if job_id is None:
-        job_id = str(uuid.uuid4())
+    Refresca SKUs puntuales con la sesión autenticada del worker
 
-    # Crear un nuevo event loop para esta tarea
-    try:
-        # Intentar obtener el loop actual, si no existe crear uno nuevo
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            # No hay loop en ejecución, crear uno nuevo
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            created_new_loop = True
+    Ver app/importers/live_refresh.py. Si fallan todos los SKUs la sesión se
+    descarta (puede haber expirado en el proveedor) y la siguiente consulta
+    hace login.
+    """
+    from sqlalchemy.orm import joinedload
+
+    importer_name = importer_name.upper()
+    results = {}
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Importer)
+            .options(joinedload(Importer.config))
+            .where(Importer.name == importer_name)
+        )
+        importer = result.unique().scalar_one_or_none()
+        components = PRODUCT_COMPONENTS.get(importer_name)
+
+        if not importer or not importer.config or not components:
+            error = f"Refresh en vivo no soportado para {importer_name}"
+            results = {
+                sku: {"sku": sku, "status": "error", "error": error} for sku in skus
+            }
         else:
-            # Ya hay un loop, usarlo
-            created_new_loop = False
+            auth_cls, products_cls = components
+            job_id = f"live-{uuid.uuid4()}"
+
+            async def login(browser):
+                auth_result = await auth_cls(
+                    importer_name=importer_name,
+                    job_id=job_id,
+                    db=db,
+                    browser=browser,
+                    credentials=importer.config.credentials or {},
+                    headless=settings.HEADLESS,
+                ).execute()
+                if not auth_result["success"]:
+                    raise RuntimeError(
+                        auth_result.get("error") or auth_result.get("message")
+                    )
+                return auth_result["page"], auth_result["context"]
 
-        if created_new_loop:
             try:
-                return loop.run_until_complete(
-                    _run_import_products(importer_name, selected_categories, job_id)
+                page, context = await worker_runtime.get_session(
+                    importer_name, login, settings.LIVE_SESSION_MAX_AGE_SECONDS
                 )
-            finally:
-                loop.close()
-                asyncio.set_event_loop(None)
-        else:
-            # Si ya hay un loop, usar asyncio.run
-            return asyncio.run(
-                _run_import_products(importer_name, selected_categories, job_id)
+                products_component = products_cls(
+                    importer_name=importer_name,
+                    job_id=job_id,
+                    db=db,
+                    browser=None,
+                    page=page,
+                    context=context,
+                    selected_categories=[],
+                    config=_build_products_config(importer.config),
+                )
+                results = await refresh_skus(
+                    db, products_component, importer.id, skus
+                )
+            except Exception as e:
+                logger.error(f"❌ Error en refresh en vivo de {importer_name}: {e}")
+                await db.rollback()
+                results = {
+                    sku: {"sku": sku, "status": "error", "error": str(e)}
+                    for sku in skus
+                }
+
+            # Todo falló: lo más probable es que la sesión haya expirado
+            if results and all(
+                entry["status"] == "error" for entry in results.values()
+            ):
+                await worker_runtime.drop_session(importer_name)
+
+    for sku in skus:
+        entry = results.get(sku)
+        if entry is None:
+            entry = {"sku": sku, "status": "error", "error": "Sin resultado"}
+        await publish_result(importer_name, sku, entry)
+
+    refreshed = sum(1 for entry in results.values() if entry["status"] == "ok")
+    logger.info(f"⚡ Refresh en vivo {importer_name}: {refreshed}/{len(skus)} SKUs")
+    return {"success": True, "refreshed": refreshed, "results": results}
+
+
+@celery_app.task(bind=True, name="live_refresh")
+def live_refresh_task(self, importer_name: str, skus: List[str]) -> dict:
+    """
+    Tarea de Celery para el refresh en vivo de uno o pocos SKUs
+
+    No crea ImportJob ni toma lease: es una consulta puntual que no debe
+    esperar a que termine un import. El resultado se publica en Redis
+    (la API lo espera ahí).
+
+    Args:
+        importer_name: Nombre del importador
+        skus: SKUs a refrescar (marcados como inflight por la API)
+    """
+    return _run_async(_run_live_refresh(importer_name, skus))
+
+
+async def _run_schedule_refreshes() -> dict:
+    """
+    Encola un refresh por importador con las categorías vencidas
+
+    Ver app/tasks/refresh_scheduler.py. Si el importador ya tiene un import
+    de productos en curso se salta este tick.
+    """
+    from sqlalchemy.orm import joinedload
+
+    scheduled = {}
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Importer)
+            .options(joinedload(Importer.config))
+            .where(Importer.is_active.is_(True))
+        )
+        importers = result.unique().scalars().all()
+
+        for importer in importers:
+            importer_name = importer.name.value
+            if importer_name not in PRODUCT_COMPONENTS:
+                continue
+            if not importer.config or not importer.config.is_active:
+                continue
+
+            plan = await load_refresh_plan(db, importer)
+            due = select_due(plan["plans"], plan["remaining"])
+            if not due:
+                continue
+
+            job_id = str(uuid.uuid4())
+            lease, running_job_id = await claim_import_lease(
+                db, importer_name, JobType.PRODUCTS, job_id
             )
-    except Exception as e:
-        logger.error(f"❌ Error crítico en import_products_task: {e}")
-        import traceback
+            if running_job_id:
+                logger.info(
+                    f"⏭️  Refresh de {importer_name} pospuesto: job {running_job_id} en curso"
+                )
+                continue
 
-        logger.error(traceback.format_exc())
-        return {"success": False, "error": str(e)}
+            cost = sum(entry.cost for entry in due)
+            try:
+                import_products_task.delay(
+                    importer_name,
+                    [str(entry.category_id) for entry in due],
+                    job_id,
+                    {"scheduled": True, "estimated_cost": cost},
+                )
+            except Exception:
+                await lease.release()
+                raise
+
+            scheduled[importer_name] = {
+                "job_id": job_id,
+                "categories": [entry.name for entry in due],
+                "estimated_cost": cost,
+                "remaining_budget": plan["remaining"] - cost,
+            }
+            logger.info(
+                f"🗓️  Refresh programado de {importer_name}: {len(due)} categorías, "
+                f"~{cost} requests (quedan {plan['remaining'] - cost} de "
+                f"{plan['daily_budget']})"
+            )
+
+    return {"success": True, "scheduled": scheduled}
+
+
+@celery_app.task(bind=True, name="schedule_refreshes")
+def schedule_refreshes_task(self) -> dict:
+    """
+    Tarea periódica (beat): programa los refreshes según la tasa de cambio
+    """
+    return _run_async(_run_schedule_refreshes())
+
+
+async def _ensure_history_partitions() -> dict:
+    async with AsyncSessionLocal() as db:
+        months = await ensure_upcoming_price_history_partitions(db)
+    logger.info(
+        "📅 Particiones de historial listas: "
+        + ", ".join(f"{month:%Y-%m}" for month in months)
+    )
+    return {"success": True, "months": [month.isoformat() for month in months]}
+
+
+@celery_app.task(bind=True, name="ensure_history_partitions")
+def ensure_history_partitions_task(self) -> dict:
+    """
+    Crea por adelantado las particiones de product_price_history del mes
+    actual y el siguiente (beat diario y arranque de cada worker)
+
+    Así las escrituras de historial no corren DDL dentro de sus
+    transacciones.
+    """
+    return _run_async(_ensure_history_partitions())
@@ -0,0 +1,207 @@
+"""
+Scheduler de refresh por tasa de cambio
+
+Cada importador tiene un presupuesto diario de requests al proveedor
+(aprox. una página de detalle por SKU). El presupuesto se reparte entre las
+categorías seleccionadas según la tasa de cambio aprendida de cada una
+(Category.change_rate, cambios de precio/stock por SKU y día):
+
+    refreshes/día_i = B · √λ_i / Σ_j (c_j · √λ_j)
+
+con c_j el costo (SKUs) de refrescar la categoría j, de modo que
+Σ c_i · refreshes/día_i = B. La raíz reparte mejor que la proporción
+directa: las categorías volátiles se refrescan más seguido sin dejar
+abandonadas a las estáticas (que igual se refrescan cada
+REFRESH_MAX_INTERVAL_HOURS como máximo).
+
+En cada tick de beat se encolan, en un solo job por importador, las
+categorías vencidas (ordenadas por atraso relativo) que quepan en lo que
+queda del presupuesto de las últimas 24 horas.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+
+@dataclass
+class CategoryRefreshPlan:
+    """Plan de refresh calculado para una categoría"""
+
+    category_id: int
+    name: str
+    cost: int
+    change_rate: float
+    learned: bool
+    interval_hours: float
+    last_refreshed_at: Optional[datetime]
+    overdue_ratio: float
+
+    @property
+    def due(self) -> bool:
+        return self.overdue_ratio >= 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "category_id": self.category_id,
+            "name": self.name,
+            "cost": self.cost,
+            "change_rate": round(self.change_rate, 4),
+            "learned": self.learned,
+            "interval_hours": round(self.interval_hours, 2),
+            "last_refreshed_at": (
+                self.last_refreshed_at.isoformat() if self.last_refreshed_at else None
+            ),
+            # inf (nunca refrescada) no es JSON válido
+            "overdue_ratio": (
+                round(self.overdue_ratio, 2)
+                if math.isfinite(self.overdue_ratio)
+                else None
+            ),
+            "due": self.due,
+        }
+
+
+def refresh_cost(category: Any, products_per_category: Optional[int] = None) -> int:
+    """Requests estimados para refrescar una categoría (listado + detalles)"""
+    count = category.product_count or settings.CATEGORY_SIZE_ESTIMATE
+    if products_per_category:
+        count = min(count, products_per_category)
+    return count + 1
+
+
+def plan_refreshes(
+    categories: List[Any],
+    daily_budget: int,
+    products_per_category: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> List[CategoryRefreshPlan]:
+    """
+    Calcula el intervalo de refresh de cada categoría dentro del presupuesto
+
+    Args:
+        categories: Categorías seleccionadas de un importador
+        daily_budget: Requests por día disponibles para refrescar
+        products_per_category: Límite de productos por categoría (o None)
+        now: Hora de referencia (default: ahora)
+
+    Returns:
+        Planes ordenados por atraso relativo (más atrasada primero)
+    """
+    now = now or datetime.now(timezone.utc)
+    min_hours = settings.REFRESH_MIN_INTERVAL_HOURS
+    max_hours = settings.REFRESH_MAX_INTERVAL_HOURS
+
+    entries = []
+    for category in categories:
+        rate = category.change_rate
+        if rate is None:
+            rate = settings.REFRESH_DEFAULT_CHANGE_RATE
+        # Piso para que ninguna categoría quede con peso cero
+        rate = max(rate, 1e-4)
+        entries.append((category, refresh_cost(category, products_per_category), rate))
+
+    weight = sum(cost * math.sqrt(rate) for _, cost, rate in entries)
+
+    plans = []
+    for category, cost, rate in entries:
+        per_day = daily_budget * math.sqrt(rate) / weight if weight else 0
+        interval_hours = 24 / per_day if per_day else max_hours
+        interval_hours = min(max(interval_hours, min_hours), max_hours)
+
+        if category.last_refreshed_at:
+            age_hours = (now - category.last_refreshed_at).total_seconds() / 3600
+            overdue_ratio = age_hours / interval_hours
+        else:
+            # Nunca refrescada: primero en la fila
+            overdue_ratio = math.inf
+
+        plans.append(
+            CategoryRefreshPlan(
+                category_id=category.id,
+                name=category.name,
+                cost=cost,
+                change_rate=rate,
+                learned=category.change_rate is not None,
+                interval_hours=interval_hours,
+                last_refreshed_at=category.last_refreshed_at,
+                overdue_ratio=overdue_ratio,
+            )
+        )
+
+    plans.sort(key=lambda plan: plan.overdue_ratio, reverse=True)
+    return plans
+
+
+def select_due(
+    plans: List[CategoryRefreshPlan], remaining_budget: int
+) -> List[CategoryRefreshPlan]:
+    """Categorías vencidas que caben en el presupuesto restante"""
+    selected = []
+    for plan in plans:
+        if not plan.due:
+            break
+        if plan.cost > remaining_budget:
+            continue
+        selected.append(plan)
+        remaining_budget -= plan.cost
+    return selected
+
+
+async def spent_budget(db: Any, importer_id: int, now: datetime) -> int:
+    """Requests usados por refreshes programados en las últimas 24 horas"""
+    from app.models import ImportJob
+    from sqlalchemy import select
+
+    result = await db.execute(
+        select(ImportJob.params).where(
+            ImportJob.importer_id == importer_id,
+            ImportJob.created_at >= now - timedelta(hours=24),
+        )
+    )
+    return sum(
+        params.get("estimated_cost", 0)
+        for params in result.scalars()
+        if params and params.get("scheduled")
+    )
+
+
+async def load_refresh_plan(db: Any, importer: Any) -> Dict[str, Any]:
+    """
+    Plan de refresh de un importador: presupuesto, gasto y categorías
+
+    Args:
+        db: Sesión de base de datos
+        importer: Importer con su config cargada
+    """
+    from app.models import Category
+    from sqlalchemy import select
+
+    config = importer.config
+    extra_config = (config.extra_config or {}) if config else {}
+    daily_budget = int(
+        extra_config.get("refresh_daily_budget")
+        or settings.REFRESH_DAILY_REQUEST_BUDGET
+    )
+    products_per_category = config.products_per_category if config else None
+
+    result = await db.execute(
+        select(Category).where(
+            Category.importer_id == importer.id, Category.selected.is_(True)
+        )
+    )
+    categories = result.scalars().all()
+
+    now = datetime.now(timezone.utc)
+    plans = plan_refreshes(categories, daily_budget, products_per_category, now)
+    spent = await spent_budget(db, importer.id, now)
+
+    return {
+        "daily_budget": daily_budget,
+        "spent_last_24h": spent,
+        "remaining": max(daily_budget - spent, 0),
+        "plans": plans,
+    }
@@ -0,0 +1,103 @@
+"""
+Colas y prioridades de las tareas de importación
+
+Cada tipo de trabajo tiene su cola para que un scrape completo de horas no
+deje esperando a un refresh de segundos:
+
+- imports.categories: importación de categorías (corta)
+- imports.refresh: imports de productos chicos, el dispatcher y el
+  finalizador de los chords, los reintentos de failed_items, los refresh
+  rápidos de precio/stock y los refresh en vivo de SKUs (interactivos,
+  deben partir en segundos)
+- imports.products: chunks de imports de productos grandes (bulk)
+- imports.dev: imports de /dev con navegador visible; no la consume ningún
+  worker de producción, sino un runner local con pantalla (make dev-runner)
+
+Cada cola la atiende su propio pool de workers (ver docker-compose.prod.yml).
+Dentro de una cola se usan las prioridades del broker Redis, donde 0 es la
+más alta.
+"""
+
+from typing import Any, Dict, List
+
+from app.core.config import settings
+
+QUEUE_CATEGORIES = "imports.categories"
+QUEUE_PRODUCTS = "imports.products"
+QUEUE_REFRESH = "imports.refresh"
+QUEUE_DEV = "imports.dev"
+
+# Redis: número menor = mayor prioridad
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BULK = 8
+
+# Rutas fijas por nombre de tarea (los chunks se re-rutean por tamaño)
+TASK_ROUTES = {
+    "import_categories": {"queue": QUEUE_CATEGORIES, "priority": PRIORITY_INTERACTIVE},
+    "import_products": {"queue": QUEUE_REFRESH, "priority": PRIORITY_INTERACTIVE},
+    "import_products_chunk": {"queue": QUEUE_PRODUCTS, "priority": PRIORITY_BULK},
+    "finalize_products_import": {
+        "queue": QUEUE_REFRESH,
+        "priority": PRIORITY_INTERACTIVE,
+    },
+    "retry_failed_items": {"queue": QUEUE_REFRESH, "priority": PRIORITY_INTERACTIVE},
+    "quick_refresh": {"queue": QUEUE_REFRESH, "priority": PRIORITY_INTERACTIVE},
+    "live_refresh": {"queue": QUEUE_REFRESH, "priority": PRIORITY_INTERACTIVE},
+    "schedule_refreshes": {"queue": QUEUE_REFRESH, "priority": PRIORITY_DEFAULT},
+    "ensure_history_partitions": {
+        "queue": QUEUE_REFRESH,
+        "priority": PRIORITY_INTERACTIVE,
+    },
+    "dev_import_categories": {"queue": QUEUE_DEV, "priority": PRIORITY_INTERACTIVE},
+    "dev_import_products": {"queue": QUEUE_DEV, "priority": PRIORITY_INTERACTIVE},
+}
+
+
+def route_products_import(estimated_products: int) -> Dict[str, Any]:
+    """
+    Cola y prioridad de los chunks de un import de productos según su tamaño
+
+    Los imports de hasta QUICK_IMPORT_MAX_PRODUCTS productos van a la cola
+    interactiva; el resto a la cola bulk con prioridad baja.
+    """
+    if estimated_products <= settings.QUICK_IMPORT_MAX_PRODUCTS:
+        return {"queue": QUEUE_REFRESH, "priority": PRIORITY_INTERACTIVE}
+    return {"queue": QUEUE_PRODUCTS, "priority": PRIORITY_BULK}
+
+
+async def estimate_products_import(
+    db: Any,
+    importer_id: int,
+    category_ids: List[str],
+    products_per_category: int = None,
+) -> int:
+    """
+    Estima cuántos productos scrapeará un import
+
+    Usa Category.product_count del último import; las categorías nunca
+    importadas cuentan como CATEGORY_SIZE_ESTIMATE. Si hay límite de
+    productos por categoría se aplica a cada una.
+    """
+    from app.models import Category
+    from sqlalchemy import select
+
+    ids = [int(category_id) for category_id in category_ids if category_id.isdigit()]
+    counts: Dict[int, int] = {}
+    if ids:
+        result = await db.execute(
+            select(Category.id, Category.product_count).where(
+                Category.importer_id == importer_id, Category.id.in_(ids)
+            )
+        )
+        counts = {category_id: count for category_id, count in result.all()}
+
+    total = 0
+    for category_id in category_ids:
+        count = counts.get(int(category_id)) if category_id.isdigit() else None
+        if not count:
+            count = settings.CATEGORY_SIZE_ESTIMATE
+        if products_per_category:
+            count = min(count, products_per_category)
+        total += count
+    return total
@@ -0,0 +1,243 @@
+"""
+Runtime asyncio persistente por proceso worker de Celery
+
+Con --pool=threads cada tarea creaba su propio event loop, y con él
+conexiones a la BD, clientes Redis y un driver de Playwright nuevos (y los
+errores "attached to a different loop" al compartir el pool del motor).
+
+El runtime mantiene un único event loop en un thread dedicado; los threads
+de Celery le envían sus corutinas y esperan el resultado. Todo lo que
+depende del loop se crea una vez y se reutiliza entre tareas:
+- Motor SQLAlchemy (app.core.database elige el motor por loop)
+- Cliente Redis (app.core.redis, uno por loop)
+- Playwright + navegador compartido; cada tarea abre sus propios contextos
+  y al cerrar "su" navegador solo se cierran esos contextos
+- Sesiones autenticadas "tibias" por importador para el refresh en vivo de
+  SKUs (se evita un login por consulta)
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import dispose_engine
+from app.core.logger import logger
+from app.core.metrics import BROWSER_CONTEXTS_ACTIVE, BROWSERS_ACTIVE
+from celery.signals import worker_shutdown
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+
+
+async def launch_browser(playwright: Any) -> Browser:
+    """Lanza Chromium con los flags necesarios para headless en Docker"""
+    launch_args = []
+    if settings.HEADLESS:
+        launch_args = [
+            "--no-sandbox",
+            "--disable-setuid-sandbox",
+            "--disable-dev-shm-usage",
+            "--disable-accelerated-2d-canvas",
+            "--no-first-run",
+            "--no-zygote",
+            "--disable-gpu",
+        ]
+
+    return await playwright.chromium.launch(
+        headless=settings.HEADLESS,
+        args=launch_args,
+        slow_mo=500 if not settings.HEADLESS else 0,
+    )
+
+
+class TaskBrowser:
+    """
+    Vista del navegador compartido para una tarea
+
+    Expone la misma interfaz que Browser; close() cierra solo los contextos
+    que abrió esta tarea y deja el navegador vivo para las siguientes.
+    """
+
+    def __init__(self, browser: Browser):
+        self._browser = browser
+        self._contexts: List[BrowserContext] = []
+
+    async def new_context(self, **kwargs) -> BrowserContext:
+        context = await self._browser.new_context(**kwargs)
+        self._contexts.append(context)
+        BROWSER_CONTEXTS_ACTIVE.inc()
+        return context
+
+    async def new_page(self, **kwargs) -> Page:
+        context = await self.new_context(**kwargs)
+        return await context.new_page()
+
+    async def close(self):
+        contexts, self._contexts = self._contexts, []
+        for context in contexts:
+            BROWSER_CONTEXTS_ACTIVE.dec()
+            try:
+                await context.close()
+            except Exception:
+                # Ya cerrado por la tarea
+                pass
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._browser, name)
+
+
+class WorkerRuntime:
+    """Event loop persistente (en su propio thread) y recursos compartidos"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        # Solo se usan desde el loop del runtime
+        self._playwright = None
+        self._browser: Optional[Browser] = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        # importador -> (navegador de la sesión, página, contexto, creada en)
+        self._sessions: Dict[str, Tuple[TaskBrowser, Page, Any, float]] = {}
+        self._session_locks: Dict[str, asyncio.Lock] = {}
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None or self._loop.is_closed():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(
+                    target=run, name="worker-asyncio", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+                self._loop = loop
+                logger.info("🔁 Runtime asyncio del worker iniciado")
+            return self._loop
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """
+        Ejecuta una corutina en el loop del runtime y espera su resultado
+
+        Se llama desde los threads de Celery (nunca desde el propio loop).
+        """
+        loop = self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(coro, loop)
+        return future.result()
+
+    async def get_browser(self) -> TaskBrowser:
+        """Navegador compartido del worker (se relanza si se cayó)"""
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await launch_browser(self._playwright)
+                BROWSERS_ACTIVE.set(1)
+                logger.info("🌐 Navegador compartido del worker lanzado")
+
+        return TaskBrowser(self._browser)
+
+    async def get_session(
+        self,
+        key: str,
+        login: Callable[[TaskBrowser], Awaitable[Tuple[Page, Any]]],
+        max_age_seconds: float,
+    ) -> Tuple[Page, Any]:
+        """
+        Sesión autenticada reutilizable (página y contexto) para `key`
+
+        Se reutiliza mientras el navegador siga conectado y no supere
+        max_age_seconds; si no, se cierra y se vuelve a hacer login.
+
+        Args:
+            key: Identificador de la sesión (nombre del importador)
+            login: Corutina que recibe el navegador y devuelve (page, context)
+            max_age_seconds: Vida máxima de la sesión
+        """
+        lock = self._session_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            session = self._sessions.get(key)
+            if session:
+                browser, page, context, created_at = session
+                fresh = time.monotonic() - created_at < max_age_seconds
+                if fresh and browser.is_connected() and not page.is_closed():
+                    return page, context
+                await self._close_session(key)
+
+            browser = await self.get_browser()
+            try:
+                page, context = await login(browser)
+            except Exception:
+                await browser.close()
+                raise
+
+            self._sessions[key] = (browser, page, context, time.monotonic())
+            logger.info(f"🔑 Sesión de {key} abierta en el worker")
+            return page, context
+
+    async def drop_session(self, key: str):
+        """Descarta la sesión de `key` (ej. tras un error: puede haber expirado)"""
+        lock = self._session_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            await self._close_session(key)
+
+    async def _close_session(self, key: str):
+        session = self._sessions.pop(key, None)
+        if session:
+            await session[0].close()
+
+    async def _close_resources(self):
+        for key in list(self._sessions):
+            await self._close_session(key)
+
+        try:
+            if self._browser is not None:
+                await self._browser.close()
+            if self._playwright is not None:
+                await self._playwright.stop()
+        except Exception as e:
+            logger.warning(f"⚠️ Error cerrando Playwright del worker: {e}")
+        finally:
+            self._browser = None
+            self._playwright = None
+            BROWSERS_ACTIVE.set(0)
+
+        await dispose_engine()
+
+    def stop(self):
+        """Libera navegador y conexiones y detiene el loop"""
+        with self._start_lock:
+            loop, self._loop = self._loop, None
+        if loop is None or loop.is_closed():
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_resources(), loop).result(
+                timeout=30
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Error cerrando el runtime del worker: {e}")
+
+        loop.call_soon_threadsafe(loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        loop.close()
+        logger.info("🔒 Runtime asyncio del worker detenido")
+
+
+worker_runtime = WorkerRuntime()
+
+
+@worker_shutdown.connect
+def _stop_worker_runtime(**kwargs):
+    worker_runtime.stop()
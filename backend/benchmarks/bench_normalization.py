@@ -0,0 +1,56 @@
+"""
+Normalización, hash de contenido y armado de URLs por producto/categoría
+
+Se mide sobre 200 productos de detalle (fixture `products`), el tamaño de
+una categoría chica o de un lote del sink.
+"""
+
+from types import SimpleNamespace
+
+from app.importers.emasa import EmasaProductsComponent
+from app.importers.noriega import NoriegaProductsComponent
+from app.importers.persistence import PRODUCT_FIELDS, compute_content_hash
+
+from conftest import CATEGORY_NAMES
+
+
+def bench_normalize_emasa(benchmark, products):
+    normalize = EmasaProductsComponent._normalize_product
+    rows = benchmark(lambda: [normalize(None, product) for product in products])
+    assert set(rows[0]) <= set(PRODUCT_FIELDS)
+
+
+def bench_normalize_noriega(benchmark, products):
+    normalize = NoriegaProductsComponent._normalize_product
+    rows = benchmark(lambda: [normalize(None, product) for product in products])
+    assert len(rows) == len(products)
+
+
+def bench_content_hash(benchmark, products):
+    normalize = EmasaProductsComponent._normalize_product
+    rows = [normalize(None, product) for product in products]
+    hashes = benchmark(lambda: [compute_content_hash(row) for row in rows])
+    assert len(set(hashes)) == len(rows)
+
+
+def bench_build_category_url(benchmark):
+    # _build_category_url solo usa self.logger
+    component = SimpleNamespace(
+        logger=SimpleNamespace(info=lambda *a: None, warning=lambda *a: None)
+    )
+    build = NoriegaProductsComponent._build_category_url
+    base = "https://ecommerce.noriegavanzulli.cl/b2b/"
+    categories = [
+        SimpleNamespace(url=f"{base}resultado_{kind}.jsp?{kind}=x")
+        for kind in ("medida", "fabrica")
+    ]
+
+    def build_all():
+        return [
+            build(component, name, category)
+            for name in CATEGORY_NAMES
+            for category in categories
+        ]
+
+    urls = benchmark(build_all)
+    assert urls[0].endswith("medida=Filtros%20de%20Aceite")
@@ -0,0 +1,71 @@
+"""
+Helpers de parseo que corren una vez por producto o por categoría
+
+Cada benchmark recorre la lista completa de textos de muestra: el tiempo
+reportado es por lote, no por llamada.
+"""
+
+from app.importers.parsing import (
+    find_listing_columns,
+    parse_price,
+    parse_result_count,
+    parse_stock,
+    parse_stock_label,
+    parse_total_records,
+    parse_year_range,
+    slugify,
+)
+
+from conftest import (
+    CATEGORY_NAMES,
+    LISTING_HEADERS,
+    PRICE_TEXTS,
+    STOCK_TEXTS,
+    YEAR_TEXTS,
+)
+
+
+def bench_parse_price(benchmark):
+    result = benchmark(lambda: [parse_price(text) for text in PRICE_TEXTS])
+    assert result[0] == 17920.0
+    assert result[3] == 1234567.0
+
+
+def bench_parse_stock(benchmark):
+    result = benchmark(lambda: [parse_stock(text) for text in STOCK_TEXTS])
+    assert result[:4] == [12, 1, 0, 0]
+
+
+def bench_parse_stock_label(benchmark):
+    result = benchmark(lambda: [parse_stock_label(text) for text in STOCK_TEXTS])
+    assert result[4:7] == [999, 0, 0]
+
+
+def bench_parse_year_range(benchmark):
+    result = benchmark(lambda: [parse_year_range(text) for text in YEAR_TEXTS])
+    assert result[0] == (2010, 2015)
+    assert result[1] == (2008, None)
+
+
+def bench_parse_counts(benchmark):
+    texts = [
+        "236 resultados",
+        "1 resultado",
+        "Mostrando registros del 1 al 10 de un total de 1523 registros",
+    ]
+
+    def parse():
+        return [parse_result_count(texts[0]), parse_total_records(texts[2])]
+
+    assert benchmark(parse) == [236, 1523]
+
+
+def bench_find_listing_columns(benchmark):
+    result = benchmark(lambda: [find_listing_columns(h) for h in LISTING_HEADERS])
+    assert result[0] == {"price": 6, "stock": 7}
+
+
+def bench_slugify(benchmark):
+    result = benchmark(lambda: [slugify(name) for name in CATEGORY_NAMES])
+    assert result[1] == "embragues-clutch"
+    assert result[-1] == "categoria"
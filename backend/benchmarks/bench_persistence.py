@@ -0,0 +1,84 @@
+"""
+Camino de guardado por lotes contra una BD local (BENCH_DATABASE_URL)
+
+Cada ronda guarda un lote de BATCH_SIZE productos de una categoría
+descartable, en los tres casos que se dan en un import:
+- insert: SKUs nuevos (INSERT + primer punto del historial)
+- unchanged: mismo contenido (solo last_scraped_at)
+- price_changed: cambia el precio (UPDATE + historial)
+y en modo "copy" (COPY a products_staging + merge).
+"""
+
+import uuid
+
+from app.importers.persistence import StagingProductLoader, save_products
+
+from conftest import make_rows
+
+BATCH_SIZE = 200
+ROUNDS = 10
+
+
+def _save(run, session_factory, category, rows):
+    async def save():
+        async with session_factory() as db:
+            return await save_products(db, category, rows)
+
+    return run(save())
+
+
+def bench_save_products_insert(benchmark, run, session_factory, bench_category):
+    def setup():
+        return (make_rows(BATCH_SIZE, uuid.uuid4().hex[:8]),), {}
+
+    stats = benchmark.pedantic(
+        lambda rows: _save(run, session_factory, bench_category, rows),
+        setup=setup,
+        rounds=ROUNDS,
+    )
+    assert stats["created"] == BATCH_SIZE
+
+
+def bench_save_products_unchanged(benchmark, run, session_factory, bench_category):
+    rows = make_rows(BATCH_SIZE, "SAME")
+    _save(run, session_factory, bench_category, rows)
+
+    stats = benchmark.pedantic(
+        lambda: _save(run, session_factory, bench_category, rows), rounds=ROUNDS
+    )
+    assert stats["unchanged"] == BATCH_SIZE
+
+
+def bench_save_products_price_changed(
+    benchmark, run, session_factory, bench_category
+):
+    rows = make_rows(BATCH_SIZE, "PRICE")
+    _save(run, session_factory, bench_category, rows)
+
+    def setup():
+        for row in rows:
+            row["price"] += 10
+        return (rows,), {}
+
+    stats = benchmark.pedantic(
+        lambda rows: _save(run, session_factory, bench_category, rows),
+        setup=setup,
+        rounds=ROUNDS,
+    )
+    assert stats["updated"] == BATCH_SIZE
+
+
+def bench_staging_copy_merge(benchmark, run, session_factory, bench_category):
+    def setup():
+        return (make_rows(BATCH_SIZE, uuid.uuid4().hex[:8]),), {}
+
+    async def stage_and_merge(rows):
+        async with session_factory() as db:
+            loader = StagingProductLoader(db, f"bench-{uuid.uuid4()}")
+            await loader.stage(bench_category, rows)
+            return await loader.merge(bench_category)
+
+    stats = benchmark.pedantic(
+        lambda rows: run(stage_and_merge(rows)), setup=setup, rounds=ROUNDS
+    )
+    assert stats["created"] == BATCH_SIZE
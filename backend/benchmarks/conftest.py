@@ -0,0 +1,206 @@
+"""
+Fixtures compartidas de los micro-benchmarks
+
+Los textos imitan lo que devuelven los sitios de los proveedores (precios
+CLP con punto de miles, etiquetas de stock, rangos de años de las tablas de
+aplicaciones). Los benchmarks de persistencia necesitan una BD Postgres con
+las migraciones aplicadas en BENCH_DATABASE_URL; sin ella se omiten. Nunca
+se usa DATABASE_URL: los benchmarks escriben y borran productos.
+"""
+
+import asyncio
+import os
+import random
+import uuid
+from typing import Any, Dict, List
+
+import pytest
+
+# Precios tal como aparecen en listados y detalles
+PRICE_TEXTS = [
+    "$17.920",
+    "$ 37.604",
+    "17.920",
+    "$1.234.567",
+    "$ 129.990 IVA incl.",
+    "Precio: $2.490",
+    "$0",
+    "",
+    "$ 8.350",
+    "  $ 452.100  ",
+]
+
+# Stock: cantidades, "X" (hay stock), fechas de llegada y etiquetas
+STOCK_TEXTS = [
+    "12",
+    "X",
+    "Oct-2025",
+    "ENE-2026",
+    "Disponible",
+    "Agotado",
+    "Sin stock",
+    " 3 unid.",
+    "",
+    "150",
+]
+
+# Columna de años de las tablas de aplicaciones
+YEAR_TEXTS = [
+    "2010 - 2015",
+    "2008 - --",
+    "1998-2004",
+    " 2015 - 2019 ",
+    "2021 - --",
+    "S/I",
+    "",
+    "1985 - 1992",
+]
+
+CATEGORY_NAMES = [
+    "Filtros de Aceite",
+    "Embragues / Clutch",
+    "Amortiguadores Delanteros",
+    "Bujías y Cables",
+    "Rodamientos Rueda (Maza)",
+    "Correas de Distribución",
+    "X MEDIDA 12x1.5",
+    "",
+]
+
+LISTING_HEADERS = [
+    [
+        "",
+        "Foto",
+        "ITEM",
+        "Descripción",
+        "Marca",
+        "Precio Neto",
+        "Precio c/IVA",
+        "Stock",
+    ],
+    ["Código", "Nombre", "Valor", "Disponibilidad"],
+    ["N° Noriega", "Descripción", "Fabricante", "PRECIO", "STOCK"],
+]
+
+_BRANDS = ["TOYOTA", "NISSAN", "CHEVROLET", "HYUNDAI", "KIA", "SUZUKI", "MAZDA"]
+
+
+def make_product(sku: str, rnd: random.Random) -> Dict[str, Any]:
+    """Producto ya extraído del detalle (formato de _parse_product_page)"""
+    year = rnd.randint(1995, 2020)
+    return {
+        "sku": sku,
+        "name": f"Pastilla de freno delantera {sku}",
+        "description": "Juego de pastillas de freno cerámicas, 4 piezas. " * 3,
+        "price": float(rnd.randint(2_000, 450_000)),
+        "stock": rnd.choice([0, 1, 3, 12, 999]),
+        "brand": rnd.choice(["BOSCH", "FRASLE", "TRW", "NIPPON"]),
+        "url": f"https://ecommerce.emasa.cl/b2b/detalle.aspx?item={sku}",
+        "image_url": f"https://ecommerce.emasa.cl/b2b/img/{sku}.jpg",
+        "images": [
+            f"https://ecommerce.emasa.cl/b2b/img/{sku}_{i}.jpg" for i in range(3)
+        ],
+        "applications": [
+            {
+                "car_brand": rnd.choice(_BRANDS),
+                "car_model": f"MODELO {rnd.randint(1, 40)}",
+                "secondary_name": None,
+                "year_start": year,
+                "year_end": year + rnd.randint(0, 8),
+            }
+            for _ in range(rnd.randint(2, 12))
+        ],
+        "characteristics": [{"name": "Posición", "value": "Delantera"}],
+        "is_offer": rnd.random() < 0.1,
+    }
+
+
+def make_rows(count: int, prefix: str, seed: int = 7) -> List[Dict[str, Any]]:
+    """Filas normalizadas (claves de PRODUCT_FIELDS) listas para guardar"""
+    from app.importers.emasa import EmasaProductsComponent
+
+    rnd = random.Random(seed)
+    normalize = EmasaProductsComponent._normalize_product
+    return [
+        normalize(None, make_product(f"{prefix}-{i}", rnd)) for i in range(count)
+    ]
+
+
+@pytest.fixture(scope="session")
+def products() -> List[Dict[str, Any]]:
+    """200 productos de detalle (~una página de categoría)"""
+    rnd = random.Random(42)
+    return [make_product(f"BENCH-{i:05d}", rnd) for i in range(200)]
+
+
+# ===== Base de datos =====
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Ejecuta corutinas en un único event loop para toda la sesión"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def session_factory(run):
+    url = os.getenv("BENCH_DATABASE_URL")
+    if not url:
+        pytest.skip("BENCH_DATABASE_URL no definida (BD local para benchmarks)")
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    engine = create_async_engine(url)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    run(engine.dispose())
+
+
+@pytest.fixture
+def bench_category(run, session_factory):
+    """Categoría descartable de EMASA; al terminar se borran sus productos"""
+    from app.models import (
+        Category,
+        Importer,
+        ImporterType,
+        Product,
+        ProductPriceHistory,
+    )
+    from sqlalchemy import delete, select
+
+    async def create():
+        async with session_factory() as db:
+            importer = await db.scalar(
+                select(Importer).where(Importer.name == ImporterType.EMASA)
+            )
+            if importer is None:
+                importer = Importer(
+                    name=ImporterType.EMASA,
+                    display_name="EMASA",
+                    base_url="https://ecommerce.emasa.cl",
+                )
+                db.add(importer)
+                await db.flush()
+
+            name = f"bench-{uuid.uuid4().hex[:8]}"
+            category = Category(importer_id=importer.id, name=name, slug=name)
+            db.add(category)
+            await db.commit()
+            return category
+
+    async def cleanup(category):
+        async with session_factory() as db:
+            product_ids = select(Product.id).where(Product.category_id == category.id)
+            await db.execute(
+                delete(ProductPriceHistory).where(
+                    ProductPriceHistory.product_id.in_(product_ids)
+                )
+            )
+            await db.execute(delete(Product).where(Product.category_id == category.id))
+            await db.execute(delete(Category).where(Category.id == category.id))
+            await db.commit()
+
+    category = run(create())
+    yield category
+    run(cleanup(category))
@@ -44,7 +44,7 @@ case $option in
     ;;
   3)
     echo -e "${GREEN}Conectando a logs del worker...${NC}"
-    ssh -t $SERVER_USER@$SERVER_HOST "cd $PROJECT_PATH && docker-compose -f docker-compose.prod.yml logs -f celery-worker"
+    ssh -t $SERVER_USER@$SERVER_HOST "cd $PROJECT_PATH && docker-compose -f docker-compose.prod.yml logs -f celery-worker celery-worker-interactive"
     ;;
   4)
     echo -e "${GREEN}Conectando a logs del frontend...${NC}"
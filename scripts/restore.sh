@@ -59,7 +59,7 @@ echo -e "${YELLOW}🔄 Restaurando backup...${NC}"
 
 # Detener aplicación para evitar conexiones
 echo "  1. Deteniendo aplicación..."
-docker-compose -f docker-compose.prod.yml stop backend celery-worker celery-beat
+docker-compose -f docker-compose.prod.yml stop backend celery-worker celery-worker-interactive celery-beat
 
 # Eliminar base de datos actual y crear nueva
 echo "  2. Recreando base de datos..."
@@ -77,7 +77,7 @@ fi
 
 # Reiniciar aplicación
 echo "  4. Reiniciando aplicación..."
-docker-compose -f docker-compose.prod.yml start backend celery-worker celery-beat
+docker-compose -f docker-compose.prod.yml start backend celery-worker celery-worker-interactive celery-beat
 
 echo -e "${GREEN}✅ Restauración completada exitosamente!${NC}"
 echo ""
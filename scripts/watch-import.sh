@@ -13,4 +13,4 @@ echo "----------------------------------------"
 echo ""
 
 # Ver logs del backend y celery worker combinados
-sshpass -p "$PASS" ssh -o StrictHostKeyChecking=no $SERVER "cd /root/syncar && docker-compose -f docker-compose.prod.yml logs -f --tail=100 backend celery-worker"
+sshpass -p "$PASS" ssh -o StrictHostKeyChecking=no $SERVER "cd /root/syncar && docker-compose -f docker-compose.prod.yml logs -f --tail=100 backend celery-worker celery-worker-interactive"